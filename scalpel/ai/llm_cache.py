@@ -0,0 +1,127 @@
+"""On-disk response cache for LLM plan requests.
+
+Local inference is slow, and replays (re-running after a crash, CI flows) send
+byte-identical requests. Responses are stored content-addressed by
+sha256(endpoint, model, request body) under a cache directory; total size is
+bounded by evicting least recently used entries (file mtime is refreshed on
+every hit).
+
+Tools only store a response after it parsed into a usable plan, so a bad model
+answer is retried rather than replayed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    env = os.environ.get("SCALPEL_LLM_CACHE_DIR", "").strip()
+    if env:
+        return Path(env).expanduser()
+    xdg = os.environ.get("XDG_CACHE_HOME", "").strip()
+    base = Path(xdg).expanduser() if xdg else Path.home() / ".cache"
+    return base / "scalpel" / "llm"
+
+
+def cache_key(url: str, body: Mapping[str, Any]) -> str:
+    blob = json.dumps(
+        {"url": url, "model": body.get("model"), "body": body},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, root: Path, *, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Corrupt or unreadable entry: drop it and treat as a miss.
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        if not isinstance(obj, dict):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return obj
+
+    def put(self, key: str, obj: Mapping[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+            total += st.st_size
+        removed = 0
+        for _mtime, size, p in sorted(entries, key=lambda e: (e[0], str(e[2]))):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+def open_cache(cache_dir: Optional[str], *, max_mb: float, disabled: bool) -> Optional[ResponseCache]:
+    """Build the cache configured by the --cache-dir/--cache-max-mb/--no-cache tool flags."""
+    if disabled:
+        return None
+    root = Path(cache_dir).expanduser() if cache_dir else default_cache_dir()
+    return ResponseCache(root, max_bytes=int(float(max_mb) * 1024 * 1024))
+
+
+__all__ = [
+    "DEFAULT_MAX_BYTES",
+    "ResponseCache",
+    "cache_key",
+    "default_cache_dir",
+    "open_cache",
+]
@@ -0,0 +1,144 @@
+"""Keep-alive HTTP client for local model endpoints.
+
+urllib opens a fresh TCP connection per request. When several candidate plans
+are requested at once, KeepAliveClient keeps a small pool of persistent
+http.client connections to one base URL and post_json_many() sends the bodies
+concurrently, so wall-clock is roughly the slowest response rather than the
+sum of all of them.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Union
+from urllib.parse import urlsplit
+
+
+class KeepAliveClient:
+    """Thread-safe pool of persistent connections to one http(s) base URL."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        api_key: Optional[str] = None,
+        timeout: float = 120.0,
+        max_idle: int = 8,
+    ):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported base URL: {base_url!r}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self._api_key = api_key
+        self._timeout = float(timeout)
+        self._max_idle = int(max_idle)
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        with self._lock:
+            self.connections_opened += 1
+        return cls(self._host, self._port, timeout=self._timeout)
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def post_json(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        data = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if self._api_key:
+            headers["Authorization"] = f"Bearer {self._api_key}"
+
+        t0 = time.monotonic()
+        conn, reused = self._acquire()
+        while True:
+            try:
+                conn.request("POST", self._prefix + path, body=data, headers=headers)
+                resp = conn.getresponse()
+                text = resp.read().decode("utf-8", errors="replace")
+                break
+            except (http.client.RemoteDisconnected, ConnectionError, http.client.BadStatusLine) as e:
+                conn.close()
+                if not reused:
+                    elapsed_ms = int((time.monotonic() - t0) * 1000)
+                    raise RuntimeError(f"LM Studio connection error after {elapsed_ms}ms: {e}") from e
+                # The server dropped an idle keep-alive connection; retry once on a fresh one.
+                conn, reused = self._connect(), False
+            except OSError as e:
+                conn.close()
+                elapsed_ms = int((time.monotonic() - t0) * 1000)
+                raise RuntimeError(f"LM Studio connection error after {elapsed_ms}ms: {e}") from e
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        elapsed_ms = int((time.monotonic() - t0) * 1000)
+        if resp.status >= 400:
+            suffix = f" body={text.strip()[:400]!r}" if text.strip() else ""
+            raise RuntimeError(f"LM Studio HTTP {resp.status} after {elapsed_ms}ms.{suffix}")
+        if not text.strip():
+            raise ValueError(f"LM Studio returned empty response after {elapsed_ms}ms")
+        obj = json.loads(text)
+        if not isinstance(obj, dict):
+            raise ValueError("LM Studio response must be a JSON object")
+        return obj
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def __enter__(self) -> "KeepAliveClient":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close()
+
+
+def post_json_many(
+    client: KeepAliveClient,
+    path: str,
+    bodies: Sequence[Dict[str, Any]],
+    *,
+    max_workers: Optional[int] = None,
+) -> List[Union[Dict[str, Any], Exception]]:
+    """POST each body concurrently; results (or the raised exception) in input order."""
+
+    def one(body: Dict[str, Any]) -> Union[Dict[str, Any], Exception]:
+        try:
+            return client.post_json(path, body)
+        except Exception as e:
+            return e
+
+    if not bodies:
+        return []
+    n = max(1, min(int(max_workers or len(bodies)), len(bodies)))
+    if n == 1:
+        return [one(b) for b in bodies]
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        return list(ex.map(one, bodies))
+
+
+__all__ = ["KeepAliveClient", "post_json_many"]
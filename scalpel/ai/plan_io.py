@@ -21,6 +21,11 @@ def _as_int(v: Any) -> int | None:
 
 def load_plan_result(path: Path) -> AiPlanResult:
     obj = json.loads(path.read_text(encoding="utf-8", errors="replace"))
+    return plan_result_from_obj(obj)
+
+
+def plan_result_from_obj(obj: Any) -> AiPlanResult:
+    """Validate a decoded plan result object (v1 or v2) and build AiPlanResult."""
     if not isinstance(obj, dict):
         raise ValueError("plan result must be a JSON object")
 
@@ -0,0 +1,237 @@
+"""Compact, budgeted prompt encoding for local-model planners.
+
+Prompt processing time on local models grows with prompt size, so v2 prompts
+can be sent in a compact form:
+
+  - tasks and slots are referenced by short aliases (T1, T2, ... / S1, S2, ...)
+  - tasks and slot candidates are tables (column list + rows), slot times are
+    local HH:MM within a day_key
+  - JSON is serialized without whitespace
+
+A byte (or estimated token) budget drops the lowest-ranked slots first (the
+tail of each task's candidate list), then the last tasks of the selection.
+
+decode_plan() maps aliases in the model output back to real uuids/slot ids, so
+the result compiles through compile_plan_v2 exactly like a full-id plan.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .slots import Slot
+
+# Rough local-model heuristic: ~4 bytes of JSON per token.
+BYTES_PER_TOKEN = 4
+
+TASK_COLS = ("id", "description", "project", "tags", "due", "start", "dur")
+SLOT_COLS = ("id", "day", "start", "end")
+
+
+@dataclass(frozen=True)
+class CompactPrompt:
+    text: str
+    task_aliases: Dict[str, str]  # alias -> uuid
+    slot_aliases: Dict[str, str]  # alias -> slot_id
+    n_bytes: int
+    est_tokens: int
+    dropped_slots: int
+    dropped_tasks: Tuple[str, ...]
+    over_budget: bool
+
+
+def estimate_tokens(text: str) -> int:
+    n = len(text.encode("utf-8"))
+    return -(-n // BYTES_PER_TOKEN)
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _local_iso(ms: Any, tz: dt.tzinfo) -> Optional[str]:
+    if not isinstance(ms, int) or ms <= 0:
+        return None
+    d = dt.datetime.fromtimestamp(ms / 1000.0, tz=tz).replace(second=0, microsecond=0)
+    return d.isoformat(timespec="minutes")
+
+
+def _hhmm(ms: int, tz: dt.tzinfo) -> str:
+    return dt.datetime.fromtimestamp(ms / 1000.0, tz=tz).strftime("%H:%M")
+
+
+def encode_plan_prompt_v2(
+    header: Mapping[str, Any],
+    tasks: Sequence[Mapping[str, Any]],
+    candidates_by_uuid: Mapping[str, Sequence[Slot]],
+    *,
+    tz: dt.tzinfo,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    default_assignment: Optional[Mapping[str, str]] = None,
+) -> CompactPrompt:
+    """Encode a v2 planning prompt compactly within an optional size budget.
+
+    header carries the non-tabular prompt fields (instruction, schema, tz, cfg,
+    user_prompt, ...). tasks are prompt task dicts (uuid, description, project,
+    tags, due_ms, start_calc_ms, duration_min) in rank order, and each task's
+    candidates are in rank order (best or earliest first). A joint-slot
+    default_assignment (uuid -> slot_id) is emitted in aliased form.
+    """
+    budget: Optional[int] = None
+    if max_bytes is not None and max_bytes > 0:
+        budget = int(max_bytes)
+    if max_tokens is not None and max_tokens > 0:
+        tok_bytes = int(max_tokens) * BYTES_PER_TOKEN
+        budget = tok_bytes if budget is None else min(budget, tok_bytes)
+
+    uuids = [str(t.get("uuid")) for t in tasks if isinstance(t.get("uuid"), str)]
+    task_alias = {u: f"T{i + 1}" for i, u in enumerate(uuids)}
+    slot_alias: Dict[str, str] = {}
+    for u in uuids:
+        for s in candidates_by_uuid.get(u, ()):
+            if s.slot_id not in slot_alias:
+                slot_alias[s.slot_id] = f"S{len(slot_alias) + 1}"
+
+    task_rows: Dict[str, List[Any]] = {}
+    for t in tasks:
+        tu = t.get("uuid")
+        if not isinstance(tu, str):
+            continue
+        tags = t.get("tags")
+        task_rows[tu] = [
+            task_alias[tu],
+            t.get("description") or "",
+            t.get("project") or None,
+            [str(x) for x in tags] if isinstance(tags, list) else [],
+            _local_iso(t.get("due_ms"), tz),
+            _local_iso(t.get("start_calc_ms"), tz),
+            t.get("duration_min") if isinstance(t.get("duration_min"), int) else None,
+        ]
+    slot_rows: Dict[str, List[List[Any]]] = {
+        u: [[slot_alias[s.slot_id], s.day_key, _hhmm(s.start_ms, tz), _hhmm(s.due_ms, tz)] for s in cands]
+        for u, cands in ((u, candidates_by_uuid.get(u, ())) for u in uuids)
+    }
+    max_cap = max((len(v) for v in slot_rows.values()), default=0)
+
+    def render(cap: int, n_tasks: int) -> str:
+        kept = uuids[:n_tasks]
+        obj = dict(header)
+        obj["selected_uuids"] = [task_alias[u] for u in kept]
+        obj["task_cols"] = list(TASK_COLS)
+        obj["tasks"] = [task_rows[u] for u in kept]
+        obj["slot_cols"] = list(SLOT_COLS)
+        obj["slots"] = {task_alias[u]: slot_rows[u][:cap] for u in kept}
+        if default_assignment is not None:
+            obj["default_assignment"] = {
+                task_alias[u]: slot_alias[default_assignment[u]]
+                for u in kept
+                if default_assignment.get(u) in slot_alias
+            }
+        return _dumps(obj)
+
+    def size(text: str) -> int:
+        return len(text.encode("utf-8"))
+
+    cap, n_tasks = max_cap, len(uuids)
+    text = render(cap, n_tasks)
+    if budget is not None and size(text) > budget:
+        # Largest per-task slot cap (>= 1) that fits with every task.
+        lo, hi = 1, max(1, max_cap)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if size(render(mid, n_tasks)) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        cap = lo
+        text = render(cap, n_tasks)
+        if size(text) > budget:
+            # Still too big: keep the most tasks (>= 1) that fit at one slot each.
+            lo, hi = 1, max(1, len(uuids))
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if size(render(cap, mid)) <= budget:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            n_tasks = lo
+            text = render(cap, n_tasks)
+
+    kept = uuids[:n_tasks]
+    kept_slot_ids = {s.slot_id for u in kept for s in list(candidates_by_uuid.get(u, ()))[:cap]}
+    n_bytes = size(text)
+    return CompactPrompt(
+        text=text,
+        task_aliases={task_alias[u]: u for u in kept},
+        slot_aliases={a: sid for sid, a in slot_alias.items() if sid in kept_slot_ids},
+        n_bytes=n_bytes,
+        est_tokens=estimate_tokens(text),
+        dropped_slots=sum(max(0, len(slot_rows[u]) - cap) for u in kept)
+        + sum(len(slot_rows[u]) for u in uuids[n_tasks:]),
+        dropped_tasks=tuple(uuids[n_tasks:]),
+        over_budget=budget is not None and n_bytes > budget,
+    )
+
+
+def _temp_ids(ops: List[Any]) -> set[str]:
+    out: set[str] = set()
+    for op in ops:
+        if not isinstance(op, dict):
+            continue
+        if op.get("op") == "create_task" and isinstance(op.get("temp_id"), str):
+            out.add(op["temp_id"].strip())
+        subs = op.get("subtasks") if op.get("op") == "split_task" else None
+        if isinstance(subs, list):
+            for st in subs:
+                if isinstance(st, dict) and isinstance(st.get("temp_id"), str):
+                    out.add(st["temp_id"].strip())
+    return out
+
+
+def decode_plan(plan_obj: Mapping[str, Any], prompt: CompactPrompt) -> Dict[str, Any]:
+    """Return a copy of a model plan with task/slot aliases mapped back to real ids.
+
+    Values that are not known aliases (full uuids, temp ids of created tasks)
+    are left untouched.
+    """
+    out = dict(plan_obj)
+    ops = plan_obj.get("ops")
+    if not isinstance(ops, list):
+        return out
+    temp_ids = _temp_ids(ops)
+
+    def task_id(v: Any) -> Any:
+        if isinstance(v, str) and v.strip() not in temp_ids:
+            return prompt.task_aliases.get(v.strip(), v)
+        return v
+
+    new_ops: List[Any] = []
+    for op in ops:
+        if not isinstance(op, dict):
+            new_ops.append(op)
+            continue
+        op2 = dict(op)
+        for key in ("target", "uuid"):
+            if key in op2:
+                op2[key] = task_id(op2[key])
+        sid = op2.get("slot_id")
+        if isinstance(sid, str):
+            op2["slot_id"] = prompt.slot_aliases.get(sid.strip(), sid)
+        new_ops.append(op2)
+    out["ops"] = new_ops
+    return out
+
+
+__all__ = [
+    "BYTES_PER_TOKEN",
+    "CompactPrompt",
+    "SLOT_COLS",
+    "TASK_COLS",
+    "decode_plan",
+    "encode_plan_prompt_v2",
+    "estimate_tokens",
+]
@@ -8,10 +8,14 @@ Design goals:
 
 from __future__ import annotations
 
+import bisect
 import datetime as dt
+import heapq
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from scalpel import planner_vec
+from scalpel.goals import goal_matches_task
 from scalpel.interval import infer_interval_ms
 from scalpel.util.tz import midnight_epoch_ms, normalize_tz_name, resolve_tz
 
@@ -139,23 +143,8 @@ def _ceil_to_snap(ms: int, snap_ms: int) -> int:
     return ms + (snap_ms - r)
 
 
-def build_candidate_slots(
-    payload: Dict[str, Any],
-    selected_uuids: List[str],
-    *,
-    max_slots_per_task: int = 24,
-    max_days_scan: Optional[int] = None,
-) -> Tuple[Dict[str, List[Slot]], Dict[str, Dict[str, int]]]:
-    """Return (candidates_by_uuid, slot_catalog).
-
-    slot_catalog maps slot_id -> {start_ms, due_ms}.
-    """
-
-    cfg_raw = payload.get("cfg")
-    cfg: dict[str, Any] = dict(cfg_raw) if isinstance(cfg_raw, dict) else {}
-    tz_name = normalize_tz_name(cfg.get("tz") if isinstance(cfg.get("tz"), str) else "local")
-    tz = resolve_tz(tz_name)
-
+def _view_dates(cfg: Dict[str, Any], tz: dt.tzinfo, max_days_scan: Optional[int]) -> Tuple[int, List[dt.date]]:
+    """Return (horizon_start_ms, dates) for the payload view window."""
     view_start_ms = cfg.get("view_start_ms")
     days = int(cfg.get("days") or 7)
     if not isinstance(view_start_ms, int):
@@ -169,16 +158,33 @@ def build_candidate_slots(
     horizon_start_ms = int(view_start_ms)
     # Compute per-day using midnight_epoch_ms to handle DST.
     start_date = dt.datetime.fromtimestamp(horizon_start_ms / 1000.0, tz=tz).date()
-    dates = [start_date + dt.timedelta(days=i) for i in range(max(1, days))]
+    return horizon_start_ms, [start_date + dt.timedelta(days=i) for i in range(max(1, days))]
+
+
+def free_intervals_by_day(
+    payload: Dict[str, Any],
+    movable_uuids: Iterable[str],
+    *,
+    max_days_scan: Optional[int] = None,
+) -> Dict[str, List[Tuple[int, int]]]:
+    """Return free work-hour intervals per day key.
+
+    Busy time is every pending task interval except `movable_uuids`, which are
+    the tasks being (re)placed.
+    """
+
+    cfg_raw = payload.get("cfg")
+    cfg: dict[str, Any] = dict(cfg_raw) if isinstance(cfg_raw, dict) else {}
+    tz_name = normalize_tz_name(cfg.get("tz") if isinstance(cfg.get("tz"), str) else "local")
+    tz = resolve_tz(tz_name)
+    horizon_start_ms, dates = _view_dates(cfg, tz, max_days_scan)
 
     work_start_min = int(cfg.get("work_start_min") or 0)
     work_end_min = int(cfg.get("work_end_min") or 24 * 60)
-    snap_min = int(cfg.get("snap_min") or 10)
-    snap_ms = max(1, snap_min) * MIN_MS
 
-    sel = set(u for u in selected_uuids if isinstance(u, str) and u)
+    sel = set(u for u in movable_uuids if isinstance(u, str) and u)
 
-    # Build busy intervals (exclude selected tasks so they can move).
+    # Build busy intervals (exclude movable tasks so they can move).
     busy: List[Tuple[int, int]] = []
     for t in _iter_tasks(payload):
         u = t.get("uuid")
@@ -198,30 +204,272 @@ def build_candidate_slots(
         # coarse horizon end: last day end
         # (we don't need exact; filter later when intersecting day windows)
         busy.append((s, e))
-    busy_u = _union_intervals(busy)
+    busy_u = planner_vec.union_intervals(busy) if planner_vec.enabled_for(len(busy)) else _union_intervals(busy)
+    busy_ends = [e for _s, e in busy_u]
 
-    # Build free intervals for each day within work hours.
-    free_by_day: Dict[str, List[Tuple[int, int]]] = {}
+    # Work window of each day in the view.
+    day_keys: List[str] = []
+    windows: List[Tuple[int, int]] = []
     for d in dates:
         day0 = midnight_epoch_ms(d, tz)
         w0 = day0 + work_start_min * MIN_MS
         w1 = day0 + work_end_min * MIN_MS
         if w1 <= w0:
             continue
+        day_keys.append(d.isoformat())
+        windows.append((w0, w1))
+
+    free_lists = planner_vec.free_in_windows(busy_u, windows) if planner_vec.enabled_for(len(busy)) else None
+    if free_lists is None:
+        free_lists = []
+        for w0, w1 in windows:
+            # Intersect busy blocks with this work window.
+            blocks = []
+            for s, e in busy_u[bisect.bisect_right(busy_ends, w0) :]:
+                if s >= w1:
+                    break
+                blocks.append((max(s, w0), min(e, w1)))
+            free_lists.append(_subtract((w0, w1), _union_intervals(blocks)))
+    return dict(zip(day_keys, free_lists, strict=True))
 
-        # Intersect busy blocks with this work window.
-        blocks = []
-        for s, e in busy_u:
-            if e <= w0:
-                continue
-            if s >= w1:
-                break
-            blocks.append((max(s, w0), min(e, w1)))
-        blocks = _union_intervals(blocks)
-        free = _subtract((w0, w1), blocks)
-        free_by_day[d.isoformat()] = free
 
-    # Determine effective duration for each selected task.
+# Slot scoring (lower is better; units are roughly "minutes of regret").
+SCORE_LATE = 100_000.0  # slot ends after the task's due
+SCORE_LATE_PER_MIN = 10.0
+SCORE_DUE_LEAD_PER_HOUR = 1.0  # prefer finishing close to (but before) due
+SCORE_WAIT_PER_HOUR = 0.25  # tasks without due: prefer sooner
+SCORE_TIME_OF_DAY_PER_HOUR = 4.0  # distance from the task's current time of day
+SCORE_FRAGMENT = 30.0  # per leftover free fragment shorter than FRAGMENT_MIN
+SCORE_OUTSIDE_BANDS = 120.0  # slot not inside any of the task's goal time bands
+FRAGMENT_MIN = 30
+
+
+@dataclass(frozen=True)
+class SlotPreferences:
+    horizon_start_ms: int
+    due_ms: Optional[int] = None
+    minute_of_day: Optional[int] = None
+    # (start_min, end_min, weekdays) from matching goals' time_bands
+    bands: Tuple[Tuple[int, int, frozenset[int]], ...] = ()
+
+
+def _slot_cost(
+    s: int,
+    e: int,
+    free_start: int,
+    free_end: int,
+    midnight: int,
+    bands: List[Tuple[int, int]],
+    prefs: SlotPreferences,
+) -> float:
+    cost = 0.0
+    due = prefs.due_ms
+    if due is not None:
+        if e > due:
+            cost += SCORE_LATE + SCORE_LATE_PER_MIN * ((e - due) / MIN_MS)
+        else:
+            cost += SCORE_DUE_LEAD_PER_HOUR * ((due - e) / 3_600_000)
+    else:
+        cost += SCORE_WAIT_PER_HOUR * (max(0, s - prefs.horizon_start_ms) / 3_600_000)
+
+    start_min = (s - midnight) // MIN_MS
+    if prefs.minute_of_day is not None:
+        cost += SCORE_TIME_OF_DAY_PER_HOUR * (abs(start_min - prefs.minute_of_day) / 60.0)
+
+    frag_ms = FRAGMENT_MIN * MIN_MS
+    left = s - free_start
+    right = free_end - e
+    if 0 < left < frag_ms:
+        cost += SCORE_FRAGMENT
+    if 0 < right < frag_ms:
+        cost += SCORE_FRAGMENT
+
+    if prefs.bands:
+        end_min = start_min + (e - s) // MIN_MS
+        if not any(b0 <= start_min and end_min <= b1 for b0, b1 in bands):
+            cost += SCORE_OUTSIDE_BANDS
+    return cost
+
+
+def slot_preferences(
+    task: Dict[str, Any],
+    cfg: Dict[str, Any],
+    tz: dt.tzinfo,
+    horizon_start_ms: int,
+    goals: List[Dict[str, Any]],
+) -> SlotPreferences:
+    """Derive scoring preferences for one task (due, current time of day, goal bands)."""
+    due = task.get("due_ms")
+    minute_of_day = None
+    iv = _effective_interval_ms(task, cfg)
+    if iv is not None:
+        local = dt.datetime.fromtimestamp(iv[0] / 1000.0, tz=tz)
+        minute_of_day = local.hour * 60 + local.minute
+    bands: List[Tuple[int, int, frozenset[int]]] = []
+    for g in goals:
+        raw_bands = g.get("time_bands")
+        if not raw_bands or not goal_matches_task(task, g):
+            continue
+        for b in raw_bands:
+            bands.append((int(b["start_min"]), int(b["end_min"]), frozenset(b.get("weekdays") or range(7))))
+    return SlotPreferences(
+        horizon_start_ms=int(horizon_start_ms),
+        due_ms=int(due) if isinstance(due, int) and due > 0 else None,
+        minute_of_day=minute_of_day,
+        bands=tuple(bands),
+    )
+
+
+class FreeTimeIndex:
+    """Free work-hour intervals for one payload and movable set, shared across tasks.
+
+    Feasible intervals are indexed per duration, slots are enumerated lazily in
+    chronological order and ISO strings are rendered (and memoized) only for
+    slots that are actually emitted.
+    """
+
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        movable_uuids: Iterable[str],
+        *,
+        max_days_scan: Optional[int] = None,
+    ) -> None:
+        cfg_raw = payload.get("cfg")
+        cfg: dict[str, Any] = dict(cfg_raw) if isinstance(cfg_raw, dict) else {}
+        tz_name = normalize_tz_name(cfg.get("tz") if isinstance(cfg.get("tz"), str) else "local")
+        self.cfg = cfg
+        self.tz = resolve_tz(tz_name)
+        self.snap_ms = max(1, int(cfg.get("snap_min") or 10)) * MIN_MS
+
+        self.free_by_day = free_intervals_by_day(payload, movable_uuids, max_days_scan=max_days_scan)
+        self._free_starts: List[int] = []
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._day_keys: List[str] = []
+        # day_key -> (local midnight ms, weekday with Monday=0)
+        self.day_info: Dict[str, Tuple[int, int]] = {}
+        for day_key, free_list in self.free_by_day.items():
+            d = dt.date.fromisoformat(day_key)
+            self.day_info[day_key] = (midnight_epoch_ms(d, self.tz), d.weekday())
+            for a, b in free_list:
+                self._free_starts.append(a)
+                self._starts.append(_ceil_to_snap(a, self.snap_ms))
+                self._ends.append(b)
+                self._day_keys.append(day_key)
+        self._feasible: Dict[int, Tuple[List[int], List[int]]] = {}
+        self._iso: Dict[int, str] = {}
+
+    def _feasible_for(self, dur_ms: int) -> Tuple[List[int], List[int]]:
+        """(interval indices, their snapped starts) that fit dur_ms, chronological."""
+        hit = self._feasible.get(dur_ms)
+        if hit is None:
+            idxs = [i for i, (s, e) in enumerate(zip(self._starts, self._ends, strict=True)) if s + dur_ms <= e]
+            hit = (idxs, [self._starts[i] for i in idxs])
+            self._feasible[dur_ms] = hit
+        return hit
+
+    def iter_intervals(self, dur_min: int, *, not_before_ms: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start_ms, due_ms, day_key) for every snapped placement of dur_min."""
+        dur_ms = max(1, int(dur_min)) * MIN_MS
+        snap_ms = self.snap_ms
+        idxs, starts = self._feasible_for(dur_ms)
+        pos = 0
+        floor = None
+        if not_before_ms is not None:
+            floor = _ceil_to_snap(int(not_before_ms), snap_ms)
+            # The interval containing `floor` may start before it.
+            pos = max(0, bisect.bisect_right(starts, floor) - 1)
+        for i in idxs[pos:]:
+            s = self._starts[i]
+            b = self._ends[i]
+            if floor is not None and s < floor:
+                s = floor  # both are snap-aligned
+            day_key = self._day_keys[i]
+            while s + dur_ms <= b:
+                yield s, s + dur_ms, day_key
+                s += snap_ms
+
+    def top_k(
+        self,
+        dur_min: int,
+        k: int,
+        prefs: "SlotPreferences",
+        *,
+        max_per_day: Optional[int] = None,
+    ) -> List[Tuple[int, int, str]]:
+        """Return the k best-scoring (start_ms, due_ms, day_key) placements, best first.
+
+        Every feasible placement is scored and streamed through bounded per-day
+        heaps (at most max_per_day kept per day), so the cost is O(n log k).
+        """
+        if k <= 0:
+            return []
+        dur_ms = max(1, int(dur_min)) * MIN_MS
+        snap_ms = self.snap_ms
+        cap = min(k, max_per_day) if max_per_day and max_per_day > 0 else k
+        idxs, _starts = self._feasible_for(dur_ms)
+
+        heaps: Dict[str, List[Tuple[float, int, int]]] = {}
+        for i in idxs:
+            day_key = self._day_keys[i]
+            midnight, weekday = self.day_info[day_key]
+            bands = [(b0, b1) for b0, b1, days in prefs.bands if weekday in days]
+            a = self._free_starts[i]
+            b = self._ends[i]
+            heap = heaps.setdefault(day_key, [])
+            s = self._starts[i]
+            while s + dur_ms <= b:
+                e = s + dur_ms
+                cost = _slot_cost(s, e, a, b, midnight, bands, prefs)
+                item = (-cost, -s, e)
+                if len(heap) < cap:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+                s += snap_ms
+
+        best = heapq.nsmallest(
+            k,
+            ((-neg_cost, -neg_s, e, day_key) for day_key, heap in heaps.items() for neg_cost, neg_s, e in heap),
+        )
+        return [(s, e, day_key) for _cost, s, e, day_key in best]
+
+    def placement_count(self, dur_min: int) -> int:
+        """Number of snapped placements of dur_min across all free intervals."""
+        dur_ms = max(1, int(dur_min)) * MIN_MS
+        idxs, _starts = self._feasible_for(dur_ms)
+        return sum((self._ends[i] - dur_ms - self._starts[i]) // self.snap_ms + 1 for i in idxs)
+
+    def iso(self, ms: int) -> str:
+        out = self._iso.get(ms)
+        if out is None:
+            out = _iso_min(ms, self.tz)
+            self._iso[ms] = out
+        return out
+
+    def slot(self, start_ms: int, due_ms: int, day_key: str) -> Slot:
+        return Slot(
+            slot_id=_slot_id_for_interval(start_ms, due_ms),
+            start_ms=int(start_ms),
+            due_ms=int(due_ms),
+            start_iso=self.iso(int(start_ms)),
+            due_iso=self.iso(int(due_ms)),
+            day_key=day_key,
+        )
+
+
+def free_time_index(
+    payload: Dict[str, Any],
+    movable_uuids: Iterable[str],
+    *,
+    max_days_scan: Optional[int] = None,
+) -> FreeTimeIndex:
+    """Return a FreeTimeIndex for payload + movable set, shared by every task of one call."""
+    return FreeTimeIndex(payload, movable_uuids, max_days_scan=max_days_scan)
+
+
+def _durations_by_uuid(payload: Dict[str, Any], cfg: Dict[str, Any], sel: set[str]) -> Dict[str, int]:
     dur_by_uuid: Dict[str, int] = {}
     by_uuid = payload.get("indices", {}).get("by_uuid") if isinstance(payload.get("indices"), dict) else None
     if isinstance(by_uuid, dict):
@@ -236,11 +484,67 @@ def build_candidate_slots(
     # Fallback if indices missing.
     if not dur_by_uuid:
         for t in _iter_tasks(payload):
-            u = t.get("uuid")
-            if u in sel:
+            tu = t.get("uuid")
+            if isinstance(tu, str) and tu in sel:
                 iv = _effective_interval_ms(t, cfg)
                 if iv is not None:
-                    dur_by_uuid[u] = int(iv[2])
+                    dur_by_uuid[tu] = int(iv[2])
+    return dur_by_uuid
+
+
+SLOT_RANKINGS = ("chronological", "score")
+
+
+def _preferences_by_uuid(
+    payload: Dict[str, Any],
+    index: FreeTimeIndex,
+    sel: set[str],
+    max_days_scan: Optional[int],
+) -> Dict[str, SlotPreferences]:
+    goals_raw = payload.get("goals")
+    goals = goals_raw.get("goals") if isinstance(goals_raw, dict) else None
+    goals_list = [g for g in goals if isinstance(g, dict)] if isinstance(goals, list) else []
+    horizon_start_ms, _dates = _view_dates(index.cfg, index.tz, max_days_scan)
+    out: Dict[str, SlotPreferences] = {}
+    for t in _iter_tasks(payload):
+        u = t.get("uuid")
+        if isinstance(u, str) and u in sel and u not in out:
+            out[u] = slot_preferences(t, index.cfg, index.tz, horizon_start_ms, goals_list)
+    return out
+
+
+def build_candidate_slots(
+    payload: Dict[str, Any],
+    selected_uuids: List[str],
+    *,
+    max_slots_per_task: int = 24,
+    max_days_scan: Optional[int] = None,
+    ranking: str = "chronological",
+    max_slots_per_day: Optional[int] = None,
+) -> Tuple[Dict[str, List[Slot]], Dict[str, Dict[str, int]]]:
+    """Return (candidates_by_uuid, slot_catalog).
+
+    slot_catalog maps slot_id -> {start_ms, due_ms}.
+
+    ranking="chronological" returns the first max_slots_per_task slots in time
+    order. ranking="score" returns the best-scoring slots (best first), keeping
+    at most max_slots_per_day per day (default: a third of the budget).
+    """
+    if ranking not in SLOT_RANKINGS:
+        raise ValueError(f"Unknown slot ranking: {ranking}")
+
+    sel = set(u for u in selected_uuids if isinstance(u, str) and u)
+    index = free_time_index(payload, sel, max_days_scan=max_days_scan)
+    cfg = index.cfg
+
+    # Determine effective duration for each selected task.
+    dur_by_uuid = _durations_by_uuid(payload, cfg, sel)
+
+    prefs_by_uuid: Dict[str, SlotPreferences] = {}
+    if ranking == "score":
+        prefs_by_uuid = _preferences_by_uuid(payload, index, sel, max_days_scan)
+        if max_slots_per_day is None:
+            max_slots_per_day = max(1, -(-int(max_slots_per_task) // 3))
 
     candidates: Dict[str, List[Slot]] = {u: [] for u in selected_uuids if u in sel}
     slot_catalog: Dict[str, Dict[str, int]] = {}
@@ -249,34 +553,129 @@ def build_candidate_slots(
         if u not in sel:
             continue
         dur_min = int(dur_by_uuid.get(u) or int(cfg.get("default_duration_min") or 30))
-        dur_ms = max(1, dur_min) * MIN_MS
+        if ranking == "score":
+            prefs = prefs_by_uuid.get(u) or SlotPreferences(horizon_start_ms=0)
+            placements: Iterable[Tuple[int, int, str]] = index.top_k(
+                dur_min, int(max_slots_per_task), prefs, max_per_day=max_slots_per_day
+            )
+        else:
+            placements = index.iter_intervals(dur_min)
         out_slots: List[Slot] = []
-
-        for day_key, free_list in free_by_day.items():
-            for a, b in free_list:
-                s = _ceil_to_snap(a, snap_ms)
-                while s + dur_ms <= b:
-                    e = s + dur_ms
-                    sid = _slot_id_for_interval(s, e)
-                    if sid not in slot_catalog:
-                        slot_catalog[sid] = {"start_ms": int(s), "due_ms": int(e)}
-                    out_slots.append(
-                        Slot(
-                            slot_id=sid,
-                            start_ms=int(s),
-                            due_ms=int(e),
-                            start_iso=_iso_min(int(s), tz),
-                            due_iso=_iso_min(int(e), tz),
-                            day_key=day_key,
-                        )
-                    )
-                    if len(out_slots) >= max_slots_per_task:
-                        break
-                    s += snap_ms
-                if len(out_slots) >= max_slots_per_task:
-                    break
+        for s, e, day_key in placements:
+            slot = index.slot(s, e, day_key)
+            if slot.slot_id not in slot_catalog:
+                slot_catalog[slot.slot_id] = {"start_ms": int(s), "due_ms": int(e)}
+            out_slots.append(slot)
             if len(out_slots) >= max_slots_per_task:
                 break
         candidates[u] = out_slots
 
     return candidates, slot_catalog
+
+
+class _Occupancy:
+    """Sorted, disjoint taken intervals."""
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def is_free(self, s: int, e: int) -> bool:
+        i = bisect.bisect_right(self.starts, s)
+        if i > 0 and self.ends[i - 1] > s:
+            return False
+        return not (i < len(self.starts) and self.starts[i] < e)
+
+    def take(self, s: int, e: int) -> None:
+        i = bisect.bisect_right(self.starts, s)
+        self.starts.insert(i, s)
+        self.ends.insert(i, e)
+
+
+def build_joint_candidate_slots(
+    payload: Dict[str, Any],
+    selected_uuids: List[str],
+    *,
+    max_slots_per_task: int = 24,
+    max_days_scan: Optional[int] = None,
+    max_slots_per_day: Optional[int] = None,
+) -> Tuple[Dict[str, List[Slot]], Dict[str, Dict[str, int]], Dict[str, str]]:
+    """Return (candidates_by_uuid, slot_catalog, default_assignment) with no cross-task collisions.
+
+    Every selected task draws from the same free time. Tasks pick their next
+    best-scoring slot in round-robin order (most constrained first), and each
+    pick reserves its time, so candidates of different tasks never overlap and
+    any combination of picks is conflict-free. The round-one picks form the
+    default feasible assignment (uuid -> slot_id); tasks that cannot be placed
+    get no candidates and no default.
+    """
+    sel = set(u for u in selected_uuids if isinstance(u, str) and u)
+    index = free_time_index(payload, sel, max_days_scan=max_days_scan)
+    cfg = index.cfg
+    dur_by_uuid = _durations_by_uuid(payload, cfg, sel)
+    prefs_by_uuid = _preferences_by_uuid(payload, index, sel, max_days_scan)
+    k = int(max_slots_per_task)
+    if max_slots_per_day is None:
+        max_slots_per_day = max(1, -(-k // 3))
+
+    order: List[str] = []
+    pools: Dict[str, List[Tuple[int, int, str]]] = {}
+    for u in selected_uuids:
+        if u not in sel or u in pools:
+            continue
+        dur_min = int(dur_by_uuid.get(u) or int(cfg.get("default_duration_min") or 30))
+        prefs = prefs_by_uuid.get(u) or SlotPreferences(horizon_start_ms=0)
+        # Full ranked list: picks of earlier tasks can invalidate any prefix of it.
+        pools[u] = index.top_k(dur_min, index.placement_count(dur_min), prefs)
+        order.append(u)
+
+    position = {u: i for i, u in enumerate(order)}
+
+    def constraint_key(u: str) -> Tuple[int, int, int, int]:
+        due = prefs_by_uuid[u].due_ms if u in prefs_by_uuid else None
+        return (
+            len(pools[u]),
+            due if due is not None else 2**62,
+            -int(dur_by_uuid.get(u) or 0),
+            position[u],
+        )
+
+    order.sort(key=constraint_key)
+
+    taken = _Occupancy()
+    picks: Dict[str, List[Tuple[int, int, str]]] = {u: [] for u in order}
+    per_day: Dict[str, Dict[str, int]] = {u: {} for u in order}
+    cursor = {u: 0 for u in order}
+    active = [u for u in order if k > 0]
+    while active:
+        still: List[str] = []
+        for u in active:
+            pool = pools[u]
+            i = cursor[u]
+            while i < len(pool):
+                s, e, day_key = pool[i]
+                i += 1
+                if per_day[u].get(day_key, 0) >= max_slots_per_day:
+                    continue
+                if not taken.is_free(s, e):
+                    continue
+                taken.take(s, e)
+                picks[u].append((s, e, day_key))
+                per_day[u][day_key] = per_day[u].get(day_key, 0) + 1
+                break
+            cursor[u] = i
+            if i < len(pool) and len(picks[u]) < k and picks[u]:
+                still.append(u)
+        active = still
+
+    candidates: Dict[str, List[Slot]] = {u: [] for u in selected_uuids if u in sel}
+    slot_catalog: Dict[str, Dict[str, int]] = {}
+    assignment: Dict[str, str] = {}
+    for u in candidates:
+        out_slots = [index.slot(s, e, day_key) for s, e, day_key in picks.get(u, [])]
+        for slot in out_slots:
+            slot_catalog.setdefault(slot.slot_id, {"start_ms": slot.start_ms, "due_ms": slot.due_ms})
+        if out_slots:
+            assignment[u] = out_slots[0].slot_id
+        candidates[u] = out_slots
+    return candidates, slot_catalog, assignment
@@ -112,3 +112,65 @@ def make_large_payload_v1(base_payload: Dict[str, Any], *, n_tasks: int, seed: i
     meta["fixture"] = {"name": "golden_payload_large_v1", "n_tasks": n_tasks, "seed": seed}
 
     return out
+
+
+def make_schedule_payload_v1(*, n_tasks: int = 500, days: int = 14, seed: int = 1) -> Dict[str, Any]:
+    """Synthetic scheduler benchmark payload (UTC, 08:00-18:00 work hours).
+
+    One in five tasks is a fixed event inside the view; the rest are backlog
+    tasks (no due, or a due deadline somewhere in the horizon).
+    """
+    import random
+
+    rng = random.Random(seed)
+    day_ms = 86_400_000
+    view_start_ms = 1_767_225_600_000  # 2026-01-01T00:00:00Z
+    work_start_min, work_end_min = 8 * 60, 18 * 60
+
+    tasks: List[Dict[str, Any]] = []
+    for i in range(n_tasks):
+        u = str(uuid5(NAMESPACE_DNS, f"scalpel.schedule.v1:{seed}:{i}"))
+        dur = rng.choice([10, 15, 20, 30])
+        t: Dict[str, Any] = {
+            "uuid": u,
+            "description": f"schedule bench task [S{i:05d}]",
+            "status": "pending",
+            "priority": rng.choice(["H", "M", "L", ""]),
+            "urgency": round(rng.uniform(0.0, 15.0), 2),
+            "tags": [],
+            "duration_min": dur,
+        }
+        day = rng.randrange(days)
+        if i % 5 == 0:
+            start_min = rng.randrange(work_start_min, work_end_min - dur, 10)
+            start_ms = view_start_ms + day * day_ms + start_min * 60_000
+            t["due_ms"] = start_ms + dur * 60_000
+            t["start_calc_ms"] = start_ms
+            t["end_calc_ms"] = start_ms + dur * 60_000
+            t["dur_calc_min"] = dur
+        elif i % 5 in (1, 2):
+            t["due_ms"] = view_start_ms + day * day_ms + work_end_min * 60_000
+            # Deadline only: start in the past so the task counts as backlog.
+            t["start_calc_ms"] = view_start_ms - day_ms
+            t["end_calc_ms"] = view_start_ms - day_ms + dur * 60_000
+            t["dur_calc_min"] = dur
+        tasks.append(t)
+
+    return {
+        "schema_version": 1,
+        "cfg": {
+            "tz": "UTC",
+            "display_tz": "UTC",
+            "days": int(days),
+            "work_start_min": work_start_min,
+            "work_end_min": work_end_min,
+            "snap_min": 10,
+            "default_duration_min": 30,
+            "max_infer_duration_min": 480,
+            "px_per_min": 2.0,
+            "view_start_ms": view_start_ms,
+        },
+        "tasks": tasks,
+        "indices": build_indices_v1(tasks),
+        "meta": {"fixture": {"name": "schedule_bench_v1", "n_tasks": n_tasks, "days": days, "seed": seed}},
+    }
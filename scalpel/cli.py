@@ -15,8 +15,12 @@ from . import serve_data as serve_data_mod
 from .ai import AiPlanResult, PlanOverride, apply_plan_result, load_plan_overrides, load_plan_result
 from .model import Payload
 from .payload import build_payload
-from .render.inline import build_html
-from .taskwarrior import parse_tw_utc_to_epoch_ms, run_task_export
+from .render.inline import write_html_file
+from .serve_async import AsyncHTTPServer
+from .serve_task_cache import TaskExportCache
+from .serve_timew_cache import TimewDayCache
+from .serve_views import RawExportCache, ViewPayloadCache
+from .taskwarrior import parse_tw_utc_to_epoch_ms, run_task_export, task_data_dir
 from .util.console import eprint
 from .util.timeparse import parse_date_yyyy_mm_dd, parse_workhours
 from .util.tz import normalize_tz_name, resolve_tz, today_date
@@ -122,6 +126,33 @@ def _build_parser(default_out: str) -> argparse.ArgumentParser:
         default=os.getenv("SCALPEL_SERVE_TOKEN", ""),
         help="Bearer/token for serve endpoints (required when --allow-remote is used).",
     )
+    ap.add_argument(
+        "--bundle",
+        choices=["split", "inline"],
+        default="split",
+        help=(
+            "Live-mode page layout: split serves a small shell plus a content-hashed, browser-cached "
+            "/static app bundle and loads data from /payload (default); inline serves the single-file HTML."
+        ),
+    )
+    ap.add_argument(
+        "--watch",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=(
+            "Live mode: watch the Taskwarrior data directory, rebuild after writes settle, and push "
+            "updates to open pages over /events (default: on)."
+        ),
+    )
+    ap.add_argument(
+        "--server",
+        choices=["threading", "asyncio"],
+        default="threading",
+        help=(
+            "Live-mode HTTP backend: threading (one thread per connection, default) or asyncio "
+            "(HTTP/1.1 keep-alive on one event loop, slow Taskwarrior calls in a bounded worker pool)."
+        ),
+    )
     ap.add_argument("--no-open", action="store_true", help="Do not open the generated HTML in a browser")
     return ap
 
@@ -171,7 +202,12 @@ def _load_plan_inputs(args: argparse.Namespace) -> tuple[dict[str, PlanOverride]
     return plan_overrides, plan_result
 
 
-def _build_data(args: argparse.Namespace) -> Payload:
+def _build_data(
+    args: argparse.Namespace,
+    *,
+    task_cache: TaskExportCache | None = None,
+    raw_cache: RawExportCache | None = None,
+) -> Payload:
     tz_name = normalize_tz_name(args.tz)
     display_tz = normalize_tz_name(args.display_tz)
     start_date = _resolve_start_date(args.start, tz_name)
@@ -195,17 +231,23 @@ def _build_data(args: argparse.Namespace) -> Payload:
         plan_overrides=plan_overrides,
         nautical_hooks_enabled=not bool(args.no_nautical_hooks),
         show_completed=bool(getattr(args, "show_completed", False)),
+        on_export=task_cache.load if task_cache is not None else None,
+        run_export=raw_cache.export if raw_cache is not None else None,
     )
     if plan_result:
         data = apply_plan_result(data, plan_result)
     return data
 
 
-def _render_once(args: argparse.Namespace, out_path: str) -> Payload:
-    data = _build_data(args)
-    html = build_html(data)
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(html)
+def _render_once(
+    args: argparse.Namespace,
+    out_path: str,
+    *,
+    task_cache: TaskExportCache | None = None,
+    raw_cache: RawExportCache | None = None,
+) -> Payload:
+    data = _build_data(args, task_cache=task_cache, raw_cache=raw_cache)
+    write_html_file(data, out_path)
     return data
 
 
@@ -238,20 +280,69 @@ def _run_timew_export_for_day(*, day_ymd: str, tz_name: str) -> TimewExportResul
     )
 
 
+def _run_timew_export_for_range(*, start_ymd: str, end_ymd: str, tz_name: str) -> list[TimewExportResult]:
+    return serve_data_mod.run_timew_export_for_range(
+        start_ymd=start_ymd,
+        end_ymd=end_ymd,
+        tz_name=tz_name,
+        run_proc=subprocess.run,
+        parse_utc=parse_tw_utc_to_epoch_ms,
+    )
+
+
 def _run_task_export_for_uuid(uuid_query: str) -> TaskExportLookupResult:
     return serve_data_mod.run_task_export_for_uuid(uuid_query, run_export=run_task_export)
 
 
-def _serve(args: argparse.Namespace, out_path: str, initial_payload: Payload) -> None:
+def _serve(
+    args: argparse.Namespace,
+    out_path: str,
+    initial_payload: Payload,
+    *,
+    task_cache: TaskExportCache | None = None,
+    raw_cache: RawExportCache | None = None,
+) -> None:
+    watch_dirs: list[str] = []
+    if bool(getattr(args, "watch", False)):
+        data_dir = task_data_dir()
+        if data_dir:
+            watch_dirs.append(data_dir)
+        else:
+            eprint("[scalpel] WARN: Taskwarrior data directory not found; live auto-refresh disabled.")
+    tz_name = str(args.tz or "local")
+    server_factory: Any = AsyncHTTPServer if getattr(args, "server", "threading") == "asyncio" else ThreadingHTTPServer
+    if raw_cache is None:
+        raw_cache = RawExportCache(lambda filter_str: run_task_export(filter_str))
+    views = ViewPayloadCache(lambda a: _build_data(a, raw_cache=raw_cache), raw_cache)
+
+    def _render_main_view(a: argparse.Namespace, p: str) -> Payload:
+        # A refresh (explicit or after a data change) must see fresh rows, for every view.
+        raw_cache.invalidate()
+        payload = _render_once(a, p, task_cache=task_cache, raw_cache=raw_cache)
+        views.prefetch_adjacent(a)
+        return payload
+
+    views.prefetch_adjacent(args)
+
     serve_mod.serve(
         args,
         out_path,
         initial_payload,
-        render_once=_render_once,
+        render_once=_render_main_view,
         task_lookup=_run_task_export_for_uuid,
-        timew_export=lambda day: _run_timew_export_for_day(day_ymd=day, tz_name=str(args.tz or "local")),
-        server_factory=ThreadingHTTPServer,
+        timew_export=lambda day: _run_timew_export_for_day(day_ymd=day, tz_name=tz_name),
+        timew_range_export=lambda start, end: _run_timew_export_for_range(
+            start_ymd=start, end_ymd=end, tz_name=tz_name
+        ),
+        server_factory=server_factory,
         browser_open=webbrowser.open,
+        watch_dirs=watch_dirs,
+        task_cache=task_cache,
+        timew_cache=TimewDayCache(
+            serve_data_mod.timew_data_dir(),
+            today_ymd=lambda: today_date(resolve_tz(normalize_tz_name(tz_name))).isoformat(),
+        ),
+        views=views,
     )
 
 
@@ -260,12 +351,15 @@ def main(argv: list[str] | None = None) -> None:
     ap = _build_parser(default_out)
     args = ap.parse_args(argv)
     out_path = _resolve_out_path(args.out, default_out)
-    payload = _render_once(args, out_path)
+    serving = bool(getattr(args, "serve", False))
+    task_cache = TaskExportCache() if serving else None
+    raw_cache = RawExportCache(lambda filter_str: run_task_export(filter_str)) if serving else None
+    payload = _render_once(args, out_path, task_cache=task_cache, raw_cache=raw_cache)
 
     print(out_path)
 
-    if bool(getattr(args, "serve", False)):
-        _serve(args, out_path, payload)
+    if serving:
+        _serve(args, out_path, payload, task_cache=task_cache, raw_cache=raw_cache)
         return
 
     if not getattr(args, "no_open", False):
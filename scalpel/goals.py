@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 _HEX_COLOR_RE = re.compile(r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$")
 _FUNC_COLOR_RE = re.compile(r"^(?:rgb|hsl)a?\(\s*[-+0-9.%\s,]+\)$", re.IGNORECASE)
 _NAMED_COLOR_RE = re.compile(r"^[A-Za-z][A-Za-z0-9-]{0,31}$")
+_HHMM_RE = re.compile(r"^(\d{1,2}):(\d{2})$")
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
 
 
 def _normalize_css_color(value: str) -> str:
@@ -23,6 +25,82 @@ def _normalize_css_color(value: str) -> str:
     return ""
 
 
+def _parse_hhmm(value: Any) -> Optional[int]:
+    m = _HHMM_RE.fullmatch(str(value or "").strip())
+    if not m:
+        return None
+    hh, mm = int(m.group(1)), int(m.group(2))
+    if mm >= 60 or hh > 24 or (hh == 24 and mm):
+        return None
+    return hh * 60 + mm
+
+
+def _normalize_time_bands(raw: Any) -> list[dict[str, Any]]:
+    """Normalize goal time bands to {start_min, end_min, weekdays} (Monday=0)."""
+    out: list[dict[str, Any]] = []
+    if not isinstance(raw, list):
+        return out
+    for b in raw:
+        if not isinstance(b, dict):
+            continue
+        start_min = _parse_hhmm(b.get("start"))
+        end_min = _parse_hhmm(b.get("end"))
+        if start_min is None or end_min is None or end_min <= start_min:
+            continue
+        days_raw = b.get("days")
+        weekdays: list[int] = []
+        if isinstance(days_raw, list):
+            for d in days_raw:
+                key = str(d).strip().lower()[:3]
+                if key in _WEEKDAYS:
+                    weekdays.append(_WEEKDAYS.index(key))
+                elif isinstance(d, int) and 0 <= d < 7:
+                    weekdays.append(d)
+        out.append(
+            {
+                "start_min": start_min,
+                "end_min": end_min,
+                "weekdays": sorted(set(weekdays)) if weekdays else list(range(7)),
+            }
+        )
+    return out
+
+
+def project_matches(project: str, prefixes: list[str]) -> bool:
+    if not project:
+        return False
+    for p in prefixes:
+        if project.startswith(p):
+            return True
+    return False
+
+
+def goal_matches_task(task: Dict[str, Any], goal: Dict[str, Any]) -> bool:
+    """Return True if a task belongs to a (normalized) goal."""
+    project = str(task.get("project") or "")
+    tags_raw = task.get("tags")
+    tags = [str(x) for x in tags_raw if str(x).strip()] if isinstance(tags_raw, list) else []
+
+    projects = goal.get("projects") or []
+    tags_any = goal.get("tags") or []
+    tags_all = goal.get("tags_all") or []
+    mode = goal.get("mode") or "any"
+
+    checks = []
+    if projects:
+        checks.append(project_matches(project, projects))
+    if tags_any:
+        checks.append(any(t in tags for t in tags_any))
+    if tags_all:
+        checks.append(all(t in tags for t in tags_all))
+
+    if not checks:
+        return False
+    if mode == "all":
+        return all(checks)
+    return any(checks)
+
+
 def load_goals_config(path: str) -> Optional[Dict[str, Any]]:
     """Load goals config JSON.
 
@@ -38,6 +116,8 @@ def load_goals_config(path: str) -> Optional[Dict[str, Any]]:
       tags (optional; list of tags)
       tags_all (optional; list of tags that must all be present)
       mode (optional; "any" (default) or "all")
+      time_bands (optional; [{"start": "HH:MM", "end": "HH:MM", "days": ["mon", ...]}]
+                  preferred placement windows, used to rank AI candidate slots)
     """
     if not path:
         return None
@@ -91,6 +171,7 @@ def load_goals_config(path: str) -> Optional[Dict[str, Any]]:
                     str(x).strip() for x in (tags_all if isinstance(tags_all, list) else []) if str(x).strip()
                 ],
                 "mode": mode,
+                "time_bands": _normalize_time_bands(g.get("time_bands")),
             }
         )
 
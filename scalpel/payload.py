@@ -6,7 +6,7 @@ import importlib.util
 import os
 import sys
 from pathlib import Path
-from typing import Any, Optional, Sequence, cast
+from typing import Any, Callable, Optional, Sequence, cast
 
 from .ai import PlanOverride, apply_plan_overrides
 from .goals import load_goals_config
@@ -229,8 +229,15 @@ def _completed_filter_for(filter_str: str) -> str | None:
     return None
 
 
-def _export_tasks_for_view(filter_str: str, *, show_completed: bool) -> list[RawTask]:
-    raw_tasks = run_task_export(filter_str)
+def _export_tasks_for_view(
+    filter_str: str,
+    *,
+    show_completed: bool,
+    run_export: Optional[Callable[[str], list[RawTask]]] = None,
+) -> list[RawTask]:
+    if run_export is None:
+        run_export = run_task_export
+    raw_tasks = run_export(filter_str)
     if not show_completed:
         return raw_tasks
 
@@ -239,7 +246,7 @@ def _export_tasks_for_view(filter_str: str, *, show_completed: bool) -> list[Raw
         return raw_tasks
 
     seen = {_task_identity(t) for t in raw_tasks if isinstance(t, dict)}
-    for task in run_task_export(completed_filter):
+    for task in run_export(completed_filter):
         if not isinstance(task, dict):
             continue
         ident = _task_identity(task)
@@ -466,9 +473,14 @@ def build_payload(
     plan_overrides: Optional[dict[str, PlanOverride]] = None,
     nautical_hooks_enabled: Optional[bool] = None,
     show_completed: bool = False,
+    on_export: Optional[Callable[[list[RawTask]], None]] = None,
+    run_export: Optional[Callable[[str], list[RawTask]]] = None,
 ) -> Payload:
     """Build a SCALPEL payload from Taskwarrior export.
 
+    ``on_export`` receives the raw export rows (live mode keeps them for /task).
+    ``run_export`` replaces ``task <filter> export`` (live mode shares one cache across views).
+
     Timezone contract:
       - All timestamps are stored as UTC epoch milliseconds.
       - `cfg.tz` defines *day boundaries* (bucketing; `day_key`, `indices.by_day`, `view_start_ms`).
@@ -483,7 +495,13 @@ def build_payload(
     tz_name = normalize_tz_name(tz)
     display_tz_name = normalize_tz_name(display_tz)
 
-    raw_tasks = _export_tasks_for_view(filter_str, show_completed=bool(show_completed))
+    raw_tasks = _export_tasks_for_view(
+        filter_str,
+        show_completed=bool(show_completed),
+        run_export=run_export,
+    )
+    if on_export is not None:
+        on_export(raw_tasks)
     nautical_enabled = _nautical_hooks_enabled(nautical_hooks_enabled)
     _warn_nautical_disabled_if_needed(raw_tasks, enabled=nautical_enabled)
 
@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 import datetime as dt
+import os
 import shlex
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 
+from . import planner_vec
 from .ai.interface import PlanOverride
 from .interval import infer_interval_ms
 from .model import (
@@ -80,6 +83,11 @@ def apply_overrides(
 
 def detect_conflicts(events: EventMap, cfg: CalendarConfig) -> list[ConflictSegment]:
     """Overlap detection and out-of-workhours segments."""
+    if planner_vec.enabled_for(len(events)):
+        fast = planner_vec.detect_conflicts(events, cfg)
+        if fast is not None:
+            return fast
+
     segments: list[ConflictSegment] = []
 
     # Overlaps (sweep line, similar to JS computeConflictSegments).
@@ -88,7 +96,19 @@ def detect_conflicts(events: EventMap, cfg: CalendarConfig) -> list[ConflictSegm
         pts.append((start_ms, +1, uuid))
         pts.append((due_ms, -1, uuid))
     pts.sort(key=lambda x: (x[0], -x[1]))
+    _sweep_overlaps(pts, segments)
+
+    # Out-of-workhours segments (day-by-day in cfg.tz).
+    work_start_min, work_end_min = _work_window_min(cfg)
+    tzinfo = resolve_tz(normalize_tz_name(cfg.get("tz")))
+    for uuid, (start_ms, due_ms, _dur) in events.items():
+        _append_out_of_hours(segments, uuid, start_ms, due_ms, tzinfo, work_start_min, work_end_min)
+
+    return segments
+
 
+def _sweep_overlaps(pts: list[tuple[int, int, str]], segments: list[ConflictSegment]) -> None:
+    """Append merged overlap segments for sorted (t_ms, +1/-1, uuid) sweep points."""
     active: set[str] = set()
     prev_t: int | None = None
 
@@ -114,75 +134,84 @@ def detect_conflicts(events: EventMap, cfg: CalendarConfig) -> list[ConflictSegm
             active.discard(uuid)
         prev_t = t_ms
 
-    # Out-of-workhours segments (day-by-day in cfg.tz).
+
+def _work_window_min(cfg: CalendarConfig) -> tuple[int, int]:
     work_start_min = int(cfg.get("work_start_min", 0) or 0)
     work_end_min = int(cfg.get("work_end_min", 1440) or 1440)
     work_start_min = max(0, min(1440, work_start_min))
     work_end_min = max(0, min(1440, work_end_min))
     if work_end_min <= work_start_min:
         work_start_min, work_end_min = 0, 1440
+    return work_start_min, work_end_min
 
-    tz_name = normalize_tz_name(cfg.get("tz"))
-    tzinfo = resolve_tz(tz_name)
-
-    for uuid, (start_ms, due_ms, _dur) in events.items():
-        if due_ms <= start_ms:
-            continue
-
-        try:
-            day_date = dt.datetime.fromtimestamp(start_ms / 1000.0, tz=tzinfo).date()
-        except Exception:
-            continue
 
-        guard = 0
-        while guard < 400:
-            guard += 1
+def _append_out_of_hours(
+    segments: list[ConflictSegment],
+    uuid: str,
+    start_ms: int,
+    due_ms: int,
+    tzinfo: dt.tzinfo,
+    work_start_min: int,
+    work_end_min: int,
+) -> None:
+    if due_ms <= start_ms:
+        return
 
-            day_start = midnight_epoch_ms(day_date, tzinfo)
-            next_day = day_date + dt.timedelta(days=1)
-            next_day_start = midnight_epoch_ms(next_day, tzinfo)
-
-            seg_start = max(start_ms, day_start)
-            seg_end = min(due_ms, next_day_start)
-            if seg_end > seg_start:
-                work_start_ms = day_start + work_start_min * 60000
-                work_end_ms = day_start + work_end_min * 60000
-
-                if seg_start < work_start_ms:
-                    out_end = min(seg_end, work_start_ms)
-                    if out_end > seg_start:
-                        segments.append(
-                            ConflictSegment(
-                                start_ms=seg_start,
-                                end_ms=out_end,
-                                uuids=(uuid,),
-                                key=uuid,
-                                kind="out_of_hours",
-                            )
+    try:
+        day_date = dt.datetime.fromtimestamp(start_ms / 1000.0, tz=tzinfo).date()
+    except Exception:
+        return
+
+    guard = 0
+    while guard < 400:
+        guard += 1
+
+        day_start = midnight_epoch_ms(day_date, tzinfo)
+        next_day = day_date + dt.timedelta(days=1)
+        next_day_start = midnight_epoch_ms(next_day, tzinfo)
+
+        seg_start = max(start_ms, day_start)
+        seg_end = min(due_ms, next_day_start)
+        if seg_end > seg_start:
+            work_start_ms = day_start + work_start_min * 60000
+            work_end_ms = day_start + work_end_min * 60000
+
+            if seg_start < work_start_ms:
+                out_end = min(seg_end, work_start_ms)
+                if out_end > seg_start:
+                    segments.append(
+                        ConflictSegment(
+                            start_ms=seg_start,
+                            end_ms=out_end,
+                            uuids=(uuid,),
+                            key=uuid,
+                            kind="out_of_hours",
                         )
-
-                if seg_end > work_end_ms:
-                    out_start = max(seg_start, work_end_ms)
-                    if seg_end > out_start:
-                        segments.append(
-                            ConflictSegment(
-                                start_ms=out_start,
-                                end_ms=seg_end,
-                                uuids=(uuid,),
-                                key=uuid,
-                                kind="out_of_hours",
-                            )
+                    )
+
+            if seg_end > work_end_ms:
+                out_start = max(seg_start, work_end_ms)
+                if seg_end > out_start:
+                    segments.append(
+                        ConflictSegment(
+                            start_ms=out_start,
+                            end_ms=seg_end,
+                            uuids=(uuid,),
+                            key=uuid,
+                            kind="out_of_hours",
                         )
+                    )
 
-            if next_day_start >= due_ms:
-                break
-            day_date = next_day
-
-    return segments
+        if next_day_start >= due_ms:
+            break
+        day_date = next_day
 
 
 def selection_metrics(selected_uuids: list[str], events: EventMap) -> SelectionMetrics:
     """sum duration, span, total gaps (between sorted intervals)."""
+    if planner_vec.enabled_for(len(selected_uuids)):
+        return planner_vec.selection_metrics(selected_uuids, events)
+
     ints: list[tuple[int, int]] = []
     total_min = 0
 
@@ -217,6 +246,39 @@ def selection_metrics(selected_uuids: list[str], events: EventMap) -> SelectionM
     )
 
 
+def day_loads(events: EventMap, cfg: CalendarConfig) -> dict[str, int]:
+    """Busy minutes per local day (cfg.tz), keyed YYYY-MM-DD in day order.
+
+    Events spanning midnight count towards each day they touch; overlapping
+    events are counted once each (this is planned load, not covered time).
+    """
+    if planner_vec.enabled_for(len(events)):
+        fast = planner_vec.day_loads(events, cfg)
+        if fast is not None:
+            return fast
+
+    tzinfo = resolve_tz(normalize_tz_name(cfg.get("tz")))
+    load_ms: dict[dt.date, int] = {}
+    for start_ms, due_ms, _dur in events.values():
+        if due_ms <= start_ms:
+            continue
+        try:
+            day_date = dt.datetime.fromtimestamp(start_ms / 1000.0, tz=tzinfo).date()
+        except Exception:
+            continue
+        while True:
+            next_day = day_date + dt.timedelta(days=1)
+            next_day_start = midnight_epoch_ms(next_day, tzinfo)
+            seg = min(due_ms, next_day_start) - max(start_ms, midnight_epoch_ms(day_date, tzinfo))
+            if seg > 0:
+                load_ms[day_date] = load_ms.get(day_date, 0) + seg
+            if next_day_start >= due_ms:
+                break
+            day_date = next_day
+
+    return {d.isoformat(): ms // 60000 for d, ms in sorted(load_ms.items())}
+
+
 def generate_modify_commands(selected: list[str], events: EventMap) -> list[str]:
     """
     Emit:
@@ -277,6 +339,131 @@ def build_plan_summary(
     return PlanSummary(events=events, conflicts=conflicts, commands=commands, metrics=metrics)
 
 
+# what-if evaluation of many candidate override sets
+OVERLAP_SCORE_WEIGHT = 10.0
+OUT_OF_HOURS_SCORE_WEIGHT = 1.0
+GAP_SCORE_WEIGHT = 0.1
+
+
+@dataclass(frozen=True)
+class PlanEvaluation:
+    index: int
+    conflicts: list[ConflictSegment]
+    overlap_min: int
+    out_of_hours_min: int
+    metrics: SelectionMetrics
+    score: float
+
+
+# Per-process base state: (base events, tasks by uuid, cfg). Set once per worker
+# by the pool initializer (inherited copy-on-write under fork, unpickled once per
+# worker under spawn), so variants only ship their own overrides.
+_EvalBase = tuple[EventMap, dict[str, Task], CalendarConfig]
+_EVAL_BASE: _EvalBase | None = None
+
+
+def _init_eval_worker(base: _EvalBase) -> None:
+    global _EVAL_BASE
+    _EVAL_BASE = base
+
+
+def _evaluate_variant(
+    base: _EvalBase,
+    index: int,
+    overrides: dict[str, PlanOverride],
+    selected_uuids: list[str] | None,
+) -> PlanEvaluation:
+    base_events, tasks_by_uuid, cfg = base
+    # Only the overridden tasks go through apply_overrides(); everything else
+    # keeps its base interval. Unknown uuids are ignored and an empty/negative
+    # override drops the event, exactly as for a full apply_overrides() call.
+    touched = [tasks_by_uuid[u] for u in overrides if u in tasks_by_uuid]
+    patched = apply_overrides(touched, overrides, cfg)
+    dropped = {t["uuid"] for t in touched} - patched.keys()
+    if patched.keys() <= base_events.keys():
+        events = dict(base_events)
+        events.update(patched)  # keeps each event's position (conflict order)
+    else:
+        # An override scheduled a task with no base interval: keep task order.
+        merged = {**base_events, **patched}
+        events = {u: merged[u] for u in tasks_by_uuid if u in merged}
+    for uuid in dropped:
+        events.pop(uuid, None)
+
+    conflicts = detect_conflicts(events, cfg)
+    overlap_min = sum((c.end_ms - c.start_ms) // 60000 for c in conflicts if c.kind == "overlap")
+    out_of_hours_min = sum((c.end_ms - c.start_ms) // 60000 for c in conflicts if c.kind == "out_of_hours")
+    selected = list(selected_uuids) if selected_uuids is not None else sorted(overrides.keys())
+    metrics = selection_metrics(selected, events)
+    score = (
+        OVERLAP_SCORE_WEIGHT * overlap_min
+        + OUT_OF_HOURS_SCORE_WEIGHT * out_of_hours_min
+        + GAP_SCORE_WEIGHT * metrics.gap_min
+    )
+    return PlanEvaluation(
+        index=index,
+        conflicts=conflicts,
+        overlap_min=int(overlap_min),
+        out_of_hours_min=int(out_of_hours_min),
+        metrics=metrics,
+        score=float(score),
+    )
+
+
+def _evaluate_variant_in_worker(
+    index: int, overrides: dict[str, PlanOverride], selected_uuids: list[str] | None
+) -> PlanEvaluation:
+    if _EVAL_BASE is None:
+        raise RuntimeError("plan evaluation worker was not initialized")
+    return _evaluate_variant(_EVAL_BASE, index, overrides, selected_uuids)
+
+
+def evaluate_plan_variants(
+    payload: Payload,
+    variants: list[dict[str, PlanOverride]],
+    *,
+    selected_uuids: list[str] | None = None,
+    workers: int | None = None,
+) -> list[PlanEvaluation]:
+    """Evaluate many candidate override sets against the same payload.
+
+    Returns one PlanEvaluation per variant, in input order. Lower score is better:
+    overlap minutes dominate, then out-of-hours minutes, then selection gaps.
+    Metrics cover selected_uuids, or each variant's own override uuids.
+
+    workers=None uses up to os.cpu_count() processes; workers<=1 (or a single
+    variant) evaluates serially in-process.
+    """
+    tasks_list = payload.get("tasks")
+    cfg_dict = payload.get("cfg")
+    tasks_list = tasks_list if isinstance(tasks_list, list) else []
+    cfg_dict = cfg_dict if isinstance(cfg_dict, dict) else {}
+
+    base_events = apply_overrides(tasks_list, {}, cfg_dict)
+    tasks_by_uuid: dict[str, Task] = {}
+    for t in tasks_list:
+        if isinstance(t, dict) and isinstance(t.get("uuid"), str) and t.get("uuid"):
+            tasks_by_uuid.setdefault(t["uuid"], t)
+    base: _EvalBase = (base_events, tasks_by_uuid, cfg_dict)
+
+    n_workers = int(workers) if workers is not None else (os.cpu_count() or 1)
+    n_workers = max(1, min(n_workers, len(variants)))
+    if n_workers <= 1:
+        return [_evaluate_variant(base, i, ov, selected_uuids) for i, ov in enumerate(variants)]
+
+    chunksize = max(1, len(variants) // (n_workers * 4))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_eval_worker, initargs=(base,)) as ex:
+        return list(
+            ex.map(
+                _evaluate_variant_in_worker,
+                range(len(variants)),
+                variants,
+                [selected_uuids] * len(variants),
+                chunksize=chunksize,
+            )
+        )
+
+
 # scheduling ops (these should operate on the events dict + return new overrides)
 def _snap_ms(ms: int, snap_min: int) -> int:
     if snap_min <= 1:
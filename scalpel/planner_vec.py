@@ -0,0 +1,302 @@
+# scalpel/planner_vec.py
+"""Optional NumPy backend for planner metrics.
+
+The pure-Python implementations in planner.py / ai.slots remain the reference.
+When NumPy is importable and the input is large enough, callers dispatch here;
+every function returns exactly what the pure-Python path would (the contract
+tests run both paths against each other).
+
+Set SCALPEL_NUMPY=0 to force the pure-Python path.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+from importlib import import_module
+from types import ModuleType
+from typing import Any
+
+from .model import CalendarConfig, ConflictSegment, EventMap, SelectionMetrics
+from .util.tz import midnight_epoch_ms, normalize_tz_name, resolve_tz
+
+np: ModuleType | None
+try:
+    np = import_module("numpy")
+except ImportError:  # pragma: no cover
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Below this many events the array conversion costs more than it saves.
+MIN_VECTOR_EVENTS = 256
+
+# Out-of-hours vectorization precomputes one midnight per calendar day spanned.
+_MAX_DAY_TABLE = 4000
+
+
+def enabled_for(n: int) -> bool:
+    if np is None or n < MIN_VECTOR_EVENTS:
+        return False
+    return (os.getenv("SCALPEL_NUMPY", "1") or "").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def event_arrays(events: EventMap) -> tuple[list[str], Any, Any, Any]:
+    """Return (uuids, start_ms, end_ms, duration_min) with int64 arrays in EventMap order."""
+    if np is None:
+        raise RuntimeError("NumPy is not available")
+    uuids = list(events.keys())
+    n = len(uuids)
+    flat = np.fromiter(
+        (int(v) for ev in events.values() for v in ev[:3]),
+        dtype=np.int64,
+        count=3 * n,
+    ).reshape(n, 3)
+    return uuids, flat[:, 0], flat[:, 1], flat[:, 2]
+
+
+def _overlaps(uuids: list[str], start: Any, end: Any, segments: list[ConflictSegment]) -> None:
+    from .planner import _sweep_overlaps
+
+    assert np is not None
+    n = len(uuids)
+    t = np.concatenate([start, end])
+    k = np.concatenate([np.ones(n, dtype=np.int64), -np.ones(n, dtype=np.int64)])
+    idx = np.concatenate([np.arange(n), np.arange(n)])
+
+    # Same ordering as the reference sweep: by time, starts before ends.
+    order = np.lexsort((-k, t))
+    t, k, idx = t[order], k[order], idx[order]
+    active = np.cumsum(k)
+
+    # Split into clusters of connected busy time (active count back to zero);
+    # only clusters that reach two concurrent events can produce overlaps.
+    ends = np.flatnonzero(active == 0)
+    if ends.size == 0:
+        return
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    peak = np.maximum.reduceat(active, starts)
+    t_list = t.tolist()
+    k_list = k.tolist()
+    i_list = idx.tolist()
+    for a, b in zip(starts[peak >= 2].tolist(), ends[peak >= 2].tolist(), strict=True):
+        pts = [(t_list[i], k_list[i], uuids[i_list[i]]) for i in range(a, b + 1)]
+        _sweep_overlaps(pts, segments)
+
+
+def _day_table(tzinfo: dt.tzinfo, first_ms: int, last_ms: int) -> tuple[dt.date, Any] | None:
+    """(first date, midnight epochs for every local day in [first_ms, last_ms] plus one), or None if unsafe."""
+    assert np is not None
+    try:
+        d0 = dt.datetime.fromtimestamp(first_ms / 1000.0, tz=tzinfo).date()
+        d1 = dt.datetime.fromtimestamp(last_ms / 1000.0, tz=tzinfo).date()
+    except Exception:
+        return None
+    n_days = (d1 - d0).days + 2
+    if n_days > _MAX_DAY_TABLE:
+        return None
+
+    dates = [d0 + dt.timedelta(days=i) for i in range(n_days)]
+    mids = [midnight_epoch_ms(d, tzinfo) for d in dates]
+    # The table is only valid if each midnight is the first instant of its date.
+    for d, m in zip(dates, mids, strict=True):
+        if dt.datetime.fromtimestamp(m / 1000.0, tz=tzinfo).date() != d:
+            return None
+        if dt.datetime.fromtimestamp((m - 1) / 1000.0, tz=tzinfo).date() == d:
+            return None
+    table = np.asarray(mids, dtype=np.int64)
+    if np.any(np.diff(table) <= 0):
+        return None
+    return d0, table
+
+
+def _out_of_hours(
+    uuids: list[str],
+    start: Any,
+    end: Any,
+    cfg: CalendarConfig,
+    segments: list[ConflictSegment],
+) -> bool:
+    from .planner import _append_out_of_hours, _work_window_min
+
+    assert np is not None
+    work_start_min, work_end_min = _work_window_min(cfg)
+    tzinfo = resolve_tz(normalize_tz_name(cfg.get("tz")))
+
+    valid = end > start
+    if not np.any(valid):
+        return True
+    found = _day_table(tzinfo, int(start[valid].min()), int(end[valid].max()))
+    if found is None:
+        return False
+    table = found[1]
+
+    day = np.searchsorted(table, start, side="right") - 1
+    day = np.clip(day, 0, len(table) - 2)
+    day_start = table[day]
+    next_day_start = table[day + 1]
+    work_start = day_start + work_start_min * 60000
+    work_end = day_start + work_end_min * 60000
+
+    single = valid & (end <= next_day_start)
+    multi = valid & ~single
+    pre = single & (start < work_start)
+    post = single & (end > work_end)
+    pre_end = np.minimum(end, work_start)
+    post_start = np.maximum(start, work_end)
+
+    hits = np.flatnonzero(pre | post | multi).tolist()
+    pre_l, post_l, multi_l = pre.tolist(), post.tolist(), multi.tolist()
+    start_l, end_l = start.tolist(), end.tolist()
+    pre_end_l, post_start_l = pre_end.tolist(), post_start.tolist()
+    for i in hits:
+        u = uuids[i]
+        if multi_l[i]:
+            _append_out_of_hours(segments, u, start_l[i], end_l[i], tzinfo, work_start_min, work_end_min)
+            continue
+        if pre_l[i]:
+            segments.append(
+                ConflictSegment(start_ms=start_l[i], end_ms=pre_end_l[i], uuids=(u,), key=u, kind="out_of_hours")
+            )
+        if post_l[i]:
+            segments.append(
+                ConflictSegment(start_ms=post_start_l[i], end_ms=end_l[i], uuids=(u,), key=u, kind="out_of_hours")
+            )
+    return True
+
+
+def detect_conflicts(events: EventMap, cfg: CalendarConfig) -> list[ConflictSegment] | None:
+    """Vectorized planner.detect_conflicts; None means "use the reference path"."""
+    if np is None:
+        return None
+    uuids, start, end, _dur = event_arrays(events)
+    if np.any(end < start):
+        return None
+
+    segments: list[ConflictSegment] = []
+    _overlaps(uuids, start, end, segments)
+    if not _out_of_hours(uuids, start, end, cfg, segments):
+        return None
+    return segments
+
+
+def selection_metrics(selected_uuids: list[str], events: EventMap) -> SelectionMetrics:
+    """Vectorized planner.selection_metrics."""
+    if np is None:
+        raise RuntimeError("NumPy is not available")
+    evs = [ev for ev in (events.get(u) for u in selected_uuids) if ev and ev[1] > ev[0]]
+    if not evs:
+        return SelectionMetrics(count=0, duration_min=0, span_min=0, gap_min=0)
+
+    arr = np.asarray([(s, e) for s, e, _d in evs], dtype=np.int64)
+    order = np.argsort(arr[:, 0], kind="stable")
+    s = arr[order, 0]
+    e = arr[order, 1]
+    span_min = int((e[-1] - s[0]) // 60000)
+    gaps = s[1:] - np.maximum.accumulate(e)[:-1]
+    gap_min = int((gaps[gaps > 0] // 60000).sum())
+
+    return SelectionMetrics(
+        count=len(evs),
+        duration_min=int(sum(int(d) for _s, _e, d in evs)),
+        span_min=span_min,
+        gap_min=gap_min,
+    )
+
+
+def union_intervals(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Vectorized ai.slots._union_intervals."""
+    if np is None:
+        raise RuntimeError("NumPy is not available")
+    if not intervals:
+        return []
+    arr = np.asarray(intervals, dtype=np.int64)
+    order = np.lexsort((arr[:, 1], arr[:, 0]))
+    s = arr[order, 0]
+    e = arr[order, 1]
+    reach = np.maximum.accumulate(e)
+    new_group = np.empty(len(s), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = s[1:] > reach[:-1]
+    firsts = np.flatnonzero(new_group)
+    lasts = np.concatenate([firsts[1:] - 1, [len(s) - 1]])
+    return list(zip(s[firsts].tolist(), reach[lasts].tolist(), strict=True))
+
+
+def free_in_windows(busy: list[tuple[int, int]], windows: list[tuple[int, int]]) -> list[list[tuple[int, int]]] | None:
+    """Vectorized ai.slots._subtract of unioned busy time from each window.
+
+    ``busy`` must be _union_intervals output (sorted, disjoint). The free gaps
+    between busy intervals are clipped to every window at once; None means
+    "use the reference path".
+    """
+    if np is None:
+        return None
+    if not windows:
+        return []
+    lo, hi = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+    b = np.asarray(busy, dtype=np.int64).reshape(-1, 2)
+    gap_s = np.concatenate([[lo], b[:, 1]]).astype(np.int64)
+    gap_e = np.concatenate([b[:, 0], [hi]]).astype(np.int64)
+    if np.any(gap_e < gap_s) or np.any(gap_s[1:] < gap_s[:-1]):
+        return None
+    w = np.asarray(windows, dtype=np.int64).reshape(-1, 2)
+
+    # Gaps touching window j are [first[j], stop[j]); expand them into one flat array.
+    first = np.searchsorted(gap_e, w[:, 0], side="right")
+    stop = np.searchsorted(gap_s, w[:, 1], side="left")
+    counts = np.maximum(stop - first, 0)
+    win = np.repeat(np.arange(len(w)), counts)
+    g = np.repeat(first - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+    free_s = np.maximum(gap_s[g], w[win, 0])
+    free_e = np.minimum(gap_e[g], w[win, 1])
+    keep = free_e > free_s
+
+    out: list[list[tuple[int, int]]] = [[] for _ in windows]
+    for j, a, z in zip(win[keep].tolist(), free_s[keep].tolist(), free_e[keep].tolist(), strict=True):
+        out[j].append((a, z))
+    return out
+
+
+def day_loads(events: EventMap, cfg: CalendarConfig) -> dict[str, int] | None:
+    """Vectorized planner.day_loads; None means "use the reference path"."""
+    if np is None:
+        return None
+    _uuids, start, end, _dur = event_arrays(events)
+    valid = end > start
+    if not np.any(valid):
+        return {}
+    start, end = start[valid], end[valid]
+    tzinfo = resolve_tz(normalize_tz_name(cfg.get("tz")))
+    found = _day_table(tzinfo, int(start.min()), int(end.max()))
+    if found is None:
+        return None
+    d0, table = found
+
+    # busy(x) = sum(clip(x - start, 0, end - start)) = sum over start < x of (x - start)
+    # minus sum over end < x of (x - end); one searchsorted per midnight gives it
+    # from prefix sums, and each day's load is the difference of its two midnights.
+    base = table[0]
+    x = table - base
+    s_sorted = np.sort(start - base)
+    e_sorted = np.sort(end - base)
+    s_cum = np.concatenate([[0], np.cumsum(s_sorted)])
+    e_cum = np.concatenate([[0], np.cumsum(e_sorted)])
+    n_s = np.searchsorted(s_sorted, x, side="left")
+    n_e = np.searchsorted(e_sorted, x, side="left")
+    busy = (n_s * x - s_cum[n_s]) - (n_e * x - e_cum[n_e])
+    load_ms = np.diff(busy).tolist()
+    return {(d0 + dt.timedelta(days=i)).isoformat(): int(ms) // 60000 for i, ms in enumerate(load_ms) if ms > 0}
+
+
+__all__ = [
+    "HAVE_NUMPY",
+    "MIN_VECTOR_EVENTS",
+    "day_loads",
+    "detect_conflicts",
+    "enabled_for",
+    "event_arrays",
+    "free_in_windows",
+    "selection_metrics",
+    "union_intervals",
+]
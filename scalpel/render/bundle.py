@@ -0,0 +1,106 @@
+# scalpel/render/bundle.py
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .html_markup import BODY_MARKUP
+from .html_shell import HTML_SHELL
+from .inline_css import CSS_BLOCK
+from .inline_js import JS_BLOCK
+
+# Live-mode layout: GET / returns a small shell that links a content-hashed
+# /static/app.<hash>.{js,css} bundle (cached immutably by the browser) and loads
+# DATA from /payload, so a refresh only moves the payload. --once keeps the
+# single-file HTML from render.inline.
+
+STATIC_PREFIX = "/static/"
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_CSS_SLOT = "<style>\n__CSS_BLOCK__\n</style>"
+_JS_SLOT = "<script>\n__JS_BLOCK__\n</script>"
+_DATA_SLOT = "__DATA_JSON__"
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    path: str
+    content_type: str
+    body: bytes
+
+
+@dataclass(frozen=True)
+class AppBundle:
+    js: StaticAsset
+    css: StaticAsset
+    shell_html: str
+
+    def asset(self, path: str) -> StaticAsset | None:
+        for a in (self.js, self.css):
+            if a.path == path:
+                return a
+        return None
+
+
+def _asset(stem: str, ext: str, content_type: str, text: str) -> StaticAsset:
+    body = text.encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    return StaticAsset(path=f"{STATIC_PREFIX}{stem}.{digest}.{ext}", content_type=content_type, body=body)
+
+
+def _loader_script(js_path: str) -> str:
+    # The app script parses #tw-data synchronously, so it is only attached once the payload is in place.
+    return (
+        "<script>\n"
+        "(() => {\n"
+        '  "use strict";\n'
+        '  const dataEl = document.getElementById("tw-data");\n'
+        "  function fail(err){\n"
+        '    const s = document.getElementById("status");\n'
+        '    if (s) s.textContent = "Failed to load data: " + String((err && err.message) || err);\n'
+        "  }\n"
+        '  const init = { headers: { "Accept": "application/json" }, credentials: "same-origin", cache: "no-cache" };\n'
+        # An extra-view page (?filter=...&days=...) asks for that view's payload.
+        '  fetch("/payload" + String(location.search || ""), init)\n'
+        "    .then((res) => {\n"
+        "      if (!res.ok) throw new Error(`HTTP ${res.status}`);\n"
+        '      const gen = res.headers.get("X-Scalpel-Generation");\n'
+        "      if (gen !== null && /^\\d+$/.test(gen)) globalThis.__scalpel_payloadGeneration = Number(gen);\n"
+        "      return res.text();\n"
+        "    })\n"
+        "    .then((text) => {\n"
+        "      dataEl.textContent = text;\n"
+        '      const s = document.createElement("script");\n'
+        f'      s.src = "{js_path}";\n'
+        "      s.onerror = () => fail(new Error(`failed to load ${s.src}`));\n"
+        "      document.body.appendChild(s);\n"
+        "    })\n"
+        "    .catch(fail);\n"
+        "})();\n"
+        "</script>"
+    )
+
+
+def _build_shell(js: StaticAsset, css: StaticAsset) -> str:
+    for slot in (_CSS_SLOT, _JS_SLOT, _DATA_SLOT, "__BODY_MARKUP__"):
+        if HTML_SHELL.count(slot) != 1:
+            raise RuntimeError(f"HTML_SHELL must contain {slot!r} exactly once")
+    head_links = f'<link rel="stylesheet" href="{css.path}" />\n<link rel="preload" href="{js.path}" as="script" />'
+    return (
+        HTML_SHELL.replace(_CSS_SLOT, head_links)
+        .replace(_JS_SLOT, _loader_script(js.path))
+        .replace(_DATA_SLOT, "")
+        .replace("__BODY_MARKUP__", BODY_MARKUP)
+    )
+
+
+@lru_cache(maxsize=1)
+def app_bundle() -> AppBundle:
+    """Build (once per process) the hashed static bundle and the live-mode shell page."""
+    js = _asset("app", "js", "application/javascript; charset=utf-8", JS_BLOCK)
+    css = _asset("app", "css", "text/css; charset=utf-8", CSS_BLOCK)
+    return AppBundle(js=js, css=css, shell_html=_build_shell(js, css))
+
+
+__all__ = ["AppBundle", "STATIC_CACHE_CONTROL", "STATIC_PREFIX", "StaticAsset", "app_bundle"]
@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
 from importlib import import_module
 from types import ModuleType
-from typing import Any, Mapping
+from typing import Any, Iterator, Mapping
 
 from .template import HTML_TEMPLATE
 
@@ -17,6 +19,15 @@ except ImportError:  # pragma: no cover
 _DATA_MARKER = "__DATA_JSON__"
 _DATA_MARKER_COUNT = HTML_TEMPLATE.count(_DATA_MARKER)
 
+# Template split once around the data marker for the streamed writer.
+_TEMPLATE_PREFIX, _, _TEMPLATE_SUFFIX = HTML_TEMPLATE.partition(_DATA_MARKER)
+_TEMPLATE_PREFIX_B = _TEMPLATE_PREFIX.encode("utf-8")
+_TEMPLATE_SUFFIX_B = _TEMPLATE_SUFFIX.encode("utf-8")
+_DATA_MARKER_B = _DATA_MARKER.encode("utf-8")
+
+# Stdlib fallback: stream the encoded JSON in slices of this many characters.
+_CHUNK_CHARS = 1 << 16
+
 
 def build_html(payload: Mapping[str, Any]) -> str:
     # Inject DATA JSON into the HTML template.
@@ -41,3 +52,68 @@ def build_html(payload: Mapping[str, Any]) -> str:
         raise RuntimeError("HTML generation failed: marker still present after injection")
 
     return html
+
+
+def _iter_data_json(payload: Mapping[str, Any]) -> Iterator[bytes]:
+    """Yield the script-safe DATA JSON as UTF-8 chunks (same bytes as build_html injects)."""
+    if orjson is not None:
+        data = orjson.dumps(payload)
+        if _DATA_MARKER_B in data:
+            raise RuntimeError("HTML generation failed: marker still present after injection")
+        yield data.replace(b"</", b"<\\/")
+        return
+
+    # The C encoder only runs one-shot, so encode once and stream escaped slices of it.
+    text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    if _DATA_MARKER in text:
+        raise RuntimeError("HTML generation failed: marker still present after injection")
+    pos = 0
+    while pos < len(text):
+        end = min(len(text), pos + _CHUNK_CHARS)
+        if text[end - 1] == "<" and end < len(text):
+            end -= 1  # keep "</" within one slice so it is escaped
+        yield text[pos:end].replace("</", r"<\/").encode("utf-8")
+        pos = end
+
+
+def iter_html_chunks(payload: Mapping[str, Any]) -> Iterator[bytes]:
+    """Stream the rendered HTML as UTF-8 chunks without building the full document string."""
+    if not isinstance(payload, Mapping):
+        raise TypeError(f"payload must be dict, got {type(payload).__name__}")
+    if _DATA_MARKER_COUNT != 1:
+        raise RuntimeError(f"HTML_TEMPLATE must contain {_DATA_MARKER} exactly once (found {_DATA_MARKER_COUNT})")
+
+    yield _TEMPLATE_PREFIX_B
+    yield from _iter_data_json(payload)
+    yield _TEMPLATE_SUFFIX_B
+
+
+def write_html_file(payload: Mapping[str, Any], out_path: str) -> int:
+    """Write the rendered HTML to out_path atomically; returns the number of bytes written.
+
+    Output is byte-identical to build_html(payload) encoded as UTF-8, but the
+    document is streamed into a temp file next to out_path (then renamed), so
+    readers never see a partial file and no multi-MB intermediate copies of the
+    template are made.
+    """
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp = tempfile.mkstemp(dir=out_dir, prefix=".scalpel-", suffix=".html.tmp")
+    n = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter_html_chunks(payload):
+                f.write(chunk)
+                n += len(chunk)
+        try:
+            mode = os.stat(out_path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp, mode)
+        os.replace(tmp, out_path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return n
@@ -792,7 +792,10 @@ startYmd: ymdFromMs(cfg.view_start_ms),
     __scalpelIndexTaskForSearch(t);
     tasksByUuid.set(t.uuid, t);
     baseline.set(t.uuid, { scheduled_ms: t.scheduled_ms ?? null, due_ms: t.due_ms ?? null });
+    baselineDur.set(t.uuid, __scalpelBaselineDurMs(t));
+  }
 
+  function __scalpelBaselineDurMs(t) {
     let durMs = DEFAULT_DUR * 60000;
 
     const d1 = parseDurationToMs(t.duration);
@@ -806,8 +809,7 @@ startYmd: ymdFromMs(cfg.view_start_ms),
         if (deltaMin > 0 && deltaMin <= MAX_INFER_DUR) durMs = (dm - sm);
       }
     }
-
-    baselineDur.set(t.uuid, durMs);
+    return durMs;
   }
 
   // Plan state: uuid -> {scheduled_ms, due_ms, dur_ms}
@@ -881,3 +883,110 @@ startYmd: ymdFromMs(cfg.view_start_ms),
     if (changed) __scalpelInvalidateTimeCaches("effective");
   }
   loadEdits();
+
+  // -----------------------------
+  // Live payload patches (GET /payload/delta)
+  // -----------------------------
+  // Tasks are upserted/removed in place. A task whose plan still matches its old
+  // baseline follows the new baseline; locally edited tasks keep their plan.
+  // Selection and undo history stay untouched (removed uuids leave the selection).
+  function __scalpelApplyPayloadDelta(delta) {
+    if (!delta || typeof delta !== "object") return false;
+    const set = (delta.set && typeof delta.set === "object") ? delta.set : {};
+    // cfg drives init-time view state (window, days, tz); a reload is cheaper than re-deriving it.
+    if (Object.prototype.hasOwnProperty.call(set, "cfg")) return false;
+
+    const removed = new Set((Array.isArray(delta.remove) ? delta.remove : []).map(String));
+    const upserts = new Map();
+    for (const t of (Array.isArray(delta.upsert) ? delta.upsert : [])) {
+      if (t && typeof t === "object" && t.uuid) upserts.set(String(t.uuid), t);
+    }
+    for (const [k, v] of Object.entries(set)) {
+      if (k === "tasks") continue;
+      if (v === null) delete DATA[k];
+      else DATA[k] = v;
+    }
+
+    const pending = new Map(upserts);
+    const next = [];
+    for (const t of (DATA.tasks || [])) {
+      const u = t && t.uuid;
+      if (removed.has(u)) continue;
+      if (pending.has(u)) {
+        next.push(pending.get(u));
+        pending.delete(u);
+        continue;
+      }
+      next.push(t);
+    }
+    for (const t of pending.values()) next.push(t);
+    DATA.tasks = next;
+
+    for (const u of removed) {
+      tasksByUuid.delete(u);
+      baseline.delete(u);
+      baselineDur.delete(u);
+      plan.delete(u);
+      __scalpelDropEffectiveIntervalCache(u);
+      selected.delete(u);
+      if (selectionLead === u) selectionLead = null;
+    }
+    for (const [u, t] of upserts) {
+      const oldB = baseline.get(u);
+      const oldD = baselineDur.get(u);
+      const cur = plan.get(u);
+      const untouched = !cur || !oldB
+        || (cur.scheduled_ms === oldB.scheduled_ms && cur.due_ms === oldB.due_ms && cur.dur_ms === oldD);
+      const durMs = __scalpelBaselineDurMs(t);
+      __scalpelIndexTaskForSearch(t);
+      tasksByUuid.set(u, t);
+      baseline.set(u, { scheduled_ms: t.scheduled_ms ?? null, due_ms: t.due_ms ?? null });
+      baselineDur.set(u, durMs);
+      if (untouched) plan.set(u, { scheduled_ms: t.scheduled_ms ?? null, due_ms: t.due_ms ?? null, dur_ms: durMs });
+      __scalpelDropEffectiveIntervalCache(u);
+    }
+    saveEdits();
+    setRangeMeta();
+    updateSelectionMeta();
+    return true;
+  }
+
+  // View spec this page was opened with (`/?filter=...&days=...`). The server
+  // builds such extra views on demand; deltas and /events follow the main view only.
+  function __scalpelViewQuery() {
+    try {
+      const src = new URLSearchParams(String(location.search || ""));
+      const out = new URLSearchParams();
+      for (const k of ["filter", "start", "days", "workhours", "tz"]) {
+        if (src.has(k)) out.set(k, String(src.get(k) || ""));
+      }
+      const q = out.toString();
+      return q ? `?${q}` : "";
+    } catch (_) {
+      return "";
+    }
+  }
+
+  // Pull the change set since the generation this page was served at and patch in place.
+  // Returns false when the caller should fall back to a full reload.
+  async function __scalpelSyncLiveDelta() {
+    const g = globalThis;
+    const since = Number(g.__scalpel_payloadGeneration);
+    if (!Number.isInteger(since) || since < 0) return false;
+    try {
+      const res = await fetch(`/payload/delta?since=${since}`, {
+        headers: { "Accept": "application/json" },
+        credentials: "same-origin",
+        cache: "no-store",
+      });
+      if (!res.ok) return false;
+      const body = await res.json();
+      if (!body || body.ok !== true || body.full) return false;
+      if (!__scalpelApplyPayloadDelta(body)) return false;
+      g.__scalpel_payloadGeneration = Number(body.generation);
+      rerenderAll({ mode: "full", immediate: true });
+      return true;
+    } catch (_) {
+      return false;
+    }
+  }
@@ -50,8 +50,8 @@
   function getSelectedCalendarUuids() {
     const out = [];
     for (const u of selected) {
-      const node = document.querySelector(`.evt[data-uuid="${u}"]`);
-      if (node) out.push(u);
+      // Off-screen days keep their (detached) nodes; see __calendarVirtual.
+      if (__eventNodeByUuid.has(u)) out.push(u);
     }
     return out;
   }
@@ -63,6 +63,7 @@
   function focusTask(uuid) {
     if (!uuid) return;
     const node =
+      (typeof __revealCalendarEvent === "function" ? __revealCalendarEvent(uuid) : null) ||
       document.querySelector(`.evt[data-uuid="${uuid}"]`) ||
       document.querySelector(`.bl-item[data-uuid="${uuid}"]`);
     if (!node) return;
@@ -781,6 +782,55 @@
     if (elStatus) elStatus.textContent = `Timewarrior notes updated for ${ymd}: ${added} interval(s) shown, ${removed} replaced.`;
   }
 
+  async function __showTimewIntervalsForVisibleDays() {
+    const canHttp = /^https?:$/i.test(String(location.protocol || ""));
+    if (!canHttp) {
+      if (elStatus) elStatus.textContent = "Timewarrior day fetch is available only in live mode.";
+      return;
+    }
+    if (!(DAYS > 0)) return;
+    const startYmd = ymdFromMs(dayStarts[0]);
+    const endYmd = ymdFromMs(dayStarts[DAYS - 1]);
+
+    // One request (and at most one `timew export`) for the whole visible range.
+    if (elStatus) elStatus.textContent = `Loading Timewarrior intervals for ${startYmd}..${endYmd}...`;
+    let body = null;
+    try{
+      const res = await fetch(`/timew/range?start=${encodeURIComponent(startYmd)}&end=${encodeURIComponent(endYmd)}`, {
+        method: "GET",
+        headers: { "Accept": "application/json" },
+        cache: "no-store",
+      });
+      try { body = await res.json(); } catch (_) {}
+      if (!res.ok || !body || body.ok !== true) {
+        const reason = (body && body.error) ? String(body.error) : `HTTP ${res.status}`;
+        if (elStatus) elStatus.textContent = `Timewarrior fetch failed: ${reason}`;
+        return;
+      }
+    } catch (e) {
+      if (elStatus) elStatus.textContent = `Timewarrior fetch failed: ${String((e && e.message) || e || "network error")}`;
+      return;
+    }
+
+    const applyFn = globalThis.__scalpel_applyTimewIntervalsAsNotes;
+    if (typeof applyFn !== "function") {
+      if (elStatus) elStatus.textContent = "Notes integration unavailable for Timewarrior intervals.";
+      return;
+    }
+
+    let added = 0;
+    let removed = 0;
+    const days = Array.isArray(body && body.days) ? body.days : [];
+    for (const day of days) {
+      const ymd = String((day && day.day) || "");
+      if (!/^\d{4}-\d{2}-\d{2}$/.test(ymd)) continue;
+      const out = applyFn(ymd, Array.isArray(day.intervals) ? day.intervals : []);
+      added += Number(out && out.added) || 0;
+      removed += Number(out && out.removed) || 0;
+    }
+    if (elStatus) elStatus.textContent = `Timewarrior notes updated for ${startYmd}..${endYmd}: ${added} interval(s) shown, ${removed} replaced.`;
+  }
+
   function __ensureDayContextMenu() {
     if (__dayCtxMenu) return __dayCtxMenu;
 
@@ -790,6 +840,7 @@
     menu.innerHTML = `
       <div class="nautical-ctx-title" data-role="title"></div>
       <button type="button" class="nautical-ctx-btn" data-act="show">Show Timewarrior intervals (this day)</button>
+      <button type="button" class="nautical-ctx-btn" data-act="range">Show Timewarrior intervals (visible days)</button>
       <button type="button" class="nautical-ctx-btn" data-act="pick">Show Timewarrior intervals (choose day...)</button>
       <button type="button" class="nautical-ctx-btn subtle" data-act="clear">Clear Timewarrior notes (this day)</button>
       <button type="button" class="nautical-ctx-btn subtle" data-act="cancel">Cancel</button>
@@ -819,6 +870,10 @@
         __showTimewIntervalsForYmd(dayYmd, di);
         return;
       }
+      if (act === "range") {
+        __showTimewIntervalsForVisibleDays();
+        return;
+      }
       if (act === "pick") {
         const initial = dayYmd || ymdFromMs(Date.now());
         const picked = prompt("Show Timewarrior intervals for day (YYYY-MM-DD):", initial);
@@ -1186,6 +1241,7 @@
     daysCol.addEventListener("scroll", () => {
       const tb = document.getElementById("timeBody");
       if (tb) tb.style.transform = `translateY(-${daysCol.scrollTop}px)`;
+      if (typeof __scheduleCalendarViewportRender === "function") __scheduleCalendarViewportRender();
     }, { passive: true });
 
     const tb = document.getElementById("timeBody");
@@ -1356,6 +1412,7 @@
     const hits = [];
     for (const node of __eventNodeByUuid.values()) {
       if (node && node.dataset && node.dataset.preview === "1") continue;
+      if (!node.isConnected) continue;
       const r = node.getBoundingClientRect();
       const nr = { left:r.left, right:r.right, top:r.top, bottom:r.bottom };
       if (rectsIntersect(rect, nr)) {
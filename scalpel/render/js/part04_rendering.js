@@ -1762,6 +1762,149 @@
     }
   }
 
+  // -----------------------------
+  // Calendar virtualization
+  // -----------------------------
+  // Day columns and headers always exist (they are cheap and keep the grid
+  // width stable), but events, gap markers and notes are only materialized for
+  // days intersecting the calendar's horizontal viewport plus an overscan.
+  // Event nodes of days that scroll out are detached, not destroyed: they stay
+  // in __eventNodeByUuid and are re-attached by uuid when the day comes back.
+  const CAL_VIRTUAL_OVERSCAN_DAYS = 2;
+  const __calendarVirtual = {
+    byDay: null,
+    byDayAll: null,
+    dayByUuid: new Map(),
+    materialized: new Set(),
+    lo: 0,
+    hi: -1,
+    queued: false,
+  };
+
+  function __calendarVisibleDayRange() {
+    const all = { lo: 0, hi: DAYS - 1 };
+    const pane = document.getElementById("daysCol");
+    const body = document.getElementById("daysBody");
+    if (!pane || !body || DAYS <= 0) return all;
+    const viewW = pane.clientWidth;
+    const totalW = body.scrollWidth;
+    if (!(viewW > 0) || !(totalW > 0)) return all;  // not laid out yet: render everything
+    const colW = totalW / DAYS;
+    const lo = Math.floor(pane.scrollLeft / colW) - CAL_VIRTUAL_OVERSCAN_DAYS;
+    const hi = Math.ceil((pane.scrollLeft + viewW) / colW) - 1 + CAL_VIRTUAL_OVERSCAN_DAYS;
+    return { lo: Math.max(0, lo), hi: Math.min(DAYS - 1, hi) };
+  }
+
+  function __attachEventNode(col, ev, t) {
+    let el = __eventNodeByUuid.get(ev.uuid);
+    if (!el) {
+      el = __createEventNode(ev.uuid);
+      __eventNodeByUuid.set(ev.uuid, el);
+    }
+    __updateEventNode(el, ev, t);
+    col.appendChild(el);
+    return el;
+  }
+
+  function __materializeCalendarDay(i, col) {
+    const v = __calendarVirtual;
+    const dayEvents = (v.byDay && v.byDay[i]) || [];
+
+    try { renderNotesInColumn(i, col); } catch (e) { /* ignore */ }
+
+    renderGapsForDay(i, col, (v.byDayAll && v.byDayAll[i]) || []);
+
+    try { renderTimeBandsInColumn(col); } catch (e) { /* ignore */ }
+
+    const normalEvents = dayEvents.filter(ev => {
+      const t = tasksByUuid.get(ev && ev.uuid);
+      return String(t && t.status || "").toLowerCase() !== "completed";
+    });
+    const completedEvents = dayEvents.filter(ev => {
+      const t = tasksByUuid.get(ev && ev.uuid);
+      return String(t && t.status || "").toLowerCase() === "completed";
+    });
+    const laidOut = layoutOverlapGroups(normalEvents);
+
+    for (const ev of laidOut) {
+      const t = tasksByUuid.get(ev.uuid);
+      if (!t) continue;
+      __attachEventNode(col, ev, t);
+    }
+    completedEvents.sort((a, b) => (a.dueMs - b.dueMs) || String(a.uuid).localeCompare(String(b.uuid)));
+    for (let ci = 0; ci < completedEvents.length; ci++) {
+      const ev = completedEvents[ci];
+      const t = tasksByUuid.get(ev.uuid);
+      if (!t) continue;
+      const el = __attachEventNode(col, { ...ev, laneIndex: 0, laneCount: 1 }, t);
+      el.style.setProperty("--completed-stack", String(ci % 3));
+    }
+  }
+
+  function __dematerializeCalendarDay(i, col) {
+    const v = __calendarVirtual;
+    const gapNodes = __scalpelGapNodesByDay.get(i);
+    for (const n of (gapNodes || [])) {
+      try { if (n && n.parentNode) n.parentNode.removeChild(n); } catch (_) {}
+    }
+    __scalpelGapNodesByDay.delete(i);
+    if (col) col.querySelectorAll(".note").forEach(n => n.remove());
+    for (const ev of ((v.byDay && v.byDay[i]) || [])) {
+      if (!ev || v.dayByUuid.get(ev.uuid) !== i) continue;
+      const el = __eventNodeByUuid.get(ev.uuid);
+      try { if (el && el.parentNode) el.parentNode.removeChild(el); } catch (_) {}
+    }
+  }
+
+  function __renderCalendarViewport(force) {
+    const v = __calendarVirtual;
+    if (!v.byDay) return;
+    const range = __calendarVisibleDayRange();
+    if (!force && range.lo === v.lo && range.hi === v.hi) return;
+    const dayCols = document.querySelectorAll(".day-col");
+    const nCols = Math.min(dayCols.length, DAYS);
+    for (const di of Array.from(v.materialized)) {
+      if (di >= range.lo && di <= range.hi && di < nCols) continue;
+      __dematerializeCalendarDay(di, dayCols[di]);
+      v.materialized.delete(di);
+    }
+    for (let i = range.lo; i <= range.hi && i < nCols; i++) {
+      if (!force && v.materialized.has(i)) continue;
+      __materializeCalendarDay(i, dayCols[i]);
+      v.materialized.add(i);
+    }
+    v.lo = range.lo;
+    v.hi = range.hi;
+  }
+
+  function __scheduleCalendarViewportRender() {
+    const v = __calendarVirtual;
+    if (v.queued) return;
+    v.queued = true;
+    requestAnimationFrame(() => {
+      v.queued = false;
+      __renderCalendarViewport(false);
+    });
+  }
+
+  // Scroll an off-screen event's day into view and materialize it; returns the node or null.
+  function __revealCalendarEvent(uuid) {
+    const el = __eventNodeByUuid.get(uuid);
+    if (!el) return null;
+    if (!el.isConnected) {
+      const di = __calendarVirtual.dayByUuid.get(uuid);
+      const pane = document.getElementById("daysCol");
+      const col = (di == null) ? null : document.querySelectorAll(".day-col")[di];
+      if (pane && col) {
+        pane.scrollLeft = Math.max(0, col.offsetLeft - Math.max(0, (pane.clientWidth - col.offsetWidth) / 2));
+        __renderCalendarViewport(false);
+      }
+    }
+    return el.isConnected ? el : null;
+  }
+
+  window.addEventListener("resize", __scheduleCalendarViewportRender, { passive: true });
+
   function renderCalendar(events, allByDay) {
     const byDay = Array.from({length: DAYS}, () => []);
     const byDayAll = Array.from({length: DAYS}, () => []);
@@ -1808,54 +1951,21 @@
   const nCols = Math.min(dayCols.length, DAYS);
   const seenUuids = new Set();
   // scalpel:renderCalendar:v1 clamp to current DAYS (defensive)
+    const dayByUuid = new Map();
     for (let i = 0; i < nCols; i++) {
-      const col = dayCols[i];
-
-      try { renderNotesInColumn(i, col); } catch (e) { /* ignore */ }
-
-      renderGapsForDay(i, col, byDayAll[i]);
-
-      try { renderTimeBandsInColumn(col); } catch (e) { /* ignore */ }
-
-      const normalEvents = (byDay[i] || []).filter(ev => {
-        const t = tasksByUuid.get(ev && ev.uuid);
-        return String(t && t.status || "").toLowerCase() !== "completed";
-      });
-      const completedEvents = (byDay[i] || []).filter(ev => {
-        const t = tasksByUuid.get(ev && ev.uuid);
-        return String(t && t.status || "").toLowerCase() === "completed";
-      });
-      const laidOut = layoutOverlapGroups(normalEvents);
-
-      for (const ev of laidOut) {
-        const t = tasksByUuid.get(ev.uuid);
-        if (!t) continue;
-        let el = __eventNodeByUuid.get(ev.uuid);
-        if (!el) {
-          el = __createEventNode(ev.uuid);
-          __eventNodeByUuid.set(ev.uuid, el);
-        }
-        __updateEventNode(el, ev, t);
-        col.appendChild(el);
-        seenUuids.add(ev.uuid);
-      }
-      completedEvents.sort((a, b) => (a.dueMs - b.dueMs) || String(a.uuid).localeCompare(String(b.uuid)));
-      for (let ci = 0; ci < completedEvents.length; ci++) {
-        const ev = completedEvents[ci];
-        const t = tasksByUuid.get(ev.uuid);
-        if (!t) continue;
-        let el = __eventNodeByUuid.get(ev.uuid);
-        if (!el) {
-          el = __createEventNode(ev.uuid);
-          __eventNodeByUuid.set(ev.uuid, el);
-        }
-        __updateEventNode(el, { ...ev, laneIndex: 0, laneCount: 1 }, t);
-        el.style.setProperty("--completed-stack", String(ci % 3));
-        col.appendChild(el);
+      for (const ev of (byDay[i] || [])) {
+        if (!tasksByUuid.has(ev.uuid)) continue;
         seenUuids.add(ev.uuid);
+        dayByUuid.set(ev.uuid, i);
       }
     }
 
+    const v = __calendarVirtual;
+    v.byDay = byDay;
+    v.byDayAll = byDayAll;
+    v.dayByUuid = dayByUuid;
+    __renderCalendarViewport(true);
+
     try {
       for (const [di, nodes] of Array.from(__scalpelGapNodesByDay.entries())) {
         if (di < nCols) continue;
@@ -1866,8 +1976,13 @@
       }
     } catch (_) {}
 
+    // Recycle by uuid: drop nodes of events that left the view, detach those outside the viewport.
     for (const [uuid, el] of Array.from(__eventNodeByUuid.entries())) {
-      if (seenUuids.has(uuid)) continue;
+      if (seenUuids.has(uuid)) {
+        if (v.materialized.has(dayByUuid.get(uuid))) continue;
+        try { if (el && el.parentNode) el.parentNode.removeChild(el); } catch (_) {}
+        continue;
+      }
       __eventNodeByUuid.delete(uuid);
       try { if (el && el.parentNode) el.parentNode.removeChild(el); } catch (_) {}
     }
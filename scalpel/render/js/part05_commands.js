@@ -153,6 +153,8 @@
   const elApplySelectNone = document.getElementById("applySelectNone");
   const elApplyRefreshPreview = document.getElementById("applyRefreshPreview");
   const elApplyConfirm = document.getElementById("applyConfirm");
+  const elApplyCancel = document.getElementById("applyCancel");
+  let __applyJobId = null;
 
   let __applyEntries = [];
   let __applySelected = new Set();
@@ -356,6 +358,55 @@
     _renderApplyPreview();
   }
 
+  function _sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+  }
+
+  // Live apply runs as a server-side job; poll it so progress shows per command.
+  async function _waitForApplyJob(jobId) {
+    __applyJobId = jobId;
+    if (elApplyCancel) {
+      elApplyCancel.disabled = false;
+      elApplyCancel.style.display = "";
+    }
+    try {
+      for (;;) {
+        const res = await fetch(`/apply/${encodeURIComponent(jobId)}`, {
+          headers: { "Accept": "application/json" },
+          credentials: "same-origin",
+          cache: "no-store",
+        });
+        const job = await res.json();
+        if (!res.ok || !job || job.ok !== true) {
+          throw new Error(String((job && job.error) || `Apply job lookup failed (${res.status}).`));
+        }
+        if (job.result) return job;
+        if (elApplyStatus) {
+          const stopping = job.cancel_requested ? " Stopping after the current command..." : "";
+          elApplyStatus.textContent = `Applying ${Number(job.done) || 0} of ${Number(job.selected) || 0} command(s)...${stopping}`;
+        }
+        await _sleep(400);
+      }
+    } finally {
+      __applyJobId = null;
+      if (elApplyCancel) elApplyCancel.style.display = "none";
+    }
+  }
+
+  async function _cancelApplyJob() {
+    if (!__applyJobId) return;
+    if (elApplyCancel) elApplyCancel.disabled = true;
+    try {
+      await fetch(`/apply/${encodeURIComponent(__applyJobId)}/cancel`, {
+        method: "POST",
+        headers: { "Accept": "application/json", "Content-Type": "application/json" },
+        credentials: "same-origin",
+        cache: "no-store",
+        body: JSON.stringify({}),
+      });
+    } catch (_) {}
+  }
+
   async function _applySelectedCommands() {
     const entries = Array.isArray(__applyEntries) ? __applyEntries.slice() : [];
     const selected = entries.map((_, idx) => idx).filter(idx => __applySelected.has(idx));
@@ -380,9 +431,26 @@
           commands: entries.map(entry => String((entry && entry.line) || "")),
           selected,
           confirm: true,
+          async: true,
         }),
       });
-      const body = await res.json();
+      let body = await res.json();
+      if (res.status === 202 && body && body.job) {
+        const job = await _waitForApplyJob(String(body.job));
+        body = job.result;
+        if (job.error) {
+          _renderApplyResults(body);
+          if (elApplyStatus) elApplyStatus.textContent = `Apply failed: ${String(job.error)}`;
+          return;
+        }
+        if (job.status === "cancelled") {
+          _renderApplyResults(body);
+          if (elApplyStatus) {
+            elApplyStatus.textContent = `Apply stopped after ${Number(body.applied) || 0} of ${Number(body.selected) || 0} command(s) on request.`;
+          }
+          return;
+        }
+      }
       _renderApplyResults(body);
       if (!res.ok) {
         if (elApplyStatus) elApplyStatus.textContent = String((body && body.error) || `Apply failed (${res.status}).`);
@@ -406,7 +474,7 @@
       if (elApplyStatus) elApplyStatus.textContent = `Applied ${Number(body.applied) || selected.length} command(s). Refreshing live data...`;
 
       try {
-        const refreshRes = await fetch("/refresh", {
+        const refreshRes = await fetch(`/refresh${__scalpelViewQuery()}`, {
           method: "POST",
           headers: { "Accept": "application/json", "Content-Type": "application/json" },
           credentials: "same-origin",
@@ -415,6 +483,10 @@
         });
         const refreshBody = await refreshRes.json();
         if (refreshRes.ok && refreshBody && refreshBody.ok) {
+          if (await __scalpelSyncLiveDelta()) {
+            if (elApplyStatus) elApplyStatus.textContent = `Applied ${Number(body.applied) || selected.length} command(s). Live data updated.`;
+            return;
+          }
           window.location.reload();
           return;
         }
@@ -448,6 +520,7 @@
     _renderApplyPreview();
   });
   if (elApplyConfirm) elApplyConfirm.addEventListener("click", _applySelectedCommands);
+  if (elApplyCancel) elApplyCancel.addEventListener("click", _cancelApplyJob);
 
   const elBtnExportPlan = document.getElementById("btnExportPlan");
   if (elBtnExportPlan) elBtnExportPlan.addEventListener("click", () => {
@@ -61,7 +61,7 @@
     for (const u of selection) {
       const e = effectiveInterval(u);
       if (!e) continue;
-      const node = document.querySelector(`.evt[data-uuid="${u}"]`);
+      const node = __eventNodeByUuid.get(u);
       if (!node) continue;
       base[u] = { startMs: e.startMs, dueMs: e.dueMs, durMs: e.durMs, el: node };
     }
@@ -728,8 +728,8 @@
     const idx = new Map();   // uuid -> {di, i, startMin}
     const all = [];
 
-    const nodes = document.querySelectorAll('.evt[data-uuid]');
-    for (const node of nodes) {
+    // Includes events of days outside the virtualized viewport (detached nodes).
+    for (const node of __eventNodeByUuid.values()) {
       const uuid = node.getAttribute('data-uuid');
       if (!uuid) continue;
 
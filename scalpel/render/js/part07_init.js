@@ -516,25 +516,10 @@
       elBtnRefresh.addEventListener("click", async () => {
         closeOverflowMenu();
 
-        try{
-          const dirty = (typeof hasPendingActions === "function" && hasPendingActions())
-            || (typeof hasPlanOverrides === "function" && hasPlanOverrides());
-          if (dirty){
-            const ok = confirm(
-              "You have local pending changes.\n\n"
-              + "Refreshing will reload the page from fresh Taskwarrior data. Continue?"
-            );
-            if (!ok) {
-              elStatus.textContent = "Refresh cancelled.";
-              return;
-            }
-          }
-        }catch(_){ }
-
         elBtnRefresh.disabled = true;
         elStatus.textContent = "Refreshing data...";
         try{
-          const res = await fetch("/refresh", {
+          const res = await fetch(`/refresh${__scalpelViewQuery()}`, {
             method: "POST",
             headers: { "Accept": "application/json" },
             cache: "no-store",
@@ -546,6 +531,24 @@
             elStatus.textContent = `Refresh failed: ${reason}`;
             return;
           }
+          if (await __scalpelSyncLiveDelta()) {
+            elStatus.textContent = "Data refreshed.";
+            return;
+          }
+          try{
+            const dirty = (typeof hasPendingActions === "function" && hasPendingActions())
+              || (typeof hasPlanOverrides === "function" && hasPlanOverrides());
+            if (dirty){
+              const ok = confirm(
+                "You have local pending changes.\n\n"
+                + "Refreshing will reload the page from fresh Taskwarrior data. Continue?"
+              );
+              if (!ok) {
+                elStatus.textContent = "Data refreshed on the server. Reload when ready.";
+                return;
+              }
+            }
+          }catch(_){ }
           elStatus.textContent = "Data refreshed. Reloading...";
           setTimeout(() => location.reload(), 40);
         } catch (e) {
@@ -557,6 +560,50 @@
     }
   }
 
+  // Live push: the server watches Taskwarrior's data directory and announces each
+  // rebuilt payload generation on /events; patch in place instead of polling.
+  function __scalpelListenForLiveUpdates(){
+    if (!/^https?:$/i.test(String(location.protocol || ""))) return;
+    if (typeof EventSource !== "function") return;
+    let syncing = false;
+    let again = false;
+    async function catchUp(target){
+      const have = Number(globalThis.__scalpel_payloadGeneration);
+      if (Number.isInteger(have) && have >= target) return;
+      if (syncing) { again = true; return; }
+      syncing = true;
+      try{
+        do {
+          again = false;
+          if (!(await __scalpelSyncLiveDelta())) {
+            elStatus.textContent = "Taskwarrior data changed. Use Refresh data to reload.";
+            break;
+          }
+          elStatus.textContent = "Live data updated.";
+        } while (again);
+      } finally {
+        syncing = false;
+      }
+    }
+    const extraView = !!__scalpelViewQuery();
+    const onEvent = (ev) => {
+      if (extraView) {
+        if (ev.type === "payload-updated") elStatus.textContent = "Taskwarrior data changed. Use Refresh data to reload.";
+        return;
+      }
+      let data = null;
+      try { data = JSON.parse(ev.data); } catch (_) {}
+      const gen = Number(data && data.generation);
+      if (Number.isInteger(gen)) void catchUp(gen);
+    };
+    try{
+      const es = new EventSource("/events");
+      es.addEventListener("hello", onEvent);
+      es.addEventListener("payload-updated", onEvent);
+    }catch(_){ }
+  }
+  __scalpelListenForLiveUpdates();
+
   function openHelpModal(){
     if (!elHelpModal) return;
     closeOverflowMenu();
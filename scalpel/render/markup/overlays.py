@@ -178,6 +178,7 @@ Review PR #142"></textarea>
     <div class="mf">
       <button class="small btn-soft" id="applyRefreshPreview">Refresh preview</button>
       <div class="grow" aria-hidden="true"></div>
+      <button class="small btn-soft" id="applyCancel" style="display:none;">Stop after current</button>
       <button class="small btn-primary" id="applyConfirm">Apply selected</button>
     </div>
   </div>
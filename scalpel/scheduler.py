@@ -0,0 +1,359 @@
+# scalpel/scheduler.py
+"""Deterministic auto-scheduler for backlog placement.
+
+Greedy earliest-deadline-first placement into free work-hour time, followed by a
+bounded local search (pair reorder + ejection moves). Existing events of tasks
+that are not being placed are treated as fixed busy time.
+
+The output is plain PlanOverride values, so results flow through the same
+apply/validate/render paths as planner ops and AI plans.
+"""
+
+from __future__ import annotations
+
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, cast
+
+from .ai.interface import PlanOverride
+from .ai.slots import MIN_MS, _ceil_to_snap, _effective_interval_ms, _iter_tasks, free_intervals_by_day
+from .model import Payload
+
+PRIORITY_WEIGHT = {"H": 3.0, "M": 2.0, "L": 1.0}
+
+# Cost model (lower is better), all terms scaled by task weight:
+#   - every minute a task starts after the horizon start costs 1
+#   - every minute a task ends after its due deadline costs LATE_COST_PER_MIN
+#   - an unplaced task costs UNPLACED_COST
+LATE_COST_PER_MIN = 100.0
+UNPLACED_COST = 10_000_000.0
+
+_DONE_STATUSES = {"completed", "deleted"}
+
+
+@dataclass(frozen=True)
+class ScheduleItem:
+    uuid: str
+    duration_min: int
+    deadline_ms: int | None
+    weight: float
+
+
+@dataclass(frozen=True)
+class ScheduleResult:
+    overrides: dict[str, PlanOverride]
+    unplaced: tuple[str, ...]
+    late: tuple[str, ...]
+    cost: float
+    greedy_cost: float
+    iterations: int
+    improvements: int
+    timed_out: bool
+
+
+class _FreeList:
+    """Sorted, non-overlapping free intervals tagged with their day index."""
+
+    def __init__(self, intervals: Iterable[tuple[int, int, int]]) -> None:
+        items = sorted((a, b, d) for a, b, d in intervals if b > a)
+        self.starts = [a for a, _b, _d in items]
+        self.ends = [b for _a, b, _d in items]
+        self.days = [d for _a, _b, d in items]
+
+    def first_fit(self, dur_ms: int, snap_ms: int) -> tuple[int, int] | None:
+        for a, b in zip(self.starts, self.ends, strict=True):
+            s = _ceil_to_snap(a, snap_ms)
+            if s + dur_ms <= b:
+                return s, s + dur_ms
+        return None
+
+    def take(self, s: int, e: int) -> None:
+        i = bisect.bisect_right(self.starts, s) - 1
+        if i < 0 or self.ends[i] < e:
+            raise ValueError("interval is not free")
+        a, b, d = self.starts[i], self.ends[i], self.days[i]
+        pieces = [(x, y) for x, y in ((a, s), (e, b)) if y > x]
+        del self.starts[i], self.ends[i], self.days[i]
+        for offset, (x, y) in enumerate(pieces):
+            self.starts.insert(i + offset, x)
+            self.ends.insert(i + offset, y)
+            self.days.insert(i + offset, d)
+
+    def give(self, s: int, e: int, day: int) -> None:
+        i = bisect.bisect_left(self.starts, s)
+        # Merge with touching neighbours from the same day window only.
+        if i > 0 and self.ends[i - 1] == s and self.days[i - 1] == day:
+            i -= 1
+            s = self.starts[i]
+            del self.starts[i], self.ends[i], self.days[i]
+        if i < len(self.starts) and self.starts[i] == e and self.days[i] == day:
+            e = self.ends[i]
+            del self.starts[i], self.ends[i], self.days[i]
+        self.starts.insert(i, s)
+        self.ends.insert(i, e)
+        self.days.insert(i, day)
+
+    def day_of(self, s: int) -> int:
+        i = bisect.bisect_right(self.starts, s) - 1
+        return self.days[i] if i >= 0 else -1
+
+
+def _task_weight(t: dict[str, Any]) -> float:
+    w = PRIORITY_WEIGHT.get(str(t.get("priority") or "").strip().upper(), 1.0)
+    urg = t.get("urgency")
+    if isinstance(urg, (int, float)) and urg > 0:
+        w += float(urg) / 10.0
+    return w
+
+
+def _is_backlog(t: dict[str, Any], cfg: dict[str, Any], horizon_start_ms: int) -> bool:
+    """Backlog = pending tasks with no placement, or whose placement is already past."""
+    iv = _effective_interval_ms(t, cfg)
+    if iv is None:
+        return True
+    return iv[1] <= horizon_start_ms
+
+
+def schedule_items(payload: Payload, uuids: list[str] | None = None) -> list[ScheduleItem]:
+    """Resolve the tasks to place (selected uuids, or the pending backlog)."""
+    cfg_raw = payload.get("cfg")
+    cfg: dict[str, Any] = dict(cfg_raw) if isinstance(cfg_raw, dict) else {}
+    default_dur = int(cfg.get("default_duration_min") or 30)
+    view_start = cfg.get("view_start_ms")
+    horizon_start_ms = int(view_start) if isinstance(view_start, int) else 0
+    wanted = None if uuids is None else set(uuids)
+
+    out: list[ScheduleItem] = []
+    seen: set[str] = set()
+    for t in _iter_tasks(cast(dict[str, Any], payload)):
+        u = t.get("uuid")
+        if not isinstance(u, str) or not u or u in seen:
+            continue
+        if str(t.get("status") or "pending").lower() in _DONE_STATUSES:
+            continue
+        if wanted is not None:
+            if u not in wanted:
+                continue
+        elif not _is_backlog(t, cfg, horizon_start_ms):
+            continue
+        seen.add(u)
+
+        iv = _effective_interval_ms(t, cfg)
+        if iv is not None:
+            dur = int(iv[2])
+        else:
+            raw_dur = t.get("duration_min")
+            dur = int(raw_dur) if isinstance(raw_dur, int) and raw_dur > 0 else default_dur
+        deadline = t.get("due_ms")
+        out.append(
+            ScheduleItem(
+                uuid=u,
+                duration_min=max(1, dur),
+                deadline_ms=int(deadline) if isinstance(deadline, int) and deadline > 0 else None,
+                weight=_task_weight(t),
+            )
+        )
+    return out
+
+
+def _greedy_key(item: ScheduleItem) -> tuple[int, float, int, str]:
+    deadline = item.deadline_ms if item.deadline_ms is not None else 2**62
+    return (deadline, -item.weight, -item.duration_min, item.uuid)
+
+
+def auto_schedule(
+    payload: Payload,
+    uuids: list[str] | None = None,
+    *,
+    time_budget_ms: int = 250,
+    max_iterations: int = 20_000,
+    neighborhood: int = 16,
+    max_days_scan: int | None = None,
+    not_before_ms: int | None = None,
+) -> ScheduleResult:
+    """Place tasks into free work-hour slots and return PlanOverrides.
+
+    - uuids=None schedules the pending backlog (unplaced or overdue tasks).
+    - Durations, snap granularity and existing events come from the payload.
+    - Due dates are deadlines: late placements are allowed but heavily penalized.
+    - time_budget_ms bounds the local search; the greedy pass always completes.
+      For a fixed max_iterations the result is deterministic when the budget
+      is not exhausted.
+    """
+    t0 = time.perf_counter()
+    budget_s = max(0, int(time_budget_ms)) / 1000.0
+
+    cfg_raw = payload.get("cfg")
+    cfg: dict[str, Any] = dict(cfg_raw) if isinstance(cfg_raw, dict) else {}
+    snap_ms = max(1, int(cfg.get("snap_min") or 10)) * MIN_MS
+    view_start = cfg.get("view_start_ms")
+    horizon_start_ms = int(view_start) if isinstance(view_start, int) else 0
+
+    items = sorted(schedule_items(payload, uuids), key=_greedy_key)
+    by_uuid = {it.uuid: it for it in items}
+
+    free_by_day = free_intervals_by_day(
+        cast(dict[str, Any], payload), list(by_uuid.keys()), max_days_scan=max_days_scan
+    )
+    raw_free: list[tuple[int, int, int]] = []
+    for day_i, day_key in enumerate(sorted(free_by_day.keys())):
+        for a, b in free_by_day[day_key]:
+            if not_before_ms is not None:
+                a = max(a, int(not_before_ms))
+            if b > a:
+                raw_free.append((a, b, day_i))
+    free = _FreeList(raw_free)
+
+    placed: dict[str, tuple[int, int, int]] = {}
+
+    def item_cost(u: str, iv: tuple[int, int, int] | None) -> float:
+        it = by_uuid[u]
+        if iv is None:
+            return it.weight * UNPLACED_COST
+        s, e, _day = iv
+        c = max(0, s - horizon_start_ms) / MIN_MS
+        if it.deadline_ms is not None and e > it.deadline_ms:
+            c += LATE_COST_PER_MIN * (e - it.deadline_ms) / MIN_MS
+        return it.weight * c
+
+    def place(u: str) -> tuple[int, int, int] | None:
+        fit = free.first_fit(by_uuid[u].duration_min * MIN_MS, snap_ms)
+        if fit is None:
+            return None
+        s, e = fit
+        day = free.day_of(s)
+        free.take(s, e)
+        placed[u] = (s, e, day)
+        return placed[u]
+
+    def unplace(u: str) -> tuple[int, int, int] | None:
+        iv = placed.pop(u, None)
+        if iv is not None:
+            free.give(*iv)
+        return iv
+
+    def restore(u: str, iv: tuple[int, int, int] | None) -> None:
+        if iv is None:
+            return
+        free.take(iv[0], iv[1])
+        placed[u] = iv
+
+    # Greedy: earliest deadline first, heavier tasks first on ties.
+    for it in items:
+        place(it.uuid)
+
+    greedy_cost = sum(item_cost(it.uuid, placed.get(it.uuid)) for it in items)
+    iterations = 0
+    improvements = 0
+    timed_out = False
+
+    def out_of_budget() -> bool:
+        nonlocal timed_out
+        if iterations >= max_iterations:
+            return True
+        if (time.perf_counter() - t0) > budget_s:
+            timed_out = True
+            return True
+        return False
+
+    improved = True
+    while improved and items:
+        improved = False
+
+        # Move 1: reorder pairs. A task that is late, or outranked by something
+        # placed before it, gets first pick of the pair's freed time.
+        order = sorted(placed.keys(), key=lambda x: (placed[x][0], x))
+        pos = {u: i for i, u in enumerate(order)}
+        worst_first = sorted(placed.keys(), key=lambda x: (-item_cost(x, placed[x]), x))
+        for j in worst_first:
+            if j not in placed:
+                continue
+            jj = pos.get(j, 0)
+            for i in reversed(order[max(0, jj - neighborhood) : jj]):
+                if out_of_budget():
+                    break
+                if i not in placed or j not in placed or placed[i][0] >= placed[j][0]:
+                    continue
+                j_late = by_uuid[j].deadline_ms is not None and placed[j][1] > cast(int, by_uuid[j].deadline_ms)
+                if not j_late and _greedy_key(by_uuid[i]) < _greedy_key(by_uuid[j]):
+                    continue
+                iterations += 1
+                before = item_cost(i, placed[i]) + item_cost(j, placed[j])
+                old_i, old_j = unplace(i), unplace(j)
+                new_j = place(j)
+                new_i = place(i)
+                after = item_cost(i, new_i) + item_cost(j, new_j)
+                if after + 1e-9 < before:
+                    improvements += 1
+                    improved = True
+                    break
+                unplace(i)
+                unplace(j)
+                restore(i, old_i)
+                restore(j, old_j)
+            if out_of_budget():
+                break
+
+        # Move 2: eject a lighter placed task to make room for an unplaced one.
+        unplaced_now = sorted((u for u in by_uuid if u not in placed), key=lambda x: _greedy_key(by_uuid[x]))
+        for u in unplaced_now:
+            if out_of_budget():
+                break
+            need = by_uuid[u].duration_min
+            victims = sorted(
+                (v for v in placed if by_uuid[v].weight < by_uuid[u].weight and by_uuid[v].duration_min >= need),
+                key=lambda v: (by_uuid[v].weight, -placed[v][0], v),
+            )
+            for v in victims[:neighborhood]:
+                if out_of_budget():
+                    break
+                iterations += 1
+                before = item_cost(u, None) + item_cost(v, placed[v])
+                old_v = unplace(v)
+                new_u = place(u)
+                new_v = place(v)
+                after = item_cost(u, new_u) + item_cost(v, new_v)
+                if after + 1e-9 < before:
+                    improvements += 1
+                    improved = True
+                    break
+                unplace(u)
+                unplace(v)
+                restore(v, old_v)
+
+        if out_of_budget():
+            break
+
+    overrides: dict[str, PlanOverride] = {}
+    late: list[str] = []
+    for it in items:
+        iv = placed.get(it.uuid)
+        if iv is None:
+            continue
+        s, e, _day = iv
+        overrides[it.uuid] = PlanOverride(start_ms=int(s), due_ms=int(e), duration_min=int(it.duration_min))
+        if it.deadline_ms is not None and e > it.deadline_ms:
+            late.append(it.uuid)
+
+    return ScheduleResult(
+        overrides=overrides,
+        unplaced=tuple(it.uuid for it in items if it.uuid not in placed),
+        late=tuple(late),
+        cost=float(sum(item_cost(it.uuid, placed.get(it.uuid)) for it in items)),
+        greedy_cost=float(greedy_cost),
+        iterations=iterations,
+        improvements=improvements,
+        timed_out=timed_out,
+    )
+
+
+__all__ = [
+    "LATE_COST_PER_MIN",
+    "PRIORITY_WEIGHT",
+    "UNPLACED_COST",
+    "ScheduleItem",
+    "ScheduleResult",
+    "auto_schedule",
+    "schedule_items",
+]
@@ -2,16 +2,25 @@ from __future__ import annotations
 
 import argparse
 import threading
+import time
 from http.server import ThreadingHTTPServer
-from typing import Any, Collection
+from typing import Any, Collection, Sequence
 from urllib.parse import quote
 
 from . import serve_support as _support
 from .model import Payload
+from .render.bundle import app_bundle
 from .serve_apply import ApplyExecutionResult, execute_apply_commands
+from .serve_apply_jobs import ApplyJob, ApplyJobManager
 from .serve_bootstrap import _escape_script_json, _inject_serve_bootstrap, _serve_bootstrap_script
+from .serve_compress import EncodedBodyCache
 from .serve_endpoints import handle_apply_post as _handle_apply_post_impl
+from .serve_endpoints import refresh_state
 from .serve_http import HttpContext, make_handler
+from .serve_metrics import ServeMetrics, hit_ratio
+from .serve_state_store import ClientStateStore
+from .serve_task_cache import TaskExportCache
+from .serve_timew_cache import TimewDayCache
 from .serve_types import (
     BrowserOpenFn,
     ObsIncFn,
@@ -25,7 +34,10 @@ from .serve_types import (
     TimewExportFn,
     TimewExportResult,
     TimewInterval,
+    TimewRangeExportFn,
 )
+from .serve_views import ViewPayloadCache
+from .serve_watch import DataDirWatcher
 
 _build_serve_config = _support.build_serve_config
 _client_state_file = _support.client_state_file
@@ -88,31 +100,91 @@ def serve(
     timew_export: TimewExportFn,
     server_factory: ServerFactoryFn = ThreadingHTTPServer,
     browser_open: BrowserOpenFn | None = None,
+    watch_dirs: Sequence[str] | None = None,
+    task_cache: TaskExportCache | None = None,
+    timew_range_export: TimewRangeExportFn | None = None,
+    timew_cache: TimewDayCache | None = None,
+    views: ViewPayloadCache | None = None,
 ) -> None:
     cfg = _build_serve_config(args, out_path)
     state = ServeState(
         payload=initial_payload,
         client_state=_read_client_state(_client_state_file(cfg.out_file)),
+        task_cache=task_cache if task_cache is not None else TaskExportCache(),
+        timew_cache=timew_cache if timew_cache is not None else TimewDayCache(),
     )
     state_lock = threading.Lock()
-    obs_lock = threading.Lock()
-    obs_counters: dict[str, Any] = {}
+    metrics = ServeMetrics()
     state_file = _client_state_file(cfg.out_file)
+    client_state_store = ClientStateStore(state_file, state.client_state)
+    body_cache = EncodedBodyCache()
 
     def _obs_inc(key: str, *, path: str | None = None) -> None:
-        with obs_lock:
-            _counter_inc(obs_counters, key, path=path)
+        metrics.inc(key, path=path)
 
     def _obs_metrics() -> dict[str, Any]:
-        with obs_lock:
-            return _counter_snapshot(obs_counters)
+        return metrics.counter_snapshot()
+
+    def _cache_hit_ratios() -> list[tuple[dict[str, str], float]]:
+        counts = metrics.counter_snapshot()
+        out = [({"cache": "body"}, hit_ratio(body_cache.hits, body_cache.misses))]
+        for name in ("task", "timew", "view"):
+            hits, misses = int(counts.get(f"{name}_cache_hit_total", 0)), int(counts.get(f"{name}_cache_miss_total", 0))
+            out.append(({"cache": name}, hit_ratio(hits, misses)))
+        return out
+
+    metrics.register_gauge("cache_hit_ratio", "Hits / lookups for the live-mode caches.", _cache_hit_ratios)
+
+    def _timed_render_once(render_args: argparse.Namespace, render_out: str) -> Payload:
+        started = time.perf_counter()
+        try:
+            return render_once(render_args, render_out)
+        finally:
+            metrics.observe("refresh_duration_seconds", time.perf_counter() - started)
 
     def _execute_apply(
         lines: Collection[object],
         *,
         selected: Collection[object] | None = None,
     ) -> ApplyExecutionResult:
-        return execute_apply_commands(lines, selected=selected)
+        try:
+            return execute_apply_commands(lines, selected=selected)
+        finally:
+            # Even a partial apply may have modified tasks; /task must ask Taskwarrior.
+            state.task_cache.invalidate()
+            if views is not None:
+                views.raw_cache.invalidate()
+
+    def _timed_execute_apply(
+        lines: Collection[object],
+        *,
+        selected: Collection[object] | None = None,
+    ) -> ApplyExecutionResult:
+        started = time.perf_counter()
+        try:
+            return _execute_apply(lines, selected=selected)
+        finally:
+            metrics.observe("apply_duration_seconds", time.perf_counter() - started)
+
+    def _on_apply_job_finished(job: ApplyJob) -> None:
+        if job.started_at is not None and job.finished_at is not None:
+            metrics.observe("apply_duration_seconds", job.finished_at - job.started_at)
+        result = job.result
+        if result is not None and result["ok"]:
+            _obs_inc("apply_success_total")
+        elif job.status == "cancelled":
+            _obs_inc("apply_job_cancelled_total")
+        else:
+            _obs_inc("apply_error_total")
+        _obs_log(
+            "serve.apply_job_finished",
+            job=job.id,
+            status=job.status,
+            applied=result["applied"] if result is not None else 0,
+            selected=len(job.indexes),
+        )
+
+    apply_jobs = ApplyJobManager(_execute_apply, publish=state.events.publish, on_finished=_on_apply_job_finished)
 
     _obs_log("serve.started", host=cfg.host, port=cfg.port, auth_required=cfg.required_token is not None)
 
@@ -124,17 +196,48 @@ def serve(
             state=state,
             state_lock=state_lock,
             state_file=state_file,
-            render_once=render_once,
+            render_once=_timed_render_once,
             task_lookup=task_lookup,
             timew_export=timew_export,
-            execute_apply=_execute_apply,
+            execute_apply=_timed_execute_apply,
             inject_bootstrap=_inject_serve_bootstrap,
             obs_inc=_obs_inc,
             obs_metrics=_obs_metrics,
+            bundle=app_bundle() if getattr(args, "bundle", "inline") == "split" else None,
+            timew_range_export=timew_range_export,
+            client_state_store=client_state_store,
+            apply_jobs=apply_jobs,
+            metrics=metrics,
+            views=views,
+            body_cache=body_cache,
         )
     )
 
+    def _on_data_change() -> None:
+        try:
+            _payload, generation, coalesced = refresh_state(
+                args=args,
+                out_path=out_path,
+                state=state,
+                state_lock=state_lock,
+                render_once=_timed_render_once,
+            )
+        except SystemExit as ex:
+            _obs_inc("watch_refresh_error_total")
+            _obs_log("serve.watch_refresh_error", error=str(ex))
+            return
+        except Exception as ex:
+            _obs_inc("watch_refresh_error_total")
+            _obs_log("serve.watch_refresh_error", error=f"{type(ex).__name__}: {ex}")
+            return
+        _obs_inc("watch_refresh_total")
+        _obs_log("serve.watch_refresh", generation=generation, coalesced=coalesced)
+
     server = server_factory((cfg.host, cfg.port), handler)
+    watcher = DataDirWatcher(watch_dirs, _on_data_change) if watch_dirs else None
+    if watcher is not None:
+        watcher.start()
+        _obs_log("serve.watch_started", backend=watcher.backend, dirs=",".join(str(d) for d in watcher.dirs))
     actual_host, actual_port = server.server_address[:2]
     if cfg.required_token is None:
         serve_url = _format_http_url(str(actual_host), int(actual_port), "/")
@@ -154,4 +257,9 @@ def serve(
     except KeyboardInterrupt:
         pass
     finally:
+        if watcher is not None:
+            watcher.stop()
+        state.events.close()
+        if views is not None:
+            views.close()
         server.server_close()
@@ -84,7 +84,7 @@ def preview_apply_commands(lines: Collection[object]) -> list[ApplyPreviewEntry]
     return [_parse_task_command_line(idx, line) for idx, line in enumerate(lines)]
 
 
-def _selected_indexes(preview: list[ApplyPreviewEntry], selected: Collection[object] | None) -> list[int]:
+def selected_apply_indexes(preview: list[ApplyPreviewEntry], selected: Collection[object] | None) -> list[int]:
     max_index = len(preview) - 1
     if selected is None:
         return [entry["index"] for entry in preview]
@@ -122,7 +122,7 @@ def execute_apply_commands(
     selected: Collection[object] | None = None,
 ) -> ApplyExecutionResult:
     preview = preview_apply_commands(lines)
-    indexes = _selected_indexes(preview, selected)
+    indexes = selected_apply_indexes(preview, selected)
     timeout_s = _task_apply_timeout_s()
     commands_by_index = {entry["index"]: entry for entry in preview}
     results: list[ApplyExecutionEntry] = []
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import itertools
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection
+
+from .serve_apply import ApplyExecutionEntry, ApplyExecutionResult, preview_apply_commands, selected_apply_indexes
+
+# Live apply as a background job (POST /apply with "async": true). Jobs run one
+# at a time on a single worker thread, since Taskwarrior commands must not
+# interleave. Each selected command goes through execute_apply on its own, so
+# progress is visible per command (GET /apply/<id>, `apply-progress` events) and
+# a cancel request takes effect before the next command starts. The merged
+# ApplyExecutionResult is kept as the job's final record.
+
+MAX_FINISHED_JOBS = 32
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+ExecuteOneFn = Callable[..., ApplyExecutionResult]
+PublishFn = Callable[[str, dict[str, Any]], None]
+
+
+@dataclass
+class ApplyJob:
+    id: str
+    commands: list[object]
+    indexes: list[int]
+    status: str = "queued"
+    entries: list[ApplyExecutionEntry] = field(default_factory=list)
+    result: ApplyExecutionResult | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "ok": True,
+            "job": self.id,
+            "status": self.status,
+            "selected": len(self.indexes),
+            "done": len(self.entries),
+            "commands": list(self.entries),
+            "cancel_requested": self.cancel_requested.is_set(),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class ApplyJobManager:
+    def __init__(
+        self,
+        execute_apply: ExecuteOneFn,
+        *,
+        publish: PublishFn | None = None,
+        on_finished: Callable[[ApplyJob], None] | None = None,
+        max_finished: int = MAX_FINISHED_JOBS,
+    ) -> None:
+        self._execute_apply = execute_apply
+        self._publish = publish
+        self._on_finished = on_finished
+        self._max_finished = max(1, int(max_finished))
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, ApplyJob] = OrderedDict()
+        self._queue: list[ApplyJob] = []
+        self._wake = threading.Condition(self._lock)
+        self._worker: threading.Thread | None = None
+        self._counter = itertools.count(1)
+
+    def submit(self, commands: Collection[object], *, selected: Collection[object] | None = None) -> ApplyJob:
+        """Validate and enqueue; raises SystemExit for a bad request, like execute_apply_commands."""
+        lines = list(commands)
+        indexes = selected_apply_indexes(preview_apply_commands(lines), selected)
+        job = ApplyJob(id=f"{next(self._counter)}-{secrets.token_hex(4)}", commands=lines, indexes=indexes)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._trim_locked()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="scalpel-apply", daemon=True)
+                self._worker.start()
+            self._wake.notify()
+        return job
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job is not None else None
+
+    def cancel(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in {"queued", "running"}:
+                job.cancel_requested.set()
+            return job.snapshot()
+
+    def _trim_locked(self) -> None:
+        finished = [jid for jid, j in self._jobs.items() if j.status in {"done", "failed", "cancelled"}]
+        for jid in finished[: max(0, len(finished) - self._max_finished)]:
+            del self._jobs[jid]
+
+    def _emit(self, event: str, data: dict[str, Any]) -> None:
+        if self._publish is not None:
+            self._publish(event, data)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue:
+                    if not self._wake.wait(timeout=30.0):
+                        self._worker = None
+                        return
+                job = self._queue.pop(0)
+                job.status = "running"
+                job.started_at = time.time()
+            self._execute(job)
+            with self._lock:
+                job.finished_at = time.time()
+                self._trim_locked()
+            self._emit("apply-finished", {"job": job.id, "status": job.status})
+            if self._on_finished is not None:
+                self._on_finished(job)
+
+    def _execute(self, job: ApplyJob) -> None:
+        applied = 0
+        stopped_after: int | None = None
+        failed = False
+        for idx in job.indexes:
+            if job.cancel_requested.is_set():
+                break
+            try:
+                one = self._execute_apply(job.commands, selected=[idx])
+            except SystemExit as ex:
+                job.error = str(ex)
+                failed = True
+                stopped_after = idx
+                break
+            except Exception as ex:
+                # Anything else would kill the worker and leave the job "running" forever.
+                job.error = f"{type(ex).__name__}: {ex}"
+                failed = True
+                stopped_after = idx
+                break
+            with self._lock:
+                job.entries.extend(one["commands"])
+            applied += int(one["applied"])
+            progress = {"job": job.id, "index": idx, "ok": bool(one["ok"])}
+            self._emit("apply-progress", {**progress, "done": len(job.entries), "total": len(job.indexes)})
+            if not one["ok"]:
+                failed = True
+                stopped_after = idx
+                break
+        cancelled = not failed and job.cancel_requested.is_set() and len(job.entries) < len(job.indexes)
+        result: ApplyExecutionResult = {
+            "ok": not failed and not cancelled,
+            "applied": applied,
+            "selected": len(job.indexes),
+            "commands": list(job.entries),
+            "stopped_after_index": stopped_after,
+        }
+        with self._lock:
+            job.result = result
+            job.status = "failed" if failed else ("cancelled" if cancelled else "done")
+
+
+__all__ = ["ApplyJob", "ApplyJobManager", "JOB_STATUSES", "MAX_FINISHED_JOBS"]
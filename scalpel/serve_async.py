@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import socket
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from typing import Any, cast
+from urllib.parse import urlsplit
+
+# Asyncio server backend for live mode (`scalpel --server asyncio`). Connections
+# are multiplexed on one event loop with HTTP/1.1 keep-alive; each parsed request
+# is dispatched to the regular serve_http handler class, so routing, auth and
+# serve_endpoints are shared with the threading backend. Handler work runs in a
+# bounded pool, and slow Taskwarrior/Timewarrior/apply calls get their own
+# smaller pool so they cannot starve /payload or /health. /events streams keep
+# a dedicated thread for their lifetime, as they do on the threading backend.
+
+DEFAULT_WORKERS = 8
+DEFAULT_BLOCKING_WORKERS = 4
+KEEPALIVE_TIMEOUT_S = 15.0
+MAX_HEADER_BYTES = 64 * 1024
+BLOCKING_PATHS = frozenset({"/refresh", "/apply", "/task", "/timew", "/timew/range"})
+STREAMING_PATHS = frozenset({"/events"})
+
+
+class _TransportWriter(io.RawIOBase):
+    """Thread-side file object forwarding writes onto the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter) -> None:
+        super().__init__()
+        self._loop = loop
+        self._writer = writer
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        if self._writer.is_closing():
+            raise BrokenPipeError("client disconnected")
+        chunk = bytes(data)
+        try:
+            self._loop.call_soon_threadsafe(self._writer.write, chunk)
+        except RuntimeError as ex:  # loop already closed (server shutdown)
+            raise BrokenPipeError("server stopped") from ex
+        return len(chunk)
+
+
+def _adapter_for(handler_class: type[BaseHTTPRequestHandler]) -> type[BaseHTTPRequestHandler]:
+    # The handler sees a normal request whose rfile holds exactly one pre-read
+    # request and whose wfile is supplied by the server (buffer or transport).
+    class _Adapter(handler_class):  # type: ignore[misc, valid-type]
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            raw, wfile = self.request
+            self.rfile = io.BytesIO(raw)
+            self.wfile = wfile
+
+        def handle(self) -> None:
+            self.handle_one_request()
+
+        def finish(self) -> None:
+            return None
+
+    return _Adapter
+
+
+class AsyncHTTPServer:
+    """Drop-in ``server_factory`` for :func:`scalpel.serve.serve` backed by asyncio."""
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handler_class: type[BaseHTTPRequestHandler],
+        *,
+        workers: int = DEFAULT_WORKERS,
+        blocking_workers: int = DEFAULT_BLOCKING_WORKERS,
+    ) -> None:
+        host, port = server_address
+        family = socket.AF_INET6 if ":" in str(host) else socket.AF_INET
+        self.socket = socket.create_server((host, port), family=family, backlog=128)
+        self.socket.setblocking(False)
+        self.server_address = self.socket.getsockname()[:2]
+        self.handler_class = handler_class
+        self._adapter = _adapter_for(handler_class)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scalpel-http")
+        self._blocking = ThreadPoolExecutor(max_workers=max(1, blocking_workers), thread_name_prefix="scalpel-slow")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._running = threading.Event()
+        self._stopped = threading.Event()
+
+    # -- socketserver-compatible surface --------------------------------------------------
+
+    def serve_forever(self) -> None:
+        self._stopped.clear()
+        try:
+            asyncio.run(self._main())
+        finally:
+            self._stopped.set()
+
+    def shutdown(self) -> None:
+        loop, stop = self._loop, self._stop
+        if loop is not None and stop is not None and self._running.is_set():
+            loop.call_soon_threadsafe(stop.set)
+            self._stopped.wait(timeout=5.0)
+
+    def server_close(self) -> None:
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._blocking.shutdown(wait=False, cancel_futures=True)
+
+    # -- event loop -------------------------------------------------------------------------
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._serve_connection, sock=self.socket, limit=MAX_HEADER_BYTES)
+        self._running.set()
+        try:
+            await self._stop.wait()
+        finally:
+            self._running.clear()
+            server.close()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername") or ("", 0)
+        client_address = (str(peer[0]), int(peer[1])) if len(peer) >= 2 else ("", 0)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=KEEPALIVE_TIMEOUT_S)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                path = _request_path(head)
+                length = _content_length(head)
+                body = await reader.readexactly(length) if length > 0 else b""
+                raw = head + body
+                if path in STREAMING_PATHS:
+                    await self._run_streaming(raw, client_address, _TransportWriter(loop, writer))
+                    break
+                pool = self._blocking if path in BLOCKING_PATHS else self._executor
+                response, close = await loop.run_in_executor(pool, self._run_buffered, raw, client_address)
+                writer.write(response)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, RuntimeError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    # -- handler dispatch (worker threads) --------------------------------------------------
+
+    def _dispatch(self, raw: bytes, wfile: io.IOBase, client_address: tuple[str, int]) -> BaseHTTPRequestHandler:
+        # _Adapter.setup() unpacks (raw, wfile) itself, and handlers only read plain
+        # attributes off the server, so neither needs the socketserver types.
+        request = cast(socket.socket, (raw, wfile))
+        return self._adapter(request, client_address, cast(socketserver.BaseServer, self))
+
+    def _run_buffered(self, raw: bytes, client_address: tuple[str, int]) -> tuple[bytes, bool]:
+        out = io.BytesIO()
+        handler = self._dispatch(raw, out, client_address)
+        return out.getvalue(), bool(handler.close_connection)
+
+    async def _run_streaming(self, raw: bytes, client_address: tuple[str, int], sink: _TransportWriter) -> None:
+        # Long-lived (SSE): a dedicated thread, so it never holds a pool worker and
+        # never blocks loop/executor teardown while waiting for EventHub.close().
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future[None] = loop.create_future()
+
+        def _finished() -> None:
+            if not done.done():
+                done.set_result(None)
+
+        def _target() -> None:
+            try:
+                self._dispatch(raw, sink, client_address)
+            except OSError:
+                pass
+            finally:
+                try:
+                    loop.call_soon_threadsafe(_finished)
+                except RuntimeError:
+                    pass
+
+        threading.Thread(target=_target, name="scalpel-stream", daemon=True).start()
+        await done
+
+
+def _request_path(head: bytes) -> str:
+    line = head.split(b"\r\n", 1)[0].decode("latin-1", "replace")
+    parts = line.split()
+    return urlsplit(parts[1]).path if len(parts) >= 2 else ""
+
+
+def _content_length(head: bytes) -> int:
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            try:
+                return max(0, int(value.strip()))
+            except ValueError:
+                return 0
+    return 0
+
+
+__all__ = ["AsyncHTTPServer", "BLOCKING_PATHS", "DEFAULT_BLOCKING_WORKERS", "DEFAULT_WORKERS"]
@@ -8,14 +8,17 @@ def _escape_script_json(value: object) -> str:
     return json.dumps(value, ensure_ascii=False, separators=(",", ":")).replace("</", r"<\/")
 
 
-def _serve_bootstrap_script(client_state: dict[str, Any]) -> str:
+def _serve_bootstrap_script(client_state: dict[str, Any], generation: int | None = None) -> str:
     boot_json = _escape_script_json(client_state)
+    # Payload generation the page was served at; the refresh flow asks /payload/delta?since=<gen>.
+    generation_js = f"  g.__scalpel_payloadGeneration = {int(generation)};\n" if generation is not None else ""
     return (
         "<script>\n"
         "(() => {\n"
         '  "use strict";\n'
         "  const g = (typeof globalThis !== 'undefined') ? globalThis : window;\n"
         "  if (!g) return;\n"
+        f"{generation_js}"
         f"  const boot = {boot_json};\n"
         "  const hasOwn = (obj, key) => Object.prototype.hasOwnProperty.call(obj, key);\n"
         "  const store = (g.__scalpel_serverKvStore && typeof g.__scalpel_serverKvStore === 'object') ? g.__scalpel_serverKvStore : Object.assign({}, boot);\n"
@@ -120,8 +123,8 @@ def _serve_bootstrap_script(client_state: dict[str, Any]) -> str:
     )
 
 
-def _inject_serve_bootstrap(html_text: str, client_state: dict[str, Any]) -> str:
-    bootstrap = _serve_bootstrap_script(client_state)
+def _inject_serve_bootstrap(html_text: str, client_state: dict[str, Any], generation: int | None = None) -> str:
+    bootstrap = _serve_bootstrap_script(client_state, generation)
     marker = '<script id="tw-data" type="application/json">'
     if marker in html_text:
         return html_text.replace(marker, bootstrap + marker, 1)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Any, Callable, Hashable, NamedTuple
+
+# Content-Encoding negotiation and validators for the live server. gzip is
+# always available; br / zstd are offered only when their modules import. The
+# large bodies (HTML, /payload, /client-state, static bundle) are serialized,
+# hashed and compressed once per generation and kept in EncodedBodyCache.
+
+MIN_COMPRESS_BYTES = 1024
+
+_Compressor = Callable[[bytes], bytes]
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _load_brotli() -> _Compressor | None:
+    try:
+        brotli: Any = import_module("brotli")
+    except Exception:
+        return None
+    return lambda body: brotli.compress(body, quality=5)
+
+
+def _load_zstd() -> _Compressor | None:
+    try:
+        zstandard: Any = import_module("zstandard")
+    except Exception:
+        zstandard = None
+    if zstandard is not None:
+        return lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+    try:
+        zstd: Any = import_module("compression.zstd")
+    except Exception:
+        return None
+    return lambda body: zstd.compress(body, level=3)
+
+
+def _available_codecs() -> dict[str, _Compressor]:
+    codecs: dict[str, _Compressor] = {}
+    zstd = _load_zstd()
+    if zstd is not None:
+        codecs["zstd"] = zstd
+    br = _load_brotli()
+    if br is not None:
+        codecs["br"] = br
+    codecs["gzip"] = _gzip
+    return codecs
+
+
+# Server preference order when the client rates several codings equally.
+CODECS: dict[str, _Compressor] = _available_codecs()
+
+
+def negotiate_encoding(accept_encoding: str, codecs: dict[str, _Compressor] | None = None) -> str | None:
+    """Pick the best supported coding from an Accept-Encoding header, or None for identity."""
+    available = CODECS if codecs is None else codecs
+    weights: dict[str, float] = {}
+    for part in str(accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name == "x-gzip":
+            name = "gzip"
+        weights[name] = q
+    best: str | None = None
+    best_q = 0.0
+    for name in available:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def encode_body(
+    body: bytes,
+    encoding: str | None,
+    codecs: dict[str, _Compressor] | None = None,
+) -> tuple[bytes, str | None]:
+    """Compress *body* with *encoding*; fall back to identity when small or not smaller."""
+    available = CODECS if codecs is None else codecs
+    if encoding is None or encoding not in available or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    packed = available[encoding](body)
+    if len(packed) >= len(body):
+        return body, None
+    return packed, encoding
+
+
+def representation_etag(digest: str, encoding: str | None) -> str:
+    """Strong ETag for one representation of a body; encodings get distinct validators."""
+    return f'"{digest}"' if encoding is None else f'"{digest}-{encoding}"'
+
+
+def etag_matches(if_none_match: str, digest: str) -> bool:
+    """True when an If-None-Match header names any representation of *digest*."""
+    for tag in str(if_none_match or "").split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == digest or tag.startswith(digest + "-"):
+            return True
+    return False
+
+
+class EncodedBody(NamedTuple):
+    body: bytes
+    encoding: str | None
+    digest: str
+
+    @property
+    def etag(self) -> str:
+        return representation_etag(self.digest, self.encoding)
+
+
+@dataclass
+class _Entry:
+    digest: str
+    variants: dict[str | None, tuple[bytes, str | None]]
+
+
+class EncodedBodyCache:
+    """Small LRU of response bodies, their content digest and compressed variants.
+
+    Keys must change whenever the body does (callers fold the payload generation
+    into the key), so entries never need explicit invalidation. The digest is a
+    content hash, so validators stay correct across server restarts.
+    """
+
+    def __init__(self, *, max_entries: int = 8, codecs: dict[str, _Compressor] | None = None) -> None:
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max(1, int(max_entries))
+        self._codecs = codecs
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key: Hashable, build: Callable[[], bytes]) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        body = build()
+        fresh = _Entry(hashlib.sha256(body).hexdigest()[:20], {None: (body, None)})
+        with self._lock:
+            entry = self._entries.setdefault(key, fresh)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def get(self, key: Hashable, encoding: str | None, build: Callable[[], bytes]) -> EncodedBody:
+        entry = self._entry(key, build)
+        hit = entry.variants.get(encoding)
+        if hit is None:
+            # Compress outside the lock; a concurrent duplicate is harmless.
+            hit = encode_body(entry.variants[None][0], encoding, self._codecs)
+            with self._lock:
+                hit = entry.variants.setdefault(encoding, hit)
+        return EncodedBody(hit[0], hit[1], entry.digest)
+
+
+__all__ = [
+    "CODECS",
+    "EncodedBody",
+    "EncodedBodyCache",
+    "MIN_COMPRESS_BYTES",
+    "encode_body",
+    "etag_matches",
+    "negotiate_encoding",
+    "representation_etag",
+]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import bisect
 import datetime as dt
 import json
 import os
@@ -42,16 +43,22 @@ def _day_window_utc_ms(day_ymd: str, tz_name: str) -> tuple[int, int]:
     return start_ms, end_ms
 
 
-def run_timew_export_for_day(
-    *,
-    day_ymd: str,
-    tz_name: str,
-    run_proc: RunProcFn,
-    parse_utc: ParseUtcFn,
-) -> TimewExportResult:
-    start_ms, end_ms = _day_window_utc_ms(day_ymd, tz_name)
-    cmd = ["timew", day_ymd, "export"]
+def timew_data_dir() -> str | None:
+    """Resolve Timewarrior's data directory: $TIMEWARRIORDB, ~/.timewarrior, then the XDG location."""
+    candidates: list[str] = []
+    db = (os.getenv("TIMEWARRIORDB", "") or "").strip()
+    if db:
+        candidates.append(os.path.join(os.path.expanduser(db), "data"))
+    candidates.append(os.path.expanduser(os.path.join("~", ".timewarrior", "data")))
+    xdg = (os.getenv("XDG_DATA_HOME", "") or "").strip() or os.path.expanduser(os.path.join("~", ".local", "share"))
+    candidates.append(os.path.join(xdg, "timewarrior", "data"))
+    for path in candidates:
+        if os.path.isdir(path):
+            return path
+    return None
+
 
+def _run_timew_export(cmd: list[str], *, run_proc: RunProcFn) -> list[Any]:
     try:
         result = run_checked(
             cmd,
@@ -71,7 +78,7 @@ def run_timew_export_for_day(
 
     text = result.stdout.strip()
     if not text:
-        return {"day": day_ymd, "intervals": []}
+        return []
 
     try:
         raw = json.loads(text)
@@ -79,7 +86,10 @@ def run_timew_export_for_day(
         raise SystemExit(f"Failed to parse `timew export` JSON: {e}") from e
     if not isinstance(raw, list):
         raise SystemExit("`timew export` did not return a JSON list.")
+    return raw
 
+
+def _timew_intervals_unclipped(raw: list[Any], *, parse_utc: ParseUtcFn) -> list[TimewInterval]:
     out: list[TimewInterval] = []
     now_ms = int(dt.datetime.now(dt.timezone.utc).timestamp() * 1000)
     for it in raw:
@@ -94,11 +104,6 @@ def run_timew_export_for_day(
         if e_ms <= s_ms:
             continue
 
-        s_ms = max(s_ms, start_ms)
-        e_ms = min(e_ms, end_ms)
-        if e_ms <= s_ms:
-            continue
-
         tags = it.get("tags")
         tags_out: list[str] = []
         if isinstance(tags, list):
@@ -115,11 +120,66 @@ def run_timew_export_for_day(
                 "annotation": annotation,
             }
         )
-
     out.sort(key=lambda x: (int(x.get("start_ms") or 0), int(x.get("end_ms") or 0)))
+    return out
+
+
+def _clip_interval(iv: TimewInterval, start_ms: int, end_ms: int) -> TimewInterval | None:
+    s_ms = max(iv["start_ms"], start_ms)
+    e_ms = min(iv["end_ms"], end_ms)
+    if e_ms <= s_ms:
+        return None
+    return {"start_ms": s_ms, "end_ms": e_ms, "tags": list(iv["tags"]), "annotation": iv["annotation"]}
+
+
+def run_timew_export_for_day(
+    *,
+    day_ymd: str,
+    tz_name: str,
+    run_proc: RunProcFn,
+    parse_utc: ParseUtcFn,
+) -> TimewExportResult:
+    start_ms, end_ms = _day_window_utc_ms(day_ymd, tz_name)
+    raw = _run_timew_export(["timew", day_ymd, "export"], run_proc=run_proc)
+    out: list[TimewInterval] = []
+    for iv in _timew_intervals_unclipped(raw, parse_utc=parse_utc):
+        clipped = _clip_interval(iv, start_ms, end_ms)
+        if clipped is not None:
+            out.append(clipped)
     return {"day": day_ymd, "intervals": out}
 
 
+def run_timew_export_for_range(
+    *,
+    start_ymd: str,
+    end_ymd: str,
+    tz_name: str,
+    run_proc: RunProcFn,
+    parse_utc: ParseUtcFn,
+) -> list[TimewExportResult]:
+    """One `timew export` covering ``start_ymd..end_ymd`` (inclusive), split per local day."""
+    first = parse_date_yyyy_mm_dd(start_ymd)
+    last = parse_date_yyyy_mm_dd(end_ymd)
+    if last < first:
+        raise ValueError("end must not be before start")
+    days = [(first + dt.timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+    windows = [_day_window_utc_ms(d, tz_name) for d in days]
+    day_starts = [w[0] for w in windows]
+    after_last = (last + dt.timedelta(days=1)).isoformat()
+    raw = _run_timew_export(["timew", "export", "from", start_ymd, "to", after_last], run_proc=run_proc)
+
+    per_day: list[list[TimewInterval]] = [[] for _ in days]
+    for iv in _timew_intervals_unclipped(raw, parse_utc=parse_utc):
+        # Intervals are sorted; each touches a contiguous run of days starting at its first overlap.
+        i = max(0, bisect.bisect_right(day_starts, iv["start_ms"]) - 1)
+        while i < len(days) and windows[i][0] < iv["end_ms"]:
+            clipped = _clip_interval(iv, windows[i][0], windows[i][1])
+            if clipped is not None:
+                per_day[i].append(clipped)
+            i += 1
+    return [{"day": d, "intervals": ivs} for d, ivs in zip(days, per_day, strict=True)]
+
+
 def run_task_export_for_uuid(
     uuid_query: str,
     *,
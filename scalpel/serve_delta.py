@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Mapping, cast
+
+from .model import Payload
+
+# Generation-numbered payload change sets for the live server. Each refresh that
+# swaps ServeState.payload records one delta (tasks upserted/removed by uuid plus
+# replaced top-level keys); GET /payload/delta?since=<gen> folds the deltas after
+# <gen> into one patch, or asks for a full reload once <gen> has aged out.
+
+DEFAULT_MAX_DELTAS = 32
+
+
+def _tasks_by_uuid(payload: Mapping[str, Any]) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for task in payload.get("tasks") or []:
+        if isinstance(task, dict):
+            uuid = str(task.get("uuid") or "")
+            if uuid:
+                out[uuid] = task
+    return out
+
+
+def diff_payloads(old: Payload, new: Payload) -> dict[str, Any]:
+    """Return {"upsert": [...], "remove": [...], "set": {...}} turning *old* into *new*."""
+    old_map = cast(Mapping[str, Any], old)
+    new_map = cast(Mapping[str, Any], new)
+    old_tasks = _tasks_by_uuid(old_map)
+    new_tasks = _tasks_by_uuid(new_map)
+    upsert = [task for uuid, task in new_tasks.items() if old_tasks.get(uuid) != task]
+    remove = [uuid for uuid in old_tasks if uuid not in new_tasks]
+    changed = {
+        key: value for key, value in new_map.items() if key != "tasks" and (key not in old_map or old_map[key] != value)
+    }
+    dropped = [key for key in old_map if key != "tasks" and key not in new_map]
+    for key in dropped:
+        changed[key] = None
+    return {"upsert": upsert, "remove": remove, "set": changed}
+
+
+class DeltaLog:
+    """Bounded ring of (generation, delta) pairs; delta N turns generation N-1 into N."""
+
+    def __init__(self, max_deltas: int = DEFAULT_MAX_DELTAS) -> None:
+        self._ring: deque[tuple[int, dict[str, Any]]] = deque(maxlen=max(1, int(max_deltas)))
+        self._lock = threading.Lock()
+
+    def record(self, generation: int, delta: dict[str, Any]) -> None:
+        with self._lock:
+            if self._ring and self._ring[-1][0] != generation - 1:
+                self._ring.clear()
+            self._ring.append((generation, delta))
+
+    def since(self, since: int, current: int) -> dict[str, Any] | None:
+        """Fold every delta after *since* into one patch; None when the client must reload."""
+        if since == current:
+            return {"upsert": [], "remove": [], "set": {}}
+        if since > current or since < 0:
+            return None
+        with self._lock:
+            entries = [(gen, delta) for gen, delta in self._ring if gen > since]
+        if not entries or entries[0][0] != since + 1 or entries[-1][0] != current:
+            return None
+        upsert: dict[str, Any] = {}
+        removed: dict[str, None] = {}
+        changed: dict[str, Any] = {}
+        for _gen, delta in entries:
+            for uuid in delta["remove"]:
+                upsert.pop(uuid, None)
+                removed[uuid] = None
+            for task in delta["upsert"]:
+                uuid = str(task.get("uuid") or "")
+                removed.pop(uuid, None)
+                upsert[uuid] = task
+            changed.update(delta["set"])
+        return {"upsert": list(upsert.values()), "remove": list(removed), "set": changed}
+
+
+__all__ = ["DEFAULT_MAX_DELTAS", "DeltaLog", "diff_payloads"]
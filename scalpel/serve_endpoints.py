@@ -4,13 +4,32 @@ import argparse
 import datetime as dt
 import re
 import threading
+import time
 from pathlib import Path
 from typing import Any, cast
 
+from .model import Payload
+from .serve_apply_jobs import ApplyJobManager
+from .serve_delta import diff_payloads
+from .serve_state_store import ClientStateStore
 from .serve_support import client_state_snapshot, obs_log, payload_generated_at, write_client_state
-from .serve_types import ExecuteApplyFn, ObsIncFn, RenderOnceFn, SendJsonFn, ServeState, TaskLookupFn, TimewExportFn
+from .serve_task_cache import TaskExportCache
+from .serve_timew_cache import TimewDayCache
+from .serve_types import (
+    ExecuteApplyFn,
+    ObsIncFn,
+    RenderOnceFn,
+    SendJsonFn,
+    ServeState,
+    TaskLookupFn,
+    TimewExportFn,
+    TimewExportResult,
+    TimewRangeExportFn,
+)
+from .serve_views import ViewPayloadCache
 
 _YMD_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+MAX_TIMEW_RANGE_DAYS = 62
 
 
 def handle_task_endpoint(
@@ -19,12 +38,20 @@ def handle_task_endpoint(
     task_lookup: TaskLookupFn,
     send_json: SendJsonFn,
     obs_inc: ObsIncFn,
+    task_cache: TaskExportCache | None = None,
 ) -> None:
     if not uuid_query:
         send_json(400, {"ok": False, "error": "Query param 'uuid' is required."})
         return
     try:
-        task_result = task_lookup(uuid_query)
+        cached = task_cache.lookup(uuid_query) if task_cache is not None else None
+        if cached is not None:
+            obs_inc("task_cache_hit_total")
+            task_result = cached
+        else:
+            if task_cache is not None:
+                obs_inc("task_cache_miss_total")
+            task_result = task_lookup(uuid_query)
         task = task_result.get("task")
         if not isinstance(task, dict):
             obs_inc("task_export_not_found_total")
@@ -36,6 +63,7 @@ def handle_task_endpoint(
             uuid_query=uuid_query,
             matched=int(task_result.get("matched") or 0),
             exact=bool(task_result.get("exact")),
+            cached=cached is not None,
         )
         send_json(
             200,
@@ -60,18 +88,42 @@ def handle_task_endpoint(
         send_json(500, {"ok": False, "error": f"{type(ex).__name__}: {ex}"})
 
 
+def _timew_fetch(
+    days: list[str],
+    *,
+    timew_export: TimewExportFn,
+    timew_range_export: TimewRangeExportFn | None,
+    timew_cache: TimewDayCache | None,
+    obs_inc: ObsIncFn,
+) -> list[TimewExportResult]:
+    def _export(missing: list[str]) -> list[TimewExportResult]:
+        if timew_range_export is not None and len(missing) > 1:
+            # One process for the whole span; days already cached are simply re-filled.
+            return timew_range_export(min(missing), max(missing))
+        return [timew_export(d) for d in missing]
+
+    if timew_cache is None:
+        return _export(days)
+    results, misses = timew_cache.fetch(days, _export)
+    obs_inc("timew_cache_miss_total" if misses else "timew_cache_hit_total")
+    return results
+
+
 def handle_timew_endpoint(
     day: str,
     *,
     timew_export: TimewExportFn,
     send_json: SendJsonFn,
     obs_inc: ObsIncFn,
+    timew_cache: TimewDayCache | None = None,
 ) -> None:
     if not _YMD_RE.match(day):
         send_json(400, {"ok": False, "error": "Query param 'day' must be YYYY-MM-DD."})
         return
     try:
-        result = timew_export(day)
+        (result,) = _timew_fetch(
+            [day], timew_export=timew_export, timew_range_export=None, timew_cache=timew_cache, obs_inc=obs_inc
+        )
         obs_inc("timew_export_success_total")
         obs_log("serve.timew_export_ok", day=day, intervals=len(result["intervals"]))
         send_json(200, {"ok": True, "day": result["day"], "intervals": result["intervals"]})
@@ -85,6 +137,128 @@ def handle_timew_endpoint(
         send_json(500, {"ok": False, "error": f"{type(ex).__name__}: {ex}"})
 
 
+def handle_timew_range_endpoint(
+    start: str,
+    end: str,
+    *,
+    timew_export: TimewExportFn,
+    timew_range_export: TimewRangeExportFn | None,
+    timew_cache: TimewDayCache | None,
+    send_json: SendJsonFn,
+    obs_inc: ObsIncFn,
+) -> None:
+    if not _YMD_RE.match(start) or not _YMD_RE.match(end):
+        send_json(400, {"ok": False, "error": "Query params 'start' and 'end' must be YYYY-MM-DD."})
+        return
+    try:
+        first = dt.date.fromisoformat(start)
+        last = dt.date.fromisoformat(end)
+    except ValueError as ex:
+        send_json(400, {"ok": False, "error": str(ex)})
+        return
+    span = (last - first).days + 1
+    if span < 1 or span > MAX_TIMEW_RANGE_DAYS:
+        send_json(400, {"ok": False, "error": f"Range must cover 1-{MAX_TIMEW_RANGE_DAYS} days with start <= end."})
+        return
+    days = [(first + dt.timedelta(days=i)).isoformat() for i in range(span)]
+    try:
+        results = _timew_fetch(
+            days,
+            timew_export=timew_export,
+            timew_range_export=timew_range_export,
+            timew_cache=timew_cache,
+            obs_inc=obs_inc,
+        )
+        obs_inc("timew_range_success_total")
+        obs_log("serve.timew_range_ok", start=start, end=end, intervals=sum(len(r["intervals"]) for r in results))
+        send_json(200, {"ok": True, "start": start, "end": end, "days": results})
+    except SystemExit as ex:
+        obs_inc("timew_range_error_total")
+        obs_log("serve.timew_range_error", start=start, end=end, error=str(ex))
+        send_json(500, {"ok": False, "error": str(ex)})
+    except Exception as ex:
+        obs_inc("timew_range_error_total")
+        obs_log("serve.timew_range_error", start=start, end=end, error=f"{type(ex).__name__}: {ex}")
+        send_json(500, {"ok": False, "error": f"{type(ex).__name__}: {ex}"})
+
+
+def refresh_state(
+    *,
+    args: argparse.Namespace,
+    out_path: str,
+    state: ServeState,
+    state_lock: threading.Lock,
+    render_once: RenderOnceFn,
+) -> tuple[Payload, int, bool]:
+    """Rebuild the payload and swap it in; returns ``(payload, generation, coalesced)``.
+
+    Export/build/write run without state_lock: readers keep the previous snapshot
+    until the swap. Concurrent callers share one build (single-flight), but only
+    one that started after they arrived, so a refresh never returns data exported
+    before it was asked for; subscribers of /events hear about each new generation once.
+    """
+
+    def _rebuild() -> tuple[Payload, int]:
+        # Only refreshes replace the payload, and the single-flight serializes
+        # them, so `previous` cannot go stale while the new one is built.
+        with state_lock:
+            previous = state.payload
+        started = time.monotonic()
+        fresh = render_once(args, out_path)
+        # A render wired to the cache has just reloaded it; anything older is stale.
+        state.task_cache.invalidate(loaded_before=started)
+        delta = diff_payloads(previous, fresh)
+        with state_lock:
+            state.payload = fresh
+            state.generation += 1
+            state.deltas.record(state.generation, delta)
+            generation = state.generation
+        state.events.publish(
+            "payload-updated",
+            {"generation": generation, "generated_at": payload_generated_at(fresh)},
+        )
+        return fresh, generation
+
+    (payload, generation), coalesced = state.refresh_flight.run(_rebuild, fresh=True)
+    return payload, generation, coalesced
+
+
+def handle_view_refresh_endpoint(
+    *,
+    args: argparse.Namespace,
+    views: ViewPayloadCache,
+    send_json: SendJsonFn,
+    obs_inc: ObsIncFn,
+) -> None:
+    started = time.monotonic()
+    try:
+        entry, coalesced = views.refresh(args)
+    except SystemExit as ex:
+        obs_inc("refresh_error_total")
+        obs_log("serve.view_refresh_error", error=str(ex))
+        send_json(500, {"ok": False, "error": str(ex)})
+        return
+    except Exception as ex:
+        obs_inc("refresh_error_total")
+        obs_log("serve.view_refresh_error", error=f"{type(ex).__name__}: {ex}")
+        send_json(500, {"ok": False, "error": f"{type(ex).__name__}: {ex}"})
+        return
+    if coalesced:
+        obs_inc("refresh_coalesced_total")
+    obs_inc("refresh_success_total")
+    obs_log("serve.view_refresh_ok", view=entry.key, ms=int((time.monotonic() - started) * 1000))
+    send_json(
+        200,
+        {
+            "ok": True,
+            "generated_at": payload_generated_at(entry.payload),
+            "view": entry.key,
+            "generation": entry.generation,
+            "coalesced": coalesced,
+        },
+    )
+
+
 def handle_refresh_endpoint(
     *,
     args: argparse.Namespace,
@@ -97,25 +271,62 @@ def handle_refresh_endpoint(
     obs_inc: ObsIncFn,
 ) -> None:
     started = dt.datetime.now(dt.timezone.utc)
+    coalesced = state.refresh_flight.in_flight()
     try:
-        with state_lock:
-            payload = render_once(args, out_path)
-            state.payload = payload
+        payload, generation, coalesced = refresh_state(
+            args=args,
+            out_path=out_path,
+            state=state,
+            state_lock=state_lock,
+            render_once=render_once,
+        )
         elapsed_ms = int((dt.datetime.now(dt.timezone.utc) - started).total_seconds() * 1000)
+        if coalesced:
+            obs_inc("refresh_coalesced_total")
         obs_inc("refresh_success_total")
-        obs_log("serve.refresh_ok", ms=elapsed_ms, generated_at=payload_generated_at(payload))
+        obs_log("serve.refresh_ok", ms=elapsed_ms, generated_at=payload_generated_at(payload), coalesced=coalesced)
         send_json(
             200,
-            {"ok": True, "generated_at": payload_generated_at(payload), "path": route_file},
+            {
+                "ok": True,
+                "generated_at": payload_generated_at(payload),
+                "path": route_file,
+                "generation": generation,
+                "coalesced": coalesced,
+            },
         )
     except SystemExit as ex:
         obs_inc("refresh_error_total")
         obs_log("serve.refresh_error", error=str(ex))
-        send_json(500, {"ok": False, "error": str(ex)})
+        send_json(500, {"ok": False, "error": str(ex), "coalesced": coalesced})
     except Exception as ex:
         obs_inc("refresh_error_total")
         obs_log("serve.refresh_error", error=f"{type(ex).__name__}: {ex}")
-        send_json(500, {"ok": False, "error": f"{type(ex).__name__}: {ex}"})
+        send_json(500, {"ok": False, "error": f"{type(ex).__name__}: {ex}", "coalesced": coalesced})
+
+
+def handle_payload_delta_endpoint(
+    since_raw: str,
+    *,
+    state: ServeState,
+    state_lock: threading.Lock,
+    send_json: SendJsonFn,
+    obs_inc: ObsIncFn,
+) -> None:
+    try:
+        since = int(str(since_raw).strip())
+    except ValueError:
+        send_json(400, {"ok": False, "error": "Query parameter 'since' must be an integer generation."})
+        return
+    with state_lock:
+        generation = state.generation
+        patch = state.deltas.since(since, generation)
+    if patch is None:
+        obs_inc("payload_delta_full_total")
+        send_json(200, {"ok": True, "full": True, "since": since, "generation": generation})
+        return
+    obs_inc("payload_delta_total")
+    send_json(200, {"ok": True, "full": False, "since": since, "generation": generation, **patch})
 
 
 def handle_client_state_get(*, state: ServeState, state_lock: threading.Lock, send_json: SendJsonFn) -> None:
@@ -131,6 +342,7 @@ def handle_client_state_post(
     state_lock: threading.Lock,
     state_file: Path,
     send_json: SendJsonFn,
+    store: ClientStateStore | None = None,
 ) -> None:
     if not isinstance(body, dict):
         send_json(400, {"ok": False, "error": "JSON body must be an object."})
@@ -153,8 +365,16 @@ def handle_client_state_post(
             state.client_state[str(key)] = value
         for key in delete_keys:
             state.client_state.pop(key, None)
+        state.client_state_rev += 1
         snapshot = client_state_snapshot(state)
-        write_client_state(state_file, snapshot)
+        if store is not None:
+            # Queued in state_lock order; only the changed keys are journaled.
+            ticket = store.queue(values, delete_keys)
+        else:
+            write_client_state(state_file, snapshot)
+    if store is not None:
+        # Durable write outside the lock; concurrent POSTs share one append + fsync.
+        store.commit(ticket)
     send_json(200, {"ok": True, "state": snapshot})
 
 
@@ -164,6 +384,7 @@ def handle_apply_post(
     execute_apply: ExecuteApplyFn,
     send_json: SendJsonFn,
     obs_inc: ObsIncFn,
+    jobs: ApplyJobManager | None = None,
 ) -> None:
     if not isinstance(body, dict):
         send_json(400, {"ok": False, "error": "JSON body must be an object."})
@@ -182,6 +403,18 @@ def handle_apply_post(
     if not commands:
         send_json(400, {"ok": False, "error": "No commands supplied for apply."})
         return
+    if bool(body.get("async")) and jobs is not None:
+        try:
+            job = jobs.submit(commands, selected=cast(list[object] | None, selected))
+        except SystemExit as ex:
+            obs_inc("apply_error_total")
+            obs_log("serve.apply_error", error=str(ex))
+            send_json(400, {"ok": False, "error": str(ex)})
+            return
+        obs_inc("apply_job_submitted_total")
+        obs_log("serve.apply_job_submitted", job=job.id, selected=len(job.indexes))
+        send_json(202, {"ok": True, "job": job.id, "status": job.status, "selected": len(job.indexes)})
+        return
     try:
         result = execute_apply(commands, selected=cast(list[object] | None, selected))
     except SystemExit as ex:
@@ -204,11 +437,37 @@ def handle_apply_post(
     send_json(200, cast(dict[str, Any], result))
 
 
+def handle_apply_job_endpoint(
+    job_id: str,
+    *,
+    jobs: ApplyJobManager | None,
+    send_json: SendJsonFn,
+    obs_inc: ObsIncFn,
+    cancel: bool = False,
+) -> None:
+    if jobs is None:
+        send_json(404, {"ok": False, "error": "Not found"})
+        return
+    snapshot = jobs.cancel(job_id) if cancel else jobs.get(job_id)
+    if snapshot is None:
+        send_json(404, {"ok": False, "error": "Unknown apply job."})
+        return
+    if cancel:
+        obs_inc("apply_job_cancel_total")
+        obs_log("serve.apply_job_cancel", job=job_id, status=snapshot["status"])
+    send_json(200, snapshot)
+
+
 __all__ = [
+    "handle_apply_job_endpoint",
     "handle_apply_post",
     "handle_client_state_get",
     "handle_client_state_post",
+    "handle_payload_delta_endpoint",
     "handle_refresh_endpoint",
     "handle_task_endpoint",
     "handle_timew_endpoint",
+    "handle_timew_range_endpoint",
+    "handle_view_refresh_endpoint",
+    "refresh_state",
 ]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+from typing import Any
+
+# Fan-out of server-sent events (GET /events). Each subscriber owns a small
+# bounded queue; a slow client loses its oldest pending events rather than
+# stalling publishers, so the newest generation (and apply-finished) always lands.
+
+SSE_HEARTBEAT_S = 15.0
+_SUBSCRIBER_QUEUE = 16
+
+
+def format_sse(event: str, data: dict[str, Any]) -> bytes:
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {body}\n\n".encode("utf-8")
+
+
+class EventHub:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: set[queue.Queue[bytes | None]] = set()
+        self._closed = False
+
+    def subscribe(self) -> queue.Queue[bytes | None]:
+        q: queue.Queue[bytes | None] = queue.Queue(maxsize=_SUBSCRIBER_QUEUE)
+        with self._lock:
+            if self._closed:
+                q.put_nowait(None)
+            else:
+                self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue[bytes | None]) -> None:
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: str, data: dict[str, Any]) -> None:
+        frame = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(frame)
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    q.put_nowait(frame)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def close(self) -> None:
+        """Wake every stream with an end-of-stream marker (server shutdown)."""
+        with self._lock:
+            self._closed = True
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for q in subscribers:
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    q.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+
+
+__all__ = ["EventHub", "SSE_HEARTBEAT_S", "format_sse"]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.started = False
+        self.result: T | None = None
+        self.error: BaseException | None = None
+        # Queued by fresh callers that arrived while this call was running.
+        self.successor: _Call[T] | None = None
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls onto one in-flight execution.
+
+    The first caller runs ``fn``; callers arriving while it runs wait for and
+    share its result (or exception). The next call after completion starts fresh.
+    With ``fresh=True`` a caller never shares a call that was already running
+    when it arrived: all such callers wait it out and share the call after it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._call: _Call[T] | None = None
+
+    def run(self, fn: Callable[[], T], *, fresh: bool = False) -> tuple[T, bool]:
+        """Return ``(result, coalesced)``; *coalesced* is True for callers that joined a running call."""
+        stale: _Call[T] | None = None
+        with self._lock:
+            call = self._call
+            if call is None:
+                call = self._call = _Call()
+                call.started = True
+                leader = True
+            elif fresh and call.started:
+                stale = call
+                if stale.successor is None:
+                    stale.successor = _Call()
+                call = stale.successor
+            else:
+                leader = False
+        if stale is not None:
+            stale.done.wait()
+            with self._lock:
+                leader = not call.started
+                call.started = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+        try:
+            call.result = fn()
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                # A queued successor becomes current so plain callers join it too.
+                self._call = call.successor
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> bool:
+        with self._lock:
+            return self._call is not None
+
+
+__all__ = ["SingleFlight"]
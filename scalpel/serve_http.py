@@ -2,25 +2,46 @@ from __future__ import annotations
 
 import argparse
 import json
+import queue
 import re
 import sys
 import threading
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from http.server import BaseHTTPRequestHandler
 from pathlib import Path
 from typing import Any, Callable, cast
 from urllib.parse import urlsplit
 
+from .render.bundle import STATIC_CACHE_CONTROL, STATIC_PREFIX, AppBundle
+from .render.inline import build_html
+from .serve_apply_jobs import ApplyJobManager
+from .serve_compress import EncodedBody, EncodedBodyCache, encode_body, etag_matches, negotiate_encoding
 from .serve_endpoints import (
+    handle_apply_job_endpoint,
     handle_apply_post,
-    handle_client_state_get,
     handle_client_state_post,
+    handle_payload_delta_endpoint,
     handle_refresh_endpoint,
     handle_task_endpoint,
     handle_timew_endpoint,
+    handle_timew_range_endpoint,
+    handle_view_refresh_endpoint,
 )
+from .serve_events import SSE_HEARTBEAT_S, format_sse
+from .serve_metrics import PROM_CONTENT_TYPE, ServeMetrics, route_label
+from .serve_state_store import ClientStateStore
 from .serve_support import client_state_snapshot, first_query_value, obs_log
-from .serve_types import ExecuteApplyFn, RenderOnceFn, ServeConfig, ServeState, TaskLookupFn, TimewExportFn
+from .serve_types import (
+    ExecuteApplyFn,
+    RenderOnceFn,
+    ServeConfig,
+    ServeState,
+    TaskLookupFn,
+    TimewExportFn,
+    TimewRangeExportFn,
+)
+from .serve_views import ViewPayloadCache, view_args_from_query
 
 
 @dataclass(frozen=True)
@@ -35,9 +56,23 @@ class HttpContext:
     task_lookup: TaskLookupFn
     timew_export: TimewExportFn
     execute_apply: ExecuteApplyFn
-    inject_bootstrap: Callable[[str, dict[str, Any]], str]
+    inject_bootstrap: Callable[..., str]
     obs_inc: Callable[..., None]
     obs_metrics: Callable[[], dict[str, Any]]
+    bundle: AppBundle | None = None
+    timew_range_export: TimewRangeExportFn | None = None
+    client_state_store: ClientStateStore | None = None
+    apply_jobs: ApplyJobManager | None = None
+    metrics: ServeMetrics = field(default_factory=ServeMetrics)
+    views: ViewPayloadCache | None = None
+    body_cache: EncodedBodyCache = field(default_factory=EncodedBodyCache)
+
+
+_JSON_TYPE = "application/json; charset=utf-8"
+_HTML_TYPE = "text/html; charset=utf-8"
+# Generation-backed bodies may be stored but must be revalidated (ETag / 304).
+_REVALIDATE = "private, no-cache"
+_APPLY_JOB_RE = re.compile(r"^/apply/([0-9a-f-]{1,64})(/cancel)?$")
 
 
 def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
@@ -45,6 +80,8 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
     config = context.config
 
     class Handler(BaseHTTPRequestHandler):
+        _response_bytes = 0
+
         def _query_token(self) -> str:
             return str(first_query_value(self.path, "token"))
 
@@ -85,57 +122,245 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
             )
             self._send_json(401, {"ok": False, "error": "Unauthorized"})
 
-        def _send_json(self, code: int, payload: dict[str, Any], *, set_auth_cookie: bool = False) -> None:
-            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        def _accepted_encoding(self) -> str | None:
+            return negotiate_encoding(str(self.headers.get("Accept-Encoding") or ""))
+
+        def _send_body(
+            self,
+            code: int,
+            body: bytes,
+            content_type: str,
+            *,
+            encoding: str | None = None,
+            cache_control: str = "no-store",
+            etag: str | None = None,
+            headers: dict[str, str] | None = None,
+            set_auth_cookie: bool = False,
+        ) -> None:
             self.send_response(code)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.send_header("Cache-Control", "no-store")
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            if encoding is not None:
+                self.send_header("Content-Encoding", encoding)
+            if etag is not None:
+                self.send_header("ETag", etag)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
             if set_auth_cookie and config.required_token is not None:
                 self.send_header(
                     "Set-Cookie",
                     f"scalpel_token={config.required_token}; Path=/; HttpOnly; SameSite=Lax",
                 )
+            if code == 304:
+                self.end_headers()
+                return
             self.send_header("Content-Length", str(len(body)))
             self.end_headers()
+            self._response_bytes = len(body)
             self.wfile.write(body)
 
-        def _send_html(self, code: int, html_text: str, *, set_auth_cookie: bool = False) -> None:
-            body = html_text.encode("utf-8")
-            self.send_response(code)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Cache-Control", "no-store")
-            if set_auth_cookie and config.required_token is not None:
-                self.send_header(
-                    "Set-Cookie",
-                    f"scalpel_token={config.required_token}; Path=/; HttpOnly; SameSite=Lax",
+        def _send_json(self, code: int, payload: dict[str, Any], *, set_auth_cookie: bool = False) -> None:
+            raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            body, encoding = encode_body(raw, self._accepted_encoding())
+            self._send_body(code, body, _JSON_TYPE, encoding=encoding, set_auth_cookie=set_auth_cookie)
+
+        def _send_encoded(
+            self,
+            encoded: EncodedBody,
+            content_type: str,
+            *,
+            cache_control: str = _REVALIDATE,
+            headers: dict[str, str] | None = None,
+            set_auth_cookie: bool = False,
+        ) -> None:
+            if etag_matches(str(self.headers.get("If-None-Match") or ""), encoded.digest):
+                context.obs_inc("not_modified_total")
+                self._send_body(
+                    304,
+                    b"",
+                    content_type,
+                    cache_control=cache_control,
+                    etag=encoded.etag,
+                    headers=headers,
+                    set_auth_cookie=set_auth_cookie,
                 )
-            self.send_header("Content-Length", str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+                return
+            self._send_body(
+                200,
+                encoded.body,
+                content_type,
+                encoding=encoded.encoding,
+                cache_control=cache_control,
+                etag=encoded.etag,
+                headers=headers,
+                set_auth_cookie=set_auth_cookie,
+            )
+
+        def _send_static(self, path: str) -> None:
+            asset = context.bundle.asset(path) if context.bundle is not None else None
+            if asset is None:
+                self._send_json(404, {"ok": False, "error": "Not found"})
+                return
+            context.obs_inc("static_reads_total")
+            encoded = context.body_cache.get(("static", path), self._accepted_encoding(), lambda: asset.body)
+            self._send_encoded(encoded, asset.content_type, cache_control=STATIC_CACHE_CONTROL)
+
+        def _stream_events(self) -> None:
+            hub = context.state.events
+            stream = hub.subscribe()
+            context.obs_inc("sse_connections_total")
+            with context.state_lock:
+                generation = context.state.generation
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("X-Accel-Buffering", "no")
+                self.end_headers()
+                self.close_connection = True
+                # "hello" carries the current generation so a reconnecting client can catch up.
+                self.wfile.write(b"retry: 3000\n\n" + format_sse("hello", {"generation": generation}))
+                self.wfile.flush()
+                while True:
+                    try:
+                        frame = stream.get(timeout=SSE_HEARTBEAT_S)
+                    except queue.Empty:
+                        frame = b": ping\n\n"
+                    if frame is None:
+                        break
+                    self.wfile.write(frame)
+                    self.wfile.flush()
+            except OSError:
+                pass
+            finally:
+                hub.unsubscribe(stream)
+
+        def _view_args(self, path: str) -> tuple[argparse.Namespace | None, bool]:
+            """Parse a query view spec; returns ``(args, handled)`` with handled=True after an error reply."""
+            if context.views is None:
+                return None, False
+            try:
+                view_args = view_args_from_query(self.path, context.args)
+            except SystemExit as ex:
+                if not self._is_authorized():
+                    self._deny_unauthorized(path)
+                else:
+                    self._send_json(400, {"ok": False, "error": str(ex)})
+                return None, True
+            return view_args, False
+
+        def _send_view(self, path: str, view_args: argparse.Namespace) -> None:
+            """`/` or `/payload` for an extra view, built (or reused) from the per-view LRU."""
+            views = cast(ViewPayloadCache, context.views)
+            try:
+                entry, hit = views.get(view_args)
+            except SystemExit as ex:
+                context.obs_inc("view_build_error_total")
+                obs_log("serve.view_build_error", error=str(ex))
+                self._send_json(500, {"ok": False, "error": str(ex)})
+                return
+            context.obs_inc("view_cache_hit_total" if hit else "view_cache_miss_total")
+            headers = {"X-Scalpel-View": entry.key}
+            if path == "/payload":
+                context.obs_inc("payload_reads_total")
+                encoded = context.body_cache.get(
+                    ("view-payload", entry.key, entry.generation),
+                    self._accepted_encoding(),
+                    lambda: json.dumps(entry.payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                )
+                self._send_encoded(encoded, _JSON_TYPE, headers=headers)
+                return
+            shell = path == "/" and context.bundle is not None
+            with context.state_lock:
+                client_state = client_state_snapshot(context.state)
+                rev = context.state.client_state_rev
+
+            def _build_view_html() -> bytes:
+                html = cast(AppBundle, context.bundle).shell_html if shell else build_html(entry.payload)
+                # No generation: /payload/delta and /events track the main view only.
+                return context.inject_bootstrap(html, client_state, None).encode("utf-8")
+
+            encoded = context.body_cache.get(
+                ("view-html", entry.key, entry.generation, shell, rev), self._accepted_encoding(), _build_view_html
+            )
+            set_cookie = config.required_token is not None and self._query_token() == config.required_token
+            self._send_encoded(encoded, _HTML_TYPE, headers=headers, set_auth_cookie=set_cookie)
 
         def log_message(self, fmt: str, *args: Any) -> None:
             message = fmt % args
             message = re.sub(r"(token=)[^&\s]+", r"\1REDACTED", message, flags=re.IGNORECASE)
             print(f"[scalpel-serve] {self.address_string()} - {message}", file=sys.stderr)
 
+        def _observed(self, method: str, handle: Callable[[], None]) -> None:
+            route = route_label(urlsplit(self.path).path, route_file=config.route_file)
+            metrics = context.metrics
+            self._response_bytes = 0
+            metrics.add_gauge("http_requests_in_flight", 1, method=method)
+            started = time.perf_counter()
+            try:
+                handle()
+            finally:
+                metrics.add_gauge("http_requests_in_flight", -1, method=method)
+                if route != "/events":  # long-lived stream; its duration is not a latency
+                    labels = {"method": method, "route": route}
+                    metrics.observe("http_request_duration_seconds", time.perf_counter() - started, **labels)
+                    metrics.observe("http_response_size_bytes", self._response_bytes, **labels)
+
         def do_GET(self) -> None:  # noqa: N802
+            self._observed("GET", self._handle_get)
+
+        def do_POST(self) -> None:  # noqa: N802
+            self._observed("POST", self._handle_post)
+
+        def _handle_get(self) -> None:
             path = urlsplit(self.path).path
             context.obs_inc("requests_total", path=path)
             context.obs_inc("requests_get_total")
+            if path.startswith(STATIC_PREFIX):
+                # Content-hashed app bundle: no task data, cacheable forever.
+                self._send_static(path)
+                return
+
+            if path in {"/", config.route_file, "/payload"}:
+                view_args, handled = self._view_args(path)
+                if handled:
+                    return
+                if view_args is not None:
+                    if not self._is_authorized():
+                        self._deny_unauthorized(path)
+                        return
+                    self._send_view(path, view_args)
+                    return
+
             if path in {"/", config.route_file}:
                 if not self._is_authorized():
                     self._deny_unauthorized(path)
                     return
-                try:
-                    with context.state_lock:
+                shell = path == "/" and context.bundle is not None
+                with context.state_lock:
+                    generation = context.state.generation
+                    client_state_rev = context.state.client_state_rev
+                    snapshot = client_state_snapshot(context.state)
+
+                def _build_html() -> bytes:
+                    if shell:
+                        html = cast(AppBundle, context.bundle).shell_html
+                    else:
                         html = config.out_file.read_text(encoding="utf-8")
-                        client_state = client_state_snapshot(context.state)
+                    return context.inject_bootstrap(html, snapshot, generation).encode("utf-8")
+
+                try:
+                    # The served file and the bootstrap only change with these two counters.
+                    # Read, inject and compress outside the lock so a cold page never stalls
+                    # /payload, refresh swaps or client-state writes.
+                    key = ("html", shell, generation, client_state_rev)
+                    encoded = context.body_cache.get(key, self._accepted_encoding(), _build_html)
                 except (OSError, UnicodeError) as ex:
                     self._send_json(500, {"ok": False, "error": f"Failed reading HTML: {ex}"})
                     return
-                html = context.inject_bootstrap(html, client_state)
                 set_cookie = config.required_token is not None and self._query_token() == config.required_token
-                self._send_html(200, html, set_auth_cookie=set_cookie)
+                self._send_encoded(encoded, _HTML_TYPE, set_auth_cookie=set_cookie)
                 return
 
             if path == "/payload":
@@ -144,19 +369,51 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
                     return
                 with context.state_lock:
                     payload = context.state.payload
+                    generation = context.state.generation
                 context.obs_inc("payload_reads_total")
-                self._send_json(200, cast(dict[str, Any], payload))
+                encoded = context.body_cache.get(
+                    ("payload", generation),
+                    self._accepted_encoding(),
+                    lambda: json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                )
+                self._send_encoded(encoded, _JSON_TYPE, headers={"X-Scalpel-Generation": str(generation)})
                 return
 
-            if path == "/client-state":
+            if path == "/payload/delta":
                 if not self._is_authorized():
                     self._deny_unauthorized(path)
                     return
-                handle_client_state_get(
+                handle_payload_delta_endpoint(
+                    first_query_value(self.path, "since"),
                     state=context.state,
                     state_lock=context.state_lock,
                     send_json=self._send_json,
+                    obs_inc=context.obs_inc,
+                )
+                return
+
+            if path == "/events":
+                if not self._is_authorized():
+                    self._deny_unauthorized(path)
+                    return
+                self._stream_events()
+                return
+
+            if path == "/client-state":
+                if not self._is_authorized():
+                    self._deny_unauthorized(path)
+                    return
+                with context.state_lock:
+                    client_state_rev = context.state.client_state_rev
+                    snapshot = client_state_snapshot(context.state)
+                encoded = context.body_cache.get(
+                    ("client-state", client_state_rev),
+                    self._accepted_encoding(),
+                    lambda: json.dumps(
+                        {"ok": True, "state": snapshot}, ensure_ascii=False, separators=(",", ":")
+                    ).encode("utf-8"),
                 )
+                self._send_encoded(encoded, _JSON_TYPE)
                 return
 
             if path == "/task":
@@ -168,6 +425,7 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
                     task_lookup=context.task_lookup,
                     send_json=self._send_json,
                     obs_inc=context.obs_inc,
+                    task_cache=context.state.task_cache,
                 )
                 return
 
@@ -180,6 +438,35 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
                     timew_export=context.timew_export,
                     send_json=self._send_json,
                     obs_inc=context.obs_inc,
+                    timew_cache=context.state.timew_cache,
+                )
+                return
+
+            if path == "/timew/range":
+                if not self._is_authorized():
+                    self._deny_unauthorized(path)
+                    return
+                handle_timew_range_endpoint(
+                    first_query_value(self.path, "start"),
+                    first_query_value(self.path, "end"),
+                    timew_export=context.timew_export,
+                    timew_range_export=context.timew_range_export,
+                    timew_cache=context.state.timew_cache,
+                    send_json=self._send_json,
+                    obs_inc=context.obs_inc,
+                )
+                return
+
+            job_match = _APPLY_JOB_RE.match(path)
+            if job_match is not None and job_match.group(2) is None:
+                if not self._is_authorized():
+                    self._deny_unauthorized(path)
+                    return
+                handle_apply_job_endpoint(
+                    job_match.group(1),
+                    jobs=context.apply_jobs,
+                    send_json=self._send_json,
+                    obs_inc=context.obs_inc,
                 )
                 return
 
@@ -187,6 +474,9 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
                 if config.required_token is not None and not self._is_authorized():
                     self._deny_unauthorized(path)
                     return
+                if first_query_value(self.path, "format").lower() in {"prom", "prometheus"}:
+                    self._send_body(200, context.metrics.render_prometheus().encode("utf-8"), PROM_CONTENT_TYPE)
+                    return
                 self._send_json(200, {"ok": True, "metrics": context.obs_metrics()})
                 return
 
@@ -203,17 +493,38 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
 
             self._send_json(404, {"ok": False, "error": "Not found"})
 
-        def do_POST(self) -> None:  # noqa: N802
+        def _handle_post(self) -> None:
             path = urlsplit(self.path).path
             context.obs_inc("requests_total", path=path)
             context.obs_inc("requests_post_total")
-            if path not in {"/refresh", "/client-state", "/apply"}:
+            job_match = _APPLY_JOB_RE.match(path)
+            if path not in {"/refresh", "/client-state", "/apply"} and (job_match is None or not job_match.group(2)):
                 self._send_json(404, {"ok": False, "error": "Not found"})
                 return
             if not self._is_authorized():
                 self._deny_unauthorized(path)
                 return
+            if job_match is not None:
+                handle_apply_job_endpoint(
+                    job_match.group(1),
+                    jobs=context.apply_jobs,
+                    send_json=self._send_json,
+                    obs_inc=context.obs_inc,
+                    cancel=True,
+                )
+                return
             if path == "/refresh":
+                view_args, handled = self._view_args(path)
+                if handled:
+                    return
+                if view_args is not None:
+                    handle_view_refresh_endpoint(
+                        args=view_args,
+                        views=cast(ViewPayloadCache, context.views),
+                        send_json=self._send_json,
+                        obs_inc=context.obs_inc,
+                    )
+                    return
                 handle_refresh_endpoint(
                     args=context.args,
                     out_path=context.out_path,
@@ -241,6 +552,7 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
                     execute_apply=context.execute_apply,
                     send_json=self._send_json,
                     obs_inc=context.obs_inc,
+                    jobs=context.apply_jobs,
                 )
                 return
             handle_client_state_post(
@@ -249,6 +561,7 @@ def make_handler(context: HttpContext) -> type[BaseHTTPRequestHandler]:
                 state_lock=context.state_lock,
                 state_file=context.state_file,
                 send_json=self._send_json,
+                store=context.client_state_store,
             )
 
     return Handler
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+from typing import Any, Callable, Iterable
+
+from .render.bundle import STATIC_PREFIX
+
+# Live-mode instrumentation. Request threads record into one of STRIPES shards
+# picked by their native thread id, each with its own lock, so concurrent
+# requests almost never wait on each other; only a scrape walks (and briefly
+# locks) every shard. The JSON /metrics form keeps the historical counter
+# layout (see counter_inc); /metrics?format=prom renders counters, histograms
+# and gauges in the Prometheus text exposition format.
+
+STRIPES = 16
+LATENCY_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+PROM_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HISTOGRAMS: dict[str, tuple[str, tuple[float, ...]]] = {
+    "http_request_duration_seconds": ("HTTP request latency by route.", LATENCY_BUCKETS_S),
+    "http_response_size_bytes": ("HTTP response body size by route.", SIZE_BUCKETS_BYTES),
+    "refresh_duration_seconds": ("Time to rebuild the payload and HTML on refresh.", LATENCY_BUCKETS_S),
+    "apply_duration_seconds": ("Time to run one live apply (all selected commands).", LATENCY_BUCKETS_S),
+}
+GAUGES: dict[str, str] = {
+    "http_requests_in_flight": "HTTP requests currently being handled.",
+}
+
+_ROUTES = frozenset(
+    {
+        "/",
+        "/apply",
+        "/client-state",
+        "/events",
+        "/health",
+        "/metrics",
+        "/payload",
+        "/payload/delta",
+        "/refresh",
+        "/task",
+        "/timew",
+        "/timew/range",
+    }
+)
+_APPLY_JOB_ROUTE_RE = re.compile(r"^/apply/[^/]+(/cancel)?$")
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+Labels = tuple[tuple[str, str], ...]
+GaugeFn = Callable[[], Iterable[tuple[dict[str, str], float]]]
+_Merged = tuple[
+    dict[str, int], dict[tuple[str, str], int], dict[tuple[str, Labels], float], dict[tuple[str, Labels], list[float]]
+]
+
+
+def route_label(path: str, *, route_file: str | None = None) -> str:
+    """Bounded label for a request path (unknown paths collapse to "other")."""
+    if path in _ROUTES or (route_file is not None and path == route_file):
+        return path
+    if path.startswith(STATIC_PREFIX):
+        return STATIC_PREFIX.rstrip("/") or "/"
+    match = _APPLY_JOB_ROUTE_RE.match(path)
+    if match is not None:
+        return "/apply/{id}/cancel" if match.group(1) else "/apply/{id}"
+    return "other"
+
+
+def _labels(raw: dict[str, str]) -> Labels:
+    return tuple(sorted((str(k), str(v)) for k, v in raw.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _series(name: str, labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = list(labels) + ([extra] if extra is not None else [])
+    if not pairs:
+        return name
+    return name + "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Shard:
+    __slots__ = ("lock", "counters", "by_path", "gauges", "histograms")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.counters: dict[str, int] = {}
+        self.by_path: dict[tuple[str, str], int] = {}
+        self.gauges: dict[tuple[str, Labels], float] = {}
+        # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.histograms: dict[tuple[str, Labels], list[float]] = {}
+
+
+class ServeMetrics:
+    def __init__(self, *, namespace: str = "scalpel", stripes: int = STRIPES) -> None:
+        self.namespace = namespace
+        self._shards = tuple(_Shard() for _ in range(max(1, int(stripes))))
+        self._gauge_fns: list[tuple[str, str, GaugeFn]] = []
+
+    def _shard(self) -> _Shard:
+        return self._shards[threading.get_native_id() % len(self._shards)]
+
+    def inc(self, key: str, *, path: str | None = None) -> None:
+        """Same semantics as counter_inc, without a process-wide lock."""
+        normalized_key = str(key).strip()
+        if not normalized_key:
+            return
+        shard = self._shard()
+        with shard.lock:
+            shard.counters[normalized_key] = shard.counters.get(normalized_key, 0) + 1
+            if path is not None:
+                map_key = (normalized_key, str(path or "").strip() or "/")
+                shard.by_path[map_key] = shard.by_path.get(map_key, 0) + 1
+
+    def add_gauge(self, name: str, delta: float, **labels: str) -> None:
+        key = (name, _labels(labels))
+        shard = self._shard()
+        with shard.lock:
+            shard.gauges[key] = shard.gauges.get(key, 0.0) + delta
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        buckets = HISTOGRAMS[name][1]
+        key = (name, _labels(labels))
+        slot = bisect.bisect_left(buckets, value)
+        shard = self._shard()
+        with shard.lock:
+            row = shard.histograms.get(key)
+            if row is None:
+                row = shard.histograms[key] = [0.0] * (len(buckets) + 2)
+            row[slot] += 1
+            row[-1] += value
+
+    def register_gauge(self, name: str, help_text: str, fn: GaugeFn) -> None:
+        """Gauge computed at scrape time, e.g. a cache hit ratio."""
+        self._gauge_fns.append((name, help_text, fn))
+
+    def _merged(self) -> _Merged:
+        counters: dict[str, int] = {}
+        by_path: dict[tuple[str, str], int] = {}
+        gauges: dict[tuple[str, Labels], float] = {}
+        histograms: dict[tuple[str, Labels], list[float]] = {}
+        for shard in self._shards:
+            with shard.lock:
+                for key, count in shard.counters.items():
+                    counters[key] = counters.get(key, 0) + count
+                for pkey, count in shard.by_path.items():
+                    by_path[pkey] = by_path.get(pkey, 0) + count
+                for gkey, value in shard.gauges.items():
+                    gauges[gkey] = gauges.get(gkey, 0.0) + value
+                for hkey, row in shard.histograms.items():
+                    acc = histograms.get(hkey)
+                    if acc is None:
+                        histograms[hkey] = list(row)
+                    else:
+                        for i, value in enumerate(row):
+                            acc[i] += value
+        return counters, by_path, gauges, histograms
+
+    def counter_snapshot(self) -> dict[str, Any]:
+        counters, by_path, _gauges, _histograms = self._merged()
+        output: dict[str, Any] = dict(counters)
+        for (key, path), count in by_path.items():
+            output.setdefault(f"{key}_by_path", {})[path] = count
+        return output
+
+    def counter_value(self, key: str) -> int:
+        return int(self._merged()[0].get(key, 0))
+
+    def histogram_snapshot(self, name: str) -> dict[Labels, dict[str, Any]]:
+        buckets = HISTOGRAMS[name][1]
+        out: dict[Labels, dict[str, Any]] = {}
+        for (hname, labels), row in self._merged()[3].items():
+            if hname == name:
+                out[labels] = {
+                    "count": int(sum(row[:-1])),
+                    "sum": row[-1],
+                    "buckets": dict(zip(buckets, row[: len(buckets)], strict=True)),
+                }
+        return out
+
+    def render_prometheus(self) -> str:
+        ns = self.namespace
+        counters, by_path, gauges, histograms = self._merged()
+        lines: list[str] = []
+
+        for key in sorted(counters):
+            name = f"{ns}_{_NAME_RE.sub('_', key)}"
+            lines += [f"# TYPE {name} counter", f"{name} {counters[key]}"]
+        path_families: dict[str, list[tuple[str, int]]] = {}
+        for (key, path), count in by_path.items():
+            path_families.setdefault(key, []).append((path, count))
+        for key in sorted(path_families):
+            base = _NAME_RE.sub("_", key.removesuffix("_total"))
+            name = f"{ns}_{base}_by_path_total"
+            lines.append(f"# TYPE {name} counter")
+            for path, count in sorted(path_families[key]):
+                lines.append(f"{_series(name, (('path', path),))} {count}")
+
+        for gname, help_text in GAUGES.items():
+            name = f"{ns}_{gname}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            series = sorted((labels, value) for (n, labels), value in gauges.items() if n == gname)
+            for labels, value in series or [((), 0.0)]:
+                lines.append(f"{_series(name, labels)} {_number(value)}")
+
+        for gname, help_text, fn in self._gauge_fns:
+            name = f"{ns}_{gname}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for raw_labels, value in fn():
+                lines.append(f"{_series(name, _labels(raw_labels))} {_number(value)}")
+
+        for hname, (help_text, buckets) in HISTOGRAMS.items():
+            name = f"{ns}_{hname}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (n, labels), row in sorted(histograms.items()):
+                if n != hname:
+                    continue
+                cumulative = 0.0
+                for bound, in_bucket in zip((*buckets, float("inf")), row[:-1], strict=True):
+                    cumulative += in_bucket
+                    lines.append(f"{_series(name + '_bucket', labels, ('le', _number(bound)))} {_number(cumulative)}")
+                lines.append(f"{_series(name + '_sum', labels)} {_number(row[-1])}")
+                lines.append(f"{_series(name + '_count', labels)} {_number(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+
+def hit_ratio(hits: int, misses: int) -> float:
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+__all__ = [
+    "GAUGES",
+    "HISTOGRAMS",
+    "LATENCY_BUCKETS_S",
+    "PROM_CONTENT_TYPE",
+    "SIZE_BUCKETS_BYTES",
+    "STRIPES",
+    "ServeMetrics",
+    "hit_ratio",
+    "route_label",
+]
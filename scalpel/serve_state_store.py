@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Collection, Mapping
+
+from .serve_support import apply_client_state_delta, client_state_journal_file, write_client_state
+
+# Durable client-state for live mode. A POST only records its key delta here.
+# Writes are group-committed: whichever request reaches the journal first
+# appends every delta queued so far as one JSON line with one fsync, and the
+# requests that queued behind it return without touching the disk. Once the
+# journal outgrows the snapshot it is folded into `.state.json` (atomic
+# replace) and removed. read_client_state replays snapshot + journal.
+
+COMPACT_MIN_BYTES = 256 * 1024
+
+
+class ClientStateStore:
+    def __init__(
+        self,
+        path: Path,
+        initial: Mapping[str, Any],
+        *,
+        compact_min_bytes: int = COMPACT_MIN_BYTES,
+    ) -> None:
+        self.path = path
+        self.journal_path = client_state_journal_file(path)
+        self._compact_min_bytes = max(0, int(compact_min_bytes))
+        self._state: dict[str, Any] = dict(initial)
+        self._pending_set: dict[str, Any] = {}
+        self._pending_del: set[str] = set()
+        self._lock = threading.Lock()  # guards pending + sequence numbers
+        self._io_lock = threading.Lock()  # serializes journal/snapshot writes
+        self._queued_seq = 0
+        self._durable_seq = 0
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self.appends = 0
+        self.compactions = 0
+        # Fold a previous run's journal in, so this one starts from a clean snapshot.
+        if self.journal_path.exists():
+            self.compact()
+        elif self.path.exists():
+            self._snapshot_bytes = self.path.stat().st_size
+
+    def queue(self, values: Mapping[str, Any], delete: Collection[str] = ()) -> int:
+        """Merge a delta into the pending batch; returns the ticket to pass to commit()."""
+        with self._lock:
+            for key, value in values.items():
+                self._pending_set[str(key)] = value
+                self._pending_del.discard(str(key))
+            for key in delete:
+                self._pending_set.pop(str(key), None)
+                self._pending_del.add(str(key))
+            self._queued_seq += 1
+            return self._queued_seq
+
+    def commit(self, seq: int) -> None:
+        """Return once ticket ``seq`` is durable, appending the batch if nobody else has."""
+        with self._io_lock:
+            if self._durable_seq >= seq:
+                return  # coalesced into the append that ran while we waited
+            self._flush_locked()
+
+    def record(self, values: Mapping[str, Any], delete: Collection[str] = ()) -> None:
+        self.commit(self.queue(values, delete))
+
+    def _take_pending(self) -> tuple[dict[str, Any] | None, int]:
+        with self._lock:
+            seq = self._queued_seq
+            if not self._pending_set and not self._pending_del:
+                return None, seq
+            delta: dict[str, Any] = {}
+            if self._pending_set:
+                delta["set"] = self._pending_set
+            if self._pending_del:
+                delta["del"] = sorted(self._pending_del)
+            self._pending_set = {}
+            self._pending_del = set()
+            return delta, seq
+
+    def flush(self) -> None:
+        with self._io_lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        delta, seq = self._take_pending()
+        if delta is not None:
+            apply_client_state_delta(self._state, delta)
+            line = (json.dumps(delta, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, "ab") as fh:
+                fh.write(line)
+                fh.flush()
+                os.fsync(fh.fileno())
+            self.appends += 1
+            self._journal_bytes += len(line)
+        self._durable_seq = seq
+        if self._journal_bytes > max(self._compact_min_bytes, self._snapshot_bytes):
+            self._compact_locked()
+
+    def compact(self) -> None:
+        with self._io_lock:
+            delta, seq = self._take_pending()
+            if delta is not None:
+                apply_client_state_delta(self._state, delta)
+            self._durable_seq = seq
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        write_client_state(self.path, self._state)
+        try:
+            self.journal_path.unlink()
+        except FileNotFoundError:
+            pass
+        self._journal_bytes = 0
+        self._snapshot_bytes = self.path.stat().st_size
+        self.compactions += 1
+
+
+__all__ = ["COMPACT_MIN_BYTES", "ClientStateStore"]
@@ -39,21 +39,53 @@ def client_state_file(out_file: Path) -> Path:
     return out_file.with_suffix(out_file.suffix + ".state.json")
 
 
+def client_state_journal_file(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".journal")
+
+
+def apply_client_state_delta(state: dict[str, Any], delta: object) -> None:
+    """Apply one journal record (``{"set": {...}, "del": [...]}``) in place."""
+    if not isinstance(delta, dict):
+        return
+    values = delta.get("set")
+    if isinstance(values, dict):
+        for key, value in values.items():
+            state[str(key)] = value
+    deleted = delta.get("del")
+    if isinstance(deleted, list):
+        for key in deleted:
+            state.pop(str(key), None)
+
+
 def read_client_state(path: Path) -> dict[str, Any]:
+    """Snapshot at ``path`` plus any journal records appended since the last compaction."""
+    state: dict[str, Any] = {}
     try:
         raw = json.loads(path.read_text(encoding="utf-8", errors="replace"))
     except (FileNotFoundError, OSError, json.JSONDecodeError):
-        return {}
-    if not isinstance(raw, dict):
-        return {}
-    return {str(key): value for key, value in raw.items()}
+        raw = {}
+    if isinstance(raw, dict):
+        state = {str(key): value for key, value in raw.items()}
+    try:
+        lines = client_state_journal_file(path).read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return state
+    for line in lines:
+        try:
+            apply_client_state_delta(state, json.loads(line))
+        except json.JSONDecodeError:
+            break  # torn tail from a crash mid-append; later records cannot be trusted
+    return state
 
 
 def write_client_state(path: Path, state: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
     text = json.dumps(state, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
-    tmp.write_text(text, encoding="utf-8")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(text)
+        fh.flush()
+        os.fsync(fh.fileno())
     tmp.replace(path)
 
 
@@ -159,8 +191,10 @@ def first_query_value(raw_path: str, name: str) -> str:
 
 
 __all__ = [
+    "apply_client_state_delta",
     "build_serve_config",
     "client_state_file",
+    "client_state_journal_file",
     "client_state_snapshot",
     "counter_inc",
     "counter_snapshot",
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable
+
+from .model import RawTask
+
+if TYPE_CHECKING:
+    from .serve_types import TaskExportLookupResult
+
+# Raw `task export` rows behind the resident payload, indexed by uuid so
+# GET /task can answer detail/edit modals without spawning `task uuid:X export`.
+# Filled by every render (see build_payload(on_export=...)); dropped on apply
+# and treated as stale after ttl_s, in which case /task falls back to the
+# subprocess lookup.
+
+DEFAULT_TTL_S = 60.0
+
+
+class TaskExportCache:
+    def __init__(self, *, ttl_s: float = DEFAULT_TTL_S) -> None:
+        self._ttl_s = max(0.0, float(ttl_s))
+        self._lock = threading.Lock()
+        self._by_uuid: dict[str, RawTask] = {}
+        self._sorted: list[str] = []
+        self._loaded_at: float | None = None
+
+    def load(self, raw_tasks: Iterable[RawTask]) -> None:
+        by_uuid: dict[str, RawTask] = {}
+        for t in raw_tasks:
+            if not isinstance(t, dict):
+                continue
+            u = str(t.get("uuid") or "").strip().lower()
+            if u:
+                by_uuid[u] = t
+        ordered = sorted(by_uuid)
+        with self._lock:
+            self._by_uuid = by_uuid
+            self._sorted = ordered
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self, *, loaded_before: float | None = None) -> None:
+        """Forget the snapshot (only if it was loaded before ``loaded_before``, when given)."""
+        with self._lock:
+            if loaded_before is not None and self._loaded_at is not None and self._loaded_at >= loaded_before:
+                return
+            self._by_uuid = {}
+            self._sorted = []
+            self._loaded_at = None
+
+    def is_fresh(self) -> bool:
+        with self._lock:
+            return self._fresh_locked()
+
+    def _fresh_locked(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at <= self._ttl_s
+
+    def lookup(self, uuid_query: str) -> TaskExportLookupResult | None:
+        """Answer a /task lookup from the snapshot; ``None`` means "ask Taskwarrior".
+
+        Misses fall through because the snapshot only covers the exported view;
+        an ambiguous prefix falls through so Taskwarrior reports it as usual.
+        """
+        uq = str(uuid_query or "").strip().lower()
+        if not uq:
+            return None
+        with self._lock:
+            if not self._fresh_locked():
+                return None
+            task = self._by_uuid.get(uq)
+            if task is not None:
+                return {"task": task, "matched": 1, "exact": True}
+            i = bisect.bisect_left(self._sorted, uq)
+            matches = self._sorted[i : i + 2]
+            matches = [u for u in matches if u.startswith(uq)]
+            if len(matches) != 1:
+                return None
+            return {"task": self._by_uuid[matches[0]], "matched": 1, "exact": False}
+
+
+__all__ = ["DEFAULT_TTL_S", "TaskExportCache"]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .serve_types import TimewExportResult
+
+# Per-day Timewarrior intervals for /timew and /timew/range. Timewarrior keeps
+# one data file per month (YYYY-MM.data); a cached day stays valid while the
+# files that can hold its intervals (its own month and the previous day's, for
+# intervals crossing midnight) are unchanged. Finished days are then kept
+# indefinitely; today (and later) also expire after today_ttl_s because an
+# open interval grows until it is stopped.
+
+DEFAULT_TODAY_TTL_S = 30.0
+
+_Signature = tuple[tuple[str, int, int], ...]
+
+
+def _local_today_ymd() -> str:
+    return dt.date.today().isoformat()
+
+
+class TimewDayCache:
+    def __init__(
+        self,
+        data_dir: str | None = None,
+        *,
+        today_ymd: Callable[[], str] = _local_today_ymd,
+        today_ttl_s: float = DEFAULT_TODAY_TTL_S,
+    ) -> None:
+        self.data_dir = data_dir
+        self._today_ymd = today_ymd
+        self._today_ttl_s = max(0.0, float(today_ttl_s))
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[TimewExportResult, _Signature, float]] = {}
+
+    def _signature(self, day_ymd: str) -> _Signature:
+        if not self.data_dir:
+            return ()
+        d = dt.date.fromisoformat(day_ymd)
+        months = sorted({f"{d:%Y-%m}", f"{d - dt.timedelta(days=1):%Y-%m}"})
+        out: list[tuple[str, int, int]] = []
+        for month in months:
+            try:
+                st = os.stat(os.path.join(self.data_dir, f"{month}.data"))
+            except OSError:
+                out.append((month, -1, -1))
+                continue
+            out.append((month, st.st_mtime_ns, st.st_size))
+        return tuple(out)
+
+    def get(self, day_ymd: str) -> TimewExportResult | None:
+        with self._lock:
+            entry = self._entries.get(day_ymd)
+        if entry is None:
+            return None
+        result, signature, stored_at = entry
+        if signature != self._signature(day_ymd):
+            return None
+        if day_ymd >= self._today_ymd() and time.monotonic() - stored_at > self._today_ttl_s:
+            return None
+        return result
+
+    def fetch(
+        self, days: list[str], export_missing: Callable[[list[str]], list[TimewExportResult]]
+    ) -> tuple[list[TimewExportResult], int]:
+        """Results for ``days`` in order plus the number of cache misses.
+
+        Missing days are handed to ``export_missing`` in one call. Signatures are
+        taken before the export so a write racing it invalidates the new entries.
+        """
+        found: dict[str, TimewExportResult] = {}
+        missing: list[str] = []
+        for day in days:
+            cached = self.get(day)
+            if cached is None:
+                missing.append(day)
+            else:
+                found[day] = cached
+        if missing:
+            signatures = {day: self._signature(day) for day in missing}
+            stored_at = time.monotonic()
+            fresh = [r for r in export_missing(missing) if r["day"] in signatures]
+            with self._lock:
+                for result in fresh:
+                    self._entries[result["day"]] = (result, signatures[result["day"]], stored_at)
+            for result in fresh:
+                found[result["day"]] = result
+        return [found.get(day) or {"day": day, "intervals": []} for day in days], len(missing)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+__all__ = ["DEFAULT_TODAY_TTL_S", "TimewDayCache"]
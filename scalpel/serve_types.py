@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import argparse
-from dataclasses import dataclass
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler
 from pathlib import Path
-from typing import Any, Callable, TypedDict
+from typing import Any, Callable, Protocol, TypedDict
 
 from .model import Payload, RawTask
 from .serve_apply import ApplyExecutionResult
+from .serve_delta import DeltaLog
+from .serve_events import EventHub
+from .serve_flight import SingleFlight
+from .serve_task_cache import TaskExportCache
+from .serve_timew_cache import TimewDayCache
 
 
 class TimewInterval(TypedDict):
@@ -41,13 +46,36 @@ class ServeConfig:
 class ServeState:
     payload: Payload
     client_state: dict[str, Any]
+    # Bumped on every payload refresh / client-state write; response caches key on them.
+    generation: int = 0
+    client_state_rev: int = 0
+    deltas: DeltaLog = field(default_factory=DeltaLog)
+    # Refreshes build outside state_lock; concurrent requests join the in-flight build.
+    refresh_flight: SingleFlight[tuple[Payload, int]] = field(default_factory=SingleFlight)
+    events: EventHub = field(default_factory=EventHub)
+    # Raw export rows of the current payload; lets /task skip the `task` subprocess.
+    task_cache: TaskExportCache = field(default_factory=TaskExportCache)
+    timew_cache: TimewDayCache = field(default_factory=TimewDayCache)
+
+
+class LiveServer(Protocol):
+    """What serve() needs from a server backend (ThreadingHTTPServer or AsyncHTTPServer)."""
+
+    server_address: Any
+
+    def serve_forever(self) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+    def server_close(self) -> None: ...
 
 
 RenderOnceFn = Callable[[argparse.Namespace, str], Payload]
 TaskLookupFn = Callable[[str], TaskExportLookupResult]
 TimewExportFn = Callable[[str], TimewExportResult]
+TimewRangeExportFn = Callable[[str, str], list[TimewExportResult]]
 BrowserOpenFn = Callable[[str], Any]
-ServerFactoryFn = Callable[[tuple[str, int], type[BaseHTTPRequestHandler]], ThreadingHTTPServer]
+ServerFactoryFn = Callable[[tuple[str, int], type[BaseHTTPRequestHandler]], LiveServer]
 ExecuteApplyFn = Callable[..., ApplyExecutionResult]
 SendJsonFn = Callable[[int, dict[str, Any]], None]
 ObsIncFn = Callable[..., None]
@@ -56,6 +84,7 @@ ObsIncFn = Callable[..., None]
 __all__ = [
     "BrowserOpenFn",
     "ExecuteApplyFn",
+    "LiveServer",
     "ObsIncFn",
     "RenderOnceFn",
     "SendJsonFn",
@@ -67,4 +96,5 @@ __all__ = [
     "TimewExportFn",
     "TimewExportResult",
     "TimewInterval",
+    "TimewRangeExportFn",
 ]
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import datetime as dt
+import re
+import shlex
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+from .model import Payload, RawTask
+from .serve_flight import SingleFlight
+from .util.timeparse import parse_date_yyyy_mm_dd, parse_workhours
+from .util.tz import normalize_tz_name, resolve_tz, today_date
+from .util.viewkey import make_view_key
+
+# Extra views for one live process. `/`, `/payload` and `/refresh` accept a view
+# spec in the query string (filter, start, days, workhours, tz); a request
+# without one keeps using the process's own view and ServeState. Built view
+# payloads sit in a small LRU keyed by make_view_key, and every build (the main
+# view included) reads Taskwarrior through one RawExportCache, so tabs that
+# share a filter cost one `task export` between refreshes. A refresh or a
+# Taskwarrior data change drops the raw exports; views built from older rows
+# are rebuilt on their next request. After each refresh or view request, the
+# windows one view length before and after it are built by a background
+# worker that yields to foreground builds, so next/previous navigation is a
+# cache hit.
+
+VIEW_QUERY_KEYS = ("filter", "start", "days", "workhours", "tz")
+DEFAULT_MAX_VIEWS = 8
+MAX_VIEW_DAYS = 92
+
+BuildViewFn = Callable[[argparse.Namespace], Payload]
+RunExportFn = Callable[[str], list[RawTask]]
+
+# A view filter comes from a URL (so any page can make the browser send one) and
+# lands in `task <filter> export`. Taskwarrior runs the first word it recognises
+# as a command, abbreviations included, and `rc.` words override its config, so
+# neither may appear in a view filter. Taskwarrior re-lexes an argument that
+# contains spaces or parentheses, so each shlex word is checked piece by piece.
+_TASK_COMMANDS = frozenset(
+    {
+        "active", "add", "all", "annotate", "append", "blocked", "blocking", "burndown", "calc", "calendar",
+        "colors", "columns", "commands", "completed", "config", "context", "count", "delete", "denotate",
+        "diagnostics", "done", "duplicate", "edit", "execute", "export", "ghistory", "help", "history",
+        "ids", "import", "information", "list", "log", "logo", "long", "ls", "minimal", "modify", "news",
+        "newest", "next", "oldest", "overdue", "prepend", "projects", "purge", "ready", "recurring",
+        "reports", "show", "start", "stats", "stop", "summary", "synchronize", "tags", "timesheet", "udas",
+        "undo", "unblocked", "uuids", "version", "waiting",
+    }
+)  # fmt: skip
+_MIN_COMMAND_ABBREVIATION = 2
+_FILTER_WORD_SPLIT_RE = re.compile(r"[\s()]+")
+
+
+def _check_view_filter(filter_str: str) -> None:
+    try:
+        words = shlex.split(filter_str, posix=True)
+    except ValueError as ex:
+        raise SystemExit(f"Invalid view filter: {ex}") from ex
+    for word in words:
+        for piece in _FILTER_WORD_SPLIT_RE.split(word):
+            bare = piece.lower()
+            if bare.startswith(("rc.", "rc:")):
+                raise SystemExit("View filters cannot contain `rc.` overrides.")
+            if not bare or bare[0] in "+-/" or ":" in bare or "=" in bare:
+                continue
+            if bare.startswith("_") or (
+                len(bare) >= _MIN_COMMAND_ABBREVIATION and any(cmd.startswith(bare) for cmd in _TASK_COMMANDS)
+            ):
+                raise SystemExit(
+                    f"View filter word {piece!r} is (or abbreviates) a Taskwarrior command; "
+                    "use description.has:<word> to search for it."
+                )
+
+
+def view_args_from_query(raw_path: str, base: argparse.Namespace) -> argparse.Namespace | None:
+    """Copy of ``base`` with the query's view spec applied, or None without one.
+
+    Raises SystemExit with a user-facing message for an invalid spec.
+    """
+    query = parse_qs(urlsplit(raw_path).query, keep_blank_values=True)
+    if not any(key in query for key in VIEW_QUERY_KEYS):
+        return None
+    view = copy.copy(base)
+    if "filter" in query:
+        view.filter = query["filter"][0].strip()
+        _check_view_filter(view.filter)
+    if "start" in query:
+        raw_start = query["start"][0].strip()
+        if raw_start:
+            try:
+                parse_date_yyyy_mm_dd(raw_start)
+            except ValueError as ex:
+                raise SystemExit(f"Invalid view start: {ex}") from ex
+        view.start = raw_start or None
+    if "days" in query:
+        try:
+            days = int(query["days"][0].strip())
+        except ValueError:
+            raise SystemExit("View days must be an integer.") from None
+        if days < 1 or days > MAX_VIEW_DAYS:
+            raise SystemExit(f"View days must be between 1 and {MAX_VIEW_DAYS}.")
+        view.days = days
+    if "workhours" in query:
+        try:
+            parse_workhours(query["workhours"][0].strip())
+        except ValueError as ex:
+            raise SystemExit(f"Invalid view workhours: {ex}") from ex
+        view.workhours = query["workhours"][0].strip()
+    if "tz" in query:
+        tz_name = normalize_tz_name(query["tz"][0].strip() or "local")
+        try:
+            resolve_tz(tz_name)
+        except ValueError as ex:
+            raise SystemExit(f"Invalid view tz: {ex}") from ex
+        view.tz = tz_name
+    return view
+
+
+def _view_start(args: argparse.Namespace) -> dt.date:
+    if args.start:
+        return parse_date_yyyy_mm_dd(args.start)
+    return today_date(resolve_tz(normalize_tz_name(args.tz)))
+
+
+def view_key_for(args: argparse.Namespace) -> str:
+    """The payload's cfg.view_key for ``args``, computed without building it."""
+    tz_name = normalize_tz_name(args.tz)
+    work_start, work_end = parse_workhours(args.workhours)
+    return make_view_key(
+        str(args.filter),
+        _view_start(args),
+        int(args.days),
+        int(work_start),
+        int(work_end),
+        int(args.snap),
+        tz_name,
+        normalize_tz_name(args.display_tz),
+    )
+
+
+class RawExportCache:
+    """`task export` rows per filter, shared by every view until invalidated."""
+
+    def __init__(self, run_export: RunExportFn) -> None:
+        self._run_export = run_export
+        self._lock = threading.Lock()
+        self._rows: dict[str, list[RawTask]] = {}
+        self._flights: dict[str, SingleFlight[list[RawTask]]] = {}
+        self.generation = 0
+        self.exports = 0
+
+    def export(self, filter_str: str) -> list[RawTask]:
+        with self._lock:
+            rows = self._rows.get(filter_str)
+            generation = self.generation
+            flight = self._flights.setdefault(filter_str, SingleFlight())
+        if rows is None:
+
+            def _load() -> list[RawTask]:
+                fresh = self._run_export(filter_str)
+                with self._lock:
+                    self.exports += 1
+                    if self.generation == generation:  # not invalidated while exporting
+                        self._rows[filter_str] = fresh
+                return fresh
+
+            rows, _coalesced = flight.run(_load)
+        # Callers append to the list (completed tasks); never hand out the cached one.
+        return list(rows)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._rows.clear()
+
+
+@dataclass(frozen=True)
+class ViewEntry:
+    key: str
+    payload: Payload
+    generation: int
+    raw_generation: int
+
+
+class ViewPayloadCache:
+    def __init__(
+        self,
+        build: BuildViewFn,
+        raw_cache: RawExportCache,
+        *,
+        max_views: int = DEFAULT_MAX_VIEWS,
+        prefetch: bool = True,
+    ) -> None:
+        self._build = build
+        self.raw_cache = raw_cache
+        self._max_views = max(1, int(max_views))
+        # Background builds nobody has asked for yet may hold only a few slots,
+        # so prefetching never pushes out the views the user is actually on.
+        self._max_prefetched = min(self._max_views - 1, max(2, self._max_views // 4))
+        # With no slot to spare a prefetched view would be evicted as soon as it was built.
+        self._prefetch = bool(prefetch) and self._max_prefetched > 0
+        self._lock = threading.Condition()
+        self._entries: OrderedDict[str, ViewEntry] = OrderedDict()
+        self._unused_prefetches: OrderedDict[str, None] = OrderedDict()
+        self._flights: dict[str, SingleFlight[ViewEntry]] = {}
+        self._foreground = 0
+        self._queue: deque[tuple[str, argparse.Namespace]] = deque()
+        self._queued: set[str] = set()
+        self._worker: threading.Thread | None = None
+        self._closed = False
+        self._prefetching = False
+        self.prefetched = 0
+
+    def _fresh_locked(self, key: str) -> ViewEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.raw_generation == self.raw_cache.generation:
+            return entry
+        return None
+
+    def get(self, args: argparse.Namespace) -> tuple[ViewEntry, bool]:
+        """Return ``(entry, hit)``, building the view when missing or older than the raw exports."""
+        key = view_key_for(args)
+        with self._lock:
+            entry = self._fresh_locked(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._unused_prefetches.pop(key, None)
+        hit = entry is not None
+        if entry is None:
+            entry = self._rebuild(key, args)
+        # Keep the next step ready too (neighbours that are already fresh are skipped).
+        self.prefetch_adjacent(args)
+        return entry, hit
+
+    def refresh(self, args: argparse.Namespace) -> tuple[ViewEntry, bool]:
+        """Re-export and rebuild one view; returns ``(entry, coalesced)``."""
+        key = view_key_for(args)
+
+        def _fresh() -> ViewEntry:
+            self.raw_cache.invalidate()
+            return self._build_entry(key, args)
+
+        result = self._flight(key).run(_fresh)
+        self.prefetch_adjacent(args)
+        return result
+
+    def _flight(self, key: str) -> SingleFlight[ViewEntry]:
+        with self._lock:
+            return self._flights.setdefault(key, SingleFlight())
+
+    def _rebuild(self, key: str, args: argparse.Namespace, *, foreground: bool = True) -> ViewEntry:
+        entry, _coalesced = self._flight(key).run(lambda: self._build_entry(key, args, foreground=foreground))
+        return entry
+
+    def _build_entry(self, key: str, args: argparse.Namespace, *, foreground: bool = True) -> ViewEntry:
+        raw_generation = self.raw_cache.generation
+        if foreground:
+            with self._lock:
+                self._foreground += 1
+        try:
+            payload = self._build(args)
+        finally:
+            if foreground:
+                with self._lock:
+                    self._foreground -= 1
+                    self._lock.notify_all()
+        with self._lock:
+            previous = self._entries.get(key)
+            entry = ViewEntry(key, payload, (previous.generation if previous else 0) + 1, raw_generation)
+            self._entries[key] = entry
+            if foreground:
+                self._entries.move_to_end(key)
+                self._unused_prefetches.pop(key, None)
+            elif previous is None:
+                self._unused_prefetches[key] = None
+            # A background rebuild of a view already in use keeps its LRU position.
+            while len(self._unused_prefetches) > self._max_prefetched:
+                self._evict_locked(next(iter(self._unused_prefetches)))
+            while len(self._entries) > self._max_views:
+                self._evict_locked(next(iter(self._entries)))
+        return entry
+
+    def _evict_locked(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._unused_prefetches.pop(key, None)
+        self._flights.pop(key, None)
+
+    def prefetch_adjacent(self, args: argparse.Namespace) -> None:
+        """Queue background builds of the windows one view length before and after ``args``."""
+        if not self._prefetch:
+            return
+        try:
+            start = _view_start(args)
+        except ValueError:
+            return
+        days = max(1, int(args.days))
+        for offset in (days, -days):
+            spec = copy.copy(args)
+            spec.start = (start + dt.timedelta(days=offset)).isoformat()
+            key = view_key_for(spec)
+            with self._lock:
+                if self._closed or key in self._queued or self._fresh_locked(key) is not None:
+                    continue
+                self._queue.append((key, spec))
+                self._queued.add(key)
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._prefetch_loop, name="scalpel-prefetch", daemon=True)
+                    self._worker.start()
+                self._lock.notify_all()
+
+    def _prefetch_loop(self) -> None:
+        while True:
+            with self._lock:
+                # Low priority: wait for work, then for foreground builds to finish.
+                while not self._closed and (not self._queue or self._foreground):
+                    self._lock.wait()
+                if self._closed:
+                    return
+                key, spec = self._queue.popleft()
+                self._queued.discard(key)
+                if self._fresh_locked(key) is not None:
+                    continue
+                self._prefetching = True
+            built = False
+            try:
+                self._rebuild(key, spec, foreground=False)
+                built = True
+            except (SystemExit, Exception):
+                pass  # the foreground request will build it and report the error
+            finally:
+                with self._lock:
+                    self._prefetching = False
+                    self.prefetched += int(built)
+
+    def wait_idle(self, timeout_s: float = 5.0) -> bool:
+        """Block until the prefetch queue is drained (tests and benchmarks)."""
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._queue and not self._prefetching:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._queue.clear()
+            self._queued.clear()
+            self._lock.notify_all()
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return list(self._entries)
+
+
+__all__ = [
+    "DEFAULT_MAX_VIEWS",
+    "MAX_VIEW_DAYS",
+    "RawExportCache",
+    "VIEW_QUERY_KEYS",
+    "ViewEntry",
+    "ViewPayloadCache",
+    "view_args_from_query",
+    "view_key_for",
+]
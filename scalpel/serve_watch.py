@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Sequence
+
+# Watches the Taskwarrior data directory for the live server. Linux uses
+# inotify through ctypes; elsewhere (or when inotify is unavailable) the
+# directory is polled for mtime/size changes. Bursts of writes (hooks, sync,
+# a multi-command apply) are debounced into one on_change call.
+
+DEFAULT_DEBOUNCE_S = 0.75
+DEFAULT_POLL_S = 1.0
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _relevant(name: str) -> bool:
+    # Taskwarrior takes a lock file around every command; it says nothing about the data.
+    return bool(name) and not name.endswith(".lock")
+
+
+class _PollBackend:
+    def __init__(self, dirs: Sequence[Path], poll_s: float) -> None:
+        self._dirs = list(dirs)
+        self._poll_s = max(0.05, float(poll_s))
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        out: dict[str, tuple[int, int]] = {}
+        for d in self._dirs:
+            try:
+                entries = list(os.scandir(d))
+            except OSError:
+                continue
+            for entry in entries:
+                if not _relevant(entry.name):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                out[entry.path] = (st.st_mtime_ns, st.st_size)
+        return out
+
+    def wait(self, timeout: float, stop: threading.Event) -> bool:
+        if stop.wait(min(timeout, self._poll_s)):
+            return False
+        current = self._scan()
+        changed = current != self._snapshot
+        self._snapshot = current
+        return changed
+
+    def reset(self) -> None:
+        self._snapshot = self._scan()
+
+    def close(self) -> None:
+        return None
+
+
+class _InotifyBackend:
+    def __init__(self, dirs: Sequence[Path]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = int(libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC))
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            for d in dirs:
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(str(d)), _WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _drain(self) -> bool:
+        relevant = False
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return relevant
+            if not buf:
+                return relevant
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                start = offset + _EVENT_HEADER.size
+                name = buf[start : start + length].split(b"\0", 1)[0].decode("utf-8", "replace")
+                relevant = relevant or _relevant(name)
+                offset = start + length
+
+    def wait(self, timeout: float, stop: threading.Event) -> bool:
+        # Short slices keep stop() responsive without a wakeup pipe.
+        deadline = time.monotonic() + timeout
+        while not stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._fd], [], [], min(remaining, 0.25))
+            if ready and self._drain():
+                return True
+        return False
+
+    def reset(self) -> None:
+        self._drain()
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+class DataDirWatcher:
+    """Call ``on_change`` once a burst of writes under ``dirs`` has been quiet for ``debounce_s``."""
+
+    def __init__(
+        self,
+        dirs: Sequence[str | Path],
+        on_change: Callable[[], None],
+        *,
+        debounce_s: float = DEFAULT_DEBOUNCE_S,
+        poll_s: float = DEFAULT_POLL_S,
+        use_inotify: bool = True,
+    ) -> None:
+        self.dirs = [Path(d) for d in dirs]
+        self._on_change = on_change
+        self._debounce_s = max(0.0, float(debounce_s))
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.backend = "poll"
+        self._impl: _PollBackend | _InotifyBackend
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._impl = _InotifyBackend(self.dirs)
+                self.backend = "inotify"
+            except (OSError, AttributeError):
+                self._impl = _PollBackend(self.dirs, poll_s)
+        else:
+            self._impl = _PollBackend(self.dirs, poll_s)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="scalpel-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._impl.close()
+
+    def _run(self) -> None:
+        pending = False
+        last_change = 0.0
+        while not self._stop.is_set():
+            timeout = self._debounce_s if pending else 1.0
+            if self._impl.wait(timeout, self._stop):
+                pending = True
+                last_change = time.monotonic()
+                continue
+            if pending and time.monotonic() - last_change >= self._debounce_s:
+                pending = False
+                try:
+                    self._on_change()
+                except Exception:
+                    pass
+                # Taskwarrior may rewrite its files during our own export (gc,
+                # recurrence); forget those so a refresh does not retrigger itself.
+                self._impl.reset()
+
+
+__all__ = ["DEFAULT_DEBOUNCE_S", "DEFAULT_POLL_S", "DataDirWatcher"]
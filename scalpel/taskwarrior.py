@@ -10,7 +10,7 @@ import time
 from typing import Optional
 
 from .model import RawTask
-from .process import CommandFailedError, CommandNotFoundError, CommandTimeoutError, run_checked
+from .process import CommandFailedError, CommandNotFoundError, CommandTimeoutError, ProcessError, run_checked
 from .util.console import eprint
 
 TW_UTC_RE = re.compile(r"^(\d{8})T(\d{6})Z$")  # e.g. 20251217T083000Z
@@ -103,3 +103,19 @@ def run_task_export(filter_str: str) -> list[RawTask]:
         return data
     except (json.JSONDecodeError, ValueError) as ex:
         raise SystemExit(f"Failed to parse `task export` JSON after {elapsed_ms}ms: {ex}") from ex
+
+
+def task_data_dir() -> Optional[str]:
+    """Resolve Taskwarrior's data directory: $TASKDATA, then `rc.data.location`, then ~/.task."""
+    raw = (os.getenv("TASKDATA", "") or "").strip()
+    if not raw:
+        try:
+            result = run_checked(
+                ["task", "rc.verbose=nothing", "rc.hooks=off", "_get", "rc.data.location"],
+                timeout_s=_task_export_timeout_s(),
+            )
+            raw = result.stdout.strip()
+        except ProcessError:
+            raw = ""
+    path = os.path.expanduser(raw or "~/.task")
+    return path if os.path.isdir(path) else None
@@ -11,8 +11,13 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from urllib import error, request
 
-from scalpel.ai import load_plan_overrides, validate_plan_result
-from scalpel.ai.slots import build_candidate_slots
+from scalpel.ai import PlanOverride, load_plan_overrides, validate_plan_result
+from scalpel.ai.llm_cache import DEFAULT_MAX_BYTES, cache_key, open_cache
+from scalpel.ai.llm_client import KeepAliveClient, post_json_many
+from scalpel.ai.plan_io import plan_result_from_obj
+from scalpel.ai.prompt_codec import CompactPrompt, decode_plan, encode_plan_prompt_v2
+from scalpel.ai.slots import SLOT_RANKINGS, build_candidate_slots, build_joint_candidate_slots
+from scalpel.planner import evaluate_plan_variants
 from scalpel.schema import upgrade_payload
 from scalpel.util.tz import normalize_tz_name, resolve_tz
 
@@ -131,7 +136,13 @@ def _build_prompt_v2(
     user_prompt: str,
     *,
     max_slots_per_task: int,
-) -> Tuple[str, Dict[str, Dict[str, int]]]:
+    slot_ranking: str = "score",
+    max_slots_per_day: Optional[int] = None,
+    joint_slots: bool = False,
+    compact: bool = False,
+    max_prompt_bytes: Optional[int] = None,
+    max_prompt_tokens: Optional[int] = None,
+) -> Tuple[str, Dict[str, Dict[str, int]], Dict[str, str], Optional[CompactPrompt]]:
     cfg_raw = payload.get("cfg")
     cfg: Dict[str, Any] = dict(cfg_raw) if isinstance(cfg_raw, dict) else {}
     tz_name = normalize_tz_name(cfg.get("tz") if isinstance(cfg.get("tz"), str) else "local")
@@ -139,11 +150,73 @@ def _build_prompt_v2(
     now_iso = dt.datetime.now(tz=tz).replace(second=0, microsecond=0).isoformat(timespec="minutes")
 
     tasks = _extract_tasks(payload, selected)
-    candidates_by_uuid, slot_catalog = build_candidate_slots(
-        payload,
-        selected,
-        max_slots_per_task=int(max_slots_per_task),
-    )
+    default_assignment: Dict[str, str] = {}
+    if joint_slots:
+        candidates_by_uuid, slot_catalog, default_assignment = build_joint_candidate_slots(
+            payload,
+            selected,
+            max_slots_per_task=int(max_slots_per_task),
+            max_slots_per_day=max_slots_per_day,
+        )
+    else:
+        candidates_by_uuid, slot_catalog = build_candidate_slots(
+            payload,
+            selected,
+            max_slots_per_task=int(max_slots_per_task),
+            ranking=slot_ranking,
+            max_slots_per_day=max_slots_per_day,
+        )
+
+    cfg_out = {
+        "work_start_min": cfg.get("work_start_min"),
+        "work_end_min": cfg.get("work_end_min"),
+        "snap_min": cfg.get("snap_min"),
+        "default_duration_min": cfg.get("default_duration_min"),
+        "max_infer_duration_min": cfg.get("max_infer_duration_min"),
+        "days": cfg.get("days"),
+    }
+
+    if compact:
+        instruction = (
+            "Return ONLY a JSON object (no markdown). Use schema 'scalpel.plan.v2'. "
+            "Do NOT do time math. tasks and slots are tables described by task_cols and slot_cols; "
+            "slots maps each task id to its candidate rows (local day, start, end). "
+            "For each selected task, emit a place op: {op:'place', target:<task id>, slot_id:<slot id>}. "
+            "To create a new task, emit create_task (with temp_id) then place it using the same temp_id in target."
+        )
+        if joint_slots:
+            instruction += (
+                " Candidate slots of different tasks never overlap, so any combination of picks is conflict-free."
+                " default_assignment is one valid choice per task; keep it unless the user prompt asks otherwise."
+            )
+        header = {
+            "instruction": instruction,
+            "schema": "scalpel.plan.v2",
+            "now_iso": now_iso,
+            "tz": tz_name,
+            "cfg": cfg_out,
+            "user_prompt": user_prompt or "",
+            "output_example": {
+                "schema": "scalpel.plan.v2",
+                "ops": [
+                    {"op": "place", "target": "T1", "slot_id": "S1"},
+                    {"op": "create_task", "temp_id": "t1", "description": "New task", "duration_min": 30},
+                    {"op": "place", "target": "t1", "slot_id": "S2"},
+                ],
+                "warnings": [],
+                "notes": [],
+            },
+        }
+        encoded = encode_plan_prompt_v2(
+            header,
+            tasks,
+            candidates_by_uuid,
+            tz=tz,
+            max_bytes=max_prompt_bytes,
+            max_tokens=max_prompt_tokens,
+            default_assignment=default_assignment if joint_slots else None,
+        )
+        return encoded.text, slot_catalog, default_assignment, encoded
 
     candidates_compact: Dict[str, Any] = {}
     for u in selected:
@@ -158,27 +231,28 @@ def _build_prompt_v2(
             for s in slots
         ]
 
+    instruction = (
+        "Return ONLY a JSON object (no markdown). Use schema 'scalpel.plan.v2'. "
+        "Do NOT do time math. Select from provided slot_id values for placements. "
+        "For each selected task, emit a place op: {op:'place', target:<uuid>, slot_id:<slot_id>}. "
+        "To create a new task, emit create_task (with temp_id) then place it using the same temp_id in target."
+    )
+    if joint_slots:
+        instruction += (
+            " Candidate slots of different tasks never overlap, so any combination of picks is conflict-free."
+            " default_assignment is one valid choice per task; keep it unless the user prompt asks otherwise."
+        )
+
     prompt_obj = {
-        "instruction": (
-            "Return ONLY a JSON object (no markdown). Use schema 'scalpel.plan.v2'. "
-            "Do NOT do time math. Select from provided slot_id values for placements. "
-            "For each selected task, emit a place op: {op:'place', target:<uuid>, slot_id:<slot_id>}. "
-            "To create a new task, emit create_task (with temp_id) then place it using the same temp_id in target."
-        ),
+        "instruction": instruction,
         "schema": "scalpel.plan.v2",
         "now_iso": now_iso,
         "tz": tz_name,
         "selected_uuids": selected,
-        "cfg": {
-            "work_start_min": cfg.get("work_start_min"),
-            "work_end_min": cfg.get("work_end_min"),
-            "snap_min": cfg.get("snap_min"),
-            "default_duration_min": cfg.get("default_duration_min"),
-            "max_infer_duration_min": cfg.get("max_infer_duration_min"),
-            "days": cfg.get("days"),
-        },
+        "cfg": cfg_out,
         "tasks": tasks,
         "slot_candidates_by_uuid": candidates_compact,
+        **({"default_assignment": default_assignment} if joint_slots else {}),
         "user_prompt": user_prompt or "",
         "output_example": {
             "schema": "scalpel.plan.v2",
@@ -197,7 +271,24 @@ def _build_prompt_v2(
         },
     }
 
-    return json.dumps(prompt_obj, ensure_ascii=False, indent=2), slot_catalog
+    return json.dumps(prompt_obj, ensure_ascii=False, indent=2), slot_catalog, default_assignment, None
+
+
+def _fill_default_placements(plan_obj: Dict[str, Any], selected: List[str], default_assignment: Dict[str, str]) -> None:
+    """Add default-assignment place ops for selected tasks the model left unplaced."""
+    ops = plan_obj.get("ops")
+    if not isinstance(ops, list):
+        return
+    placed = {op.get("target") for op in ops if isinstance(op, dict) and op.get("op") == "place"}
+    warnings = plan_obj.get("warnings")
+    if not isinstance(warnings, list):
+        warnings = []
+        plan_obj["warnings"] = warnings
+    for u in selected:
+        sid = default_assignment.get(u)
+        if sid and u not in placed:
+            ops.append({"op": "place", "target": u, "slot_id": sid})
+            warnings.append(f"default slot {sid} used for {u}")
 
 
 def _post_json(url: str, body: Dict[str, Any], api_key: Optional[str]) -> Dict[str, Any]:
@@ -350,6 +441,81 @@ def _plan_result_schema_v2() -> Dict[str, Any]:
     }
 
 
+def _candidate_body(body: Dict[str, Any], index: int, temp_step: float) -> Dict[str, Any]:
+    """Request body for candidate `index`; candidate 0 is the base request unchanged."""
+    if index == 0:
+        return body
+    out = dict(body)
+    out["temperature"] = round(min(2.0, float(body.get("temperature") or 0.0) + temp_step * index), 3)
+    out["seed"] = index
+    return out
+
+
+def _response_content(resp: Dict[str, Any]) -> str:
+    choices = resp.get("choices")
+    content: str | None = None
+    if isinstance(choices, list) and choices:
+        msg = choices[0].get("message") if isinstance(choices[0], dict) else None
+        if isinstance(msg, dict):
+            content = msg.get("content")
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError("No content in model response")
+    return content
+
+
+def _finalize_plan(
+    plan_obj: Dict[str, Any],
+    *,
+    ns: argparse.Namespace,
+    payload: Dict[str, Any],
+    selected: List[str],
+    compact: Optional[CompactPrompt],
+    default_assignment: Dict[str, str],
+    slot_catalog: Dict[str, Dict[str, int]],
+) -> Dict[str, Any]:
+    """Post-process a parsed model plan (alias decoding, defaults, catalog, snapping, merges)."""
+    if ns.plan_schema == "v2":
+        if compact is not None:
+            plan_obj = decode_plan(plan_obj, compact)
+        if default_assignment:
+            _fill_default_placements(plan_obj, selected, default_assignment)
+        # Attach engine slot catalog so v2 plans can be compiled without payload context.
+        if slot_catalog:
+            existing = plan_obj.get("slot_catalog")
+            if isinstance(existing, dict):
+                merged = dict(existing)
+                for k, catalog_entry in slot_catalog.items():
+                    merged.setdefault(k, catalog_entry)
+                plan_obj["slot_catalog"] = merged
+            else:
+                plan_obj["slot_catalog"] = slot_catalog
+        return plan_obj
+
+    # Filter overrides to known task uuids.
+    _filter_overrides(plan_obj, payload)
+
+    # Snap overrides to minute boundaries.
+    snap_min = int(ns.snap_min) if int(ns.snap_min) > 0 else int(payload.get("cfg", {}).get("snap_min") or 1)
+    _normalize_plan_overrides(plan_obj, snap_min)
+
+    # Merge existing overrides if provided.
+    if ns.overrides_in:
+        try:
+            overrides = load_plan_overrides(Path(ns.overrides_in))
+            overrides_raw = plan_obj.get("overrides")
+            merged = dict(overrides_raw) if isinstance(overrides_raw, dict) else {}
+            for k, override in overrides.items():
+                merged[k] = {
+                    "start_ms": override.start_ms,
+                    "due_ms": override.due_ms,
+                    "duration_min": override.duration_min,
+                }
+            plan_obj["overrides"] = merged
+        except Exception as e:
+            raise ValueError(f"Failed to merge overrides: {e}") from e
+    return plan_obj
+
+
 def main(argv: List[str] | None = None) -> int:
     ap = argparse.ArgumentParser(
         prog="scalpel-ai-plan-lmstudio",
@@ -380,6 +546,66 @@ def main(argv: List[str] | None = None) -> int:
         default=24,
         help="Max candidate slots to include per task in v2 prompts (default: 24)",
     )
+    ap.add_argument(
+        "--slot-ranking",
+        choices=list(SLOT_RANKINGS),
+        default="score",
+        help="How v2 candidate slots are chosen: score (top-k, spread across days) or chronological (default: score)",
+    )
+    ap.add_argument(
+        "--max-slots-per-day",
+        type=int,
+        default=None,
+        help="Cap candidate slots per day when --slot-ranking=score (default: a third of --max-slots-per-task)",
+    )
+    ap.add_argument(
+        "--joint-slots",
+        action="store_true",
+        help="v2: give tasks mutually non-overlapping candidates plus a default assignment; "
+        "tasks the model leaves unplaced fall back to their default slot",
+    )
+    ap.add_argument(
+        "--compact-prompt",
+        action="store_true",
+        help="v2: send tasks/slots as whitespace-free tables with short ids (mapped back on output)",
+    )
+    ap.add_argument(
+        "--prompt-max-bytes",
+        type=int,
+        default=None,
+        help="With --compact-prompt, drop lowest-ranked slots, then tasks, to fit N bytes",
+    )
+    ap.add_argument(
+        "--prompt-max-tokens",
+        type=int,
+        default=None,
+        help="With --compact-prompt, same as --prompt-max-bytes using an estimated token count",
+    )
+    ap.add_argument(
+        "--candidates",
+        type=int,
+        default=1,
+        help="Request N plans concurrently (rising temperature, distinct seeds) and keep the one with "
+        "the fewest unplaced tasks and conflicts (default: 1)",
+    )
+    ap.add_argument(
+        "--candidate-temp-step",
+        type=float,
+        default=0.2,
+        help="Temperature increment between successive candidates (default: 0.2)",
+    )
+    ap.add_argument("--no-cache", action="store_true", help="Always query the model; skip the response cache")
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Response cache directory (default: $SCALPEL_LLM_CACHE_DIR or ~/.cache/scalpel/llm)",
+    )
+    ap.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size (default: 64)",
+    )
     ns = ap.parse_args(argv)
 
     in_path = Path(ns.in_json)
@@ -398,16 +624,31 @@ def main(argv: List[str] | None = None) -> int:
         return _die(f"Failed to load selected uuids: {e}")
 
     slot_catalog: Dict[str, Dict[str, int]] = {}
+    default_assignment: Dict[str, str] = {}
+    compact: Optional[CompactPrompt] = None
     if ns.plan_schema == "v2":
         try:
-            prompt, slot_catalog = _build_prompt_v2(
+            prompt, slot_catalog, default_assignment, compact = _build_prompt_v2(
                 payload,
                 selected,
                 ns.prompt,
                 max_slots_per_task=int(ns.max_slots_per_task),
+                slot_ranking=ns.slot_ranking,
+                max_slots_per_day=ns.max_slots_per_day,
+                joint_slots=bool(ns.joint_slots),
+                compact=bool(ns.compact_prompt),
+                max_prompt_bytes=ns.prompt_max_bytes,
+                max_prompt_tokens=ns.prompt_max_tokens,
             )
         except ValueError as e:
             return _die(f"Invalid timezone value in payload/cfg: {e}")
+        if compact is not None:
+            print(
+                f"[scalpel-ai-plan-lmstudio] prompt: {compact.n_bytes} bytes (~{compact.est_tokens} tokens), "
+                f"dropped {compact.dropped_slots} slots, {len(compact.dropped_tasks)} tasks"
+                + (" (over budget)" if compact.over_budget else ""),
+                file=sys.stderr,
+            )
     else:
         prompt = _build_prompt_v1(payload, selected, ns.prompt)
 
@@ -424,73 +665,118 @@ def main(argv: List[str] | None = None) -> int:
         js = _plan_result_schema_v2() if ns.plan_schema == "v2" else _plan_result_schema()
         body["response_format"] = {"type": "json_schema", "json_schema": js}
 
-    try:
-        resp = _post_json(f"{ns.base_url.rstrip('/')}/v1/chat/completions", body, ns.api_key)
-    except Exception as e:
-        return _die(f"Request failed: {e}")
-
-    try:
-        choices = resp.get("choices")
+    url = f"{ns.base_url.rstrip('/')}/v1/chat/completions"
+    cache = open_cache(ns.cache_dir, max_mb=ns.cache_max_mb, disabled=bool(ns.no_cache))
+    n_candidates = max(1, int(ns.candidates))
+    bodies = [_candidate_body(body, i, float(ns.candidate_temp_step)) for i in range(n_candidates)]
+    keys = [cache_key(url, b) for b in bodies]
+    resps: List[Any] = [cache.get(k) if cache is not None else None for k in keys]
+    from_cache = [r is not None for r in resps]
+    if cache is not None:
+        for k, hit in zip(keys, from_cache, strict=True):
+            if hit:
+                print(f"[scalpel-ai-plan-lmstudio] cache hit {k[:12]} ({cache.root})", file=sys.stderr)
+    missing = [i for i, r in enumerate(resps) if r is None]
+    if n_candidates == 1 and missing:
+        try:
+            resps[0] = _post_json(url, body, ns.api_key)
+        except Exception as e:
+            return _die(f"Request failed: {e}")
+    elif missing:
+        # Candidates run concurrently over persistent connections: wall-clock ~ the slowest one.
+        try:
+            client = KeepAliveClient(ns.base_url, api_key=ns.api_key)
+        except ValueError as e:
+            return _die(f"Request failed: {e}")
+        with client:
+            fetched = post_json_many(client, "/v1/chat/completions", [bodies[i] for i in missing])
+        for i, r in zip(missing, fetched, strict=True):
+            resps[i] = r
+
+    finalize_kw: Dict[str, Any] = {
+        "ns": ns,
+        "payload": payload,
+        "selected": selected,
+        "compact": compact,
+        "default_assignment": default_assignment,
+        "slot_catalog": slot_catalog,
+    }
+    stored: List[int] = []
+    if n_candidates == 1:
+        resp = resps[0]
         content: str | None = None
-        if isinstance(choices, list) and choices:
-            msg = choices[0].get("message") if isinstance(choices[0], dict) else None
-            if isinstance(msg, dict):
-                content = msg.get("content")
-        if not isinstance(content, str) or not content.strip():
-            raise ValueError("No content in model response")
-        if ns.raw_out:
-            Path(ns.raw_out).write_text(content, encoding="utf-8")
-        plan_obj = _extract_json_from_text(content)
-    except Exception as e:
-        if ns.raw_out and isinstance(content, str):
-            try:
+        try:
+            content = _response_content(resp)
+            if ns.raw_out:
                 Path(ns.raw_out).write_text(content, encoding="utf-8")
-            except Exception:
-                pass
-        return _die(f"Failed to parse model output: {e}")
+            plan_obj = _extract_json_from_text(content)
+        except Exception as e:
+            if ns.raw_out and isinstance(content, str):
+                try:
+                    Path(ns.raw_out).write_text(content, encoding="utf-8")
+                except Exception:
+                    pass
+            return _die(f"Failed to parse model output: {e}")
 
-    if ns.plan_schema == "v2":
-        # Attach engine slot catalog so v2 plans can be compiled without payload context.
-        if slot_catalog:
-            existing = plan_obj.get("slot_catalog")
-            if isinstance(existing, dict):
-                merged = dict(existing)
-                for k, catalog_entry in slot_catalog.items():
-                    merged.setdefault(k, catalog_entry)
-                plan_obj["slot_catalog"] = merged
-            else:
-                plan_obj["slot_catalog"] = slot_catalog
-    else:
-        # Filter overrides to known task uuids.
-        _filter_overrides(plan_obj, payload)
-
-        # Snap overrides to minute boundaries.
-        snap_min = int(ns.snap_min) if int(ns.snap_min) > 0 else int(payload.get("cfg", {}).get("snap_min") or 1)
-        _normalize_plan_overrides(plan_obj, snap_min)
+        try:
+            plan_obj = _finalize_plan(plan_obj, **finalize_kw)
+        except ValueError as e:
+            return _die(str(e))
 
-        # Merge existing overrides if provided.
-        if ns.overrides_in:
+        errs = validate_plan_result(plan_obj)
+        if errs:
+            return _die("Invalid plan result:\n" + "\n".join(f"  - {e}" for e in errs), rc=3)
+        stored = [0]
+    else:
+        valid: List[Tuple[int, Dict[str, Any], str, Dict[str, PlanOverride]]] = []
+        for i, resp in enumerate(resps):
             try:
-                overrides = load_plan_overrides(Path(ns.overrides_in))
-                overrides_raw = plan_obj.get("overrides")
-                merged = dict(overrides_raw) if isinstance(overrides_raw, dict) else {}
-                for k, override in overrides.items():
-                    merged[k] = {
-                        "start_ms": override.start_ms,
-                        "due_ms": override.due_ms,
-                        "duration_min": override.duration_min,
-                    }
-                plan_obj["overrides"] = merged
+                if isinstance(resp, Exception):
+                    raise resp
+                content = _response_content(resp)
+                cand = _finalize_plan(_extract_json_from_text(content), **finalize_kw)
+                overrides = dict(plan_result_from_obj(cand).overrides)
             except Exception as e:
-                return _die(f"Failed to merge overrides: {e}")
-
-    errs = validate_plan_result(plan_obj)
-    if errs:
-        return _die("Invalid plan result:\n" + "\n".join(f"  - {e}" for e in errs), rc=3)
+                print(f"[scalpel-ai-plan-lmstudio] candidate {i + 1}/{n_candidates} rejected: {e}", file=sys.stderr)
+                continue
+            valid.append((i, cand, content, overrides))
+        if not valid:
+            return _die(f"No valid plan among {n_candidates} candidates", rc=3)
+
+        evals = evaluate_plan_variants(payload, [v[3] for v in valid], selected_uuids=selected, workers=1)
+        ranked = sorted(
+            zip(valid, evals, strict=True),
+            key=lambda ve: (sum(1 for u in selected if u not in ve[0][3]), ve[1].score, ve[0][0]),
+        )
+        for (i, _cand, _content, overrides), ev in ranked:
+            unplaced = sum(1 for u in selected if u not in overrides)
+            print(
+                f"[scalpel-ai-plan-lmstudio] candidate {i + 1}/{n_candidates}: score={ev.score:.1f} "
+                f"overlap={ev.overlap_min}m out_of_hours={ev.out_of_hours_min}m unplaced={unplaced}",
+                file=sys.stderr,
+            )
+        (best_i, plan_obj, best_content, _ov), best_ev = ranked[0]
+        notes = plan_obj.get("notes")
+        notes = list(notes) if isinstance(notes, list) else []
+        notes.append(f"best of {n_candidates} candidates: #{best_i + 1} (score {best_ev.score:.1f})")
+        plan_obj["notes"] = notes
+        if ns.raw_out:
+            Path(ns.raw_out).write_text(best_content, encoding="utf-8")
+        stored = [v[0] for v in valid]
 
     out_path = Path(ns.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(json.dumps(plan_obj, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    if cache is not None:
+        # Only responses that produced a valid plan are worth replaying.
+        for i in stored:
+            if from_cache[i]:
+                continue
+            try:
+                cache.put(keys[i], resps[i])
+            except OSError as e:
+                print(f"[scalpel-ai-plan-lmstudio] WARN: response cache write failed: {e}", file=sys.stderr)
+                break
     return 0
 
 
@@ -9,10 +9,10 @@ import sys
 import uuid as uuidlib
 from pathlib import Path
 from typing import Any, Dict, List, Optional
-from urllib import request
-from urllib.error import HTTPError
 
-from scalpel.goals import load_goals_config
+from scalpel.ai.llm_cache import DEFAULT_MAX_BYTES, cache_key, open_cache
+from scalpel.ai.llm_client import KeepAliveClient
+from scalpel.goals import goal_matches_task, load_goals_config, project_matches
 from scalpel.taskwarrior import run_task_export
 
 
@@ -35,40 +35,6 @@ def _task_uuid(t: Dict[str, Any]) -> Optional[str]:
     return None
 
 
-def _project_match(project: str, prefixes: List[str]) -> bool:
-    if not project:
-        return False
-    for p in prefixes:
-        if project.startswith(p):
-            return True
-    return False
-
-
-def _goal_match(task: Dict[str, Any], goal: Dict[str, Any]) -> bool:
-    project = str(task.get("project") or "")
-    tags_raw = task.get("tags")
-    tags = [str(x) for x in tags_raw if str(x).strip()] if isinstance(tags_raw, list) else []
-
-    projects = goal.get("projects") or []
-    tags_any = goal.get("tags") or []
-    tags_all = goal.get("tags_all") or []
-    mode = goal.get("mode") or "any"
-
-    checks = []
-    if projects:
-        checks.append(_project_match(project, projects))
-    if tags_any:
-        checks.append(any(t in tags for t in tags_any))
-    if tags_all:
-        checks.append(all(t in tags for t in tags_all))
-
-    if not checks:
-        return False
-    if mode == "all":
-        return all(checks)
-    return any(checks)
-
-
 def _select_tasks(
     tasks: List[Dict[str, Any]],
     *,
@@ -90,9 +56,9 @@ def _select_tasks(
             continue
         if projects:
             proj = str(t.get("project") or "")
-            if not _project_match(proj, projects):
+            if not project_matches(proj, projects):
                 continue
-        if goal and not _goal_match(t, goal):
+        if goal and not goal_matches_task(t, goal):
             continue
         out.append(t)
     return out
@@ -118,28 +84,6 @@ def _extract_json_from_text(text: str) -> Dict[str, Any]:
     return obj
 
 
-def _post_json(url: str, body: Dict[str, Any], api_key: Optional[str]) -> Dict[str, Any]:
-    data = json.dumps(body).encode("utf-8")
-    req = request.Request(url, data=data, method="POST")
-    req.add_header("Content-Type", "application/json")
-    if api_key:
-        req.add_header("Authorization", f"Bearer {api_key}")
-    try:
-        with request.urlopen(req, timeout=120) as resp:
-            text = resp.read().decode("utf-8", errors="replace")
-    except HTTPError as e:
-        raw = ""
-        try:
-            raw = e.read().decode("utf-8", errors="replace")
-        except (OSError, UnicodeError):
-            raw = ""
-        raise ValueError(f"HTTP {e.code} error: {raw}") from e
-    obj = json.loads(text)
-    if not isinstance(obj, dict):
-        raise ValueError("LM Studio response must be a JSON object")
-    return obj
-
-
 def _iso_to_tw_utc(s: str) -> str:
     raw = s.strip().replace("Z", "+00:00")
     d = dt.datetime.fromisoformat(raw)
@@ -500,6 +444,18 @@ def main(argv: Optional[List[str]] = None) -> int:
     ap.add_argument("--temperature", type=float, default=0.2, help="Sampling temperature")
     ap.add_argument("--max-tokens", type=int, default=1500, help="Max tokens for response")
     ap.add_argument("--structured-output", action="store_true", help="Request JSON schema output")
+    ap.add_argument("--no-cache", action="store_true", help="Always query the model; skip the response cache")
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Response cache directory (default: $SCALPEL_LLM_CACHE_DIR or ~/.cache/scalpel/llm)",
+    )
+    ap.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size (default: 64)",
+    )
     ns = ap.parse_args(argv)
 
     if ns.in_export and ns.filter:
@@ -630,7 +586,7 @@ def main(argv: Optional[List[str]] = None) -> int:
 
         for _ in range(5):
             base["tasks"] = build_tasks(minimal, limit)
-            text = json.dumps(base, ensure_ascii=False)
+            text = json.dumps(base, ensure_ascii=False, separators=(",", ":"))
             if len(text) <= max_chars:
                 break
             if not minimal:
@@ -645,6 +601,13 @@ def main(argv: Optional[List[str]] = None) -> int:
             base["tasks_limit"] = limit
         return base
 
+    cache = open_cache(ns.cache_dir, max_mb=ns.cache_max_mb, disabled=bool(ns.no_cache))
+    try:
+        # One persistent connection is reused across interactive rounds.
+        client = KeepAliveClient(ns.base_url, api_key=ns.api_key)
+    except ValueError as e:
+        return _die(str(e))
+
     def run_round(user_prompt: str, summary_text: str) -> Dict[str, Any]:
         prompt_obj = _build_prompt_obj(user_prompt, summary_text)
 
@@ -652,7 +615,8 @@ def main(argv: Optional[List[str]] = None) -> int:
             "model": ns.model,
             "messages": [
                 {"role": "system", "content": "You are a task planning assistant that outputs strict JSON only."},
-                {"role": "user", "content": json.dumps(prompt_obj, ensure_ascii=False, indent=2)},
+                # Sent exactly as size-checked against --max-prompt-chars: no whitespace.
+                {"role": "user", "content": json.dumps(prompt_obj, ensure_ascii=False, separators=(",", ":"))},
             ],
             "temperature": float(ns.temperature),
             "max_tokens": int(ns.max_tokens),
@@ -660,7 +624,14 @@ def main(argv: Optional[List[str]] = None) -> int:
         if ns.structured_output:
             body["response_format"] = {"type": "json_schema", "json_schema": _taskplan_schema()}
 
-        resp = _post_json(f"{ns.base_url.rstrip('/')}/v1/chat/completions", body, ns.api_key)
+        url = f"{ns.base_url.rstrip('/')}/v1/chat/completions"
+        key = cache_key(url, body)
+        cached = cache.get(key) if cache is not None else None
+        if cache is not None and cached is not None:
+            print(f"[scalpel-ai-plan-tasks] cache hit {key[:12]} ({cache.root})", file=sys.stderr)
+            resp = cached
+        else:
+            resp = client.post_json("/v1/chat/completions", body)
         choices = resp.get("choices")
         content = None
         if isinstance(choices, list) and choices:
@@ -672,149 +643,54 @@ def main(argv: Optional[List[str]] = None) -> int:
         plan_obj = _extract_json_from_text(content)
         if "schema" not in plan_obj and isinstance(plan_obj.get("operations"), list):
             plan_obj = {"schema": "scalpel.taskplan.v1", "ops": plan_obj.get("operations")}
+        if cache is not None and cached is None:
+            try:
+                cache.put(key, resp)
+            except OSError as e:
+                print(f"[scalpel-ai-plan-tasks] WARN: response cache write failed: {e}", file=sys.stderr)
         return plan_obj
 
-    if ns.print_payload:
-        payload = _build_prompt_obj(ns.prompt or "", summary)
-        print(json.dumps(payload, indent=2, ensure_ascii=False))
-        return 0
-
-    default_project = ns.project[0] if ns.project else None
-
-    if not ns.interactive:
-        try:
-            plan_obj = run_round(ns.prompt or "", summary)
-        except Exception as e:
-            return _die(f"Request failed: {e}")
-
-        if plan_obj.get("schema") != "scalpel.taskplan.v1":
-            return _die("Invalid schema in model output:\n" + json.dumps(plan_obj, indent=2))
-        ops = plan_obj.get("ops")
-        if not isinstance(ops, list):
-            return _die("Model output missing ops list")
-        ops = _normalize_ops(ops)
-        plan_obj = dict(plan_obj)
-        plan_obj["ops"] = ops
-        ambiguities = _list_field(plan_obj, "ambiguities")
-        confidence = plan_obj.get("confidence")
-        response = plan_obj.get("response") if isinstance(plan_obj.get("response"), str) else None
-        clar_qs = plan_obj.get("clarifying_questions") if isinstance(plan_obj.get("clarifying_questions"), list) else []
-        if not ops and (response or clar_qs):
-            if response:
-                print(response)
-            if clar_qs:
-                print("\nClarifying questions:")
-                for q in clar_qs:
-                    print(f"- {q}")
-            out_path = Path(ns.out)
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            out_path.write_text("[]\n", encoding="utf-8")
+    with client:  # closes the kept-alive connection on every exit path
+        if ns.print_payload:
+            payload = _build_prompt_obj(ns.prompt or "", summary)
+            print(json.dumps(payload, indent=2, ensure_ascii=False))
             return 0
-        if ambiguities or (isinstance(confidence, (int, float)) and confidence < ns.min_confidence):
-            return _die("Model response requires clarification; rerun in interactive mode.")
 
-        try:
-            if ns.out_mode == "full":
-                merged = _apply_ops(list(tasks_full), ops, default_project=default_project)
-                out_tasks = merged
-            else:
-                before_sel = copy.deepcopy(list(selected))
-                merged = _apply_ops(list(selected), ops, default_project=default_project)
-                if ns.out_mode == "delta":
-                    out_tasks = _diff_tasks(before_sel, merged)
-                else:
-                    out_tasks = merged
-        except Exception as e:
-            return _die(f"Failed to apply ops: {e}")
+        default_project = ns.project[0] if ns.project else None
 
-        out_path = Path(ns.out)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(json.dumps(out_tasks, indent=2, sort_keys=True) + "\n", encoding="utf-8")
-        return 0
+        if not ns.interactive:
+            try:
+                plan_obj = run_round(ns.prompt or "", summary)
+            except Exception as e:
+                return _die(f"Request failed: {e}")
 
-    last_plan: Optional[Dict[str, Any]] = None
-    initial_prompt = (ns.prompt or "").strip()
-    if initial_prompt:
-        initial_plan: Optional[Dict[str, Any]]
-        try:
-            initial_plan = run_round(initial_prompt, summary)
-        except Exception as e:
-            print(f"Request failed: {e}")
-            initial_plan = None
-        if initial_plan:
-            plan_obj = initial_plan
             if plan_obj.get("schema") != "scalpel.taskplan.v1":
-                print("Invalid schema in model output")
-                print(json.dumps(plan_obj, indent=2))
-            else:
-                ops = _normalize_ops(_list_field(plan_obj, "ops"))
-                plan_obj = dict(plan_obj)
-                plan_obj["ops"] = ops
-
-                print("\nOps summary:")
-                tasks_map = _tasks_map(tasks_full)
-                print(_summarize_ops(ops, tasks_map) or "(none)")
-
-                warnings = _list_field(plan_obj, "warnings")
-                ambiguities = _list_field(plan_obj, "ambiguities")
-                suggestions = _list_field(plan_obj, "suggestions")
-                response = plan_obj.get("response") if isinstance(plan_obj.get("response"), str) else None
-                clar_qs = _list_field(plan_obj, "clarifying_questions")
-                confidence = plan_obj.get("confidence")
-
-                if warnings:
-                    print("\nWarnings:")
-                    for w in warnings:
-                        print(f"- {w}")
-                if ambiguities:
-                    print("\nAmbiguities:")
-                    for a in ambiguities:
-                        print(f"- {a}")
+                return _die("Invalid schema in model output:\n" + json.dumps(plan_obj, indent=2))
+            ops = plan_obj.get("ops")
+            if not isinstance(ops, list):
+                return _die("Model output missing ops list")
+            ops = _normalize_ops(ops)
+            plan_obj = dict(plan_obj)
+            plan_obj["ops"] = ops
+            ambiguities = _list_field(plan_obj, "ambiguities")
+            confidence = plan_obj.get("confidence")
+            response = plan_obj.get("response") if isinstance(plan_obj.get("response"), str) else None
+            clar_raw = plan_obj.get("clarifying_questions")
+            clar_qs = clar_raw if isinstance(clar_raw, list) else []
+            if not ops and (response or clar_qs):
                 if response:
-                    print("\nResponse:\n" + response)
+                    print(response)
                 if clar_qs:
                     print("\nClarifying questions:")
                     for q in clar_qs:
                         print(f"- {q}")
-                if suggestions:
-                    print("\nSuggestions:")
-                    for s in suggestions:
-                        print(f"- {s}")
-
-                if not ops:
-                    raw_ops = _list_field(plan_obj, "ops")
-                    print("\nNo actionable ops. Refine the prompt.")
-                    if raw_ops:
-                        print("\nRaw ops (first 5):")
-                        print(json.dumps(raw_ops[:5], indent=2))
-                    else:
-                        print("\nRaw plan:")
-                        print(json.dumps(plan_obj, indent=2))
-                elif ambiguities or (isinstance(confidence, (int, float)) and confidence < ns.min_confidence):
-                    print("\nClarify required:")
-                    for a in ambiguities:
-                        print(f"- {a}")
-                    clar = input("> ").strip()
-                    if clar:
-                        summary = _update_summary(summary, "clarify:" + clar, plan_obj, int(ns.summary_max_chars))
-                else:
-                    summary = _update_summary(summary, initial_prompt, plan_obj, int(ns.summary_max_chars))
-                    last_plan = plan_obj
-    while True:
-        print("\nPrompt (or :accept / :quit):")
-        try:
-            user_prompt = input("> ").strip()
-        except EOFError:
-            return 0
-        if not user_prompt:
-            continue
-        if user_prompt in (":quit", ":exit"):
-            return 0
-        if user_prompt == ":accept":
-            if not last_plan:
-                print("No plan to accept yet.")
-                continue
-            ops = _normalize_ops(_list_field(last_plan, "ops"))
+                out_path = Path(ns.out)
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                out_path.write_text("[]\n", encoding="utf-8")
+                return 0
+            if ambiguities or (isinstance(confidence, (int, float)) and confidence < ns.min_confidence):
+                return _die("Model response requires clarification; rerun in interactive mode.")
+
             try:
                 if ns.out_mode == "full":
                     merged = _apply_ops(list(tasks_full), ops, default_project=default_project)
@@ -827,94 +703,196 @@ def main(argv: Optional[List[str]] = None) -> int:
                     else:
                         out_tasks = merged
             except Exception as e:
-                print(f"Failed to apply ops: {e}")
-                continue
-            base_for_diff = list(tasks_full) if ns.out_mode == "full" else list(selected)
-            print("Diff:", _diff_summary(base_for_diff, merged))
-            preview = _diff_preview(base_for_diff, merged, limit=6)
-            if preview:
-                print("\nPreview:\n" + preview)
-            changed = len(_diff_tasks(base_for_diff, merged))
-            if ns.max_change and changed > int(ns.max_change):
-                print(f"\nChange count {changed} exceeds max-change {ns.max_change}.")
-                confirm = input("Proceed anyway? [y/N]: ").strip().lower()
-                if confirm != "y":
-                    continue
-            confirm = input("Write import JSON? [y/N]: ").strip().lower()
-            if confirm != "y":
-                continue
+                return _die(f"Failed to apply ops: {e}")
+
             out_path = Path(ns.out)
             out_path.parent.mkdir(parents=True, exist_ok=True)
             out_path.write_text(json.dumps(out_tasks, indent=2, sort_keys=True) + "\n", encoding="utf-8")
-            print(f"Wrote {ns.out}")
             return 0
 
-        try:
-            plan_obj = run_round(user_prompt, summary)
-        except Exception as e:
-            print(f"Request failed: {e}")
-            continue
+        last_plan: Optional[Dict[str, Any]] = None
+        initial_prompt = (ns.prompt or "").strip()
+        if initial_prompt:
+            initial_plan: Optional[Dict[str, Any]]
+            try:
+                initial_plan = run_round(initial_prompt, summary)
+            except Exception as e:
+                print(f"Request failed: {e}")
+                initial_plan = None
+            if initial_plan:
+                plan_obj = initial_plan
+                if plan_obj.get("schema") != "scalpel.taskplan.v1":
+                    print("Invalid schema in model output")
+                    print(json.dumps(plan_obj, indent=2))
+                else:
+                    ops = _normalize_ops(_list_field(plan_obj, "ops"))
+                    plan_obj = dict(plan_obj)
+                    plan_obj["ops"] = ops
+
+                    print("\nOps summary:")
+                    tasks_map = _tasks_map(tasks_full)
+                    print(_summarize_ops(ops, tasks_map) or "(none)")
+
+                    warnings = _list_field(plan_obj, "warnings")
+                    ambiguities = _list_field(plan_obj, "ambiguities")
+                    suggestions = _list_field(plan_obj, "suggestions")
+                    response = plan_obj.get("response") if isinstance(plan_obj.get("response"), str) else None
+                    clar_qs = _list_field(plan_obj, "clarifying_questions")
+                    confidence = plan_obj.get("confidence")
+
+                    if warnings:
+                        print("\nWarnings:")
+                        for w in warnings:
+                            print(f"- {w}")
+                    if ambiguities:
+                        print("\nAmbiguities:")
+                        for a in ambiguities:
+                            print(f"- {a}")
+                    if response:
+                        print("\nResponse:\n" + response)
+                    if clar_qs:
+                        print("\nClarifying questions:")
+                        for q in clar_qs:
+                            print(f"- {q}")
+                    if suggestions:
+                        print("\nSuggestions:")
+                        for s in suggestions:
+                            print(f"- {s}")
+
+                    if not ops:
+                        raw_ops = _list_field(plan_obj, "ops")
+                        print("\nNo actionable ops. Refine the prompt.")
+                        if raw_ops:
+                            print("\nRaw ops (first 5):")
+                            print(json.dumps(raw_ops[:5], indent=2))
+                        else:
+                            print("\nRaw plan:")
+                            print(json.dumps(plan_obj, indent=2))
+                    elif ambiguities or (isinstance(confidence, (int, float)) and confidence < ns.min_confidence):
+                        print("\nClarify required:")
+                        for a in ambiguities:
+                            print(f"- {a}")
+                        clar = input("> ").strip()
+                        if clar:
+                            summary = _update_summary(summary, "clarify:" + clar, plan_obj, int(ns.summary_max_chars))
+                    else:
+                        summary = _update_summary(summary, initial_prompt, plan_obj, int(ns.summary_max_chars))
+                        last_plan = plan_obj
+        while True:
+            print("\nPrompt (or :accept / :quit):")
+            try:
+                user_prompt = input("> ").strip()
+            except EOFError:
+                return 0
+            if not user_prompt:
+                continue
+            if user_prompt in (":quit", ":exit"):
+                return 0
+            if user_prompt == ":accept":
+                if not last_plan:
+                    print("No plan to accept yet.")
+                    continue
+                ops = _normalize_ops(_list_field(last_plan, "ops"))
+                try:
+                    if ns.out_mode == "full":
+                        merged = _apply_ops(list(tasks_full), ops, default_project=default_project)
+                        out_tasks = merged
+                    else:
+                        before_sel = copy.deepcopy(list(selected))
+                        merged = _apply_ops(list(selected), ops, default_project=default_project)
+                        if ns.out_mode == "delta":
+                            out_tasks = _diff_tasks(before_sel, merged)
+                        else:
+                            out_tasks = merged
+                except Exception as e:
+                    print(f"Failed to apply ops: {e}")
+                    continue
+                base_for_diff = list(tasks_full) if ns.out_mode == "full" else list(selected)
+                print("Diff:", _diff_summary(base_for_diff, merged))
+                preview = _diff_preview(base_for_diff, merged, limit=6)
+                if preview:
+                    print("\nPreview:\n" + preview)
+                changed = len(_diff_tasks(base_for_diff, merged))
+                if ns.max_change and changed > int(ns.max_change):
+                    print(f"\nChange count {changed} exceeds max-change {ns.max_change}.")
+                    confirm = input("Proceed anyway? [y/N]: ").strip().lower()
+                    if confirm != "y":
+                        continue
+                confirm = input("Write import JSON? [y/N]: ").strip().lower()
+                if confirm != "y":
+                    continue
+                out_path = Path(ns.out)
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                out_path.write_text(json.dumps(out_tasks, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+                print(f"Wrote {ns.out}")
+                return 0
 
-        if plan_obj.get("schema") != "scalpel.taskplan.v1":
-            print("Invalid schema in model output")
-            print(json.dumps(plan_obj, indent=2))
-            continue
-        ops = plan_obj.get("ops")
-        if not isinstance(ops, list):
-            print("Model output missing ops list")
-            continue
-        ops = _normalize_ops(ops)
-        plan_obj = dict(plan_obj)
-        plan_obj["ops"] = ops
-
-        print("\nOps summary:")
-        tasks_map = _tasks_map(tasks_full)
-        print(_summarize_ops(ops, tasks_map) or "(none)")
-        warnings = _list_field(plan_obj, "warnings")
-        ambiguities = _list_field(plan_obj, "ambiguities")
-        suggestions = _list_field(plan_obj, "suggestions")
-        confidence = plan_obj.get("confidence")
-        response = plan_obj.get("response") if isinstance(plan_obj.get("response"), str) else None
-        clar_qs = _list_field(plan_obj, "clarifying_questions")
-        if warnings:
-            print("\nWarnings:")
-            for w in warnings:
-                print(f"- {w}")
-        if ambiguities:
-            print("\nAmbiguities:")
-            for a in ambiguities:
-                print(f"- {a}")
-        if response:
-            print("\nResponse:\n" + response)
-        if clar_qs:
-            print("\nClarifying questions:")
-            for q in clar_qs:
-                print(f"- {q}")
-        if suggestions:
-            print("\nSuggestions:")
-            for s in suggestions:
-                print(f"- {s}")
-        if not ops:
-            raw_ops = _list_field(plan_obj, "ops")
-            print("\nNo actionable ops. Refine the prompt.")
-            if raw_ops:
-                print("\nRaw ops (first 5):")
-                print(json.dumps(raw_ops[:5], indent=2))
-            else:
-                print("\nRaw plan:")
+            try:
+                plan_obj = run_round(user_prompt, summary)
+            except Exception as e:
+                print(f"Request failed: {e}")
+                continue
+
+            if plan_obj.get("schema") != "scalpel.taskplan.v1":
+                print("Invalid schema in model output")
                 print(json.dumps(plan_obj, indent=2))
-            continue
-        if ambiguities or (isinstance(confidence, (int, float)) and confidence < ns.min_confidence):
-            print("\nClarify required:")
-            for a in ambiguities:
-                print(f"- {a}")
-            clar = input("> ").strip()
-            if clar:
-                summary = _update_summary(summary, "clarify:" + clar, plan_obj, int(ns.summary_max_chars))
-            continue
+                continue
+            ops = plan_obj.get("ops")
+            if not isinstance(ops, list):
+                print("Model output missing ops list")
+                continue
+            ops = _normalize_ops(ops)
+            plan_obj = dict(plan_obj)
+            plan_obj["ops"] = ops
+
+            print("\nOps summary:")
+            tasks_map = _tasks_map(tasks_full)
+            print(_summarize_ops(ops, tasks_map) or "(none)")
+            warnings = _list_field(plan_obj, "warnings")
+            ambiguities = _list_field(plan_obj, "ambiguities")
+            suggestions = _list_field(plan_obj, "suggestions")
+            confidence = plan_obj.get("confidence")
+            response = plan_obj.get("response") if isinstance(plan_obj.get("response"), str) else None
+            clar_qs = _list_field(plan_obj, "clarifying_questions")
+            if warnings:
+                print("\nWarnings:")
+                for w in warnings:
+                    print(f"- {w}")
+            if ambiguities:
+                print("\nAmbiguities:")
+                for a in ambiguities:
+                    print(f"- {a}")
+            if response:
+                print("\nResponse:\n" + response)
+            if clar_qs:
+                print("\nClarifying questions:")
+                for q in clar_qs:
+                    print(f"- {q}")
+            if suggestions:
+                print("\nSuggestions:")
+                for s in suggestions:
+                    print(f"- {s}")
+            if not ops:
+                raw_ops = _list_field(plan_obj, "ops")
+                print("\nNo actionable ops. Refine the prompt.")
+                if raw_ops:
+                    print("\nRaw ops (first 5):")
+                    print(json.dumps(raw_ops[:5], indent=2))
+                else:
+                    print("\nRaw plan:")
+                    print(json.dumps(plan_obj, indent=2))
+                continue
+            if ambiguities or (isinstance(confidence, (int, float)) and confidence < ns.min_confidence):
+                print("\nClarify required:")
+                for a in ambiguities:
+                    print(f"- {a}")
+                clar = input("> ").strip()
+                if clar:
+                    summary = _update_summary(summary, "clarify:" + clar, plan_obj, int(ns.summary_max_chars))
+                continue
 
-        summary = _update_summary(summary, user_prompt, plan_obj, int(ns.summary_max_chars))
-        last_plan = plan_obj
+            summary = _update_summary(summary, user_prompt, plan_obj, int(ns.summary_max_chars))
+            last_plan = plan_obj
 
 
 if __name__ == "__main__":
@@ -3,9 +3,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import random
 import statistics
 import sys
+import tempfile
 import time
 from collections.abc import Callable
 from pathlib import Path
@@ -173,7 +175,7 @@ def main(argv: List[str] | None = None) -> int:
         return 0
 
     # Lazy import to keep fast-path lean.
-    from scalpel.render.inline import build_html
+    from scalpel.render.inline import build_html, write_html_file
 
     def _render() -> None:
         html = build_html(payload)
@@ -182,6 +184,16 @@ def main(argv: List[str] | None = None) -> int:
 
     mn, av, mx = _time_one(_render, repeats=int(ns.repeats), warmup=int(ns.warmup))
     print(f"[scalpel-bench] render:    {mn:.2f}/{av:.2f}/{mx:.2f} ms (min/avg/max)")
+
+    with tempfile.TemporaryDirectory() as td:
+        out_html = os.path.join(td, "bench.html")
+
+        def _write() -> None:
+            if write_html_file(payload, out_html) < 10:
+                raise RuntimeError("render produced unexpected output")
+
+        mn, av, mx = _time_one(_write, repeats=int(ns.repeats), warmup=int(ns.warmup))
+    print(f"[scalpel-bench] write:     {mn:.2f}/{av:.2f}/{mx:.2f} ms (min/avg/max)")
     return 0
 
 
@@ -7,7 +7,7 @@ import webbrowser
 from pathlib import Path
 
 from scalpel.payload import build_payload
-from scalpel.render.inline import build_html
+from scalpel.render.inline import write_html_file
 from scalpel.util.timeparse import parse_workhours
 from scalpel.util.tz import normalize_tz_name, resolve_tz, today_date
 
@@ -96,12 +96,9 @@ def main(argv: list[str] | None = None) -> None:
             "overdueDays": 0,
         }
 
-    html = build_html(data)
-
     out_path = os.path.abspath(args.out)
     Path(out_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    write_html_file(data, out_path)
 
     print(out_path)
 
@@ -9,7 +9,7 @@ from pathlib import Path
 from typing import Any, Dict, List, cast
 
 from scalpel.ai import PlanOverride, apply_plan_overrides, load_plan_overrides
-from scalpel.model import CalendarConfig
+from scalpel.model import CalendarConfig, Payload
 from scalpel.planner import (
     apply_overrides,
     op_align_ends,
@@ -18,6 +18,7 @@ from scalpel.planner import (
     op_nudge,
     op_stack,
 )
+from scalpel.scheduler import auto_schedule
 from scalpel.schema import upgrade_payload
 
 
@@ -69,9 +70,17 @@ def main(argv: List[str] | None = None) -> int:
     ap.add_argument("--overrides-in", default=None, help="Existing plan overrides JSON to layer on")
     ap.add_argument("--overrides-out", default=None, help="Write merged plan overrides JSON to this path")
     ap.add_argument("--selected", required=True, help="JSON file with selected UUIDs array")
-    ap.add_argument("--op", required=True, help="Operation: align-starts|align-ends|stack|distribute|nudge")
+    ap.add_argument(
+        "--op", required=True, help="Operation: align-starts|align-ends|stack|distribute|nudge|auto-schedule"
+    )
     ap.add_argument("--snap", type=int, default=10, help="Snap minutes for align/stack/distribute (default: 10)")
     ap.add_argument("--delta", type=int, default=0, help="Delta minutes for nudge (default: 0)")
+    ap.add_argument(
+        "--time-budget-ms",
+        type=int,
+        default=250,
+        help="Local search budget for auto-schedule (default: 250). Empty --selected schedules the backlog.",
+    )
     ns = ap.parse_args(argv)
 
     in_path = Path(ns.in_json)
@@ -101,6 +110,20 @@ def main(argv: List[str] | None = None) -> int:
     cfg = cast(CalendarConfig, cfg_raw) if isinstance(cfg_raw, dict) else CalendarConfig()
     tz_name = cfg.get("tz") if isinstance(cfg.get("tz"), str) else "UTC"
 
+    if ns.op.lower().strip() == "auto-schedule":
+        try:
+            base = apply_plan_overrides(payload, overrides) if overrides else payload
+            result = auto_schedule(base, selected or None, time_budget_ms=int(ns.time_budget_ms))
+        except Exception as e:
+            return _die(str(e))
+        new_overrides = result.overrides
+        print(
+            f"[scalpel-plan-ops] auto-schedule placed={len(result.overrides)} unplaced={len(result.unplaced)} "
+            f"late={len(result.late)} iterations={result.iterations}",
+            file=sys.stderr,
+        )
+        return _write_outputs(ns, payload, overrides, new_overrides)
+
     events = apply_overrides(payload.get("tasks", []), overrides, cfg)
     try:
         op = _op_func(ns.op)
@@ -111,6 +134,15 @@ def main(argv: List[str] | None = None) -> int:
     except Exception as e:
         return _die(str(e))
 
+    return _write_outputs(ns, payload, overrides, new_overrides)
+
+
+def _write_outputs(
+    ns: argparse.Namespace,
+    payload: Payload,
+    overrides: Dict[str, PlanOverride],
+    new_overrides: Dict[str, PlanOverride],
+) -> int:
     merged = dict(overrides)
     merged.update(new_overrides)
 
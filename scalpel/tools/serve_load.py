@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import http.client
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, cast
+
+from scalpel import serve
+from scalpel.model import Payload
+from scalpel.schema import LATEST_SCHEMA_VERSION
+from scalpel.serve_async import AsyncHTTPServer
+from scalpel.serve_types import LiveServer
+from scalpel.tools.bench import _load_json, _scale_payload_tasks
+
+BACKENDS = ("threading", "asyncio")
+
+
+def _die(msg: str, rc: int = 2) -> int:
+    print(f"[scalpel-serve-load] ERROR: {msg}", file=sys.stderr)
+    return rc
+
+
+def _quiet(handler: type[BaseHTTPRequestHandler]) -> type[BaseHTTPRequestHandler]:
+    class _Quiet(handler):  # type: ignore[misc, valid-type]
+        def log_message(self, fmt: str, *args: Any) -> None:
+            return None
+
+    return _Quiet
+
+
+def _start_server(backend: str, payload: Dict[str, Any], out_file: Path) -> LiveServer:
+    holder: Dict[str, LiveServer] = {}
+    errors: List[BaseException] = []
+
+    def factory(addr: Tuple[str, int], handler: type[BaseHTTPRequestHandler]) -> LiveServer:
+        server: LiveServer
+        if backend == "asyncio":
+            server = AsyncHTTPServer(addr, _quiet(handler))
+        else:
+            server = ThreadingHTTPServer(addr, _quiet(handler))
+        holder["server"] = server
+        return server
+
+    def runner() -> None:
+        args = argparse.Namespace(host="127.0.0.1", port=0, serve_token="", allow_remote=False, no_open=True)
+        try:
+            serve.serve(
+                args,
+                str(out_file),
+                cast(Payload, payload),
+                render_once=lambda _a, _p: cast(Payload, payload),
+                task_lookup=lambda _u: {"task": None, "matched": 0, "exact": False},
+                timew_export=lambda d: {"day": d, "intervals": []},
+                server_factory=factory,
+            )
+        except BaseException as ex:
+            errors.append(ex)
+
+    threading.Thread(target=runner, name=f"serve-load-{backend}", daemon=True).start()
+    deadline = time.monotonic() + 10.0
+    while "server" not in holder:
+        if errors or time.monotonic() >= deadline:
+            raise RuntimeError(f"{backend} server failed to start: {errors[0] if errors else 'timeout'}")
+        time.sleep(0.01)
+    return holder["server"]
+
+
+def _client(host: str, port: int, path: str, count: int, headers: Dict[str, str], out: List[float]) -> None:
+    # One connection per client; http.client reconnects when the server closes (HTTP/1.0 backend).
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        for _ in range(count):
+            t0 = time.perf_counter_ns()
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                raise RuntimeError(f"GET {path} -> HTTP {resp.status}")
+            out.append((time.perf_counter_ns() - t0) / 1_000_000.0)
+    finally:
+        conn.close()
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _run_load(
+    server: LiveServer, path: str, *, requests: int, concurrency: int, headers: Dict[str, str]
+) -> Dict[str, float]:
+    host, port = server.server_address[:2]
+    per_client = max(1, requests // max(1, concurrency))
+    _client(str(host), int(port), path, min(10, per_client), headers, [])  # warm caches
+    results: List[List[float]] = [[] for _ in range(concurrency)]
+    threads = [
+        threading.Thread(target=_client, args=(str(host), int(port), path, per_client, headers, results[i]))
+        for i in range(concurrency)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = max(1e-9, time.perf_counter() - t0)
+    samples = [ms for chunk in results for ms in chunk]
+    if len(samples) != per_client * concurrency:
+        raise RuntimeError(f"GET {path}: {per_client * concurrency - len(samples)} request(s) failed")
+    return {
+        "requests": float(len(samples)),
+        "rps": len(samples) / elapsed,
+        "p50_ms": statistics.median(samples),
+        "p99_ms": _percentile(samples, 99.0),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="scalpel-serve-load",
+        description="Load-test live mode: compare the threading and asyncio server backends.",
+    )
+    ap.add_argument(
+        "--in", dest="in_json", default="tests/fixtures/golden_payload_v1.json", help="Base payload JSON path"
+    )
+    ap.add_argument("--n", type=int, default=250, help="Number of tasks in the served payload (scaled from base)")
+    ap.add_argument("--seed", type=int, default=1, help="RNG seed for task scaling")
+    ap.add_argument("--requests", type=int, default=2000, help="Requests per backend and path (default: 2000)")
+    ap.add_argument("--concurrency", type=int, default=8, help="Concurrent client connections (default: 8)")
+    ap.add_argument(
+        "--paths", default="/payload,/health", help="Comma-separated GET paths to measure (default: /payload,/health)"
+    )
+    ap.add_argument("--backend", choices=[*BACKENDS, "both"], default="both", help="Backend(s) to measure")
+    ap.add_argument("--gzip", action="store_true", help="Send Accept-Encoding: gzip (measures compressed bodies)")
+    ns = ap.parse_args(argv)
+
+    base_path = Path(ns.in_json)
+    if not base_path.exists():
+        return _die(f"Missing input JSON: {base_path}")
+    try:
+        base_payload = _load_json(base_path)
+    except Exception as e:
+        return _die(f"Failed to load JSON: {base_path} ({e})")
+    payload = _scale_payload_tasks(base_payload, int(ns.n), int(ns.seed), int(LATEST_SCHEMA_VERSION))
+    paths = [p.strip() for p in str(ns.paths).split(",") if p.strip()]
+    if not paths:
+        return _die("--paths is empty")
+    backends = list(BACKENDS) if ns.backend == "both" else [str(ns.backend)]
+    headers = {"Accept-Encoding": "gzip" if ns.gzip else "identity"}
+    concurrency = max(1, int(ns.concurrency))
+
+    print(
+        f"[scalpel-serve-load] n={ns.n} requests={ns.requests} concurrency={concurrency} "
+        f"paths={','.join(paths)} gzip={bool(ns.gzip)}"
+    )
+    with tempfile.TemporaryDirectory() as td:
+        out_file = Path(td) / "serve.html"
+        out_file.write_text("<html><body>load</body></html>", encoding="utf-8")
+        for backend in backends:
+            try:
+                server = _start_server(backend, payload, out_file)
+            except RuntimeError as e:
+                return _die(str(e))
+            try:
+                for path in paths:
+                    try:
+                        r = _run_load(server, path, requests=int(ns.requests), concurrency=concurrency, headers=headers)
+                    except (OSError, RuntimeError, http.client.HTTPException) as e:
+                        return _die(f"{backend} {path}: {e}")
+                    print(
+                        f"[scalpel-serve-load] {backend:<9} {path:<10} {r['rps']:9.1f} req/s  "
+                        f"p50={r['p50_ms']:.2f} ms  p99={r['p99_ms']:.2f} ms  (n={int(r['requests'])})"
+                    )
+            finally:
+                server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from itertools import pairwise
+from pathlib import Path
+from unittest import mock
+
+from scalpel.ai.plan_v2 import compile_plan_v2
+from scalpel.ai.slots import build_joint_candidate_slots, free_intervals_by_day
+from scalpel.bench import make_schedule_payload_v1
+from scalpel.planner import apply_overrides, detect_conflicts
+from scalpel.tools import ai_plan_lmstudio
+
+MIN_MS = 60_000
+VIEW_START_MS = 1_767_225_600_000  # 2026-01-01T00:00:00Z
+
+
+def _small_payload(n_tasks: int) -> dict:
+    tasks = [{"uuid": f"t{i}", "status": "pending", "duration_min": 60} for i in range(n_tasks)]
+    tasks.append(
+        {
+            "uuid": "fixed",
+            "status": "pending",
+            "start_calc_ms": VIEW_START_MS + 10 * 60 * MIN_MS,
+            "end_calc_ms": VIEW_START_MS + 11 * 60 * MIN_MS,
+            "dur_calc_min": 60,
+        }
+    )
+    return {
+        "cfg": {
+            "tz": "UTC",
+            "view_start_ms": VIEW_START_MS,
+            "days": 1,
+            "work_start_min": 9 * 60,
+            "work_end_min": 13 * 60,
+            "snap_min": 30,
+            "default_duration_min": 60,
+        },
+        "tasks": tasks,
+    }
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class TestJointSlotsContract(unittest.TestCase):
+    def test_candidates_never_collide_across_tasks(self) -> None:
+        payload = make_schedule_payload_v1(n_tasks=300, days=7, seed=6)
+        selected = [t["uuid"] for t in payload["tasks"][1:80:2]]
+        candidates, catalog, assignment = build_joint_candidate_slots(payload, selected, max_slots_per_task=6)
+
+        self.assertEqual(list(candidates), selected)
+        intervals = sorted((s.start_ms, s.due_ms) for slots in candidates.values() for s in slots)
+        for (_s0, e0), (s1, _e1) in pairwise(intervals):
+            self.assertLessEqual(e0, s1)
+
+        free = [iv for ivs in free_intervals_by_day(payload, selected).values() for iv in ivs]
+        for s, e in intervals:
+            self.assertTrue(any(a <= s and e <= b for a, b in free))
+
+        for u, slots in candidates.items():
+            self.assertLessEqual(len(slots), 6)
+            if slots:
+                self.assertEqual(assignment[u], slots[0].slot_id)
+                self.assertEqual(catalog[slots[0].slot_id], {"start_ms": slots[0].start_ms, "due_ms": slots[0].due_ms})
+            else:
+                self.assertNotIn(u, assignment)
+
+    def test_oversubscribed_selection_leaves_tasks_unassigned(self) -> None:
+        payload = _small_payload(5)
+        candidates, _catalog, assignment = build_joint_candidate_slots(
+            payload, [f"t{i}" for i in range(5)], max_slots_per_task=3
+        )
+        # 4h window minus a 1h fixed event fits exactly three 1h tasks.
+        self.assertEqual(len(assignment), 3)
+        self.assertEqual(sum(len(v) for v in candidates.values()), 3)
+        self.assertEqual([len(candidates[f"t{i}"]) for i in range(5)], [1, 1, 1, 0, 0])
+
+    def test_lmstudio_joint_mode_fills_unplaced_tasks_with_defaults(self) -> None:
+        payload = _small_payload(2)
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "payload.json").write_text(json.dumps(payload), encoding="utf-8")
+            (root / "selected.json").write_text(json.dumps(["t0", "t1"]), encoding="utf-8")
+            captured: dict = {}
+
+            def fake_urlopen(req, timeout=None):
+                body = json.loads(req.data.decode("utf-8"))
+                prompt = json.loads(body["messages"][1]["content"])
+                captured["prompt"] = prompt
+                first = prompt["default_assignment"]["t0"]
+                plan = {
+                    "schema": "scalpel.plan.v2",
+                    "ops": [{"op": "place", "target": "t0", "slot_id": first}],
+                    "warnings": [],
+                    "notes": [],
+                }
+                return _FakeResponse({"choices": [{"message": {"content": json.dumps(plan)}}]})
+
+            with mock.patch("scalpel.tools.ai_plan_lmstudio.request.urlopen", side_effect=fake_urlopen):
+                rc = ai_plan_lmstudio.main(
+                    [
+                        "--in",
+                        str(root / "payload.json"),
+                        "--selected",
+                        str(root / "selected.json"),
+                        "--out",
+                        str(root / "plan.json"),
+                        "--plan-schema",
+                        "v2",
+                        "--joint-slots",
+                        "--no-cache",
+                    ]
+                )
+            self.assertEqual(rc, 0)
+            self.assertEqual(set(captured["prompt"]["default_assignment"]), {"t0", "t1"})
+
+            plan_obj = json.loads((root / "plan.json").read_text(encoding="utf-8"))
+            self.assertEqual({op["target"] for op in plan_obj["ops"]}, {"t0", "t1"})
+            self.assertEqual(len(plan_obj["warnings"]), 1)
+
+            plan = compile_plan_v2(plan_obj)
+            events = apply_overrides(payload["tasks"], plan.overrides, payload["cfg"])
+            self.assertEqual([c for c in detect_conflicts(events, payload["cfg"]) if c.kind == "overlap"], [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from scalpel.ai.llm_cache import ResponseCache, cache_key
+from scalpel.tools import ai_plan_lmstudio
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURE = REPO_ROOT / "tests" / "fixtures" / "planner_core_fixture.json"
+
+PLAN = {
+    "schema": "scalpel.plan.v1",
+    "overrides": {"a": {"start_ms": 60_000, "due_ms": 120_000, "duration_min": 1}},
+    "added_tasks": [],
+    "task_updates": {},
+    "warnings": [],
+    "notes": [],
+    "model_id": "stub",
+}
+
+
+class _StubModelServer:
+    """Minimal OpenAI-style chat endpoint that counts requests."""
+
+    def __init__(self, content: str):
+        self.requests = 0
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                outer.requests += 1
+                data = json.dumps({"choices": [{"message": {"content": content}}]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):  # noqa: A002
+                return
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "_StubModelServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(timeout=5)
+
+
+class TestLlmResponseCacheContract(unittest.TestCase):
+    def _run(self, root: Path, base_url: str, *extra: str) -> tuple[int, str]:
+        err = io.StringIO()
+        with redirect_stderr(err):
+            rc = ai_plan_lmstudio.main(
+                [
+                    "--in",
+                    str(FIXTURE),
+                    "--selected",
+                    str(root / "selected.json"),
+                    "--out",
+                    str(root / "plan.json"),
+                    "--base-url",
+                    base_url,
+                    "--cache-dir",
+                    str(root / "cache"),
+                    *extra,
+                ]
+            )
+        return rc, err.getvalue()
+
+    def test_identical_request_is_served_from_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as td, _StubModelServer(json.dumps(PLAN)) as stub:
+            root = Path(td)
+            (root / "selected.json").write_text(json.dumps(["a"]), encoding="utf-8")
+
+            rc, log = self._run(root, stub.base_url)
+            self.assertEqual((rc, stub.requests), (0, 1))
+            self.assertNotIn("cache hit", log)
+            first = (root / "plan.json").read_text(encoding="utf-8")
+
+            rc, log = self._run(root, stub.base_url)
+            self.assertEqual((rc, stub.requests), (0, 1))
+            self.assertIn("cache hit", log)
+            self.assertEqual((root / "plan.json").read_text(encoding="utf-8"), first)
+
+            # A different prompt is a different key; --no-cache always queries.
+            rc, _log = self._run(root, stub.base_url, "--prompt", "other")
+            self.assertEqual((rc, stub.requests), (0, 2))
+            rc, _log = self._run(root, stub.base_url, "--no-cache")
+            self.assertEqual((rc, stub.requests), (0, 3))
+
+    def test_invalid_model_output_is_not_cached(self) -> None:
+        with tempfile.TemporaryDirectory() as td, _StubModelServer("not json") as stub:
+            root = Path(td)
+            (root / "selected.json").write_text(json.dumps(["a"]), encoding="utf-8")
+            for _ in range(2):
+                rc, _log = self._run(root, stub.base_url)
+                self.assertNotEqual(rc, 0)
+            self.assertEqual(stub.requests, 2)
+            self.assertEqual(list((root / "cache").glob("*/*.json")), [])
+
+    def test_lru_eviction_bounds_size(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            cache = ResponseCache(Path(td), max_bytes=2500)
+            keys = [cache_key("http://x", {"model": "m", "i": i}) for i in range(5)]
+            blob = {"pad": "x" * 1000}
+            for i, k in enumerate(keys[:2]):
+                cache.put(k, blob)
+                os.utime(cache._path(k), ns=(i * 10**9, i * 10**9))
+            self.assertIsNotNone(cache.get(keys[0]))  # refreshes keys[0]
+            cache.put(keys[2], blob)
+
+            self.assertIsNotNone(cache.get(keys[0]))
+            self.assertIsNone(cache.get(keys[1]))
+            self.assertIsNotNone(cache.get(keys[2]))
+            self.assertLessEqual(sum(p.stat().st_size for p in Path(td).glob("*/*.json")), 2500)
+
+            cache._path(keys[0]).write_text("{broken", encoding="utf-8")
+            self.assertIsNone(cache.get(keys[0]))
+            self.assertFalse(cache._path(keys[0]).exists())
+
+    def test_key_covers_endpoint_model_and_body(self) -> None:
+        body = {"model": "m", "messages": [{"role": "user", "content": "x"}]}
+        k = cache_key("http://a/v1/chat/completions", body)
+        self.assertEqual(k, cache_key("http://a/v1/chat/completions", dict(reversed(list(body.items())))))
+        self.assertNotEqual(k, cache_key("http://b/v1/chat/completions", body))
+        self.assertNotEqual(k, cache_key("http://a/v1/chat/completions", {**body, "model": "n"}))
+        self.assertNotEqual(k, cache_key("http://a/v1/chat/completions", {**body, "temperature": 0.5}))
+        self.assertEqual(len(k), 64)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
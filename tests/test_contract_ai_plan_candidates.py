@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stderr
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from scalpel.ai.llm_client import KeepAliveClient, post_json_many
+from scalpel.tools import ai_plan_lmstudio
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURE = REPO_ROOT / "tests" / "fixtures" / "planner_core_fixture.json"
+
+H = 3_600_000
+NINE_AM = 1_577_869_200_000  # 2020-01-01T09:00:00Z
+
+
+def _plan(overrides: dict) -> str:
+    return json.dumps(
+        {
+            "schema": "scalpel.plan.v1",
+            "overrides": {
+                u: {"start_ms": NINE_AM + s * H, "due_ms": NINE_AM + (s + 1) * H, "duration_min": 60}
+                for u, s in overrides.items()
+            },
+            "added_tasks": [],
+            "task_updates": {},
+            "warnings": [],
+            "notes": [],
+        }
+    )
+
+
+# Candidate answers keyed by the seed the tool sends (candidate 0 has none).
+ANSWERS = {
+    None: _plan({"a": 1, "b": 1}),  # overlapping placements
+    1: _plan({"a": 2, "b": 3}),  # clean
+    2: _plan({"a": 4}),  # clean but leaves b unplaced
+    3: "not json",
+}
+
+
+class _KeepAliveStub:
+    def __init__(self, delay_s: float = 0.0):
+        self.connections = 0
+        self.requests: list[dict] = []
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                outer.connections += 1
+
+            def do_POST(self) -> None:  # noqa: N802
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                outer.requests.append(body)
+                time.sleep(delay_s)
+                content = ANSWERS.get(body.get("seed"), ANSWERS[None])
+                data = json.dumps({"choices": [{"message": {"content": content}}]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):  # noqa: A002
+                return
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "_KeepAliveStub":
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(timeout=5)
+
+
+class TestPlanCandidatesContract(unittest.TestCase):
+    def test_client_reuses_one_connection(self) -> None:
+        with _KeepAliveStub() as stub, KeepAliveClient(stub.base_url + "/") as client:
+            for i in range(3):
+                resp = client.post_json("/v1/chat/completions", {"model": "m", "i": i})
+                self.assertIn("choices", resp)
+            self.assertEqual(client.connections_opened, 1)
+            self.assertEqual(stub.connections, 1)
+            self.assertEqual([r["i"] for r in stub.requests], [0, 1, 2])
+
+    def test_post_json_many_runs_concurrently(self) -> None:
+        with _KeepAliveStub(delay_s=0.3) as stub, KeepAliveClient(stub.base_url) as client:
+            t0 = time.perf_counter()
+            out = post_json_many(client, "/v1/chat/completions", [{"i": i} for i in range(4)])
+            elapsed = time.perf_counter() - t0
+        self.assertEqual(len(out), 4)
+        self.assertTrue(all(isinstance(r, dict) for r in out))
+        self.assertLess(elapsed, 1.0)
+
+        with KeepAliveClient("http://127.0.0.1:9") as dead:
+            (err,) = post_json_many(dead, "/v1/chat/completions", [{"i": 0}])
+        self.assertIsInstance(err, RuntimeError)
+
+    def test_lmstudio_keeps_best_valid_candidate(self) -> None:
+        with tempfile.TemporaryDirectory() as td, _KeepAliveStub() as stub:
+            root = Path(td)
+            (root / "selected.json").write_text(json.dumps(["a", "b"]), encoding="utf-8")
+            err = io.StringIO()
+            with redirect_stderr(err):
+                rc = ai_plan_lmstudio.main(
+                    [
+                        "--in",
+                        str(FIXTURE),
+                        "--selected",
+                        str(root / "selected.json"),
+                        "--out",
+                        str(root / "plan.json"),
+                        "--base-url",
+                        stub.base_url,
+                        "--candidates",
+                        "4",
+                        "--no-cache",
+                    ]
+                )
+            self.assertEqual(rc, 0, err.getvalue())
+            self.assertEqual(len(stub.requests), 4)
+            self.assertEqual(
+                sorted(r.get("temperature") for r in stub.requests),
+                [0.2, 0.4, 0.6, 0.8],
+            )
+            self.assertIn("candidate 4/4 rejected", err.getvalue())
+
+            plan_obj = json.loads((root / "plan.json").read_text(encoding="utf-8"))
+            self.assertEqual(plan_obj["overrides"]["a"]["start_ms"], NINE_AM + 2 * H)
+            self.assertEqual(plan_obj["overrides"]["b"]["start_ms"], NINE_AM + 3 * H)
+            self.assertIn("best of 4 candidates: #2", plan_obj["notes"][-1])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -62,6 +62,7 @@ class TestAiPlanLmStudioToolContract(unittest.TestCase):
                         "http://127.0.0.1:1234",
                         "--model",
                         "ministral-3-14b-reasoning",
+                        "--no-cache",
                     ]
                 )
             self.assertEqual(rc, 0)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import datetime as dt
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from pathlib import Path
+from unittest import mock
+
+from scalpel.ai.plan_v2 import compile_plan_v2
+from scalpel.ai.prompt_codec import decode_plan, encode_plan_prompt_v2, estimate_tokens
+from scalpel.ai.slots import build_candidate_slots
+from scalpel.bench import make_schedule_payload_v1
+from scalpel.tools import ai_plan_lmstudio
+
+
+def _prompt_tasks(payload: dict, selected: list[str]) -> list[dict]:
+    by_uuid = {t["uuid"]: t for t in payload["tasks"]}
+    return [by_uuid[u] for u in selected]
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    def read(self) -> bytes:
+        return json.dumps(self._payload).encode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class TestPromptCodecContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self.payload = make_schedule_payload_v1(n_tasks=120, days=7, seed=3)
+        self.selected = [t["uuid"] for t in self.payload["tasks"][1:40:3]]
+        self.candidates, self.catalog = build_candidate_slots(self.payload, self.selected, max_slots_per_task=12)
+        self.header = {"schema": "scalpel.plan.v2", "user_prompt": ""}
+
+    def _encode(self, **kw):
+        return encode_plan_prompt_v2(
+            self.header, _prompt_tasks(self.payload, self.selected), self.candidates, tz=dt.timezone.utc, **kw
+        )
+
+    def test_encoding_is_tabular_and_whitespace_free(self) -> None:
+        cp = self._encode()
+        obj = json.loads(cp.text)
+        self.assertNotIn("\n", cp.text)
+        self.assertNotIn(", ", cp.text.replace(obj["user_prompt"], ""))
+        self.assertEqual(obj["selected_uuids"], [f"T{i + 1}" for i in range(len(self.selected))])
+        self.assertEqual(obj["slot_cols"], ["id", "day", "start", "end"])
+        self.assertEqual(len(obj["tasks"]), len(self.selected))
+        self.assertEqual(cp.n_bytes, len(cp.text.encode("utf-8")))
+        self.assertEqual(cp.est_tokens, estimate_tokens(cp.text))
+        self.assertEqual((cp.dropped_slots, cp.dropped_tasks, cp.over_budget), (0, (), False))
+
+        verbose_slots = {
+            u: [{"slot_id": s.slot_id, "start_iso": s.start_iso, "due_iso": s.due_iso, "day_key": s.day_key} for s in v]
+            for u, v in self.candidates.items()
+        }
+        self.assertLess(len(json.dumps(obj["slots"])), len(json.dumps(verbose_slots, indent=2)) // 3)
+
+    def test_budget_drops_slots_then_tasks(self) -> None:
+        full = self._encode()
+        cp = self._encode(max_bytes=full.n_bytes * 2 // 3)
+        self.assertLessEqual(cp.n_bytes, full.n_bytes * 2 // 3)
+        self.assertGreater(cp.dropped_slots, 0)
+        self.assertEqual(cp.dropped_tasks, ())
+        # Kept slots are each task's best-ranked prefix.
+        obj = json.loads(cp.text)
+        for alias, rows in obj["slots"].items():
+            u = cp.task_aliases[alias]
+            self.assertEqual(
+                [cp.slot_aliases[r[0]] for r in rows], [s.slot_id for s in self.candidates[u][: len(rows)]]
+            )
+
+        tiny = self._encode(max_tokens=200)
+        self.assertLessEqual(tiny.n_bytes, 800)
+        self.assertTrue(tiny.dropped_tasks)
+        self.assertEqual(tiny.dropped_tasks, tuple(self.selected[len(tiny.task_aliases) :]))
+        self.assertFalse(tiny.over_budget)
+
+    def test_decoded_plan_compiles_like_full_id_plan(self) -> None:
+        cp = self._encode()
+        inv_task = {u: a for a, u in cp.task_aliases.items()}
+        inv_slot = {sid: a for a, sid in cp.slot_aliases.items()}
+        full_ops = [{"op": "place", "target": u, "slot_id": self.candidates[u][0].slot_id} for u in self.selected[:5]]
+        full_ops += [
+            {"op": "create_task", "temp_id": "t1", "description": "New"},
+            {"op": "place", "target": "t1", "slot_id": self.candidates[self.selected[6]][1].slot_id},
+            {"op": "update_task", "uuid": self.selected[7], "patch": {"description": "x"}},
+        ]
+        aliased_ops = []
+        for op in full_ops:
+            op2 = dict(op)
+            if op2.get("target") in inv_task:
+                op2["target"] = inv_task[op2["target"]]
+            if op2.get("uuid") in inv_task:
+                op2["uuid"] = inv_task[op2["uuid"]]
+            if "slot_id" in op2:
+                op2["slot_id"] = inv_slot[op2["slot_id"]]
+            aliased_ops.append(op2)
+
+        full = {"schema": "scalpel.plan.v2", "ops": full_ops, "slot_catalog": self.catalog}
+        decoded = decode_plan({"schema": "scalpel.plan.v2", "ops": aliased_ops, "slot_catalog": self.catalog}, cp)
+        self.assertEqual(decoded, full)
+        self.assertEqual(compile_plan_v2(decoded), compile_plan_v2(full))
+
+    def test_lmstudio_compact_prompt_round_trip(self) -> None:
+        payload = make_schedule_payload_v1(n_tasks=40, days=3, seed=1)
+        selected = [t["uuid"] for t in payload["tasks"][1:10]]
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "payload.json").write_text(json.dumps(payload), encoding="utf-8")
+            (root / "selected.json").write_text(json.dumps(selected), encoding="utf-8")
+            captured: dict = {}
+
+            def fake_urlopen(req, timeout=None):
+                text = json.loads(req.data.decode("utf-8"))["messages"][1]["content"]
+                captured["text"] = text
+                prompt = json.loads(text)
+                ops = [{"op": "place", "target": a, "slot_id": prompt["slots"][a][0][0]} for a in prompt["slots"]]
+                plan = {"schema": "scalpel.plan.v2", "ops": ops, "warnings": [], "notes": []}
+                return _FakeResponse({"choices": [{"message": {"content": json.dumps(plan)}}]})
+
+            err = io.StringIO()
+            with mock.patch("scalpel.tools.ai_plan_lmstudio.request.urlopen", side_effect=fake_urlopen):
+                with redirect_stderr(err):
+                    rc = ai_plan_lmstudio.main(
+                        [
+                            "--in",
+                            str(root / "payload.json"),
+                            "--selected",
+                            str(root / "selected.json"),
+                            "--out",
+                            str(root / "plan.json"),
+                            "--plan-schema",
+                            "v2",
+                            "--compact-prompt",
+                            "--prompt-max-bytes",
+                            "3000",
+                            "--no-cache",
+                        ]
+                    )
+            self.assertEqual(rc, 0)
+            self.assertLessEqual(len(captured["text"].encode("utf-8")), 3000)
+            self.assertIn("bytes (~", err.getvalue())
+
+            plan_obj = json.loads((root / "plan.json").read_text(encoding="utf-8"))
+            targets = [op["target"] for op in plan_obj["ops"]]
+            self.assertTrue(targets)
+            self.assertTrue(set(targets) <= set(selected))
+            plan = compile_plan_v2(plan_obj)
+            self.assertEqual(set(plan.overrides), set(targets))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
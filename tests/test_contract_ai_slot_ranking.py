@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from scalpel.ai.slots import FreeTimeIndex, SlotPreferences, _slot_cost, build_candidate_slots
+from scalpel.goals import load_goals_config
+from scalpel.schema import upgrade_payload
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LARGE_FIXTURE = REPO_ROOT / "tests" / "fixtures" / "golden_payload_large_v1.json"
+
+MIN_MS = 60_000
+DAY_MS = 86_400_000
+VIEW_START_MS = 1_767_225_600_000  # 2026-01-01T00:00:00Z (Thursday)
+
+
+def _payload(tasks: list[dict], goals: list[dict] | None = None) -> dict:
+    payload = {
+        "cfg": {
+            "tz": "UTC",
+            "view_start_ms": VIEW_START_MS,
+            "days": 5,
+            "work_start_min": 9 * 60,
+            "work_end_min": 17 * 60,
+            "snap_min": 30,
+            "default_duration_min": 60,
+            "max_infer_duration_min": 480,
+        },
+        "tasks": tasks,
+    }
+    if goals is not None:
+        payload["goals"] = {"version": 1, "goals": goals}
+    return payload
+
+
+class TestSlotRankingContract(unittest.TestCase):
+    def test_top_k_matches_exhaustive_ranking(self) -> None:
+        payload = _payload(
+            [
+                {"uuid": "busy", "status": "pending", "due_ms": VIEW_START_MS + 11 * 60 * MIN_MS, "duration_min": 90},
+                {"uuid": "t", "status": "pending", "due_ms": VIEW_START_MS + 2 * DAY_MS, "duration_min": 60},
+            ]
+        )
+        index = FreeTimeIndex(payload, ["t"])
+        prefs = SlotPreferences(horizon_start_ms=VIEW_START_MS, due_ms=VIEW_START_MS + 2 * DAY_MS, minute_of_day=600)
+
+        scored = []
+        for day_key, free_list in index.free_by_day.items():
+            midnight, _weekday = index.day_info[day_key]
+            for a, b in free_list:
+                s = -(-a // (30 * MIN_MS)) * (30 * MIN_MS)
+                while s + 60 * MIN_MS <= b:
+                    e = s + 60 * MIN_MS
+                    scored.append((_slot_cost(s, e, a, b, midnight, [], prefs), s, e, day_key))
+                    s += 30 * MIN_MS
+        per_day: dict[str, list] = {}
+        for item in sorted(scored):
+            per_day.setdefault(item[3], []).append(item)
+        capped = sorted(x for items in per_day.values() for x in items[:3])
+        want = [(s, e, d) for _c, s, e, d in capped[:7]]
+
+        self.assertEqual(index.top_k(60, 7, prefs, max_per_day=3), want)
+        # Late slots (days after due) only appear once on-time slots run out.
+        late = [s for s, e, _d in index.top_k(60, 100, prefs) if e > prefs.due_ms]
+        on_time = [s for s, e, _d in index.top_k(60, 100, prefs) if e <= prefs.due_ms]
+        self.assertTrue(late and on_time)
+        ranked = index.top_k(60, 100, prefs)
+        self.assertTrue(all(e <= prefs.due_ms for _s, e, _d in ranked[: len(on_time)]))
+
+    def test_score_ranking_spreads_days_and_honors_goal_bands(self) -> None:
+        goals = [
+            {
+                "id": "deep",
+                "name": "Deep",
+                "color": "#123456",
+                "projects": ["work"],
+                "tags": [],
+                "tags_all": [],
+                "mode": "any",
+                "time_bands": [{"start_min": 14 * 60, "end_min": 16 * 60, "weekdays": [0, 1, 2, 3, 4]}],
+            }
+        ]
+        payload = _payload(
+            [
+                {"uuid": "deep", "status": "pending", "project": "work.api", "duration_min": 60},
+                {"uuid": "other", "status": "pending", "project": "home", "duration_min": 60},
+            ],
+            goals,
+        )
+        chrono, _ = build_candidate_slots(payload, ["deep", "other"], max_slots_per_task=6)
+        self.assertEqual({s.day_key for s in chrono["deep"]}, {"2026-01-01"})
+
+        ranked, catalog = build_candidate_slots(payload, ["deep", "other"], max_slots_per_task=6, ranking="score")
+        self.assertEqual(len(ranked["deep"]), 6)
+        self.assertGreaterEqual(len({s.day_key for s in ranked["other"]}), 3)
+        for s in ranked["deep"]:
+            self.assertEqual(catalog[s.slot_id], {"start_ms": s.start_ms, "due_ms": s.due_ms})
+            start_min = (s.start_ms - VIEW_START_MS) % DAY_MS // MIN_MS
+            self.assertTrue(14 * 60 <= start_min <= 15 * 60, s.start_iso)
+        # Saturday is outside the band's weekdays.
+        self.assertNotIn("2026-01-03", {s.day_key for s in ranked["deep"]})
+
+        with self.assertRaises(ValueError):
+            build_candidate_slots(payload, ["deep"], ranking="random")
+
+    def test_goal_time_bands_are_normalized(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "goals.json"
+            path.write_text(
+                json.dumps(
+                    [
+                        {
+                            "name": "Deep",
+                            "color": "#abcdef",
+                            "time_bands": [
+                                {"start": "9:00", "end": "11:30", "days": ["Mon", "wed", 4]},
+                                {"start": "14:00", "end": "13:00"},
+                                {"start": "25:00", "end": "26:00"},
+                                {"start": "16:00", "end": "24:00"},
+                            ],
+                        }
+                    ]
+                ),
+                encoding="utf-8",
+            )
+            cfg = load_goals_config(str(path))
+        assert cfg is not None
+        self.assertEqual(
+            cfg["goals"][0]["time_bands"],
+            [
+                {"start_min": 540, "end_min": 690, "weekdays": [0, 2, 4]},
+                {"start_min": 960, "end_min": 1440, "weekdays": [0, 1, 2, 3, 4, 5, 6]},
+            ],
+        )
+
+    def test_score_ranking_budget_large_fixture(self) -> None:
+        if os.environ.get("SCALPEL_SKIP_PERF_TESTS", "").strip() == "1":
+            self.skipTest("SCALPEL_SKIP_PERF_TESTS=1")
+
+        payload = upgrade_payload(json.loads(LARGE_FIXTURE.read_text(encoding="utf-8")))
+        selected = [t["uuid"] for t in payload["tasks"][:150]]
+        budget_ms = float(os.environ.get("SCALPEL_SLOT_RANKING_PERF_BUDGET_MS", "600"))
+
+        t0 = time.perf_counter()
+        candidates, _catalog = build_candidate_slots(payload, selected, max_slots_per_task=24, ranking="score")
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        self.assertTrue(all(len({s.day_key for s in v}) >= 3 for v in candidates.values() if len(v) == 24))
+        self.assertLessEqual(
+            elapsed_ms,
+            budget_ms,
+            f"Slot ranking budget exceeded: {elapsed_ms:.2f} ms > {budget_ms:.2f} ms (tasks=150, large fixture)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import time
+import unittest
+
+from scalpel.ai.slots import (
+    FreeTimeIndex,
+    build_candidate_slots,
+    free_intervals_by_day,
+)
+from scalpel.bench import make_schedule_payload_v1
+
+MIN_MS = 60_000
+
+
+def _brute_force_slots(payload: dict, movable: list[str], dur_min: int) -> list[tuple[int, int, str]]:
+    snap_ms = int(payload["cfg"]["snap_min"]) * MIN_MS
+    dur_ms = dur_min * MIN_MS
+    out = []
+    for day_key, free_list in free_intervals_by_day(payload, movable).items():
+        for a, b in free_list:
+            s = -(-a // snap_ms) * snap_ms
+            while s + dur_ms <= b:
+                out.append((s, s + dur_ms, day_key))
+                s += snap_ms
+    return out
+
+
+class TestFreeTimeIndexContract(unittest.TestCase):
+    def test_lazy_enumeration_matches_brute_force(self) -> None:
+        payload = make_schedule_payload_v1(n_tasks=200, days=5, seed=4)
+        movable = [t["uuid"] for t in payload["tasks"][:20]]
+        index = FreeTimeIndex(payload, movable)
+        for dur in (10, 45, 240):
+            with self.subTest(dur=dur):
+                want = _brute_force_slots(payload, movable, dur)
+                self.assertEqual(list(index.iter_intervals(dur)), want)
+
+                floor = want[len(want) // 2][0] + 3 * MIN_MS if want else 0
+                got = list(index.iter_intervals(dur, not_before_ms=floor))
+                self.assertEqual(got, [w for w in want if w[0] >= floor])
+
+    def test_candidate_slots_budget_100_tasks_30_days(self) -> None:
+        if os.environ.get("SCALPEL_SKIP_PERF_TESTS", "").strip() == "1":
+            self.skipTest("SCALPEL_SKIP_PERF_TESTS=1")
+
+        payload = make_schedule_payload_v1(n_tasks=600, days=30, seed=2)
+        selected = [t["uuid"] for t in payload["tasks"][:120]]
+        budget_ms = float(os.environ.get("SCALPEL_SLOTS_PERF_BUDGET_MS", "400"))
+
+        t0 = time.perf_counter()
+        candidates, slot_catalog = build_candidate_slots(payload, selected, max_slots_per_task=24)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        self.assertEqual(len(candidates), len(selected))
+        self.assertTrue(all(len(v) == 24 for v in candidates.values()))
+        for slots in candidates.values():
+            for s in slots:
+                self.assertEqual(slot_catalog[s.slot_id], {"start_ms": s.start_ms, "due_ms": s.due_ms})
+        self.assertLessEqual(
+            elapsed_ms,
+            budget_ms,
+            f"Candidate slot budget exceeded: {elapsed_ms:.2f} ms > {budget_ms:.2f} ms (tasks=120, days=30)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import unittest
+
+from scalpel.render.assets import read_render_asset
+
+
+def _slice(source: str, start: str, end: str) -> str:
+    return start + source.split(start, 1)[1].split(end, 1)[0]
+
+
+# Runs the real range/attach/dematerialize/viewport functions from
+# part04_rendering.js against a minimal fake DOM: 14 day columns of 100px in a
+# 400px pane, one event per day. Only __materializeCalendarDay is stubbed (it
+# attaches the day's events through the real __attachEventNode).
+_HARNESS = r"""
+let DAYS = 14;
+const pane = { clientWidth: 0, scrollLeft: 0 };
+const body = { scrollWidth: 1400 };
+function makeNode(name) {
+  return { name, parentNode: null, remove() { if (this.parentNode) this.parentNode.removeChild(this); } };
+}
+function makeCol(i) {
+  return {
+    i,
+    children: [],
+    appendChild(n) { if (n.parentNode) n.parentNode.removeChild(n); n.parentNode = this; this.children.push(n); },
+    removeChild(n) { this.children = this.children.filter(c => c !== n); n.parentNode = null; },
+    querySelectorAll(sel) { return sel === ".note" ? this.children.filter(c => c.name === "note") : []; },
+  };
+}
+const cols = Array.from({ length: DAYS }, (_, i) => makeCol(i));
+const document = {
+  getElementById: (id) => (id === "daysCol" ? pane : id === "daysBody" ? body : null),
+  querySelectorAll: (sel) => (sel === ".day-col" ? cols : []),
+};
+const __eventNodeByUuid = new Map();
+const __scalpelGapNodesByDay = new Map();
+let created = 0;
+const materializeCalls = [];
+function __createEventNode(uuid) { created++; return makeNode("evt:" + uuid); }
+function __updateEventNode(_el, _ev, _t) {}
+function __materializeCalendarDay(i, col) {
+  materializeCalls.push(i);
+  const gap = makeNode("gap");
+  col.appendChild(gap);
+  __scalpelGapNodesByDay.set(i, [gap]);
+  col.appendChild(makeNode("note"));
+  for (const ev of __calendarVirtual.byDay[i]) __attachEventNode(col, ev, {});
+}
+
+/*__SOURCE__*/
+
+const v = __calendarVirtual;
+v.byDay = Array.from({ length: DAYS }, (_, i) => [{ uuid: "u" + i }]);
+v.byDayAll = v.byDay;
+for (let i = 0; i < DAYS; i++) v.dayByUuid.set("u" + i, i);
+const snap = () => ({
+  range: __calendarVisibleDayRange(),
+  materialized: Array.from(v.materialized).sort((a, b) => a - b),
+  calls: materializeCalls.splice(0),
+  populated: cols.filter(c => c.children.length).map(c => c.i),
+  gapDays: Array.from(__scalpelGapNodesByDay.keys()).sort((a, b) => a - b),
+  cachedNodes: __eventNodeByUuid.size,
+  created,
+});
+const out = {};
+out.unlaidOut = __calendarVisibleDayRange();
+pane.clientWidth = 400;
+__renderCalendarViewport(true);
+out.initial = snap();
+const firstNode = __eventNodeByUuid.get("u0");
+pane.scrollLeft = 700;
+__renderCalendarViewport(false);
+out.scrolled = snap();
+out.detachedNodeKept = __eventNodeByUuid.get("u0") === firstNode && firstNode.parentNode === null;
+__renderCalendarViewport(false);
+out.unchanged = snap();
+pane.scrollLeft = 0;
+__renderCalendarViewport(false);
+out.back = snap();
+out.recycled = __eventNodeByUuid.get("u0") === firstNode && firstNode.parentNode === cols[0];
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+class CalendarVirtualizationContractTests(unittest.TestCase):
+    def test_render_calendar_only_materializes_the_visible_day_range(self) -> None:
+        rendering = read_render_asset("js/part04_rendering.js")
+        self.assertIn("const CAL_VIRTUAL_OVERSCAN_DAYS = 2;", rendering)
+        self.assertIn("function __calendarVisibleDayRange()", rendering)
+        self.assertIn("Math.floor(pane.scrollLeft / colW) - CAL_VIRTUAL_OVERSCAN_DAYS", rendering)
+        self.assertIn("__renderCalendarViewport(true);", rendering)
+        self.assertIn("function __dematerializeCalendarDay(i, col)", rendering)
+
+        body = rendering.split("function renderCalendar(", 1)[1].split("// Task FX helpers", 1)[0]
+        self.assertNotIn("renderGapsForDay(", body)
+        self.assertNotIn("__createEventNode(", body)
+
+    def test_viewport_bookkeeping_runs_in_node(self) -> None:
+        node = shutil.which("node")
+        if node is None:
+            raise unittest.SkipTest("node not available")
+        rendering = read_render_asset("js/part04_rendering.js")
+        source = _slice(
+            rendering, "  const CAL_VIRTUAL_OVERSCAN_DAYS", "  function __materializeCalendarDay("
+        ) + _slice(rendering, "  function __dematerializeCalendarDay(", "  function __scheduleCalendarViewportRender(")
+        proc = subprocess.run(
+            [node, "-e", _HARNESS.replace("/*__SOURCE__*/", source)],
+            text=True,
+            capture_output=True,
+            timeout=30,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        out = json.loads(proc.stdout)
+
+        self.assertEqual(out["unlaidOut"], {"lo": 0, "hi": 13})  # not laid out: everything
+        self.assertEqual(out["initial"]["range"], {"lo": 0, "hi": 5})  # 4 visible days + 2 overscan
+        self.assertEqual(out["initial"]["materialized"], [0, 1, 2, 3, 4, 5])
+        self.assertEqual(out["initial"]["populated"], [0, 1, 2, 3, 4, 5])
+
+        scrolled = out["scrolled"]
+        self.assertEqual(scrolled["range"], {"lo": 5, "hi": 12})
+        self.assertEqual(scrolled["materialized"], list(range(5, 13)))
+        self.assertEqual(scrolled["calls"], list(range(6, 13)))  # day 5 stays as it was
+        self.assertEqual(scrolled["populated"], list(range(5, 13)))  # events, gaps and notes left days 0-4
+        self.assertEqual(scrolled["gapDays"], list(range(5, 13)))
+        self.assertEqual(scrolled["cachedNodes"], 13)
+        self.assertTrue(out["detachedNodeKept"])
+
+        self.assertEqual(out["unchanged"]["calls"], [])  # same range: no work
+
+        back = out["back"]
+        self.assertEqual(back["materialized"], [0, 1, 2, 3, 4, 5])
+        self.assertEqual(back["calls"], [0, 1, 2, 3, 4])
+        self.assertEqual(back["created"], 13)  # days 0-4 reuse their detached nodes
+        self.assertTrue(out["recycled"])
+
+    def test_off_screen_event_nodes_are_recycled_by_uuid(self) -> None:
+        rendering = read_render_asset("js/part04_rendering.js")
+        self.assertIn("let el = __eventNodeByUuid.get(ev.uuid);", rendering)
+        self.assertIn("if (v.materialized.has(dayByUuid.get(uuid))) continue;", rendering)
+        self.assertIn("function __revealCalendarEvent(uuid)", rendering)
+
+    def test_scrolling_rerenders_the_viewport_once_per_frame(self) -> None:
+        rendering = read_render_asset("js/part04_rendering.js")
+        selection = read_render_asset("js/part03_selection_ops.js")
+        drag = read_render_asset("js/part06_drag_resize.js")
+        self.assertIn("if (v.queued) return;", rendering)
+        self.assertIn("requestAnimationFrame(() => {\n      v.queued = false;", rendering)
+        self.assertIn("__scheduleCalendarViewportRender();\n    }, { passive: true });", selection)
+        self.assertIn("__revealCalendarEvent(uuid)", selection)
+        self.assertIn("if (!node.isConnected) continue;", selection)
+        self.assertIn("for (const node of __eventNodeByUuid.values())", drag)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
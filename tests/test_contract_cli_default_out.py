@@ -10,6 +10,10 @@ from unittest.mock import patch
 from scalpel import cli
 
 
+def _fake_write_html(_data: object, out_path: str) -> int:
+    return Path(out_path).write_text("<!doctype html><html><body>ok</body></html>", encoding="utf-8")
+
+
 class TestCliDefaultOutContract(unittest.TestCase):
     def test_obs_log_emits_structured_line_when_enabled(self) -> None:
         with patch.dict(os.environ, {"SCALPEL_OBS_LOG": "1"}, clear=False), patch("scalpel.cli.eprint") as ep:
@@ -48,7 +52,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
                 os.chdir(tmp)
                 with (
                     patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}),
-                    patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+                    patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
                 ):
                     cli.main(["--once", "--no-open", "--start", "2026-01-01"])
             finally:
@@ -64,7 +68,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
     def test_nautical_hooks_enabled_by_default(self) -> None:
         with (
             patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}) as bp,
-            patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+            patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
         ):
             cli.main(["--once", "--no-open", "--start", "2026-01-01"])
         self.assertTrue(bp.call_args.kwargs.get("nautical_hooks_enabled"))
@@ -72,7 +76,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
     def test_no_nautical_hooks_flag_disables_preview_expansion(self) -> None:
         with (
             patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}) as bp,
-            patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+            patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
         ):
             cli.main(["--once", "--no-open", "--start", "2026-01-01", "--no-nautical-hooks"])
         self.assertFalse(bp.call_args.kwargs.get("nautical_hooks_enabled"))
@@ -97,7 +101,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
                 patch("scalpel.cli.os.path.abspath", return_value=blocked_out),
                 patch("pathlib.Path.mkdir", new=fake_mkdir),
                 patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}),
-                patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+                patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
             ):
                 cli.main(["--once", "--no-open", "--start", "2026-01-01"])
 
@@ -122,7 +126,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
             outp = Path(td) / "serve.html"
             with (
                 patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}),
-                patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+                patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
                 patch("scalpel.cli.ThreadingHTTPServer", FakeServer),
             ):
                 cli.main(["--no-open", "--start", "2026-01-01", "--port", "0", "--out", str(outp)])
@@ -135,7 +139,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
             outp = Path(td) / "once.html"
             with (
                 patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}),
-                patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+                patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
                 patch("scalpel.cli.ThreadingHTTPServer", side_effect=AssertionError("server should not start")),
             ):
                 cli.main(["--once", "--no-open", "--start", "2026-01-01", "--out", str(outp)])
@@ -145,7 +149,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
     def test_serve_remote_host_requires_allow_remote_flag(self) -> None:
         with (
             patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}),
-            patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+            patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
         ):
             with self.assertRaises(SystemExit) as ctx:
                 cli.main(["--serve", "--no-open", "--start", "2026-01-01", "--host", "0.0.0.0"])
@@ -154,7 +158,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
     def test_serve_remote_host_requires_token(self) -> None:
         with (
             patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}),
-            patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+            patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
         ):
             with self.assertRaises(SystemExit) as ctx:
                 cli.main(
@@ -189,7 +193,7 @@ class TestCliDefaultOutContract(unittest.TestCase):
             outp = Path(td) / "serve.html"
             with (
                 patch("scalpel.cli.build_payload", return_value={"cfg": {}, "tasks": []}),
-                patch("scalpel.cli.build_html", return_value="<!doctype html><html><body>ok</body></html>"),
+                patch("scalpel.cli.write_html_file", side_effect=_fake_write_html),
                 patch("scalpel.cli.ThreadingHTTPServer", FakeServer),
             ):
                 cli.main(
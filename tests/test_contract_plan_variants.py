@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import unittest
+from pathlib import Path
+
+from scalpel.ai import PlanOverride
+from scalpel.planner import apply_overrides, detect_conflicts, evaluate_plan_variants, op_nudge, selection_metrics
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURE = REPO_ROOT / "tests" / "fixtures" / "planner_core_fixture.json"
+
+
+def _fixture_overrides(payload: dict) -> dict[str, PlanOverride]:
+    return {
+        uuid: PlanOverride(start_ms=int(v["start_ms"]), due_ms=int(v["due_ms"]), duration_min=v.get("duration_min"))
+        for uuid, v in payload.get("overrides", {}).items()
+    }
+
+
+class TestPlanVariantsContract(unittest.TestCase):
+    def _variants(self, payload: dict) -> list[dict[str, PlanOverride]]:
+        base = _fixture_overrides(payload)
+        events = apply_overrides(payload["tasks"], base, payload["cfg"])
+        uuids = sorted(events.keys())
+        variants: list[dict[str, PlanOverride]] = [{}, base]
+        for delta in (-120, -30, 30, 600):
+            variants.append({**base, **op_nudge(uuids, events, delta)})
+        # Unknown uuids are ignored; empty intervals drop the event.
+        variants.append({"missing": PlanOverride(start_ms=0, due_ms=60000, duration_min=1)})
+        variants.append({"a": PlanOverride(start_ms=1000, due_ms=1000, duration_min=None)})
+        return variants
+
+    def test_matches_planner_core_per_variant(self) -> None:
+        payload = json.loads(FIXTURE.read_text(encoding="utf-8"))
+        variants = self._variants(payload)
+
+        got = evaluate_plan_variants(payload, variants, selected_uuids=["a", "b", "c", "d"], workers=1)
+        self.assertEqual([e.index for e in got], list(range(len(variants))))
+
+        for ev, ov in zip(got, variants, strict=True):
+            events = apply_overrides(payload["tasks"], ov, payload["cfg"])
+            want_conflicts = detect_conflicts(events, payload["cfg"])
+            self.assertEqual(ev.conflicts, want_conflicts)
+            self.assertEqual(ev.metrics, selection_metrics(["a", "b", "c", "d"], events))
+            self.assertEqual(
+                ev.overlap_min,
+                sum((c.end_ms - c.start_ms) // 60000 for c in want_conflicts if c.kind == "overlap"),
+            )
+            self.assertGreaterEqual(ev.score, 0.0)
+
+        # Nudging everything 10h later pushes events out of work hours.
+        self.assertGreater(got[5].out_of_hours_min, got[1].out_of_hours_min)
+
+    def test_process_pool_matches_serial(self) -> None:
+        payload = json.loads(FIXTURE.read_text(encoding="utf-8"))
+        variants = self._variants(payload)
+        serial = evaluate_plan_variants(payload, variants, workers=1)
+        try:
+            parallel = evaluate_plan_variants(payload, variants, workers=2)
+        except (OSError, PermissionError, NotImplementedError) as ex:
+            self.skipTest(f"process pool unavailable: {ex}")
+        self.assertEqual(parallel, serial)
+        self.assertEqual(evaluate_plan_variants(payload, [], workers=4), [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import random
+import unittest
+from unittest.mock import patch
+
+from scalpel import planner_vec
+from scalpel.ai.slots import _subtract, _union_intervals, free_intervals_by_day
+from scalpel.bench import make_schedule_payload_v1
+from scalpel.model import EventMap
+from scalpel.planner import apply_overrides, day_loads, detect_conflicts, selection_metrics
+
+DAY_MS = 86_400_000
+MIN_MS = 60_000
+T0 = 1_772_323_200_000  # 2026-03-01T00:00:00Z (spans the US DST switch)
+
+
+def _random_events(n: int, seed: int) -> EventMap:
+    rng = random.Random(seed)
+    events: EventMap = {}
+    for i in range(n):
+        start = T0 + rng.randrange(0, 21 * 24 * 60, 5) * MIN_MS
+        r = rng.random()
+        if r < 0.05:
+            dur = rng.randrange(24 * 60, 3 * 24 * 60)  # multi-day
+        elif r < 0.07:
+            dur = 0  # empty interval
+        else:
+            dur = rng.choice([10, 15, 30, 45, 60, 90, 120])
+        events[f"u{i:05d}"] = (start, start + dur * MIN_MS, max(1, dur))
+    return events
+
+
+@unittest.skipUnless(planner_vec.HAVE_NUMPY, "numpy not installed")
+class TestPlannerVecParityContract(unittest.TestCase):
+    def _reference(self, fn, *args):
+        with patch.dict(os.environ, {"SCALPEL_NUMPY": "0"}):
+            self.assertFalse(planner_vec.enabled_for(10**6))
+            return fn(*args)
+
+    def test_detect_conflicts_matches_reference(self) -> None:
+        for tz in ("UTC", "America/New_York", "Asia/Kolkata"):
+            for seed in (1, 2):
+                with self.subTest(tz=tz, seed=seed):
+                    events = _random_events(1500, seed)
+                    cfg = {"tz": tz, "work_start_min": 9 * 60, "work_end_min": 17 * 60}
+                    want = self._reference(detect_conflicts, events, cfg)
+                    self.assertEqual(planner_vec.detect_conflicts(events, cfg), want)
+                    self.assertEqual(detect_conflicts(events, cfg), want)
+                    self.assertTrue(any(s.kind == "overlap" for s in want))
+                    self.assertTrue(any(s.kind == "out_of_hours" for s in want))
+
+    def test_selection_metrics_and_union_match_reference(self) -> None:
+        events = _random_events(1200, 3)
+        selected = sorted(events.keys())[::2] + ["missing", "u00001"]
+        want = self._reference(selection_metrics, selected, events)
+        self.assertEqual(planner_vec.selection_metrics(selected, events), want)
+
+        intervals = [(s, e) for s, e, _d in events.values()]
+        self.assertEqual(planner_vec.union_intervals(intervals), _union_intervals(intervals))
+        self.assertEqual(planner_vec.union_intervals([]), [])
+
+    def test_day_loads_match_reference(self) -> None:
+        for tz in ("UTC", "America/New_York", "Asia/Kolkata"):
+            with self.subTest(tz=tz):
+                events = _random_events(1500, 4)
+                cfg = {"tz": tz}
+                want = self._reference(day_loads, events, cfg)
+                self.assertEqual(planner_vec.day_loads(events, cfg), want)
+                self.assertEqual(list(want), sorted(want))
+        self.assertEqual(planner_vec.day_loads({"a": (T0, T0, 1)}, {"tz": "UTC"}), {})
+
+    def test_free_in_windows_matches_subtract(self) -> None:
+        rng = random.Random(6)
+        busy = _union_intervals(
+            [
+                (s, s + rng.choice([0, 10, 30, 90]) * MIN_MS)
+                for s in (T0 + rng.randrange(0, 7 * 1440) * MIN_MS for _ in range(600))
+            ]
+        )
+        windows = [(T0 + d * DAY_MS + 9 * 60 * MIN_MS, T0 + d * DAY_MS + 17 * 60 * MIN_MS) for d in range(-1, 9)]
+        windows.append((busy[3][0], busy[3][1]))  # a window exactly covered by busy time
+        windows.append((busy[5][1], busy[6][0]))  # a window exactly between two busy blocks
+        want = []
+        for w0, w1 in windows:
+            blocks = [(max(s, w0), min(e, w1)) for s, e in busy if e > w0 and s < w1]
+            want.append(_subtract((w0, w1), _union_intervals(blocks)))
+        self.assertEqual(planner_vec.free_in_windows(busy, windows), want)
+        self.assertEqual(planner_vec.free_in_windows([], windows[:1]), [[windows[0]]])
+
+    def test_payload_paths_match_reference(self) -> None:
+        payload = make_schedule_payload_v1(n_tasks=1500, days=14, seed=5)  # enough busy time to vectorize
+        events = apply_overrides(payload["tasks"], {}, payload["cfg"])
+        self.assertEqual(
+            detect_conflicts(events, payload["cfg"]),
+            self._reference(detect_conflicts, events, payload["cfg"]),
+        )
+        movable = [t["uuid"] for t in payload["tasks"][:40]]
+        self.assertEqual(
+            free_intervals_by_day(payload, movable),
+            self._reference(free_intervals_by_day, payload, movable),
+        )
+
+
+class TestPlannerVecFallbackContract(unittest.TestCase):
+    def test_day_loads_split_events_at_local_midnight(self) -> None:
+        events: EventMap = {
+            "a": (T0 + 23 * 60 * MIN_MS, T0 + 25 * 60 * MIN_MS + 30 * MIN_MS, 150),  # 23:00 -> 01:30 next day
+            "b": (T0 + DAY_MS + 9 * 60 * MIN_MS, T0 + DAY_MS + 10 * 60 * MIN_MS, 60),
+            "empty": (T0, T0, 1),
+        }
+        with patch.dict(os.environ, {"SCALPEL_NUMPY": "0"}):
+            self.assertEqual(day_loads(events, {"tz": "UTC"}), {"2026-03-01": 60, "2026-03-02": 150})
+
+    def test_small_inputs_and_opt_out_use_reference_path(self) -> None:
+        self.assertFalse(planner_vec.enabled_for(planner_vec.MIN_VECTOR_EVENTS - 1))
+        with patch.dict(os.environ, {"SCALPEL_NUMPY": "0"}):
+            self.assertFalse(planner_vec.enabled_for(10**6))
+        if not planner_vec.HAVE_NUMPY:
+            self.assertFalse(planner_vec.enabled_for(10**6))
+            self.assertIsNone(planner_vec.detect_conflicts({"a": (0, 60_000, 1)}, {}))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from scalpel.render import inline
+from scalpel.render.inline import build_html, iter_html_chunks, write_html_file
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURE = REPO_ROOT / "tests" / "fixtures" / "golden_payload_large_v1.json"
+
+
+def _tricky_payload() -> dict:
+    payload = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    payload["tasks"][0]["description"] = "</script><script>alert(1)</script> é✓ <\\/ done"
+    payload["tasks"][1]["description"] = "<" * 7 + "/" * 3
+    return payload
+
+
+class TestRenderStreamWriterContract(unittest.TestCase):
+    def _assert_identical(self, payload: dict) -> None:
+        want = build_html(payload).encode("utf-8")
+        self.assertEqual(b"".join(iter_html_chunks(payload)), want)
+        with tempfile.TemporaryDirectory() as td:
+            out = Path(td) / "out.html"
+            n = write_html_file(payload, str(out))
+            self.assertEqual(out.read_bytes(), want)
+            self.assertEqual(n, len(want))
+            self.assertEqual(os.listdir(td), ["out.html"])
+
+    def test_streamed_output_is_byte_identical(self) -> None:
+        self._assert_identical(_tricky_payload())
+
+    def test_stdlib_fallback_escapes_across_chunk_boundaries(self) -> None:
+        payload = _tricky_payload()
+        with mock.patch.object(inline, "orjson", None):
+            want = build_html(payload).encode("utf-8")
+            self.assertNotIn(b"alert(1)</script>", want)
+            for chunk_chars in (2, 3, 7, 4096):
+                with mock.patch.object(inline, "_CHUNK_CHARS", chunk_chars):
+                    self.assertEqual(b"".join(iter_html_chunks(payload)), want, chunk_chars)
+            self._assert_identical(payload)
+
+    def test_failed_write_keeps_previous_file(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            out = Path(td) / "out.html"
+            out.write_text("previous", encoding="utf-8")
+            os.chmod(out, 0o640)
+            with self.assertRaises(RuntimeError):
+                write_html_file({"tasks": [{"description": "__DATA_JSON__"}]}, str(out))
+            self.assertEqual(out.read_text(encoding="utf-8"), "previous")
+            self.assertEqual(os.listdir(td), ["out.html"])
+
+            write_html_file({"cfg": {}, "tasks": []}, str(out))
+            self.assertEqual(stat.S_IMODE(out.stat().st_mode), 0o640)
+            with self.assertRaises(TypeError):
+                write_html_file([], str(out))  # type: ignore[arg-type]
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from typing import Any
+
+from scalpel.serve_apply_jobs import ApplyJobManager
+from scalpel.serve_endpoints import handle_apply_job_endpoint, handle_apply_post
+
+
+def _entry(idx: int, line: object, ok: bool = True) -> dict[str, Any]:
+    return {
+        "index": idx,
+        "kind": "modify",
+        "line": str(line),
+        "argv": str(line).split(),
+        "ok": ok,
+        "returncode": 0 if ok else 1,
+        "stdout": "",
+        "stderr": "" if ok else "boom",
+        "error": None if ok else "Taskwarrior command failed with exit 1.",
+    }
+
+
+class _FakeApply:
+    def __init__(self, *, fail_at: int | None = None, gate: threading.Event | None = None) -> None:
+        self.calls: list[list[object]] = []
+        self.fail_at = fail_at
+        self.gate = gate
+
+    def __call__(self, commands: list[object], *, selected: list[object] | None = None) -> dict[str, Any]:
+        assert selected is not None and len(selected) == 1
+        idx = int(selected[0])  # type: ignore[call-overload]
+        self.calls.append(list(selected))
+        if self.gate is not None:
+            self.gate.wait(5.0)
+        ok = idx != self.fail_at
+        return {
+            "ok": ok,
+            "applied": 1 if ok else 0,
+            "selected": 1,
+            "commands": [_entry(idx, commands[idx], ok)],
+            "stopped_after_index": None if ok else idx,
+        }
+
+
+def _wait_finished(jobs: ApplyJobManager, job_id: str) -> dict[str, Any]:
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        snap = jobs.get(job_id)
+        if snap is not None and snap["result"] is not None:
+            return snap
+        time.sleep(0.01)
+    raise AssertionError("apply job did not finish")
+
+
+COMMANDS = ["task 1 modify project:a", "task 2 modify project:b", "task 3 done"]
+
+
+class TestServeApplyJobsContract(unittest.TestCase):
+    def test_async_post_returns_job_and_streams_progress(self) -> None:
+        events: list[tuple[str, dict]] = []
+        fake = _FakeApply()
+        jobs = ApplyJobManager(fake, publish=lambda ev, data: events.append((ev, data)))
+        responses: list[tuple[int, dict]] = []
+        counters: list[str] = []
+        handle_apply_post(
+            body={"commands": COMMANDS, "selected": [2, 0], "confirm": True, "async": True},
+            execute_apply=fake,
+            send_json=lambda code, body: responses.append((code, body)),
+            obs_inc=lambda key, **_kw: counters.append(key),
+            jobs=jobs,
+        )
+        code, body = responses[-1]
+        self.assertEqual((code, body["ok"], body["selected"]), (202, True, 2))
+
+        snap = _wait_finished(jobs, body["job"])
+        self.assertEqual(snap["status"], "done")
+        self.assertEqual(fake.calls, [[2], [0]])
+        result = snap["result"]
+        self.assertEqual((result["ok"], result["applied"], result["selected"]), (True, 2, 2))
+        self.assertEqual([c["index"] for c in result["commands"]], [2, 0])
+        self.assertEqual([e for e, _ in events], ["apply-progress", "apply-progress", "apply-finished"])
+        self.assertEqual(events[1][1]["done"], 2)
+        self.assertEqual(counters, ["apply_job_submitted_total"])
+
+        handle_apply_job_endpoint(
+            body["job"], jobs=jobs, send_json=lambda c, b: responses.append((c, b)), obs_inc=counters.append
+        )
+        self.assertEqual(responses[-1][1]["status"], "done")
+        handle_apply_job_endpoint(
+            "0-deadbeef", jobs=jobs, send_json=lambda c, b: responses.append((c, b)), obs_inc=counters.append
+        )
+        self.assertEqual(responses[-1][0], 404)
+
+    def test_cancel_takes_effect_between_commands(self) -> None:
+        gate = threading.Event()
+        fake = _FakeApply(gate=gate)
+        jobs = ApplyJobManager(fake)
+        job = jobs.submit(COMMANDS)
+        deadline = time.monotonic() + 5.0
+        while not fake.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        snap = jobs.cancel(job.id)
+        assert snap is not None
+        self.assertTrue(snap["cancel_requested"])
+        gate.set()
+        snap = _wait_finished(jobs, job.id)
+        self.assertEqual(snap["status"], "cancelled")
+        self.assertEqual(fake.calls, [[0]])  # the running command finished; nothing new started
+        self.assertEqual((snap["result"]["ok"], snap["result"]["applied"]), (False, 1))
+
+    def test_failure_stops_job_and_bad_requests_are_rejected_upfront(self) -> None:
+        fake = _FakeApply(fail_at=1)
+        jobs = ApplyJobManager(fake)
+        snap = _wait_finished(jobs, jobs.submit(COMMANDS).id)
+        self.assertEqual(snap["status"], "failed")
+        self.assertEqual(fake.calls, [[0], [1]])
+        self.assertEqual(snap["result"]["stopped_after_index"], 1)
+
+        with self.assertRaises(SystemExit):
+            jobs.submit(["rm -rf /"])
+        with self.assertRaises(SystemExit):
+            jobs.submit(COMMANDS, selected=[7])
+
+    def test_unexpected_error_fails_the_job_and_keeps_the_worker(self) -> None:
+        fake = _FakeApply()
+        finished: list[str] = []
+
+        def flaky(commands: list[object], *, selected: list[object] | None = None) -> dict[str, Any]:
+            if selected == [1]:
+                raise OSError("task: cannot open data file")
+            return fake(commands, selected=selected)
+
+        jobs = ApplyJobManager(flaky, on_finished=lambda job: finished.append(job.status))
+        snap = _wait_finished(jobs, jobs.submit(COMMANDS).id)
+        self.assertEqual(snap["status"], "failed")
+        self.assertEqual(snap["error"], "OSError: task: cannot open data file")
+        self.assertEqual((snap["result"]["applied"], snap["result"]["stopped_after_index"]), (1, 1))
+        self.assertEqual(fake.calls, [[0]])
+
+        snap = _wait_finished(jobs, jobs.submit(COMMANDS, selected=[2]).id)
+        self.assertEqual(snap["status"], "done")
+        deadline = time.monotonic() + 5.0
+        while len(finished) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)  # on_finished runs just after the result is recorded
+        self.assertEqual(finished, ["failed", "done"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from scalpel import serve
+from scalpel.serve_async import AsyncHTTPServer
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _payload() -> dict:
+    return {"cfg": {"view_key": "async"}, "tasks": [{"uuid": "a", "description": "A"}], "meta": {"g": 0}}
+
+
+class TestServeAsyncBackendContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.out_file = Path(self._td.name) / "serve.html"
+        self.out_file.write_text("<html><body>page</body></html>", encoding="utf-8")
+        self.holder: dict[str, AsyncHTTPServer] = {}
+        self.error: BaseException | None = None
+        self.lookup_started = threading.Event()
+        self.release_lookup = threading.Event()
+
+    def tearDown(self) -> None:
+        self.release_lookup.set()
+        server = self.holder.get("server")
+        if server is not None:
+            server.shutdown()
+        self._td.cleanup()
+
+    def _slow_lookup(self, uuid: str) -> dict:
+        self.lookup_started.set()
+        self.release_lookup.wait(timeout=5.0)
+        return {"task": {"uuid": uuid, "description": "slow"}, "matched": 1, "exact": True}
+
+    def _start(self) -> tuple[str, int]:
+        args = argparse.Namespace(host="127.0.0.1", port=0, serve_token="", allow_remote=False, no_open=True)
+
+        def factory(addr, handler):
+            server = AsyncHTTPServer(addr, handler, blocking_workers=1)
+            self.holder["server"] = server
+            return server
+
+        def runner() -> None:
+            try:
+                serve.serve(
+                    args,
+                    str(self.out_file),
+                    _payload(),
+                    render_once=lambda _a, _p: _payload(),
+                    task_lookup=self._slow_lookup,
+                    timew_export=lambda d: {"day": d, "intervals": []},
+                    server_factory=factory,
+                )
+            except BaseException as ex:
+                self.error = ex
+
+        threading.Thread(target=runner, daemon=True).start()
+        deadline = time.time() + 5.0
+        while "server" not in self.holder:
+            if isinstance(self.error, PermissionError):
+                self.skipTest("local HTTP bind not permitted in this environment")
+            if self.error is not None or time.time() >= deadline:
+                raise RuntimeError(f"serve thread failed to start: {self.error}")
+            time.sleep(0.01)
+        host, port = self.holder["server"].server_address[:2]
+        return str(host), int(port)
+
+    def test_keep_alive_serves_many_requests_on_one_connection(self) -> None:
+        host, port = self._start()
+        conn = http.client.HTTPConnection(host, port, timeout=5)
+        try:
+            conn.request("GET", "/health")
+            resp = conn.getresponse()
+            self.assertEqual((resp.status, resp.version), (200, 11))
+            self.assertEqual(json.loads(resp.read()), {"ok": True})
+            sock = conn.sock
+
+            body = json.dumps({"values": {"scalpel.zoom": 3}}).encode("utf-8")
+            conn.request("POST", "/client-state", body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 200, resp.read())
+            resp.read()
+
+            conn.request("GET", "/payload", headers={"Accept-Encoding": "identity"})
+            resp = conn.getresponse()
+            self.assertEqual(json.loads(resp.read())["tasks"], _payload()["tasks"])
+            etag = resp.headers["ETag"]
+            conn.request("GET", "/payload", headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+            resp = conn.getresponse()
+            self.assertEqual((resp.status, resp.read()), (304, b""))
+
+            conn.request("GET", "/client-state")
+            resp = conn.getresponse()
+            self.assertIn("scalpel.zoom", resp.read().decode("utf-8"))
+            self.assertIs(conn.sock, sock)  # every exchange reused the first socket
+        finally:
+            conn.close()
+
+    def test_slow_taskwarrior_call_does_not_block_fast_paths(self) -> None:
+        host, port = self._start()
+        results: dict[str, int] = {}
+
+        def slow() -> None:
+            c = http.client.HTTPConnection(host, port, timeout=10)
+            c.request("GET", "/task?uuid=abc")
+            results["task"] = c.getresponse().status
+            c.close()
+
+        t = threading.Thread(target=slow, daemon=True)
+        t.start()
+        self.assertTrue(self.lookup_started.wait(timeout=5.0))
+        conn = http.client.HTTPConnection(host, port, timeout=2)
+        t0 = time.monotonic()
+        for _ in range(5):
+            conn.request("GET", "/health")
+            self.assertEqual(conn.getresponse().read(), b'{"ok":true}')
+        self.assertLess(time.monotonic() - t0, 1.0)
+        conn.close()
+        self.release_lookup.set()
+        t.join(timeout=5.0)
+        self.assertEqual(results.get("task"), 200)
+
+    def test_events_stream_on_async_backend(self) -> None:
+        host, port = self._start()
+        conn = http.client.HTTPConnection(host, port, timeout=5)
+        conn.request("GET", "/events")
+        resp = conn.getresponse()
+        self.assertEqual(resp.headers["Content-Type"], "text/event-stream; charset=utf-8")
+        lines = [resp.readline() for _ in range(4)]
+        self.assertIn(b'data: {"generation":0}\n', lines)
+        conn.close()
+
+    def test_load_tool_compares_backends(self) -> None:
+        cmd = [sys.executable, "-m", "scalpel.tools.serve_load", "--requests", "40", "--concurrency", "2", "--n", "20"]
+        p = subprocess.run(cmd, cwd=str(REPO_ROOT), capture_output=True, text=True, timeout=120)
+        combined = (p.stdout or "") + "\n" + (p.stderr or "")
+        self.assertEqual(p.returncode, 0, combined)
+        for backend in ("threading", "asyncio"):
+            for path in ("/payload", "/health"):
+                self.assertRegex(combined, rf"{backend}\s+{path}\s+[\d.]+ req/s\s+p50=[\d.]+ ms\s+p99=[\d.]+ ms")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from scalpel.serve_endpoints import handle_client_state_post
+from scalpel.serve_state_store import ClientStateStore
+from scalpel.serve_support import client_state_journal_file, read_client_state, write_client_state
+from scalpel.serve_types import ServeState
+
+
+class TestClientStateJournalContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.path = Path(self._td.name) / "out.html.state.json"
+        self.journal = client_state_journal_file(self.path)
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def test_queued_deltas_share_one_small_journal_append(self) -> None:
+        notes = {"doc": "x" * 50_000}
+        write_client_state(self.path, {"notes": notes, "zoom": 1})
+        snapshot_before = self.path.read_bytes()
+        store = ClientStateStore(self.path, read_client_state(self.path))
+        tickets = [store.queue({"zoom": i, f"panel.{i % 3}": True}) for i in range(20)]
+        tickets.append(store.queue({}, ["panel.0"]))
+        store.commit(tickets[-1])
+        for ticket in tickets[:-1]:
+            store.commit(ticket)  # already durable: no further writes
+
+        self.assertEqual(store.appends, 1)
+        self.assertEqual(self.path.read_bytes(), snapshot_before)  # large snapshot untouched
+        lines = self.journal.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertLess(len(lines[0]), 200)
+        state = read_client_state(self.path)
+        self.assertEqual((state["zoom"], state["notes"], "panel.0" in state), (19, notes, False))
+
+        store.record({"zoom": 20})
+        self.assertEqual((store.appends, len(self.journal.read_text(encoding="utf-8").splitlines())), (2, 2))
+
+    def test_journal_compacts_once_it_outgrows_the_snapshot(self) -> None:
+        store = ClientStateStore(self.path, {}, compact_min_bytes=0)
+        store.record({"a": 1})  # journal (1 line) > empty snapshot -> folded immediately
+        self.assertEqual((store.compactions, self.journal.exists()), (1, False))
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8")), {"a": 1})
+
+        store = ClientStateStore(self.path, {"a": 1}, compact_min_bytes=10_000)
+        store.record({"b": 2})
+        self.assertTrue(self.journal.exists())
+        self.assertEqual(read_client_state(self.path), {"a": 1, "b": 2})
+
+    def test_startup_replays_and_folds_journal_and_ignores_torn_tail(self) -> None:
+        write_client_state(self.path, {"a": 1, "b": 2})
+        self.journal.write_text('{"set":{"c":3},"del":["a"]}\n{"set":{"d":', encoding="utf-8")
+        self.assertEqual(read_client_state(self.path), {"b": 2, "c": 3})
+        ClientStateStore(self.path, read_client_state(self.path))
+        self.assertFalse(self.journal.exists())
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8")), {"b": 2, "c": 3})
+
+    def test_post_journals_delta_instead_of_rewriting_snapshot(self) -> None:
+        write_client_state(self.path, {"old": 1})
+        state = ServeState(payload={}, client_state={"old": 1})  # type: ignore[arg-type]
+        store = ClientStateStore(self.path, state.client_state)
+        responses: list[tuple[int, dict]] = []
+        handle_client_state_post(
+            body={"values": {"new": 2}, "delete": ["old"]},
+            state=state,
+            state_lock=threading.Lock(),
+            state_file=self.path,
+            send_json=lambda code, body: responses.append((code, body)),
+            store=store,
+        )
+        self.assertEqual(responses[-1], (200, {"ok": True, "state": {"new": 2}}))
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8")), {"old": 1})
+        self.assertEqual(read_client_state(self.path), {"new": 2})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+from scalpel import serve
+from scalpel.serve_compress import EncodedBodyCache, encode_body, negotiate_encoding
+
+
+def _payload(n: int, tag: str) -> dict:
+    tasks = [{"uuid": f"{i:08x}-0000-0000-0000-000000000000", "description": f"task {i} {tag}"} for i in range(n)]
+    return {"cfg": {"view_key": "gz"}, "tasks": tasks, "meta": {"generated_at": tag}}
+
+
+class TestServeCompressionUnitContract(unittest.TestCase):
+    def test_negotiation_honours_q_values_and_server_preference(self) -> None:
+        codecs = {"zstd": bytes, "br": bytes, "gzip": bytes}
+        self.assertEqual(negotiate_encoding("gzip, deflate, br, zstd", codecs), "zstd")
+        self.assertEqual(negotiate_encoding("gzip;q=1.0, br;q=0.5", codecs), "gzip")
+        self.assertEqual(negotiate_encoding("br;q=0, *;q=0.1", codecs), "zstd")
+        self.assertEqual(negotiate_encoding("x-gzip", {"gzip": bytes}), "gzip")
+        self.assertIsNone(negotiate_encoding("gzip;q=0", codecs))
+        self.assertIsNone(negotiate_encoding("identity", codecs))
+        self.assertIsNone(negotiate_encoding("", codecs))
+        self.assertEqual(negotiate_encoding("br, gzip", {"gzip": bytes}), "gzip")
+
+    def test_small_bodies_stay_identity(self) -> None:
+        self.assertEqual(encode_body(b"{}", "gzip"), (b"{}", None))
+        big = b"x" * 4096
+        packed, enc = encode_body(big, "gzip")
+        self.assertEqual(enc, "gzip")
+        self.assertEqual(gzip.decompress(packed), big)
+
+    def test_cache_compresses_once_per_key(self) -> None:
+        calls: list[int] = []
+
+        def fake(body: bytes) -> bytes:
+            calls.append(len(body))
+            return body[:10]
+
+        builds: list[str] = []
+        cache = EncodedBodyCache(max_entries=2, codecs={"gzip": fake})
+
+        def build(tag: str):
+            return lambda: builds.append(tag) or tag.encode() * 2000
+
+        for _ in range(3):
+            self.assertEqual(cache.get(("p", 1), "gzip", build("a"))[:2], (b"a" * 10, "gzip"))
+        self.assertEqual(cache.get(("p", 1), None, build("a"))[:2], (b"a" * 2000, None))
+        self.assertEqual((len(calls), builds), (1, ["a"]))
+        cache.get(("p", 2), "gzip", build("b"))
+        cache.get(("p", 3), "gzip", build("c"))
+        cache.get(("p", 1), "gzip", build("a"))  # evicted; rebuilt
+        self.assertEqual(builds, ["a", "b", "c", "a"])
+
+
+class TestServeCompressionLiveContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.out_file = Path(self._td.name) / "serve.html"
+        self.out_file.write_text("<html><body>" + "inline page " * 500 + "</body></html>", encoding="utf-8")
+        self.renders = 0
+        self.holder: dict[str, ThreadingHTTPServer] = {}
+        self.error: BaseException | None = None
+
+    def tearDown(self) -> None:
+        server = self.holder.get("server")
+        if server is not None:
+            server.shutdown()
+        self._td.cleanup()
+
+    def _render_once(self, _args, _out):
+        self.renders += 1
+        return _payload(400, f"gen-{self.renders}")
+
+    def _start(self) -> str:
+        args = argparse.Namespace(
+            host="127.0.0.1", port=0, serve_token="", allow_remote=False, no_open=True, bundle="split"
+        )
+
+        def factory(addr, handler):
+            server = ThreadingHTTPServer(addr, handler)
+            self.holder["server"] = server
+            return server
+
+        def runner() -> None:
+            try:
+                serve.serve(
+                    args,
+                    str(self.out_file),
+                    _payload(400, "gen-0"),
+                    render_once=self._render_once,
+                    task_lookup=lambda _u: {"task": None, "matched": 0, "exact": False},
+                    timew_export=lambda d: {"day": d, "intervals": []},
+                    server_factory=factory,
+                )
+            except BaseException as ex:
+                self.error = ex
+
+        threading.Thread(target=runner, daemon=True).start()
+        deadline = time.time() + 5.0
+        while "server" not in self.holder:
+            if isinstance(self.error, PermissionError):
+                self.skipTest("local HTTP bind not permitted in this environment")
+            if self.error is not None or time.time() >= deadline:
+                raise RuntimeError(f"serve thread failed to start: {self.error}")
+            time.sleep(0.01)
+        host, port = self.holder["server"].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _get(self, url: str, encoding: str = "gzip") -> tuple[bytes, dict]:
+        with urlopen(Request(url, headers={"Accept-Encoding": encoding}), timeout=5) as resp:
+            return resp.read(), dict(resp.headers)
+
+    def test_payload_html_and_static_are_gzipped_per_generation(self) -> None:
+        base = self._start()
+        raw, headers = self._get(base + "/payload")
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        first = gzip.decompress(raw)
+        self.assertEqual(json.loads(first)["meta"]["generated_at"], "gen-0")
+        self.assertLess(len(raw) * 5, len(first))
+        self.assertEqual(self._get(base + "/payload")[0], raw)
+
+        plain, headers = self._get(base + "/payload", "identity")
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(plain, first)
+
+        for path in ("/", "/serve.html"):
+            raw, headers = self._get(base + path)
+            self.assertEqual(headers["Content-Encoding"], "gzip", path)
+            self.assertIn(b"__scalpel_kvGet", gzip.decompress(raw))
+
+        shell = gzip.decompress(self._get(base + "/")[0]).decode("utf-8")
+        js_path = shell.split('s.src = "', 1)[1].split('"', 1)[0]
+        raw, headers = self._get(base + js_path)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertTrue(headers["ETag"].endswith('-gzip"'))
+        self.assertIn(b"use strict", gzip.decompress(raw))
+
+        with urlopen(Request(base + "/refresh", data=b"{}", method="POST"), timeout=5) as resp:
+            self.assertTrue(json.loads(resp.read())["ok"])
+        raw, _ = self._get(base + "/payload")
+        self.assertEqual(json.loads(gzip.decompress(raw))["meta"]["generated_at"], "gen-1")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
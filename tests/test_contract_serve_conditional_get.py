@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from scalpel import serve
+from scalpel.serve_compress import EncodedBodyCache, etag_matches
+
+
+def _payload(tag: str) -> dict:
+    return {"cfg": {"view_key": "etag"}, "tasks": [], "meta": {"generated_at": tag}}
+
+
+class TestServeConditionalGetContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.out_file = Path(self._td.name) / "serve.html"
+        self.out_file.write_text("<html><body>page-0</body></html>", encoding="utf-8")
+        self.renders = 0
+        self.holder: dict[str, ThreadingHTTPServer] = {}
+        self.error: BaseException | None = None
+
+    def tearDown(self) -> None:
+        server = self.holder.get("server")
+        if server is not None:
+            server.shutdown()
+        self._td.cleanup()
+
+    def _render_once(self, _args, _out):
+        self.renders += 1
+        self.out_file.write_text(f"<html><body>page-{self.renders}</body></html>", encoding="utf-8")
+        return _payload(f"gen-{self.renders}")
+
+    def _start(self) -> str:
+        args = argparse.Namespace(
+            host="127.0.0.1", port=0, serve_token="", allow_remote=False, no_open=True, bundle="inline"
+        )
+
+        def factory(addr, handler):
+            server = ThreadingHTTPServer(addr, handler)
+            self.holder["server"] = server
+            return server
+
+        def runner() -> None:
+            try:
+                serve.serve(
+                    args,
+                    str(self.out_file),
+                    _payload("gen-0"),
+                    render_once=self._render_once,
+                    task_lookup=lambda _u: {"task": None, "matched": 0, "exact": False},
+                    timew_export=lambda d: {"day": d, "intervals": []},
+                    server_factory=factory,
+                )
+            except BaseException as ex:
+                self.error = ex
+
+        threading.Thread(target=runner, daemon=True).start()
+        deadline = time.time() + 5.0
+        while "server" not in self.holder:
+            if isinstance(self.error, PermissionError):
+                self.skipTest("local HTTP bind not permitted in this environment")
+            if self.error is not None or time.time() >= deadline:
+                raise RuntimeError(f"serve thread failed to start: {self.error}")
+            time.sleep(0.01)
+        host, port = self.holder["server"].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _get(self, url: str, etag: str | None = None) -> tuple[int, bytes, str]:
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            with urlopen(Request(url, headers=headers), timeout=5) as resp:
+                self.assertEqual(resp.headers["Cache-Control"], "private, no-cache")
+                return resp.status, resp.read(), resp.headers["ETag"]
+        except HTTPError as ex:
+            return ex.code, ex.read(), ex.headers["ETag"]
+
+    def _post(self, url: str, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        req = Request(url, data=data, method="POST", headers={"Content-Type": "application/json"})
+        with urlopen(req, timeout=5) as resp:
+            self.assertTrue(json.loads(resp.read())["ok"])
+
+    def test_generation_backed_etags_and_304(self) -> None:
+        base = self._start()
+        tags: dict[str, str] = {}
+        for path in ("/", "/payload", "/client-state"):
+            code, body, etag = self._get(base + path)
+            self.assertEqual(code, 200, path)
+            self.assertTrue(body)
+            self.assertRegex(etag, r'^"[0-9a-f]{20}"$')
+            tags[path] = etag
+            code, body, again = self._get(base + path, etag)
+            self.assertEqual((code, body, again), (304, b"", etag), path)
+
+        self._post(base + "/client-state", {"values": {"scalpel.zoom": 2}})
+        code, body, etag = self._get(base + "/client-state", tags["/client-state"])
+        self.assertEqual(code, 200)
+        self.assertEqual(json.loads(body)["state"]["scalpel.zoom"], 2)
+        self.assertNotEqual(etag, tags["/client-state"])
+        self.assertEqual(self._get(base + "/", tags["/"])[0], 200)  # bootstrap changed
+        self.assertEqual(self._get(base + "/payload", tags["/payload"])[0], 304)
+
+        self._post(base + "/refresh", {})
+        code, body, etag = self._get(base + "/payload", tags["/payload"])
+        self.assertEqual(code, 200)
+        self.assertEqual(json.loads(body)["meta"]["generated_at"], "gen-1")
+        code, body, _ = self._get(base + "/")
+        self.assertIn(b"page-1", body)
+
+        with urlopen(base + "/metrics", timeout=5) as resp:
+            counters = json.loads(resp.read())["metrics"]
+        self.assertGreaterEqual(counters["not_modified_total"], 4)
+
+    def test_validators_are_content_hashes(self) -> None:
+        a = EncodedBodyCache().get(("payload", 0), None, lambda: b'{"x":1}')
+        b = EncodedBodyCache().get(("payload", 7), None, lambda: b'{"x":1}')
+        self.assertEqual(a.etag, b.etag)  # survives a server restart / generation reset
+        self.assertTrue(etag_matches(f'W/"{a.digest}-gzip", "other"', a.digest))
+        self.assertTrue(etag_matches("*", a.digest))
+        self.assertFalse(etag_matches('"other"', a.digest))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import unittest
+
+from scalpel.render.inline_js import JS_BLOCK
+from scalpel.serve import _inject_serve_bootstrap
+from scalpel.serve_delta import DeltaLog, diff_payloads
+from scalpel.serve_endpoints import handle_payload_delta_endpoint, handle_refresh_endpoint
+from scalpel.serve_types import ServeState
+
+
+def _task(uuid: str, desc: str, due: int = 0) -> dict:
+    return {"uuid": uuid, "description": desc, "due_ms": due}
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.responses: list[tuple[int, dict]] = []
+        self.counters: list[str] = []
+
+    def send(self, code: int, body: dict) -> None:
+        self.responses.append((code, body))
+
+    def inc(self, key: str, **_kw) -> None:
+        self.counters.append(key)
+
+
+class TestServeDeltaContract(unittest.TestCase):
+    def test_diff_reports_upserts_removals_and_top_level_changes(self) -> None:
+        old = {"cfg": {"days": 7}, "meta": {"g": 1}, "tasks": [_task("a", "A"), _task("b", "B"), _task("c", "C")]}
+        new = {"cfg": {"days": 7}, "meta": {"g": 2}, "tasks": [_task("a", "A"), _task("b", "B2"), _task("d", "D")]}
+        delta = diff_payloads(old, new)  # type: ignore[arg-type]
+        self.assertEqual([t["uuid"] for t in delta["upsert"]], ["b", "d"])
+        self.assertEqual(delta["remove"], ["c"])
+        self.assertEqual(delta["set"], {"meta": {"g": 2}})
+
+    def test_log_folds_generations_and_ages_out(self) -> None:
+        log = DeltaLog(max_deltas=2)
+        log.record(1, {"upsert": [_task("a", "A1")], "remove": ["x"], "set": {"meta": 1}})
+        log.record(2, {"upsert": [_task("x", "X")], "remove": ["a"], "set": {"meta": 2}})
+        folded = log.since(0, 2)
+        assert folded is not None
+        self.assertEqual([t["uuid"] for t in folded["upsert"]], ["x"])
+        self.assertEqual(folded["remove"], ["a"])
+        self.assertEqual(folded["set"], {"meta": 2})
+        self.assertEqual(log.since(2, 2), {"upsert": [], "remove": [], "set": {}})
+
+        log.record(3, {"upsert": [], "remove": [], "set": {}})
+        self.assertIsNone(log.since(0, 3))  # generation 1 fell out of the ring
+        self.assertIsNotNone(log.since(1, 3))
+        self.assertIsNone(log.since(5, 3))
+        log.record(7, {"upsert": [], "remove": [], "set": {}})  # gap: older deltas are unusable
+        self.assertIsNone(log.since(3, 7))
+        self.assertIsNotNone(log.since(6, 7))
+
+    def test_refresh_records_deltas_served_by_endpoint(self) -> None:
+        renders = iter(
+            [
+                {"meta": {"g": 1}, "tasks": [_task("a", "A"), _task("b", "B")]},
+                {"meta": {"g": 2}, "tasks": [_task("a", "A"), _task("b", "B", due=5)]},
+            ]
+        )
+        initial = {"meta": {"g": 0}, "tasks": [_task("a", "A")]}
+        state = ServeState(payload=initial, client_state={})  # type: ignore[arg-type]
+        lock = threading.Lock()
+        rec = _Recorder()
+        for _ in range(2):
+            handle_refresh_endpoint(
+                args=argparse.Namespace(),
+                out_path="out.html",
+                route_file="/out.html",
+                state=state,
+                state_lock=lock,
+                render_once=lambda _a, _p: next(renders),  # type: ignore[arg-type,return-value]
+                send_json=rec.send,
+                obs_inc=rec.inc,
+            )
+        self.assertEqual(rec.responses[-1][1]["generation"], 2)
+
+        handle_payload_delta_endpoint("0", state=state, state_lock=lock, send_json=rec.send, obs_inc=rec.inc)
+        code, body = rec.responses[-1]
+        self.assertEqual((code, body["full"], body["generation"]), (200, False, 2))
+        self.assertEqual(body["upsert"], [_task("b", "B", due=5)])
+        self.assertEqual(body["set"], {"meta": {"g": 2}})
+
+        handle_payload_delta_endpoint("-1", state=state, state_lock=lock, send_json=rec.send, obs_inc=rec.inc)
+        self.assertTrue(rec.responses[-1][1]["full"])
+        handle_payload_delta_endpoint("abc", state=state, state_lock=lock, send_json=rec.send, obs_inc=rec.inc)
+        self.assertEqual(rec.responses[-1][0], 400)
+        self.assertEqual(rec.counters[-2:], ["payload_delta_total", "payload_delta_full_total"])
+
+    def test_page_knows_its_generation_and_patches_in_place(self) -> None:
+        self.assertIn("__scalpel_payloadGeneration = 4;", _inject_serve_bootstrap("<body></body>", {}, 4))
+        self.assertNotIn("__scalpel_payloadGeneration", _inject_serve_bootstrap("<body></body>", {}))
+        self.assertIn("/payload/delta?since=", JS_BLOCK)
+        self.assertIn("function __scalpelApplyPayloadDelta(delta)", JS_BLOCK)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+from scalpel import serve
+from scalpel.serve_metrics import ServeMetrics, route_label
+from scalpel.serve_support import counter_inc, counter_snapshot
+
+
+def _payload() -> dict:
+    return {"cfg": {"view_key": "prom"}, "tasks": [], "meta": {"generated_at": "gen-0"}}
+
+
+class TestServeMetricsPromContract(unittest.TestCase):
+    def test_sharded_counters_keep_the_json_layout(self) -> None:
+        metrics = ServeMetrics(stripes=4)
+        legacy: dict = {}
+
+        def worker() -> None:
+            for _ in range(500):
+                metrics.inc("requests_total", path="/payload")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for _ in range(4000):
+            counter_inc(legacy, "requests_total", path="/payload")
+        metrics.inc("apply_success_total")
+        counter_inc(legacy, "apply_success_total")
+        self.assertEqual(metrics.counter_snapshot(), counter_snapshot(legacy))
+
+    def test_prometheus_text_has_histograms_gauges_and_counters(self) -> None:
+        metrics = ServeMetrics()
+        metrics.inc("requests_total", path='/we"ird')
+        metrics.observe("http_request_duration_seconds", 0.003, method="GET", route="/payload")
+        metrics.observe("http_request_duration_seconds", 20.0, method="GET", route="/payload")
+        metrics.add_gauge("http_requests_in_flight", 1, method="GET")
+        metrics.register_gauge("cache_hit_ratio", "Hit ratio.", lambda: [({"cache": "task"}, 0.75)])
+        text = metrics.render_prometheus()
+
+        self.assertIn("# TYPE scalpel_requests_total counter\nscalpel_requests_total 1\n", text)
+        self.assertIn('scalpel_requests_by_path_total{path="/we\\"ird"} 1', text)
+        self.assertIn('scalpel_http_requests_in_flight{method="GET"} 1', text)
+        self.assertIn('scalpel_cache_hit_ratio{cache="task"} 0.75', text)
+        prefix = 'scalpel_http_request_duration_seconds_bucket{method="GET",route="/payload",le='
+        self.assertIn(prefix + '"0.0025"} 0', text)
+        self.assertIn(prefix + '"0.005"} 1', text)
+        self.assertIn(prefix + '"10"} 1', text)
+        self.assertIn(prefix + '"+Inf"} 2', text)
+        self.assertIn('scalpel_http_request_duration_seconds_count{method="GET",route="/payload"} 2', text)
+        self.assertIn("# TYPE scalpel_apply_duration_seconds histogram", text)
+
+    def test_route_labels_are_bounded(self) -> None:
+        self.assertEqual(route_label("/payload"), "/payload")
+        self.assertEqual(route_label("/static/app.abc.js"), "/static")
+        self.assertEqual(route_label("/apply/3-deadbeef/cancel"), "/apply/{id}/cancel")
+        self.assertEqual(route_label("/serve.html", route_file="/serve.html"), "/serve.html")
+        self.assertEqual(route_label("/../../etc/passwd"), "other")
+
+    def test_live_server_serves_prometheus_metrics(self) -> None:
+        holder: dict[str, ThreadingHTTPServer] = {}
+        errors: list[BaseException] = []
+        with tempfile.TemporaryDirectory() as td:
+            out_file = Path(td) / "serve.html"
+            out_file.write_text("<html><body>page</body></html>", encoding="utf-8")
+            args = argparse.Namespace(
+                host="127.0.0.1", port=0, serve_token="", allow_remote=False, no_open=True, bundle="inline"
+            )
+
+            def factory(addr, handler):
+                holder["server"] = ThreadingHTTPServer(addr, handler)
+                return holder["server"]
+
+            def runner() -> None:
+                try:
+                    serve.serve(
+                        args,
+                        str(out_file),
+                        _payload(),
+                        render_once=lambda _a, _o: _payload(),
+                        task_lookup=lambda _u: {"task": None, "matched": 0, "exact": False},
+                        timew_export=lambda d: {"day": d, "intervals": []},
+                        server_factory=factory,
+                    )
+                except BaseException as ex:
+                    errors.append(ex)
+
+            threading.Thread(target=runner, daemon=True).start()
+            deadline = time.time() + 5.0
+            while "server" not in holder:
+                if errors and isinstance(errors[0], PermissionError):
+                    self.skipTest("local HTTP bind not permitted in this environment")
+                if errors or time.time() >= deadline:
+                    raise RuntimeError(f"serve thread failed to start: {errors}")
+                time.sleep(0.01)
+            host, port = holder["server"].server_address[:2]
+            base = f"http://{host}:{port}"
+            try:
+                for path in ("/payload", "/payload", "/health"):
+                    with urlopen(base + path, timeout=5) as resp:
+                        resp.read()
+                with urlopen(Request(base + "/refresh", data=b"{}", method="POST"), timeout=5) as resp:
+                    resp.read()
+                with urlopen(base + "/metrics?format=prom", timeout=5) as resp:
+                    content_type = resp.headers.get("Content-Type")
+                    text = resp.read().decode("utf-8")
+                with urlopen(base + "/metrics", timeout=5) as resp:
+                    metrics_json = json.loads(resp.read())["metrics"]
+            finally:
+                holder["server"].shutdown()
+
+        self.assertTrue(str(content_type).startswith("text/plain; version=0.0.4"))
+        self.assertIn('scalpel_http_request_duration_seconds_count{method="GET",route="/payload"} 2', text)
+        self.assertIn('scalpel_http_response_size_bytes_count{method="GET",route="/health"} 1', text)
+        self.assertIn("scalpel_refresh_duration_seconds_count 1", text)
+        self.assertIn('scalpel_cache_hit_ratio{cache="body"} 0.5', text)
+        self.assertEqual(metrics_json["requests_total_by_path"]["/payload"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from scalpel import serve
+from scalpel.serve_views import RawExportCache, ViewPayloadCache, view_args_from_query, view_key_for
+
+
+def _args(**kw) -> argparse.Namespace:
+    base = dict(
+        filter="status:pending",
+        start="2026-03-02",
+        days=7,
+        workhours="06:00-23:00",
+        snap=10,
+        tz="UTC",
+        display_tz="UTC",
+        host="127.0.0.1",
+        port=0,
+        serve_token="",
+        allow_remote=False,
+        no_open=True,
+        bundle="inline",
+    )
+    base.update(kw)
+    return argparse.Namespace(**base)
+
+
+class _Views:
+    def __init__(self, *, max_views: int = 4, prefetch: bool = False) -> None:
+        self.exports: list[str] = []
+        self.builds: list[str] = []
+        self.raw = RawExportCache(self._export)
+        self.cache = ViewPayloadCache(self._build, self.raw, max_views=max_views, prefetch=prefetch)
+
+    def _export(self, filter_str: str) -> list[dict]:
+        self.exports.append(filter_str)
+        return [{"uuid": f"{filter_str}-{len(self.exports)}"}]
+
+    def _build(self, args: argparse.Namespace) -> dict:
+        self.builds.append(str(args.start))
+        rows = self.raw.export(args.filter)
+        rows.append({"uuid": "appended-by-build"})  # builds may extend the list they get
+        return {"cfg": {"view_key": view_key_for(args), "days": args.days}, "tasks": rows, "meta": {}}
+
+
+class TestServeMultiViewContract(unittest.TestCase):
+    def test_view_spec_is_parsed_from_the_query(self) -> None:
+        base = _args()
+        self.assertIsNone(view_args_from_query("/payload?token=abc", base))
+        view = view_args_from_query("/?filter=project%3Awork&days=3&tz=UTC&token=abc", base)
+        assert view is not None
+        self.assertEqual((view.filter, view.days, view.start), ("project:work", 3, "2026-03-02"))
+        self.assertEqual(base.filter, "status:pending")
+        self.assertNotEqual(view_key_for(view), view_key_for(base))
+        view = view_args_from_query("/?filter=%28project%3Awork+or+%2Bnext%29+-blocked+1-3+desk", base)
+        assert view is not None
+        self.assertEqual(view.filter, "(project:work or +next) -blocked 1-3 desk")
+        for bad in (
+            "days=0",
+            "days=x",
+            "start=2026-13-01",
+            "workhours=nope",
+            "tz=Not/AZone",
+            "filter=rc.confirmation%3Aoff+1+delete",
+            "filter=1+del",
+            "filter=%221+delete%22",
+            "filter=%27project%3Awork%09rc.confirmation%3Aoff%27",
+            "filter=%22%281%29modify%22",
+            "filter=%28+1+modify+%29+due%3Atoday",
+            "filter=_get+1.description",
+            "filter=%22unbalanced",
+        ):
+            with self.assertRaises(SystemExit):
+                view_args_from_query(f"/?{bad}", base)
+
+    def test_views_share_raw_exports_and_evict_lru(self) -> None:
+        views = _Views(max_views=2)
+        week, three_days = _args(days=7), _args(days=3)
+        e1, hit1 = views.cache.get(week)
+        e2, hit2 = views.cache.get(three_days)
+        self.assertEqual((hit1, hit2, views.exports), (False, False, ["status:pending"]))
+        self.assertEqual(len(e2.payload["tasks"]), 2)  # cached rows were not extended in place
+        self.assertIs(views.cache.get(week)[0], e1)
+
+        views.cache.get(_args(filter="project:home"))
+        self.assertEqual(views.cache.keys(), [view_key_for(week), view_key_for(_args(filter="project:home"))])
+
+        refreshed, _coalesced = views.cache.refresh(week)
+        self.assertEqual((refreshed.generation, len(views.exports)), (2, 3))
+        again, hit = views.cache.get(_args(filter="project:home"))
+        self.assertFalse(hit)  # built from rows older than the refresh
+        self.assertEqual(again.generation, 2)
+
+    def test_adjacent_windows_are_prefetched_and_dropped_on_data_change(self) -> None:
+        views = _Views(max_views=8, prefetch=True)
+        try:
+            views.cache.get(_args(start="2026-03-09", days=7))
+            self.assertTrue(views.cache.wait_idle())
+            self.assertEqual(sorted(views.builds), ["2026-03-02", "2026-03-09", "2026-03-16"])
+            self.assertEqual((views.cache.prefetched, views.exports), (2, ["status:pending"]))
+
+            _entry, hit = views.cache.get(_args(start="2026-03-16", days=7))  # "next week"
+            self.assertTrue(hit)
+            self.assertTrue(views.cache.wait_idle())
+            self.assertEqual(views.builds.count("2026-03-23"), 1)  # its own neighbour is queued in turn
+
+            views.raw.invalidate()  # Taskwarrior data changed
+            self.assertFalse(views.cache.get(_args(start="2026-03-02", days=7))[1])
+        finally:
+            views.cache.close()
+
+    def test_prefetches_do_not_evict_the_views_in_use(self) -> None:
+        views = _Views(max_views=5, prefetch=True)
+        in_use = [_args(filter=f"project:{name}") for name in ("work", "home", "errands")]
+        try:
+            for args in in_use:
+                views.cache.get(args)
+                self.assertTrue(views.cache.wait_idle())
+            self.assertEqual(views.cache.prefetched, 6)
+            keys = views.cache.keys()
+            self.assertEqual(len(keys), 5)
+            self.assertTrue({view_key_for(args) for args in in_use} <= set(keys))
+            self.assertTrue(all(views.cache.get(args)[1] for args in in_use))
+        finally:
+            views.cache.close()
+
+    def test_single_view_cache_does_not_prefetch(self) -> None:
+        views = _Views(max_views=1, prefetch=True)
+        try:
+            views.cache.get(_args(start="2026-03-09", days=7))
+            self.assertTrue(views.cache.wait_idle())
+            self.assertEqual((views.builds, views.cache.prefetched), (["2026-03-09"], 0))
+            self.assertEqual(views.cache.keys(), [view_key_for(_args(start="2026-03-09", days=7))])
+        finally:
+            views.cache.close()
+
+    def test_live_server_serves_and_refreshes_extra_views(self) -> None:
+        views = _Views()
+        holder: dict[str, ThreadingHTTPServer] = {}
+        errors: list[BaseException] = []
+        main_payload = {"cfg": {"view_key": "main"}, "tasks": [], "meta": {"generated_at": "main"}}
+        with tempfile.TemporaryDirectory() as td:
+            out_file = Path(td) / "serve.html"
+            out_file.write_text("<html><body>main</body></html>", encoding="utf-8")
+
+            def factory(addr, handler):
+                holder["server"] = ThreadingHTTPServer(addr, handler)
+                return holder["server"]
+
+            def runner() -> None:
+                try:
+                    serve.serve(
+                        _args(),
+                        str(out_file),
+                        main_payload,
+                        render_once=lambda _a, _o: main_payload,
+                        task_lookup=lambda _u: {"task": None, "matched": 0, "exact": False},
+                        timew_export=lambda d: {"day": d, "intervals": []},
+                        server_factory=factory,
+                        views=views.cache,
+                    )
+                except BaseException as ex:
+                    errors.append(ex)
+
+            threading.Thread(target=runner, daemon=True).start()
+            deadline = time.time() + 5.0
+            while "server" not in holder:
+                if errors and isinstance(errors[0], PermissionError):
+                    self.skipTest("local HTTP bind not permitted in this environment")
+                if errors or time.time() >= deadline:
+                    raise RuntimeError(f"serve thread failed to start: {errors}")
+                time.sleep(0.01)
+            host, port = holder["server"].server_address[:2]
+            base = f"http://{host}:{port}"
+            try:
+                with urlopen(base + "/payload?days=3", timeout=5) as resp:
+                    view_key = resp.headers.get("X-Scalpel-View")
+                    body = json.loads(resp.read())
+                with urlopen(base + "/?days=3", timeout=5) as resp:
+                    page = resp.read().decode("utf-8")
+                with urlopen(base + "/payload", timeout=5) as resp:
+                    main = json.loads(resp.read())
+                req = Request(base + "/refresh?days=3", data=b"{}", method="POST")
+                with urlopen(req, timeout=5) as resp:
+                    refreshed = json.loads(resp.read())
+                with self.assertRaises(HTTPError) as ctx:
+                    urlopen(base + "/payload?days=500", timeout=5)
+                self.assertEqual(ctx.exception.code, 400)
+                with self.assertRaises(HTTPError) as ctx:
+                    urlopen(base + "/payload?filter=rc.confirmation%3Aoff+1+delete", timeout=5)
+                self.assertEqual(ctx.exception.code, 400)
+                with urlopen(base + "/metrics", timeout=5) as resp:
+                    metrics = json.loads(resp.read())["metrics"]
+            finally:
+                holder["server"].shutdown()
+
+        self.assertEqual((body["cfg"]["days"], body["cfg"]["view_key"]), (3, view_key))
+        self.assertIn("appended-by-build", page)
+        self.assertNotRegex(page, r"g\.__scalpel_payloadGeneration = \d+;")  # main-view generation only
+        self.assertEqual(main["cfg"]["view_key"], "main")
+        self.assertEqual((refreshed["ok"], refreshed["view"], refreshed["generation"]), (True, view_key, 2))
+        self.assertEqual((metrics["view_cache_miss_total"], metrics["view_cache_hit_total"]), (1, 1))
+        self.assertEqual(len(views.exports), 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+import unittest
+
+from scalpel.serve_endpoints import handle_refresh_endpoint
+from scalpel.serve_flight import SingleFlight
+from scalpel.serve_types import ServeState
+
+
+class TestServeRefreshSingleFlightContract(unittest.TestCase):
+    def _wait_for(self, predicate, timeout: float = 5.0) -> None:
+        deadline = time.time() + timeout
+        while not predicate():
+            if time.time() >= deadline:
+                self.fail("timed out waiting for condition")
+            time.sleep(0.005)
+
+    def test_single_flight_shares_result_and_errors(self) -> None:
+        flight: SingleFlight[int] = SingleFlight()
+        gate = threading.Event()
+        calls: list[int] = []
+        results: list[tuple[int, bool]] = []
+
+        def work() -> int:
+            calls.append(1)
+            gate.wait(5)
+            return 42
+
+        threads = [threading.Thread(target=lambda: results.append(flight.run(work))) for _ in range(5)]
+        threads[0].start()
+        self._wait_for(flight.in_flight)
+        for t in threads[1:]:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [(42, False)] + [(42, True)] * 4)
+        self.assertFalse(flight.in_flight())
+
+        with self.assertRaises(RuntimeError):
+            flight.run(lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+        self.assertEqual(flight.run(lambda: 7), (7, False))
+
+    def test_fresh_callers_never_join_a_call_that_started_before_them(self) -> None:
+        flight: SingleFlight[int] = SingleFlight()
+        gate = threading.Event()
+        calls: list[int] = []
+        results: list[tuple[int, bool]] = []
+
+        def work() -> int:
+            calls.append(1)
+            gate.wait(5)
+            return len(calls)
+
+        first = threading.Thread(target=lambda: results.append(flight.run(work)))
+        first.start()
+        self._wait_for(flight.in_flight)
+        late = [threading.Thread(target=lambda: results.append(flight.run(work, fresh=True))) for _ in range(3)]
+        for t in late:
+            t.start()
+        time.sleep(0.05)
+        self.assertEqual(len(calls), 1)
+        gate.set()
+        for t in [first, *late]:
+            t.join(5)
+        # The late callers wait out the stale call and share one new one.
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(sorted(results), [(1, False), (2, False), (2, True), (2, True)])
+
+    def test_refresh_builds_outside_lock_and_coalesces(self) -> None:
+        state = ServeState(payload={"generated_at": "old", "tasks": []}, client_state={})
+        lock = threading.Lock()
+        gate = threading.Event()
+        renders: list[int] = []
+        responses: list[tuple[int, dict]] = []
+        counters: list[str] = []
+
+        def render_once(_args, _path):
+            renders.append(1)
+            gate.wait(5)
+            return {"generated_at": "new", "tasks": [{"uuid": "a"}]}
+
+        def refresh() -> None:
+            handle_refresh_endpoint(
+                args=argparse.Namespace(),
+                out_path="out.html",
+                route_file="/out.html",
+                state=state,
+                state_lock=lock,
+                render_once=render_once,
+                send_json=lambda code, body: responses.append((code, body)),
+                obs_inc=lambda key, **_kw: counters.append(key),
+            )
+
+        first = threading.Thread(target=refresh)
+        first.start()
+        self._wait_for(lambda: bool(renders))
+        # Readers are not blocked by the in-flight export and still see the old snapshot.
+        self.assertTrue(lock.acquire(timeout=0.5))
+        try:
+            self.assertEqual(state.payload["generated_at"], "old")
+        finally:
+            lock.release()
+        # Refreshes that arrive mid-build must not get data exported before they
+        # asked, so they share one follow-up build instead of joining the first.
+        late = [threading.Thread(target=refresh) for _ in range(2)]
+        for t in late:
+            t.start()
+        time.sleep(0.05)
+        self.assertEqual(len(renders), 1)
+        gate.set()
+        for t in [first, *late]:
+            t.join(5)
+
+        self.assertEqual(len(renders), 2)
+        self.assertEqual(state.payload["generated_at"], "new")
+        self.assertEqual(state.generation, 2)
+        self.assertEqual([code for code, _ in responses], [200, 200, 200])
+        self.assertEqual(sorted(body["coalesced"] for _, body in responses), [False, False, True])
+        self.assertEqual(sorted(body["generation"] for _, body in responses), [1, 2, 2])
+        self.assertEqual(counters.count("refresh_coalesced_total"), 1)
+        self.assertEqual(state.deltas.since(0, 2)["upsert"], [{"uuid": "a"}])  # type: ignore[index]
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
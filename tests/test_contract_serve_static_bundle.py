@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from scalpel import serve
+from scalpel.render.bundle import STATIC_CACHE_CONTROL, app_bundle
+from scalpel.render.inline_css import CSS_BLOCK
+from scalpel.render.inline_js import JS_BLOCK
+
+PAYLOAD = {"cfg": {"view_key": "bundle", "view_start_ms": 0, "days": 7}, "tasks": [], "meta": {"generated_at": "g0"}}
+
+
+class TestServeStaticBundleContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+        self.out_file = self.root / "serve.html"
+        self.out_file.write_text("<!doctype html><html><body>single-file</body></html>", encoding="utf-8")
+        self.holder: dict[str, ThreadingHTTPServer] = {}
+        self.error: BaseException | None = None
+
+    def tearDown(self) -> None:
+        server = self.holder.get("server")
+        if server is not None:
+            server.shutdown()
+        self._td.cleanup()
+
+    def _start(self, bundle: str) -> str:
+        args = argparse.Namespace(
+            host="127.0.0.1", port=0, serve_token="", allow_remote=False, no_open=True, bundle=bundle
+        )
+
+        def factory(addr, handler):
+            server = ThreadingHTTPServer(addr, handler)
+            self.holder["server"] = server
+            return server
+
+        def runner() -> None:
+            try:
+                serve.serve(
+                    args,
+                    str(self.out_file),
+                    PAYLOAD,
+                    render_once=lambda _a, _p: PAYLOAD,
+                    task_lookup=lambda _u: {"task": None, "matched": 0, "exact": False},
+                    timew_export=lambda d: {"day": d, "intervals": []},
+                    server_factory=factory,
+                )
+            except BaseException as ex:
+                self.error = ex
+
+        threading.Thread(target=runner, daemon=True).start()
+        deadline = time.time() + 5.0
+        while "server" not in self.holder:
+            if isinstance(self.error, PermissionError):
+                self.skipTest("local HTTP bind not permitted in this environment")
+            if self.error is not None or time.time() >= deadline:
+                raise RuntimeError(f"serve thread failed to start: {self.error}")
+            time.sleep(0.01)
+        host, port = self.holder["server"].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def test_split_mode_serves_shell_and_immutable_bundle(self) -> None:
+        base = self._start("split")
+        with urlopen(base + "/", timeout=5) as resp:
+            shell = resp.read().decode("utf-8")
+            self.assertEqual(resp.headers["Cache-Control"], "private, no-cache")
+        self.assertLess(len(shell), len(JS_BLOCK) // 5)
+        self.assertNotIn(JS_BLOCK[:2000], shell)
+        self.assertIn('<script id="tw-data" type="application/json">', shell)
+        self.assertIn("__scalpel_kvGet", shell)  # client-state bootstrap is still injected
+        self.assertIn('fetch("/payload"', shell)
+
+        bundle = app_bundle()
+        for asset, text in ((bundle.js, JS_BLOCK), (bundle.css, CSS_BLOCK)):
+            self.assertIn(asset.path, shell)
+            digest = re.fullmatch(r"/static/app\.([0-9a-f]{16})\.(js|css)", asset.path).group(1)
+            self.assertEqual(digest, hashlib.sha256(text.encode("utf-8")).hexdigest()[:16])
+            with urlopen(base + asset.path, timeout=5) as resp:
+                self.assertEqual(resp.read(), text.encode("utf-8"))
+                self.assertEqual(resp.headers["Cache-Control"], STATIC_CACHE_CONTROL)
+                self.assertEqual(resp.headers["Content-Type"], asset.content_type)
+                etag = resp.headers["ETag"]
+            with self.assertRaises(HTTPError) as ctx:
+                urlopen(Request(base + asset.path, headers={"If-None-Match": etag}), timeout=5)
+            self.assertEqual(ctx.exception.code, 304)
+
+        with self.assertRaises(HTTPError) as ctx:
+            urlopen(base + "/static/app.0000000000000000.js", timeout=5)
+        self.assertEqual(ctx.exception.code, 404)
+
+        with urlopen(base + "/payload", timeout=5) as resp:
+            self.assertEqual(json.loads(resp.read())["meta"]["generated_at"], "g0")
+        with urlopen(base + "/serve.html", timeout=5) as resp:
+            self.assertIn("single-file", resp.read().decode("utf-8"))
+
+    def test_inline_mode_keeps_single_file_page(self) -> None:
+        base = self._start("inline")
+        with urlopen(base + "/", timeout=5) as resp:
+            self.assertIn("single-file", resp.read().decode("utf-8"))
+        with self.assertRaises(HTTPError) as ctx:
+            urlopen(base + app_bundle().js.path, timeout=5)
+        self.assertEqual(ctx.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+import unittest
+
+from scalpel.serve_endpoints import handle_task_endpoint, refresh_state
+from scalpel.serve_task_cache import TaskExportCache
+from scalpel.serve_types import ServeState
+
+_A = "aaaa1111-0000-4000-8000-000000000001"
+_B = "aaaa2222-0000-4000-8000-000000000002"
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.responses: list[tuple[int, dict]] = []
+        self.counters: list[str] = []
+
+    def send(self, code: int, body: dict) -> None:
+        self.responses.append((code, body))
+
+    def inc(self, key: str, **_kw) -> None:
+        self.counters.append(key)
+
+
+class TestServeTaskCacheContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self.subprocess_calls: list[str] = []
+
+    def _fallback(self, uuid_query: str) -> dict:
+        self.subprocess_calls.append(uuid_query)
+        return {"task": {"uuid": uuid_query, "description": "from task"}, "matched": 1, "exact": True}
+
+    def _get(self, cache: TaskExportCache | None, uuid_query: str) -> tuple[_Recorder, int, dict]:
+        rec = _Recorder()
+        handle_task_endpoint(
+            uuid_query, task_lookup=self._fallback, send_json=rec.send, obs_inc=rec.inc, task_cache=cache
+        )
+        code, body = rec.responses[-1]
+        return rec, code, body
+
+    def test_exact_and_prefix_hits_skip_the_subprocess(self) -> None:
+        cache = TaskExportCache()
+        cache.load([{"uuid": _A, "description": "A", "urgency": 3.2}, {"uuid": _B.upper(), "description": "B"}])
+
+        rec, code, body = self._get(cache, _A)
+        self.assertEqual((code, body["task"]["description"], body["exact"]), (200, "A", True))
+        self.assertEqual(rec.counters, ["task_cache_hit_total", "task_export_success_total"])
+
+        _rec, code, body = self._get(cache, "AAAA2222")
+        self.assertEqual((code, body["task"]["description"], body["exact"]), (200, "B", False))
+        self.assertEqual(self.subprocess_calls, [])
+
+        rec, _code, _body = self._get(cache, "aaaa")  # ambiguous in the snapshot -> Taskwarrior decides
+        self.assertEqual(rec.counters[0], "task_cache_miss_total")
+        self._get(cache, "bbbb0000")  # outside the exported view
+        self.assertEqual(self.subprocess_calls, ["aaaa", "bbbb0000"])
+
+    def test_stale_or_invalidated_snapshot_falls_back(self) -> None:
+        cache = TaskExportCache(ttl_s=0.05)
+        cache.load([{"uuid": _A, "description": "A"}])
+        self.assertIsNotNone(cache.lookup(_A))
+        time.sleep(0.1)
+        self.assertFalse(cache.is_fresh())
+        self.assertIsNone(cache.lookup(_A))
+
+        cache = TaskExportCache()
+        cache.load([{"uuid": _A, "description": "A"}])
+        cache.invalidate(loaded_before=time.monotonic() - 10)  # loaded after the cutoff: kept
+        self.assertIsNotNone(cache.lookup(_A))
+        cache.invalidate()
+        _rec, _code, body = self._get(cache, _A)
+        self.assertEqual(body["task"]["description"], "from task")
+
+    def test_refresh_drops_snapshots_its_render_did_not_reload(self) -> None:
+        state = ServeState(payload={"tasks": []}, client_state={})  # type: ignore[arg-type]
+        state.task_cache.load([{"uuid": _A, "description": "old"}])
+        lock = threading.Lock()
+
+        def plain_render(_a, _p):
+            return {"tasks": []}
+
+        refresh_state(args=argparse.Namespace(), out_path="x", state=state, state_lock=lock, render_once=plain_render)
+        self.assertIsNone(state.task_cache.lookup(_A))
+
+        def cache_render(_a, _p):
+            state.task_cache.load([{"uuid": _A, "description": "new"}])
+            return {"tasks": []}
+
+        refresh_state(args=argparse.Namespace(), out_path="x", state=state, state_lock=lock, render_once=cache_render)
+        hit = state.task_cache.lookup(_A)
+        assert hit is not None
+        self.assertEqual(hit["task"]["description"], "new")  # type: ignore[index]
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from scalpel.serve_data import run_timew_export_for_range
+from scalpel.serve_endpoints import handle_timew_endpoint, handle_timew_range_endpoint
+from scalpel.serve_timew_cache import TimewDayCache
+from scalpel.taskwarrior import parse_tw_utc_to_epoch_ms
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.responses: list[tuple[int, dict]] = []
+        self.counters: list[str] = []
+
+    def send(self, code: int, body: dict) -> None:
+        self.responses.append((code, body))
+
+    def inc(self, key: str, **_kw) -> None:
+        self.counters.append(key)
+
+
+class _Proc:
+    def __init__(self, rows: list[dict]) -> None:
+        self.returncode = 0
+        self.stdout = json.dumps(rows).encode("utf-8")
+        self.stderr = b""
+
+
+class TestServeTimewRangeContract(unittest.TestCase):
+    def test_one_export_is_split_per_local_day(self) -> None:
+        rows = [
+            {"start": "20260101T2330Z", "end": "20260102T0030Z", "tags": ["late"]},
+            {"start": "20260103T0900Z", "end": "20260103T1000Z", "annotation": "Deep work"},
+        ]
+        cmds: list[list[str]] = []
+
+        def fake_run(cmd, **_kw):  # type: ignore[no-untyped-def]
+            cmds.append(list(cmd))
+            return _Proc(rows)
+
+        out = run_timew_export_for_range(
+            start_ymd="2026-01-01",
+            end_ymd="2026-01-03",
+            tz_name="UTC",
+            run_proc=fake_run,
+            parse_utc=parse_tw_utc_to_epoch_ms,
+        )
+        self.assertEqual(cmds, [["timew", "export", "from", "2026-01-01", "to", "2026-01-04"]])
+        self.assertEqual([d["day"] for d in out], ["2026-01-01", "2026-01-02", "2026-01-03"])
+        self.assertEqual([len(d["intervals"]) for d in out], [1, 1, 1])
+        self.assertEqual(out[0]["intervals"][0]["end_ms"], 1767312000000)  # clipped at midnight
+        self.assertEqual(out[1]["intervals"][0]["start_ms"], 1767312000000)
+        self.assertEqual(out[2]["intervals"][0]["annotation"], "Deep work")
+
+    def test_cache_keys_days_on_month_files_and_expires_today(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            month = Path(td) / "2026-01.data"
+            month.write_text("inc 20260101T090000Z - 20260101T100000Z\n", encoding="utf-8")
+            today = {"ymd": "2026-01-05"}
+            cache = TimewDayCache(td, today_ymd=lambda: today["ymd"], today_ttl_s=0.0)
+            exported: list[list[str]] = []
+
+            def export(missing: list[str]) -> list[dict]:
+                exported.append(list(missing))
+                return [{"day": d, "intervals": []} for d in missing]
+
+            days = ["2026-01-03", "2026-01-04", "2026-01-05"]
+            self.assertEqual(cache.fetch(days, export)[1], 3)  # type: ignore[arg-type]
+            # Finished days survive; today (ttl 0) is exported again.
+            results, misses = cache.fetch(days, export)  # type: ignore[arg-type]
+            self.assertEqual((misses, exported[-1]), (1, ["2026-01-05"]))
+            self.assertEqual([r["day"] for r in results], days)
+
+            month.write_text("changed\n", encoding="utf-8")
+            os.utime(month, ns=(1, 1))
+            self.assertEqual(cache.fetch(["2026-01-03"], export)[1], 1)  # type: ignore[arg-type]
+            self.assertIsNotNone(cache.get("2026-01-03"))
+            self.assertIsNone(cache.get("2026-02-10"))
+
+    def test_range_endpoint_runs_at_most_one_export(self) -> None:
+        range_calls: list[tuple[str, str]] = []
+        day_calls: list[str] = []
+
+        def range_export(start: str, end: str) -> list[dict]:
+            range_calls.append((start, end))
+            return [{"day": f"2026-01-{i:02d}", "intervals": []} for i in range(int(start[-2:]), int(end[-2:]) + 1)]
+
+        def day_export(day: str) -> dict:
+            day_calls.append(day)
+            return {"day": day, "intervals": []}
+
+        cache = TimewDayCache(None, today_ymd=lambda: "2030-01-01")
+        rec = _Recorder()
+        kw = dict(timew_export=day_export, timew_range_export=range_export, timew_cache=cache)
+        handle_timew_range_endpoint("2026-01-01", "2026-01-07", send_json=rec.send, obs_inc=rec.inc, **kw)
+        code, body = rec.responses[-1]
+        self.assertEqual((code, len(body["days"])), (200, 7))
+        self.assertEqual(range_calls, [("2026-01-01", "2026-01-07")])
+
+        handle_timew_range_endpoint("2026-01-02", "2026-01-06", send_json=rec.send, obs_inc=rec.inc, **kw)
+        handle_timew_endpoint(
+            "2026-01-04", timew_export=day_export, send_json=rec.send, obs_inc=rec.inc, timew_cache=cache
+        )
+        self.assertEqual((len(range_calls), day_calls), (1, []))
+        self.assertEqual(rec.counters.count("timew_cache_hit_total"), 2)
+
+        handle_timew_range_endpoint("2026-01-07", "2026-01-01", send_json=rec.send, obs_inc=rec.inc, **kw)
+        self.assertEqual(rec.responses[-1][0], 400)
+        handle_timew_range_endpoint("2026-01-01", "2026-06-01", send_json=rec.send, obs_inc=rec.inc, **kw)
+        self.assertEqual(rec.responses[-1][0], 400)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
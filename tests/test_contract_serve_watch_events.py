@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.request import urlopen
+
+from scalpel import serve
+from scalpel.serve_events import EventHub, format_sse
+from scalpel.serve_watch import DataDirWatcher
+
+
+def _payload(tag: str) -> dict:
+    return {"cfg": {"view_key": "watch"}, "tasks": [{"uuid": "a", "description": tag}], "meta": {"generated_at": tag}}
+
+
+class TestServeWatchContract(unittest.TestCase):
+    def _assert_debounced(self, use_inotify: bool) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            calls: list[float] = []
+            watcher = DataDirWatcher(
+                [td], lambda: calls.append(time.monotonic()), debounce_s=0.15, poll_s=0.05, use_inotify=use_inotify
+            )
+            if use_inotify and watcher.backend != "inotify":
+                watcher.stop()
+                self.skipTest("inotify unavailable")
+            watcher.start()
+            try:
+                time.sleep(0.1)
+                (Path(td) / "lock.lock").write_text("x", encoding="utf-8")
+                time.sleep(0.4)
+                self.assertEqual(calls, [])  # lock-file churn is ignored
+                for i in range(5):
+                    (Path(td) / "pending.data").write_text(f"burst {i}\n", encoding="utf-8")
+                    time.sleep(0.03)
+                deadline = time.time() + 3.0
+                while not calls and time.time() < deadline:
+                    time.sleep(0.02)
+                time.sleep(0.4)
+                self.assertEqual(len(calls), 1)
+            finally:
+                watcher.stop()
+
+    def test_poll_backend_debounces_bursts(self) -> None:
+        self._assert_debounced(use_inotify=False)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_backend_debounces_bursts(self) -> None:
+        self._assert_debounced(use_inotify=True)
+
+    def test_event_hub_drops_for_slow_clients_and_closes(self) -> None:
+        hub = EventHub()
+        stream = hub.subscribe()
+        for gen in range(40):
+            hub.publish("payload-updated", {"generation": gen})
+        self.assertEqual(stream.qsize(), 16)
+        # A full queue drops its oldest frames, so the newest event is never lost.
+        frames = [stream.get_nowait() for _ in range(16)]
+        self.assertEqual(frames[0], format_sse("payload-updated", {"generation": 24}))
+        self.assertEqual(frames[-1], format_sse("payload-updated", {"generation": 39}))
+        hub.close()
+        self.assertEqual(hub.subscriber_count(), 0)
+        self.assertIsNone(hub.subscribe().get_nowait())
+
+
+class TestServeEventsLiveContract(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+        self.data_dir = self.root / "taskdata"
+        self.data_dir.mkdir()
+        self.out_file = self.root / "serve.html"
+        self.out_file.write_text("<html><body>page</body></html>", encoding="utf-8")
+        self.renders = 0
+        self.holder: dict[str, ThreadingHTTPServer] = {}
+        self.error: BaseException | None = None
+
+    def tearDown(self) -> None:
+        server = self.holder.get("server")
+        if server is not None:
+            server.shutdown()
+        self._td.cleanup()
+
+    def _render_once(self, _args, _out):
+        self.renders += 1
+        return _payload(f"gen-{self.renders}")
+
+    def _start(self) -> str:
+        args = argparse.Namespace(host="127.0.0.1", port=0, serve_token="", allow_remote=False, no_open=True)
+
+        def factory(addr, handler):
+            server = ThreadingHTTPServer(addr, handler)
+            self.holder["server"] = server
+            return server
+
+        def runner() -> None:
+            try:
+                serve.serve(
+                    args,
+                    str(self.out_file),
+                    _payload("gen-0"),
+                    render_once=self._render_once,
+                    task_lookup=lambda _u: {"task": None, "matched": 0, "exact": False},
+                    timew_export=lambda d: {"day": d, "intervals": []},
+                    server_factory=factory,
+                    watch_dirs=[str(self.data_dir)],
+                )
+            except BaseException as ex:
+                self.error = ex
+
+        threading.Thread(target=runner, daemon=True).start()
+        deadline = time.time() + 5.0
+        while "server" not in self.holder:
+            if isinstance(self.error, PermissionError):
+                self.skipTest("local HTTP bind not permitted in this environment")
+            if self.error is not None or time.time() >= deadline:
+                raise RuntimeError(f"serve thread failed to start: {self.error}")
+            time.sleep(0.01)
+        host, port = self.holder["server"].server_address[:2]
+        return f"http://{host}:{port}"
+
+    @staticmethod
+    def _next_event(resp) -> tuple[str, dict]:
+        event = ""
+        while True:
+            line = resp.readline().decode("utf-8").rstrip("\n")
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event:
+                return event, json.loads(line[6:])
+
+    def test_data_dir_write_pushes_payload_updated(self) -> None:
+        base = self._start()
+        with urlopen(base + "/events", timeout=10) as resp:
+            self.assertEqual(resp.headers["Content-Type"], "text/event-stream; charset=utf-8")
+            self.assertEqual(self._next_event(resp), ("hello", {"generation": 0}))
+            (self.data_dir / "pending.data").write_text('[description:"new"]\n', encoding="utf-8")
+            event, data = self._next_event(resp)
+        self.assertEqual(event, "payload-updated")
+        self.assertEqual(data, {"generation": 1, "generated_at": "gen-1"})
+        self.assertEqual(self.renders, 1)
+        with urlopen(base + "/payload/delta?since=0", timeout=5) as resp:
+            delta = json.loads(resp.read())
+        self.assertEqual(delta["upsert"], [{"uuid": "a", "description": "gen-1"}])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)